@@ -374,3 +374,59 @@ class Return(Stmt):
 
     def accept_visitor(self, visitor: TreeVisitor) -> "any":
         return visitor.visit_return(self)
+
+class While(Stmt):
+    def __init__(self, conditional: Expr, body: Stmt):
+        super().__init__()
+        self.conditional = conditional
+        self.body = body
+
+    def get_conditions(self) -> Expr:
+        return self.conditional
+
+    def get_body(self) -> Stmt:
+        return self.body
+
+    def is_expr_stmt(self) -> bool:
+        return False
+
+    def is_declaration(self) -> bool:
+        return False
+
+    def is_control_flow(self) -> bool:
+        return True
+
+    def accept_visitor(self, visitor: TreeVisitor) -> "any":
+        return visitor.visit_while(self)
+
+class Break(Stmt):
+    def __init__(self):
+        super().__init__()
+
+    def is_expr_stmt(self) -> bool:
+        return False
+
+    def is_declaration(self) -> bool:
+        return False
+
+    def is_control_flow(self) -> bool:
+        return True
+
+    def accept_visitor(self, visitor: TreeVisitor) -> "any":
+        return visitor.visit_break(self)
+
+class Continue(Stmt):
+    def __init__(self):
+        super().__init__()
+
+    def is_expr_stmt(self) -> bool:
+        return False
+
+    def is_declaration(self) -> bool:
+        return False
+
+    def is_control_flow(self) -> bool:
+        return True
+
+    def accept_visitor(self, visitor: TreeVisitor) -> "any":
+        return visitor.visit_continue(self)
@@ -33,3 +33,12 @@ class ASTVisitor:
 
     def visit_return(self, node) -> "any":
         pass
+
+    def visit_while(self, node) -> "any":
+        pass
+
+    def visit_break(self, node) -> "any":
+        pass
+
+    def visit_continue(self, node) -> "any":
+        pass
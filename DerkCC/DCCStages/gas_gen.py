@@ -46,8 +46,12 @@ IR_COMPARE_TO_JMP = {
 
 IR_OP_TO_GAS = {
     "NEGATE": "neg",
-    "MULTIPLY": "mul",
-    "DIVIDE": "div",
+    "MULTIPLY": "imul",
+    "DIVIDE": "idiv",
+    "MULTIPLY_HIGH": "imulh",
+    "SHIFT_LEFT": "sal",
+    "SHIFT_RIGHT": "sar",
+    "SHIFT_RIGHT_LOGICAL": "shr",
     "ADD": "add",
     "SUBTRACT": "sub",
     "COMPARE_NEQ": "cmovne",
@@ -285,6 +289,8 @@ class GASEmitter(IRVisitor):
     ir_to_gasreg: dict[str, str]
     ir_to_gastemp: dict[str, str]
     current_funcinfo: ir_gen.FuncInfo
+    pushed_arg_count: int
+    jump_table_count: int
     results: ASMLines
 
     def __init__(self, funcs: ir_gen.FuncInfoTable):
@@ -295,6 +301,8 @@ class GASEmitter(IRVisitor):
         self.ir_to_gasreg = {}
         self.ir_to_gastemp = {}
         self.current_funcinfo = None
+        self.pushed_arg_count = 0
+        self.jump_table_count = 0
         self.results = []
 
     def deduce_sizeof_local(self, ir_addr: str) -> int:
@@ -337,6 +345,9 @@ class GASEmitter(IRVisitor):
             self.results.append(f'.global {label_name}\n')
             self.results.append(f'{label_name}:\n')
 
+            # NOTE a function whose every path ends in a tail call never reaches the return that resets this state.
+            self.reset_func_state()
+
             # 1. allocate the stack frame
             self.results.append(f'\tpushq %rbp\n')
             self.results.append(f'\tmovq %rsp, %rbp\n')
@@ -367,29 +378,39 @@ class GASEmitter(IRVisitor):
             self.results.append(f'\tpushq %r15\n')
 
     def visit_return(self, step: ir_bits.IRStep):
-        result_gas_addr = self.ir_to_gasreg.get(step.result_addr) or self.ir_to_gastemp.get(step.result_addr)
+        # NOTE a void function's return has no result to move.
+        if step.result_addr is not None:
+            result_gas_addr = self.ir_to_gasreg.get(step.result_addr) or self.ir_to_gastemp.get(step.result_addr)
+
+            result_size = self.deduce_sizeof_local(step.result_addr)
+            inst_postfix = deduce_postfix(result_size)
+            gas_result_equiv = result_gas_addr
+
+            if gas_result_equiv[0] == '%':
+                gas_result_equiv = translate_reg(gas_result_equiv, result_size)
 
-        result_size = self.deduce_sizeof_local(step.result_addr)
-        inst_postfix = deduce_postfix(result_size)
-        gas_result_equiv = result_gas_addr
+            self.results.append(f'\tmov{inst_postfix} {gas_result_equiv}, {translate_reg('%rax', result_size)}')
 
-        if gas_result_equiv[0] == '%':
-            gas_result_equiv = translate_reg(gas_result_equiv, result_size)
+        self.emit_epilogue()
+        self.results.append(f'\tret\n')
+
+        self.reset_func_state()
 
-        self.results.append(f'\tmov{inst_postfix} {gas_result_equiv}, {translate_reg('%rax', result_size)}')
+    def emit_epilogue(self):
         self.results.append(f'\tpopq %r15\n')
         self.results.append(f'\tpopq %r14\n')
         self.results.append(f'\tpopq %r13\n')
         self.results.append(f'\tpopq %r12\n')
         self.results.append(f'\tmovq %rbp, %rsp\n')
         self.results.append(f'\tpopq %rbp\n')
-        self.results.append(f'\tret\n')
 
+    def reset_func_state(self):
         self.ir_to_gastemp.clear()
         self.temp_allocator.reset_state(0)
         self.ir_to_gasreg.clear()
         self.reg_allocator.release_all(RegisterKind.GENERAL)
         self.reg_allocator.release_all(RegisterKind.ARG)
+        self.pushed_arg_count = 0
         self.current_funcinfo = None
 
     def visit_jump(self, step: ir_bits.IRStep):
@@ -455,6 +476,12 @@ class GASEmitter(IRVisitor):
     def visit_push_arg(self, step: ir_bits.IRStep):
         ir_arg: str | int = step.arg
         ir_arg_type: DataType = step.arg_type
+
+        # NOTE params were already copied into the frame, so a call's first arg always starts over at %rdi.
+        if self.pushed_arg_count == 0:
+            self.reg_allocator.release_all(RegisterKind.ARG)
+
+        self.pushed_arg_count += 1
         arg_dest = self.reg_allocator.allocate_reg(RegisterKind.ARG)
 
         if not arg_dest:
@@ -516,6 +543,34 @@ class GASEmitter(IRVisitor):
 
         self.results.append(f'\tmov{inst_postfix} {param_gas_src_equiv}, {param_gas_dst}\n')
 
+    def visit_jump_table(self, step: ir_bits.IRStep):
+        table_label = f'.Ljt{self.jump_table_count}'
+        gas_arg = self.ir_to_gasreg.get(step.arg) or self.ir_to_gastemp.get(step.arg)
+        self.jump_table_count += 1
+
+        # NOTE no args are pending at a terminator, so %rax and %rdx are free. The unsigned `ja` also sends args below `low` to the default.
+        self.emit_scratch_load(step.arg, gas_arg, '%rax')
+
+        if step.low != 0:
+            self.results.append(f'\tsubl ${step.low}, %eax\n')
+
+        self.results.append(f'\tcmpl ${len(step.targets) - 1}, %eax\n')
+        self.results.append(f'\tja {step.default}\n')
+        self.results.append(f'\tleaq {table_label}(%rip), %rdx\n')
+        self.results.append(f'\tmovslq (%rdx,%rax,4), %rax\n')
+        self.results.append(f'\taddq %rdx, %rax\n')
+        self.results.append(f'\tjmp *%rax\n')
+
+        # NOTE entries are offsets from the table, so it needs no relocations when linked as PIE.
+        self.results.append('.section .rodata\n')
+        self.results.append('.balign 4\n')
+        self.results.append(f'{table_label}:\n')
+
+        for target in step.targets:
+            self.results.append(f'\t.long {target} - {table_label}\n')
+
+        self.results.append('.text\n')
+
     def visit_call_func(self, step: ir_bits.IRStep):
         self.results.append(f'\tpushq %r10\n')
         self.results.append(f'\tpushq %r11\n')
@@ -523,6 +578,28 @@ class GASEmitter(IRVisitor):
         self.results.append(f'\tcall {step.callee}\n')
         self.results.append(f'\tpopq %r11\n')
         self.results.append(f'\tpopq %r10\n')
+        self.pushed_arg_count = 0
+
+    def emit_scratch_load(self, ir_arg: str | int, gas_addr: str, reg: str):
+        """
+            Loads an operand into the 32-bit part of a scratch register, widening a `char` by its sign like C's integer promotion.
+        """
+        arg_size = self.deduce_sizeof_local(ir_arg) if type(ir_arg) == str else 4
+        gas_src = gas_addr
+
+        if gas_src[0] == '%':
+            gas_src = translate_reg(gas_src, arg_size or 4)
+
+        if arg_size == 1:
+            self.results.append(f'\tmovsbl {gas_src}, {translate_reg(reg, 4)}\n')
+        else:
+            self.results.append(f'\tmovl {gas_src}, {translate_reg(reg, 4)}\n')
+
+    def visit_tail_call(self, step: ir_bits.IRStep):
+        # NOTE the args are already in their registers, so this frame can go before jumping: the callee then returns straight to our caller.
+        self.emit_epilogue()
+        self.results.append(f'\tjmp {step.callee}\n')
+        self.pushed_arg_count = 0
 
     def visit_assign(self, step: ir_bits.IRStep):
         ir_dest: str = step.dest
@@ -575,12 +652,35 @@ class GASEmitter(IRVisitor):
             case 'sub':
                 self.results.append(f'\tmov{inst_postfix} {arg1_gas_addr_equiv}, {gas_dest_equiv}\n')
                 self.results.append(f'\tsub{inst_postfix} {arg0_gas_addr_equiv}, {gas_dest_equiv}\n')
-            case 'mul':
-                self.results.append(f'\tnop\n') # FIXME
-                pass
-            case 'div':
-                self.results.append(f'\tnop\n') # FIXME
-                pass
+            case 'imul' | 'imulh':
+                # NOTE %rdx may hold an arg pushed for an upcoming call, and one-operand imul writes the high half there.
+                self.results.append(f'\tpushq %rdx\n')
+                self.emit_scratch_load(ir_arg0, arg0_gas_addr, '%rax')
+                self.emit_scratch_load(ir_arg1, arg1_gas_addr, '%rdx')
+
+                if gas_op == 'imul':
+                    self.results.append(f'\timull %edx, %eax\n')
+                    self.results.append(f'\tmov{inst_postfix} {translate_reg('%rax', data_size)}, {gas_dest_equiv}\n')
+                else:
+                    self.results.append(f'\timull %edx\n')
+                    self.results.append(f'\tmov{inst_postfix} {translate_reg('%rdx', data_size)}, {gas_dest_equiv}\n')
+
+                self.results.append(f'\tpopq %rdx\n')
+            case 'idiv':
+                self.results.append(f'\tpushq %rdx\n')
+                self.results.append(f'\tpushq %rcx\n')
+                self.emit_scratch_load(ir_arg0, arg0_gas_addr, '%rax')
+                self.emit_scratch_load(ir_arg1, arg1_gas_addr, '%rcx')
+                self.results.append(f'\tcltd\n')
+                self.results.append(f'\tidivl %ecx\n')
+                self.results.append(f'\tmov{inst_postfix} {translate_reg('%rax', data_size)}, {gas_dest_equiv}\n')
+                self.results.append(f'\tpopq %rcx\n')
+                self.results.append(f'\tpopq %rdx\n')
+            case 'sal' | 'sar' | 'shr':
+                # NOTE shift counts are always immediates from StrengthReductionPass.
+                self.emit_scratch_load(ir_arg0, arg0_gas_addr, '%rax')
+                self.results.append(f'\t{gas_op}l {arg1_gas_addr}, %eax\n')
+                self.results.append(f'\tmov{inst_postfix} {translate_reg('%rax', data_size)}, {gas_dest_equiv}\n')
             case 'cmovne':
                 self.results.append(f'\tmov{inst_postfix} $0, {gas_dest_equiv}\n')
                 self.results.append(f'\tcmp {arg1_gas_addr_equiv}, {arg0_gas_addr_equiv}\n')
@@ -0,0 +1,220 @@
+"""
+    ir_callgraph.py\n
+    By DrkWithT\n
+    Builds the call graph of a program's CFGs from its IRCallFunc / IRTailCall steps, with strongly connected components for recursion, reachability from exported roots, and a Graphviz dump. Also has the pass dropping functions no root can reach.\n
+    Sources:
+    [Tarjan's SCC algorithm](https://en.wikipedia.org/wiki/Tarjan%27s_strongly_connected_components_algorithm)
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+
+## Constants ##
+
+# NOTE DerkCC has no `static` or linkage options yet, so only the program entry is called from outside.
+EXPORTED_ROOTS = ('main',)
+
+## Aliases and Types ##
+
+# NOTE maps each function to the functions it calls. Callees without a body here are kept, but get no entry of their own.
+CallGraph = dict[str, set[str]]
+
+## Utility functions ##
+
+def get_call_graph(cfgs: list[ir_cfg.ControlFlowGraph]) -> CallGraph:
+    results = {cfg.func_name: set() for cfg in cfgs}
+
+    for cfg in cfgs:
+        for block in cfg.blocks:
+            for step in block.steps:
+                if step.get_ir_type() in (ir_types.IRType.FUNC_CALL, ir_types.IRType.TAIL_CALL):
+                    results[cfg.func_name].add(step.callee)
+
+    return results
+
+def get_callers(call_graph: CallGraph) -> CallGraph:
+    results = {func_name: set() for func_name in call_graph}
+
+    for func_name, callees in call_graph.items():
+        for callee in callees:
+            results.setdefault(callee, set()).add(func_name)
+
+    return results
+
+def get_sccs(call_graph: CallGraph) -> list[list[str]]:
+    """
+        Groups functions into strongly connected components by Tarjan's algorithm, giving each component after every component it calls into. Members of a component are sorted by name.
+    """
+    indices: dict[str, int] = {}
+    lows: dict[str, int] = {}
+    stack = []
+    on_stack = set()
+    results = []
+
+    for root in call_graph:
+        if root in indices:
+            continue
+
+        indices[root] = lows[root] = len(indices)
+        stack.append(root)
+        on_stack.add(root)
+        pending = [(root, iter(sorted(call_graph[root])))]
+
+        while pending:
+            func_name, callee_iter = pending[-1]
+            callee = next(callee_iter, None)
+
+            if callee is None:
+                pending.pop()
+
+                if pending:
+                    caller = pending[-1][0]
+                    lows[caller] = min(lows[caller], lows[func_name])
+
+                if lows[func_name] == indices[func_name]:
+                    component = []
+
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+
+                        if member == func_name:
+                            break
+
+                    results.append(sorted(component))
+            elif callee not in call_graph:
+                continue
+            elif callee not in indices:
+                indices[callee] = lows[callee] = len(indices)
+                stack.append(callee)
+                on_stack.add(callee)
+                pending.append((callee, iter(sorted(call_graph[callee]))))
+            elif callee in on_stack:
+                lows[func_name] = min(lows[func_name], indices[callee])
+
+    return results
+
+def get_recursive_funcs(call_graph: CallGraph) -> set[str]:
+    """
+        Finds the functions that can reach a call to themselves, directly or through others: the members of a component with a cycle.
+    """
+    results = set()
+
+    for component in get_sccs(call_graph):
+        if len(component) > 1 or component[0] in call_graph[component[0]]:
+            results.update(component)
+
+    return results
+
+def get_bottom_up_order(call_graph: CallGraph) -> list[str]:
+    """
+        Orders functions so callees come before their callers where there is no recursion, so a callee is inlined into others only after its own calls were.
+    """
+    results = []
+    visited = set()
+
+    for root in call_graph:
+        if root in visited:
+            continue
+
+        visited.add(root)
+        pending = [(root, iter(sorted(call_graph[root])))]
+
+        while pending:
+            func_name, callee_iter = pending[-1]
+            callee = next(callee_iter, None)
+
+            if callee is None:
+                pending.pop()
+                results.append(func_name)
+            elif callee in call_graph and callee not in visited:
+                visited.add(callee)
+                pending.append((callee, iter(sorted(call_graph[callee]))))
+
+    return results
+
+def get_reachable_funcs(call_graph: CallGraph, roots) -> set[str]:
+    results = set()
+    pending = [root for root in roots if root in call_graph]
+
+    while pending:
+        func_name = pending.pop()
+
+        if func_name in results:
+            continue
+
+        results.add(func_name)
+        pending.extend(callee for callee in call_graph[func_name] if callee in call_graph)
+
+    return results
+
+def dump_call_graph(call_graph: CallGraph, roots = EXPORTED_ROOTS) -> str:
+    """
+        Gives the call graph as Graphviz DOT: roots are boxes, functions no root reaches are dashed, and each recursive component is a cluster.
+    """
+    reachable = get_reachable_funcs(call_graph, roots)
+    recursives = get_recursive_funcs(call_graph)
+    lines = ['digraph calls {']
+
+    for component_id, component in enumerate(get_sccs(call_graph)):
+        indent = '  '
+
+        if component[0] in recursives:
+            lines.append(f'  subgraph cluster_{component_id} {{')
+            lines.append(f'    label="scc #{component_id}";')
+            indent = '    '
+
+        for func_name in component:
+            attrs = []
+
+            if func_name in roots:
+                attrs.append('shape=box')
+
+            if func_name not in reachable:
+                attrs.append('style=dashed')
+
+            lines.append(f'{indent}"{func_name}"' + (f' [{", ".join(attrs)}];' if attrs else ';'))
+
+        if component[0] in recursives:
+            lines.append('  }')
+
+    for func_name, callees in call_graph.items():
+        for callee in sorted(callees):
+            lines.append(f'  "{func_name}" -> "{callee}";')
+
+    lines.append('}')
+
+    return '\n'.join(lines)
+
+## Dead Function Pass ##
+
+class DeadFunctionPass:
+    """
+        Drops the CFGs and local records of functions that no exported root can reach through calls, so GASEmitter skips them.\n
+        NOTE When none of the roots is defined, as in a file of helpers only, every function is kept.
+    """
+    name = 'deadfuncs'
+
+    def __init__(self, roots = EXPORTED_ROOTS):
+        self.roots = tuple(roots)
+        self.removed_funcs: list[str] = []
+
+    def run_program(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable) -> int:
+        call_graph = get_call_graph(cfgs)
+
+        if not any(root in call_graph for root in self.roots):
+            return 0
+
+        reachable = get_reachable_funcs(call_graph, self.roots)
+        removed = [cfg.func_name for cfg in cfgs if cfg.func_name not in reachable]
+
+        cfgs[:] = [cfg for cfg in cfgs if cfg.func_name in reachable]
+
+        for func_name in removed:
+            funcs.pop(func_name, None)
+
+        self.removed_funcs.extend(removed)
+
+        return len(removed)
@@ -0,0 +1,359 @@
+"""
+    ir_cfg.py\n
+    By DrkWithT\n
+    Splits the flat IR of each function into basic blocks, then links them into a control flow graph (CFG) with dominator info.\n
+    Sources:
+    [A Simple, Fast Dominance Algorithm](https://www.cs.tufts.edu/comp/150FP/archive/keith-cooper/dom14.pdf)
+"""
+
+import dataclasses
+import DerkCC.DCCStages.ir_types as ir_types
+
+## Aliases and Types ##
+
+BlockIds = list[int]
+
+# NOTE control never continues past these steps within a block.
+TERMINATOR_TYPES = (ir_types.IRType.JUMP, ir_types.IRType.JUMP_IF, ir_types.IRType.JUMP_TABLE, ir_types.IRType.RETURN, ir_types.IRType.TAIL_CALL)
+
+# NOTE these terminators leave the function, so they have no target block.
+EXIT_TYPES = (ir_types.IRType.RETURN, ir_types.IRType.TAIL_CALL)
+
+@dataclasses.dataclass
+class BasicBlock:
+    """
+        A straight-line run of IR steps with one entry (its label) and one exit (its last step).\n
+        NOTE `steps` never contains an IRLabel, as the block's own label is kept in `label`. Successors of a conditional jump are ordered as `[taken, fallthrough]`.
+    """
+    label: str | None
+    steps: ir_types.StepList
+    preds: BlockIds = dataclasses.field(default_factory=list)
+    succs: BlockIds = dataclasses.field(default_factory=list)
+
+    def get_terminator(self) -> ir_types.IRStep | None:
+        if not self.steps:
+            return None
+
+        last_step = self.steps[-1]
+
+        if last_step.get_ir_type() in TERMINATOR_TYPES:
+            return last_step
+
+        return None
+
+    def falls_through(self) -> bool:
+        terminator = self.get_terminator()
+
+        if terminator is None:
+            return True
+
+        return terminator.get_ir_type() == ir_types.IRType.JUMP_IF
+
+## CFG ##
+
+class ControlFlowGraph:
+    """
+        Models one function's basic blocks in their layout order, where `blocks[0]` is the entry block labeled by the function's name.\n
+        NOTE Passes that rewrite labels, terminators, or the block order must call `recompute_edges()` afterwards, as that also drops the cached orderings and dominators.
+    """
+    func_name: str
+    blocks: list[BasicBlock]
+    label_count: int
+    rpo: BlockIds
+    idoms: list[int | None]
+    dom_children: list[BlockIds]
+    dom_frontiers: list[set[int]]
+
+    def __init__(self, func_name: str, blocks: list[BasicBlock]):
+        self.func_name = func_name
+        self.blocks = blocks
+        self.label_count = 0
+        self.rpo = None
+        self.idoms = None
+        self.dom_children = None
+        self.dom_frontiers = None
+
+        self.recompute_edges()
+
+    def get_entry(self) -> BasicBlock:
+        return self.blocks[0]
+
+    def get_block_id(self, label: str) -> int:
+        for block_id, block in enumerate(self.blocks):
+            if block.label == label:
+                return block_id
+
+        raise RuntimeError(f'ir_cfg.py [Error]: Jump to unknown label {label} in function {self.func_name}!\n')
+
+    def recompute_edges(self):
+        label_ids = {}
+
+        for block_id, block in enumerate(self.blocks):
+            block.preds.clear()
+            block.succs.clear()
+
+            if block.label is not None:
+                label_ids[block.label] = block_id
+
+        for block_id, block in enumerate(self.blocks):
+            terminator = block.get_terminator()
+            next_id = block_id + 1
+
+            for target in terminator.get_jump_targets() if terminator is not None else []:
+                target_id = label_ids.get(target)
+
+                if target_id is None:
+                    raise RuntimeError(f'ir_cfg.py [Error]: Jump to unknown label {target} in function {self.func_name}!\n')
+
+                if target_id not in block.succs:
+                    block.succs.append(target_id)
+
+            if block.falls_through() and next_id < len(self.blocks) and next_id not in block.succs:
+                block.succs.append(next_id)
+
+            for succ_id in block.succs:
+                self.blocks[succ_id].preds.append(block_id)
+
+        self.rpo = None
+        self.idoms = None
+        self.dom_children = None
+        self.dom_frontiers = None
+
+    def new_label(self) -> str:
+        """
+            Makes a fresh jump label for this function. The '.' keeps it apart from both IREmitter labels and C identifiers.
+        """
+        taken = set(block.label for block in self.blocks)
+
+        while True:
+            label = f'L{self.func_name}.{self.label_count}'
+            self.label_count += 1
+
+            if label not in taken:
+                return label
+
+    def ensure_label(self, block_id: int) -> str:
+        block = self.blocks[block_id]
+
+        if block.label is None:
+            block.label = self.new_label()
+
+        return block.label
+
+    def get_reverse_postorder(self) -> BlockIds:
+        """
+            Orders the blocks reachable from the entry so that each block comes before its successors, ignoring back edges.
+        """
+        if self.rpo is not None:
+            return self.rpo
+
+        visited = [False for _ in self.blocks]
+        postorder = []
+
+        # NOTE iterative DFS avoids Python's recursion limit on long functions.
+        visited[0] = True
+        pending = [(0, iter(self.blocks[0].succs))]
+
+        while pending:
+            block_id, succ_iter = pending[-1]
+            next_id = next(succ_iter, None)
+
+            if next_id is None:
+                pending.pop()
+                postorder.append(block_id)
+            elif not visited[next_id]:
+                visited[next_id] = True
+                pending.append((next_id, iter(self.blocks[next_id].succs)))
+
+        postorder.reverse()
+        self.rpo = postorder
+
+        return self.rpo
+
+    def is_reachable(self, block_id: int) -> bool:
+        self.compute_dominators()
+
+        return self.idoms[block_id] is not None
+
+    def compute_dominators(self):
+        """
+            Finds each block's immediate dominator using the Cooper-Harvey-Kennedy iteration over the reverse postorder. Unreachable blocks get `None`.
+        """
+        if self.idoms is not None:
+            return
+
+        rpo = self.get_reverse_postorder()
+        rpo_index = {block_id: index for index, block_id in enumerate(rpo)}
+        idoms: list[int | None] = [None for _ in self.blocks]
+        idoms[0] = 0
+        changed = True
+
+        while changed:
+            changed = False
+
+            for block_id in rpo[1:]:
+                new_idom = None
+
+                for pred_id in self.blocks[block_id].preds:
+                    if idoms[pred_id] is None:
+                        continue
+
+                    if new_idom is None:
+                        new_idom = pred_id
+                        continue
+
+                    # NOTE walk both fingers up the partial tree until they meet.
+                    finger_a = pred_id
+                    finger_b = new_idom
+
+                    while finger_a != finger_b:
+                        while rpo_index[finger_a] > rpo_index[finger_b]:
+                            finger_a = idoms[finger_a]
+                        while rpo_index[finger_b] > rpo_index[finger_a]:
+                            finger_b = idoms[finger_b]
+
+                    new_idom = finger_a
+
+                if idoms[block_id] != new_idom:
+                    idoms[block_id] = new_idom
+                    changed = True
+
+        self.idoms = idoms
+        self.dom_children = [[] for _ in self.blocks]
+
+        for block_id in rpo[1:]:
+            self.dom_children[idoms[block_id]].append(block_id)
+
+    def get_idom(self, block_id: int) -> int | None:
+        self.compute_dominators()
+
+        if block_id == 0:
+            return None
+
+        return self.idoms[block_id]
+
+    def get_dom_children(self, block_id: int) -> BlockIds:
+        self.compute_dominators()
+
+        return self.dom_children[block_id]
+
+    def dominates(self, dom_id: int, block_id: int) -> bool:
+        self.compute_dominators()
+
+        if self.idoms[block_id] is None:
+            return False
+
+        while block_id != dom_id:
+            if block_id == 0:
+                return False
+
+            block_id = self.idoms[block_id]
+
+        return True
+
+    def get_dom_frontiers(self) -> list[set[int]]:
+        """
+            Finds each block's dominance frontier: the join points where its dominance ends.
+        """
+        if self.dom_frontiers is not None:
+            return self.dom_frontiers
+
+        self.compute_dominators()
+        frontiers = [set() for _ in self.blocks]
+
+        for block_id, block in enumerate(self.blocks):
+            if len(block.preds) < 2 or self.idoms[block_id] is None:
+                continue
+
+            for pred_id in block.preds:
+                runner = pred_id
+
+                if self.idoms[runner] is None:
+                    continue
+
+                while runner != self.idoms[block_id]:
+                    frontiers[runner].add(block_id)
+                    runner = self.idoms[runner]
+
+        self.dom_frontiers = frontiers
+
+        return self.dom_frontiers
+
+    def get_step_count(self) -> int:
+        return sum(len(block.steps) for block in self.blocks)
+
+    def to_steps(self) -> ir_types.StepList:
+        results = []
+
+        for block in self.blocks:
+            if block.label is not None:
+                results.append(ir_types.IRLabel(block.label))
+
+            results.extend(block.steps)
+
+        return results
+
+    def dump(self) -> str:
+        lines = [f'function {self.func_name}:']
+
+        for block_id, block in enumerate(self.blocks):
+            lines.append(f'  block #{block_id} ({block.label or "<no label>"}) preds={block.preds} succs={block.succs} idom={self.get_idom(block_id)}')
+
+            for step in block.steps:
+                lines.append(f'    {step}')
+
+        return '\n'.join(lines)
+
+## Builders ##
+
+def build_cfg(func_steps: ir_types.StepList) -> ControlFlowGraph:
+    """
+        Makes a CFG from one function's steps, which must begin with the function's IRLabel.
+    """
+    if not func_steps or func_steps[0].get_ir_type() != ir_types.IRType.LABEL:
+        raise RuntimeError('ir_cfg.py [Error]: Function IR must begin with its name label!\n')
+
+    blocks = [BasicBlock(func_steps[0].title, [])]
+
+    for step in func_steps[1:]:
+        step_type = step.get_ir_type()
+        current = blocks[-1]
+
+        if step_type == ir_types.IRType.LABEL:
+            blocks.append(BasicBlock(step.title, []))
+            continue
+
+        if current.get_terminator() is not None:
+            current = BasicBlock(None, [])
+            blocks.append(current)
+
+        current.steps.append(step)
+
+    return ControlFlowGraph(func_steps[0].title, blocks)
+
+def split_functions(steps: ir_types.StepList, func_names) -> list[ir_types.StepList]:
+    """
+        Cuts a program's flat IR at each function label. `func_names` is any collection of the function names, e.g. the IREmitter's FuncInfoTable.
+    """
+    results = []
+
+    for step in steps:
+        if step.get_ir_type() == ir_types.IRType.LABEL and step.title in func_names:
+            results.append([])
+        elif not results:
+            raise RuntimeError('ir_cfg.py [Error]: Found IR outside of any function!\n')
+
+        results[-1].append(step)
+
+    return results
+
+def build_program_cfgs(steps: ir_types.StepList, func_names) -> list[ControlFlowGraph]:
+    return [build_cfg(func_steps) for func_steps in split_functions(steps, func_names)]
+
+def flatten_cfgs(cfgs: list[ControlFlowGraph]) -> ir_types.StepList:
+    results = []
+
+    for cfg in cfgs:
+        results.extend(cfg.to_steps())
+
+    return results
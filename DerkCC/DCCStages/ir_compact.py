@@ -0,0 +1,131 @@
+"""
+    ir_compact.py\n
+    By DrkWithT\n
+    Packs the virtual registers from IREmitter into as few IR addresses as their live intervals allow, using a linear scan.\n
+    Sources:
+    [Linear Scan Register Allocation](https://web.cs.ucla.edu/~palsberg/course/cs132/linearscan.pdf)
+"""
+
+import heapq
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_liveness import LivenessInfo
+from DerkCC.DCCStages.ir_copyprop import is_plain_copy
+
+## Aliases and Types ##
+
+# NOTE models an address's live interval as [first point, last point]
+LiveInterval = list[int]
+
+## Utility functions ##
+
+def build_live_intervals(cfg: ir_cfg.ControlFlowGraph) -> dict[str, LiveInterval]:
+    """
+        Gives each address one interval covering every point it may be live at, in layout order.\n
+        NOTE Step `i` reads at point `2i` and writes at point `2i + 1`, so a value dying at a step can hand its address to the step's result.
+    """
+    liveness = LivenessInfo(cfg)
+    intervals: dict[str, LiveInterval] = {}
+    step_i = 0
+
+    def extend(addr: str, point: int):
+        interval = intervals.get(addr)
+
+        if interval is None:
+            intervals[addr] = [point, point]
+        elif point < interval[0]:
+            interval[0] = point
+        elif point > interval[1]:
+            interval[1] = point
+
+    for block_id, block in enumerate(cfg.blocks):
+        if not block.steps:
+            continue
+
+        for addr in liveness.get_live_in(block_id):
+            extend(addr, 2 * step_i)
+
+        for step in block.steps:
+            for use in step.get_use_addrs():
+                extend(use, 2 * step_i)
+
+            def_addr = step.get_def_addr()
+
+            if def_addr is not None:
+                extend(def_addr, 2 * step_i + 1)
+
+            step_i += 1
+
+        for addr in liveness.get_live_out(block_id):
+            extend(addr, 2 * step_i - 1)
+
+    return intervals
+
+## Compaction Pass ##
+
+class AddressCompactionPass:
+    """
+        Renames every address to an `a<n>` one shared by values whose intervals never overlap, then rewrites the function's local records to match. Copies left between a value and itself get dropped. Sorting the intervals and a heap of active ones make this O(n log n).\n
+        NOTE Only addresses of the same size share, as GASEmitter sizes an address by its first record. Params keep addresses of their own so their records stay paired with argument registers.
+    """
+    name = 'compact'
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        intervals = build_live_intervals(cfg)
+        params = [entry[1] for entry in func_info if entry[2]]
+        renames: dict[str, str] = {}
+        name_count = 0
+
+        for param in params:
+            renames[param] = f'a{name_count}'
+            name_count += 1
+
+        active: list[tuple[int, str]] = []
+        free_names: dict[int, list[str]] = {}
+
+        for addr in sorted(intervals, key=lambda addr: intervals[addr][0]):
+            if addr in renames:
+                continue
+
+            start, end = intervals[addr]
+
+            while active and active[0][0] < start:
+                _, old_addr = heapq.heappop(active)
+                free_names.setdefault(ir_gen.get_local_size(func_info, old_addr), []).append(renames[old_addr])
+
+            pool = free_names.get(ir_gen.get_local_size(func_info, addr))
+
+            if pool:
+                renames[addr] = pool.pop()
+            else:
+                renames[addr] = f'a{name_count}'
+                name_count += 1
+
+            heapq.heappush(active, (end, addr))
+
+        for block in cfg.blocks:
+            for step in block.steps:
+                step.replace_uses({use: renames[use] for use in step.get_use_addrs()})
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None:
+                    step.set_def_addr(renames[def_addr])
+
+            block.steps = [step for step in block.steps if not (is_plain_copy(step) and step.arg0 == step.dest)]
+
+        self.rename_func_locals(func_info, renames)
+
+        return len(intervals) - name_count
+
+    def rename_func_locals(self, func_info: ir_gen.FuncInfo, renames: dict[str, str]):
+        results = []
+        seen = set()
+
+        for datatype, ir_addr, is_param in func_info:
+            new_addr = renames.get(ir_addr)
+
+            if new_addr is not None and new_addr not in seen:
+                seen.add(new_addr)
+                results.append((datatype, new_addr, is_param))
+
+        func_info[:] = results
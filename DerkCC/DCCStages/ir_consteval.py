@@ -0,0 +1,136 @@
+"""
+    ir_consteval.py\n
+    By DrkWithT\n
+    Runs calls of pure functions with only constant arguments at compile time, replacing each call with its result. Evaluation uses IRInterpreter under step and recursion limits, with results memoized by callee and arguments.
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_inline import find_call_args
+from DerkCC.DCCStages.ir_callgraph import get_call_graph
+from DerkCC.DCCStages.ir_interp import IRInterpreter, wrap_int32
+
+## Constants ##
+
+# NOTE blocks one evaluated call may enter, counting its nested calls, before the call is left for runtime.
+MAX_EVAL_BLOCKS = 100_000
+
+# NOTE nested call depth one evaluated call may reach, kept well under the interpreter's own limit.
+MAX_EVAL_DEPTH = 64
+
+## Aliases and Types ##
+
+# NOTE maps a call's callee and wrapped args to its result, or to `None` if evaluating it failed.
+CallMemo = dict[tuple[str, tuple[int, ...]], int | None]
+
+## Utility functions ##
+
+def get_pure_funcs(call_graph: dict[str, set[str]]) -> set[str]:
+    """
+        Finds the functions whose result only depends on their args. IR steps can't touch memory or I/O, so a function is impure only if it can reach a call of a function with no body here.
+    """
+    results = set(call_graph)
+    changed = True
+
+    while changed:
+        changed = False
+
+        for func_name in list(results):
+            if any(callee not in results for callee in call_graph[func_name]):
+                results.remove(func_name)
+                changed = True
+
+    return results
+
+## Evaluator ##
+
+class MemoInterpreter(IRInterpreter):
+    """
+        An IRInterpreter that looks up every call, nested ones included, in a shared memo table before running it.\n
+        NOTE A pure call's result only depends on its args, so each `(callee, args)` key runs once, e.g. `fib(n)` runs `n` calls instead of about `fib(n)`. A key memoized as failed fails again, since a nested run has no more budget or depth than a top-level one.
+    """
+    def __init__(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable, memo: CallMemo, max_call_depth: int, max_block_runs: int):
+        super().__init__(cfgs, funcs, max_call_depth, max_block_runs)
+        self.memo = memo
+
+    def call_func(self, func_name: str, args: list[int], depth: int) -> int:
+        key = (func_name, tuple(args))
+
+        if key not in self.memo:
+            self.memo[key] = super().call_func(func_name, args, depth)
+        elif self.memo[key] is None:
+            raise RuntimeError(f'ir_consteval.py [Error]: Call of {func_name} failed before!\n')
+
+        return self.memo[key]
+
+## Constant Call Pass ##
+
+class ConstCallPass:
+    """
+        Replaces each IRCallFunc to a pure function whose IRPushArg steps all hold immediates: the pushes and call are dropped and the IRStoreYield becomes a copy of the result.\n
+        NOTE A call that traps, recurses too deep, or runs past `max_blocks` is left as is, so its behavior stays at runtime. Tail calls are skipped, as IRReturn only reads addresses, so this pass runs before TailCallPass.
+    """
+    name = 'consteval'
+
+    def __init__(self, max_blocks: int = MAX_EVAL_BLOCKS, max_depth: int = MAX_EVAL_DEPTH):
+        self.max_blocks = max_blocks
+        self.max_depth = max_depth
+        self.memo: CallMemo = {}
+        self.folded_counts: dict[str, int] = {}
+
+    def run_program(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable) -> int:
+        pures = get_pure_funcs(get_call_graph(cfgs))
+        interp = MemoInterpreter([cfg for cfg in cfgs if cfg.func_name in pures], funcs, self.memo, self.max_depth, self.max_blocks)
+        change_count = 0
+
+        for cfg in cfgs:
+            count = sum(self.fold_calls(block, funcs, pures, interp) for block in cfg.blocks)
+            self.folded_counts[cfg.func_name] = count
+            change_count += count
+
+        return change_count
+
+    def eval_call(self, interp: MemoInterpreter, callee: str, args: list[int]) -> int | None:
+        key = (callee, tuple(wrap_int32(arg) for arg in args))
+
+        if key not in self.memo:
+            try:
+                interp.run(callee, args)
+            except RuntimeError:
+                self.memo[key] = None
+
+        return self.memo[key]
+
+    def fold_calls(self, block: ir_cfg.BasicBlock, funcs: ir_gen.FuncInfoTable, pures: set[str], interp: MemoInterpreter) -> int:
+        removed_ids = set()
+        fold_count = 0
+        yield_copies: dict[int, ir_types.IRAssign] = {}
+
+        for step_i, step in enumerate(block.steps):
+            if step.get_ir_type() != ir_types.IRType.FUNC_CALL or step.callee not in pures:
+                continue
+
+            param_count = len([entry for entry in funcs[step.callee] if entry[2]])
+            arg_ids = find_call_args(block.steps, step_i, param_count)
+
+            if arg_ids is None or any(type(block.steps[arg_i].arg) != int for arg_i in arg_ids):
+                continue
+
+            value = self.eval_call(interp, step.callee, [block.steps[arg_i].arg for arg_i in arg_ids])
+
+            if value is None:
+                continue
+
+            removed_ids.update(arg_ids)
+            removed_ids.add(step_i)
+            fold_count += 1
+            next_i = step_i + 1
+
+            if next_i < len(block.steps) and block.steps[next_i].get_ir_type() == ir_types.IRType.STORE_YIELD:
+                yield_copies[next_i] = ir_types.IRAssign(block.steps[next_i].target, ir_types.IROp.NOP, value, None)
+
+        if fold_count > 0:
+            block.steps = [yield_copies.get(step_i, step) for step_i, step in enumerate(block.steps) if step_i not in removed_ids]
+
+        return fold_count
@@ -0,0 +1,186 @@
+"""
+    ir_copyprop.py\n
+    By DrkWithT\n
+    Global copy propagation over the IR CFG plus coalescing of NOP copies into the step that computed their source.
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_dce import DeadCodePass
+
+## Aliases and Types ##
+
+# NOTE maps a copy's destination to its source, e.g. `b = a` gives {"b": "a"}
+CopyTable = dict[str, str | int]
+
+## Constants ##
+
+# NOTE a coalesced source must come from a step whose destination can simply be renamed.
+COALESCABLE_DEF_TYPES = (ir_types.IRType.ADDR_ASSIGN, ir_types.IRType.LOAD_CONSTANT, ir_types.IRType.STORE_YIELD)
+
+## Utility functions ##
+
+def is_plain_copy(step: ir_types.IRStep) -> bool:
+    return step.get_ir_type() == ir_types.IRType.ADDR_ASSIGN and step.op == ir_types.IROp.NOP and step.arg1 is None
+
+def kill_copies(copies: CopyTable, addr: str):
+    for dest in [dest for dest, src in copies.items() if dest == addr or src == addr]:
+        del copies[dest]
+
+def intersect_copies(tables: list[CopyTable]) -> CopyTable:
+    if not tables:
+        return {}
+
+    results = dict(tables[0])
+
+    for table in tables[1:]:
+        for dest in list(results.keys()):
+            if table.get(dest) != results[dest]:
+                del results[dest]
+
+    return results
+
+## Copy Propagation Pass ##
+
+class CopyPropagationPass:
+    """
+        Rewrites reads of a copy's destination to read the copy's source wherever that copy is available on all incoming paths, then folds `t = <expr>; x = t` pairs into `x = <expr>`. The copies left dead get removed by DCE.\n
+        NOTE Copies between addresses of different sizes truncate, so those are never propagated.
+    """
+    name = 'copy-prop'
+
+    def __init__(self):
+        self.func_info: ir_gen.FuncInfo = None
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        self.func_info = func_info
+        change_count = self.propagate(cfg)
+        change_count += self.coalesce(cfg)
+        change_count += DeadCodePass().run(cfg, func_info)
+
+        return change_count
+
+    def is_same_size(self, dest: str, src: str | int) -> bool:
+        dest_size = ir_gen.get_local_size(self.func_info, dest)
+
+        if type(src) == int:
+            return ir_types.wrap_int(src, dest_size) == src
+
+        return dest_size == ir_gen.get_local_size(self.func_info, src)
+
+    def transfer_step(self, step: ir_types.IRStep, copies: CopyTable, rewrite: bool) -> int:
+        """
+            Applies one step to the available copies. When `rewrite` is set, its reads are redirected first, giving 1 if anything changed.
+        """
+        change_count = 0
+
+        if rewrite:
+            substitutes = {use: copies[use] for use in step.get_use_addrs() if use in copies}
+
+            if substitutes:
+                old_text = repr(step)
+                step.replace_uses(substitutes)
+                change_count = int(old_text != repr(step))
+
+        def_addr = step.get_def_addr()
+
+        if def_addr is None:
+            return change_count
+
+        kill_copies(copies, def_addr)
+
+        if is_plain_copy(step) and step.arg0 != def_addr and self.is_same_size(def_addr, step.arg0):
+            # NOTE chains stay flat, since a source was already resolved when it got recorded.
+            copies[def_addr] = copies.get(step.arg0, step.arg0) if type(step.arg0) == str else step.arg0
+
+        return change_count
+
+    def propagate(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        rpo = cfg.get_reverse_postorder()
+        copies_in: dict[int, CopyTable] = {0: {}}
+        copies_out: dict[int, CopyTable] = {}
+        changed = True
+
+        # NOTE forward "must" dataflow: blocks not yet visited are left out of the intersection.
+        while changed:
+            changed = False
+
+            for block_id in rpo:
+                if block_id != 0:
+                    copies_in[block_id] = intersect_copies([copies_out[pred_id] for pred_id in cfg.blocks[block_id].preds if pred_id in copies_out])
+
+                working = dict(copies_in[block_id])
+
+                for step in cfg.blocks[block_id].steps:
+                    self.transfer_step(step, working, False)
+
+                if copies_out.get(block_id) != working:
+                    copies_out[block_id] = working
+                    changed = True
+
+        change_count = 0
+
+        for block_id in rpo:
+            working = dict(copies_in[block_id])
+            block = cfg.blocks[block_id]
+
+            for step in block.steps:
+                change_count += self.transfer_step(step, working, True)
+
+            old_count = len(block.steps)
+            block.steps = [step for step in block.steps if not (is_plain_copy(step) and step.arg0 == step.dest)]
+            change_count += old_count - len(block.steps)
+
+        return change_count
+
+    def coalesce(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        use_counts: dict[str, int] = {}
+
+        for block in cfg.blocks:
+            for step in block.steps:
+                for use in step.get_use_addrs():
+                    use_counts[use] = use_counts.get(use, 0) + 1
+
+        change_count = 0
+
+        for block in cfg.blocks:
+            last_defs: dict[str, int] = {}
+            step_i = 0
+
+            while step_i < len(block.steps):
+                step = block.steps[step_i]
+                src = step.arg0 if is_plain_copy(step) else None
+                src_def_i = last_defs.get(src) if type(src) == str else None
+
+                if src_def_i is not None and use_counts.get(src) == 1 and self.can_coalesce(block.steps, src_def_i, step_i):
+                    # NOTE `t = <expr>; ...; x = t` becomes `x = <expr>; ...`
+                    block.steps[src_def_i].set_def_addr(step.dest)
+                    del block.steps[step_i]
+                    last_defs = {addr: def_i for addr, def_i in last_defs.items() if def_i != src_def_i}
+                    last_defs[step.dest] = src_def_i
+                    change_count += 1
+                    continue
+
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None:
+                    last_defs[def_addr] = step_i
+
+                step_i += 1
+
+        return change_count
+
+    def can_coalesce(self, steps: ir_types.StepList, def_i: int, copy_i: int) -> bool:
+        src_def = steps[def_i]
+        copy = steps[copy_i]
+
+        if src_def.get_ir_type() not in COALESCABLE_DEF_TYPES or not self.is_same_size(copy.dest, copy.arg0):
+            return False
+
+        # NOTE the copy's destination can't be touched while it would be holding the source's value early.
+        for step in steps[def_i + 1:copy_i]:
+            if copy.dest in step.get_use_addrs() or step.get_def_addr() == copy.dest:
+                return False
+
+        return True
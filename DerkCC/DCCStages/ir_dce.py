@@ -0,0 +1,102 @@
+"""
+    ir_dce.py\n
+    By DrkWithT\n
+    Liveness-driven dead code elimination: removes unreachable blocks, then assignments whose results are never read, then the local records of addresses left unused.
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_liveness import LivenessInfo
+
+## Constants ##
+
+# NOTE these only write their address, so they can go once it's dead. IRLoadParam stays since GASEmitter pairs params with argument registers by order.
+REMOVABLE_DEF_TYPES = (ir_types.IRType.ADDR_ASSIGN, ir_types.IRType.LOAD_CONSTANT, ir_types.IRType.STORE_YIELD)
+
+## Utility functions ##
+
+def remove_unreachable_blocks(cfg: ir_cfg.ControlFlowGraph) -> int:
+    """
+        Deletes blocks not reachable from the entry and gives the count of steps removed. A reachable block never falls into an unreachable one, so the layout stays valid.
+    """
+    reachable = set(cfg.get_reverse_postorder())
+
+    if len(reachable) == len(cfg.blocks):
+        return 0
+
+    removed_count = sum(len(block.steps) for block_id, block in enumerate(cfg.blocks) if block_id not in reachable)
+    cfg.blocks = [block for block_id, block in enumerate(cfg.blocks) if block_id in reachable]
+    cfg.recompute_edges()
+
+    return removed_count
+
+def get_referenced_addrs(cfg: ir_cfg.ControlFlowGraph) -> set[str]:
+    results = set()
+
+    for block in cfg.blocks:
+        for step in block.steps:
+            results.update(step.get_use_addrs())
+            def_addr = step.get_def_addr()
+
+            if def_addr is not None:
+                results.add(def_addr)
+
+    return results
+
+def prune_func_locals(cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+    """
+        Drops non-param local records of addresses the function no longer mentions, so no stack slot gets reserved for them. The list is changed in place to update its FuncInfoTable too.
+    """
+    referenced = get_referenced_addrs(cfg)
+    old_count = len(func_info)
+
+    func_info[:] = [entry for entry in func_info if entry[2] or entry[1] in referenced]
+
+    return old_count - len(func_info)
+
+## DCE Pass ##
+
+class DeadCodePass:
+    name = 'dce'
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        change_count = remove_unreachable_blocks(cfg)
+
+        while True:
+            removed_count = self.remove_dead_stores(cfg)
+
+            if removed_count == 0:
+                break
+
+            change_count += removed_count
+
+        prune_func_locals(cfg, func_info)
+
+        return change_count
+
+    def remove_dead_stores(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        liveness = LivenessInfo(cfg)
+        removed_count = 0
+
+        for block_id, block in enumerate(cfg.blocks):
+            live = set(liveness.get_live_out(block_id))
+            kept_steps = []
+
+            for step in reversed(block.steps):
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None and def_addr not in live and step.get_ir_type() in REMOVABLE_DEF_TYPES:
+                    removed_count += 1
+                    continue
+
+                if def_addr is not None:
+                    live.discard(def_addr)
+
+                live.update(step.get_use_addrs())
+                kept_steps.append(step)
+
+            kept_steps.reverse()
+            block.steps = kept_steps
+
+        return removed_count
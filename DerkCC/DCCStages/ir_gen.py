@@ -22,17 +22,74 @@ FuncInfo = list[LocalRecord]
 # NOTE models all function info entries
 FuncInfoTable = dict[str, FuncInfo]
 
+# NOTE models an expression's register need (its Sethi-Ullman number) and whether it's free of calls and assignments
+ExprNeed = tuple[int, bool]
+
+## Utility functions ##
+
+def get_local_size(func_info: FuncInfo, ir_addr: str) -> int:
+    """
+        Gets the byte size of an IR address by its first local record like GASEmitter does. Unrecorded temporaries hold ints.
+    """
+    for entry in func_info:
+        if entry[1] == ir_addr:
+            return ir_types.DATATYPE_SIZES.get(entry[0].name) or 4
+
+    return 4
+
+def get_expr_need(expr: ast.Expr, cache: dict[int, ExprNeed]) -> ExprNeed:
+    """
+        Gives the most temporaries live at once while lowering an expression, if each binary operator goes first into its needier side. Literals and names are used in place, so they need none.\n
+        NOTE Results are cached by node identity, as IREmitter asks again at every operator of a tree.
+    """
+    if id(expr) in cache:
+        return cache[id(expr)]
+
+    op = expr.get_op_type()
+
+    if op == ast.OpType.OP_NONE:
+        result = (0, True)
+    elif op == ast.OpType.OP_CALL:
+        # NOTE each arg is pushed before the next one is lowered, so only the neediest one counts.
+        result = (max([get_expr_need(arg, cache)[0] for arg in expr.get_args()] + [1]), False)
+    elif op == ast.OpType.OP_NEG:
+        inner_need, inner_pure = get_expr_need(expr.get_inner(), cache)
+        result = (max(inner_need, 1), inner_pure)
+    else:
+        lhs_need, lhs_pure = get_expr_need(expr.get_lhs(), cache)
+        rhs_need, rhs_pure = get_expr_need(expr.get_rhs(), cache)
+
+        if op == ast.OpType.OP_ASSIGN:
+            result = (max(rhs_need, 1), False)
+        elif op == ast.OpType.OP_LOGIC_AND or op == ast.OpType.OP_LOGIC_OR:
+            result = (max(lhs_need, rhs_need, 1), lhs_pure and rhs_pure)
+        else:
+            result = (max(min(get_peak_need(lhs_need, rhs_need), get_peak_need(rhs_need, lhs_need)), 1), lhs_pure and rhs_pure)
+
+    cache[id(expr)] = result
+
+    return result
+
+def get_peak_need(first_need: int, second_need: int) -> int:
+    """
+        Gives the most temporaries live at once while lowering two operands in order, as the first one's temporary is held across the second.
+    """
+    return max(first_need, int(first_need > 0) + second_need)
+
 ## IR Generator ##
 
 class IREmitter(ASTVisitor):
-    AddrUsageTable = dict[str, bool] # NOTE format is "a{num}": bool.
-
+    """
+        Generates IR with a fresh virtual register (`v<n>`) for every local and intermediate value, so no two values ever share an address. `AddressCompactionPass` later packs them into as few addresses as their live ranges allow.
+    """
     sem_table: sem.SemanticsTable = None
-    addr_table: AddrUsageTable = None
     name_to_addr_table: dict = None
+    vreg_count: int = None
     jump_label_i: int = None
     temp_exits: list[str] = None
-    temp_returns: list[str] = None
+    loop_labels: list[tuple[str, str]] = None
+    ret_addr: str | None = None
+    expr_needs: dict[int, ExprNeed] = None
 
     curr_func_name: str
     funcs: FuncInfoTable
@@ -40,62 +97,29 @@ class IREmitter(ASTVisitor):
 
     def __init__(self, sem_info: sem.SemanticsTable):
         self.sem_table = sem_info
-        self.addr_table = {
-            "A": False, # NOTE True => used!
-            "B": False,
-            "C": False
-        }
         self.name_to_addr_table = {}
+        self.vreg_count = 0
         self.jump_label_i = 0
         self.temp_exits = []
-        self.temp_returns = []
+        self.loop_labels = []
+        self.ret_addr = None
+        self.expr_needs = {}
         self.curr_func_name = None
         self.funcs = FuncInfoTable()
         self.results = []
 
     def release_all_addrs(self):
-        for addr in self.addr_table:
-            self.addr_table[addr] = False
-
+        self.vreg_count = 0
         self.name_to_addr_table.clear()
+        self.expr_needs.clear()
 
-    def toggle_addr_usage(self, id: str):
-        # NOTE an IR address is "used" during initialization or operations.
-        if self.addr_table.get(id) is not None:
-            # NOTE handles A,B,C addresses...
-            temp = not self.addr_table.get(id)
-            self.addr_table[id] = temp
-        else:
-            # NOTE handles new temp addresses of a<n> form... "initialize" it here!
-            self.addr_table[id] = False
-
-    def get_available_addrs(self):
+    def allocate_addr(self) -> str:
         """
-            NOTE Gets available (unused) IR address list excluding temps.\n
+            Gives the next unused virtual register of the current function. This is O(1), as liveness is left to `AddressCompactionPass`.
         """
-        availables = filter(lambda a: not self.addr_table.get(a), self.addr_table.keys())
-        return [usable_addr for usable_addr in availables]
+        new_addr = f'v{self.vreg_count}'
+        self.vreg_count += 1
 
-    def allocate_addr(self):
-        """
-            Generates the next usable IR address to store an intermediate value if no candidates exist... but a used address can become unused after use for other operations. This logic basically uses memoization of IR addresses. \n
-            * If a reserved register is available AND not for a return result, use the next one.
-            * If not, use an existing temporary register if available.
-            * Finally, use a new temporary register if no existing ones are available.
-        """
-        # pool of at least 1 guaranteed free address...
-        candidates = self.get_available_addrs()
-
-        for addr in candidates:
-            if self.addr_table.get(addr) != True and addr not in self.temp_returns:
-                self.toggle_addr_usage(addr)
-                return addr
-
-        # empty pool case:
-        new_temp_id = len(self.addr_table) - 3
-        new_addr = f'a{new_temp_id}'
-        self.toggle_addr_usage(new_addr)
-        self.toggle_addr_usage(new_addr)
         return new_addr
 
     def generate_next_label(self):
@@ -120,60 +144,57 @@ class IREmitter(ASTVisitor):
 
         return self.results
 
-    def generate_normal_jump(self, target_label: str, expr: ast.Expr):
-        # NOTE the 3 NOPs for ASSIGN, AND, OR will be handled by caller code instead...
-        expr_op = ir_types.AST_OP_IR_MATCHES.get(expr.get_op_type().name)
-        temp = self.allocate_addr()
-        op_arity = expr.get_op_arity()
-
-        if op_arity == ast.OpArity.BINARY:
-            lhs_temp = expr.get_lhs().accept_visitor(self)
-            rhs_temp = expr.get_rhs().accept_visitor(self)
-            self.results.append(ir_types.IRAssign(temp, expr_op, lhs_temp, rhs_temp))
-            self.results.append(ir_types.IRJumpIf(target_label, ir_types.IROp.COMPARE_NEQ, 0, temp))
-            self.toggle_addr_usage(rhs_temp)
-            self.toggle_addr_usage(lhs_temp)
-        elif op_arity == ast.OpArity.UNARY:
-            inner_temp = expr.get_inner().accept_visitor()
-            self.results.append(ir_types.IRAssign(temp, expr_op, inner_temp, None))
-            self.results.append(ir_types.IRJumpIf(target_label, ir_types.IROp.COMPARE_NEQ, 0, temp))
-            self.toggle_addr_usage(inner_temp)
-
-        self.toggle_addr_usage(temp)
-
-    def generate_inverse_jump(self, target_label: str, expr: ast.Expr):
+    def gen_operands(self, lhs: ast.Expr, rhs: ast.Expr) -> tuple[str | int, str | int]:
+        """
+            Lowers both operands of a binary operator, going first into the side needing more temporaries when that lowers the peak. Operands with calls or assignments keep C's usual left to right order.
+        """
+        lhs_need, lhs_pure = get_expr_need(lhs, self.expr_needs)
+        rhs_need, rhs_pure = get_expr_need(rhs, self.expr_needs)
+
+        if lhs_pure and rhs_pure and get_peak_need(rhs_need, lhs_need) < get_peak_need(lhs_need, rhs_need):
+            rhs_item = rhs.accept_visitor(self)
+            return (lhs.accept_visitor(self), rhs_item)
+
+        lhs_item = lhs.accept_visitor(self)
+        return (lhs_item, rhs.accept_visitor(self))
+
+    def emit_cond_jump(self, target_label: str, op: ir_types.IROp, arg0: str | int, arg1: str | int):
+        # NOTE GASEmitter's `cmp` can't take an immediate as its 2nd operand, so a constant goes on the right.
+        if type(arg0) == int and type(arg1) == int:
+            if ir_types.fold_ir_op(op, arg0, arg1):
+                self.results.append(ir_types.IRJump(target_label))
+        elif type(arg0) == int:
+            self.results.append(ir_types.IRJumpIf(target_label, ir_types.SWAPPED_COMPARES[op], arg1, arg0))
+        else:
+            self.results.append(ir_types.IRJumpIf(target_label, op, arg0, arg1))
+
+    def generate_cond_jump(self, target_label: str, expr: ast.Expr, jump_when: bool):
+        """
+            Lowers a condition straight into control flow: jumps to `target_label` when the condition's truth equals `jump_when`, else falls through.\n
+            NOTE Comparisons become one IRJumpIf, inverted by `AST_OP_IR_INVERSES` as needed, and `&&` / `||` only branch. Other operands get compared against 0.
+        """
         op = expr.get_op_type()
-        inverse_op = ir_types.AST_OP_IR_INVERSES.get(op.name) or ir_types.IROp.NOP
-        op_arity = expr.get_op_arity()
-
-        if inverse_op != ir_types.IROp.NOP:
-            lhs_temp = expr.get_lhs().accept_visitor(self)
-            rhs_temp = expr.get_rhs().accept_visitor(self)
-
-            self.results.append(ir_types.IRJumpIf(target_label, inverse_op, lhs_temp, rhs_temp))
-            self.toggle_addr_usage(rhs_temp)
-            self.toggle_addr_usage(lhs_temp)
-        elif op_arity == ast.OpArity.BINARY:
-            temp = self.allocate_addr()
-            lhs_temp = expr.get_lhs().accept_visitor(self)
-            rhs_temp = expr.get_rhs().accept_visitor(self)
-
-            self.results.append(ir_types.IRAssign(temp, op, lhs_temp, rhs_temp))
-            self.results.append(ir_types.IRJumpIf(target_label, ir_types.IROp.COMPARE_EQ, 0, temp))
-            self.toggle_addr_usage(temp)
-            self.toggle_addr_usage(rhs_temp)
-            self.toggle_addr_usage(lhs_temp)
-        elif op_arity == ast.OpArity.UNARY:
-            inner_temp = expr.get_inner().accept_visitor(self)
-            temp = self.allocate_addr()
-            self.results.append(ir_types.IRAssign(temp, op, inner_temp, None))
-            self.results.append(ir_types.IRJumpIf(target_label, ir_types.IROp.COMPARE_EQ, 0, inner_temp))
-            self.toggle_addr_usage(temp)
-            self.toggle_addr_usage(inner_temp)
-        elif op_arity == ast.OpArity.NOTHING:
+
+        if op == ast.OpType.OP_LOGIC_AND or op == ast.OpType.OP_LOGIC_OR:
+            # NOTE the lhs decides the whole condition when it's false for `&&` or true for `||`.
+            decided_by = op == ast.OpType.OP_LOGIC_OR
+
+            if decided_by == jump_when:
+                self.generate_cond_jump(target_label, expr.get_lhs(), jump_when)
+                self.generate_cond_jump(target_label, expr.get_rhs(), jump_when)
+            else:
+                skip_label = self.generate_next_label()
+                self.generate_cond_jump(skip_label, expr.get_lhs(), decided_by)
+                self.generate_cond_jump(target_label, expr.get_rhs(), jump_when)
+                self.results.append(ir_types.IRLabel(skip_label))
+        elif op.name in ir_types.AST_OP_IR_INVERSES:
+            lhs_temp, rhs_temp = self.gen_operands(expr.get_lhs(), expr.get_rhs())
+            jump_op = ir_types.AST_OP_IR_MATCHES.get(op.name) if jump_when else ir_types.AST_OP_IR_INVERSES.get(op.name)
+
+            self.emit_cond_jump(target_label, jump_op, lhs_temp, rhs_temp)
+        else:
             temp = expr.accept_visitor(self)
-            self.results.append(ir_types.IRJumpIf(target_label, ir_types.IROp.COMPARE_EQ, 0, temp))
-            self.toggle_addr_usage(temp)
+            self.emit_cond_jump(target_label, ir_types.IROp.COMPARE_NEQ if jump_when else ir_types.IROp.COMPARE_EQ, temp, 0)
 
     def visit_literal(self, node: ast.Expr) -> str | int:
         # NOTE literal_token: Literal.LiteralData & literal_arrtype: Literal.ArrayType
@@ -200,14 +221,13 @@ class IREmitter(ASTVisitor):
     def visit_unary(self, node: ast.Expr):
         src_item: str | int = node.get_inner().accept_visitor(self)
         op = node.get_op_type()
-        dest_addr = self.allocate_addr()
 
         if op != ast.OpType.OP_NEG:
             return
         
         if type(src_item) == str:
+            dest_addr = self.allocate_addr()
             self.results.append(ir_types.IRAssign(dest_addr, ir_types.IROp.NEGATE, src_item, None))
-            self.toggle_addr_usage(src_item)
             return dest_addr
         else:
             return -src_item
@@ -218,72 +238,49 @@ class IREmitter(ASTVisitor):
         op = node.get_op_type()
         dest_addr = None
 
-        if op == ast.OpType.OP_LOGIC_AND:
+        if op == ast.OpType.OP_LOGIC_AND or op == ast.OpType.OP_LOGIC_OR:
+            # NOTE the boolean is only materialized here, where the value itself is needed.
             falsy_label = self.generate_next_label()
             truthy_label = self.generate_next_label()
             dest_addr = self.allocate_addr()
 
-            self.generate_inverse_jump(falsy_label, expr_lhs)
-            self.generate_inverse_jump(falsy_label, expr_rhs)
+            self.generate_cond_jump(falsy_label, node, False)
             self.results.append(ir_types.IRAssign(dest_addr, ir_types.IROp.NOP, 1, None))
             self.results.append(ir_types.IRJump(truthy_label))
 
             self.results.append(ir_types.IRLabel(falsy_label))
             self.results.append(ir_types.IRAssign(dest_addr, ir_types.IROp.NOP, 0, None))
             self.results.append(ir_types.IRLabel(truthy_label))
-        elif op == ast.OpType.OP_LOGIC_OR:
-            falsy_label = self.generate_next_label()
-            truthy_label = self.generate_next_label()
-            skippy_label = self.generate_next_label()
-            dest_addr = self.allocate_addr()
-
-            self.generate_normal_jump(truthy_label, expr_lhs)
-            self.generate_normal_jump(truthy_label, expr_rhs)
-            self.results.append(ir_types.IRJump(falsy_label))
-
-            self.results.append(ir_types.IRLabel(truthy_label))
-            self.results.append(ir_types.IRAssign(dest_addr, ir_types.IROp.NOP, 1, None))
-            self.results.append(ir_types.IRJump(skippy_label))
-
-            self.results.append(ir_types.IRLabel(falsy_label))
-            self.results.append(ir_types.IRAssign(dest_addr, ir_types.IROp.NOP, 0, None))
-            self.results.append(ir_types.IRLabel(skippy_label))
         elif op != ast.OpType.OP_ASSIGN:
-            arg0_item = expr_lhs.accept_visitor(self)
-            arg1_item = expr_rhs.accept_visitor(self)
+            arg0_item, arg1_item = self.gen_operands(expr_lhs, expr_rhs)
             dest_addr = self.allocate_addr()
 
             self.results.append(ir_types.IRAssign(dest_addr, ir_types.IROp(op.value), arg0_item, arg1_item))
-
-            self.toggle_addr_usage(arg1_item)
-            self.toggle_addr_usage(arg0_item)
         else:
             dest_addr = expr_lhs.accept_visitor(self)
             value_item = expr_rhs.accept_visitor(self)
 
             if value_item is not None:
                 self.results.append(ir_types.IRAssign(dest_addr, ir_types.IROp.NOP, value_item, None))
-                self.toggle_addr_usage(value_item)
 
         return dest_addr
 
     def visit_call(self, node: ast.Expr):
         func_name: str = node.get_name()
-        func_retype: ast.DataType = self.sem_table.get('.global').get(func_name).data_type
+        func_note = self.sem_table.get('.global').get(func_name)
+        func_retype: ast.DataType = func_note.data_type
         func_argv: ast.Call.ArgList = node.get_args()
 
-        for arg in func_argv:
-            arg_type = arg.deduce_early_type()
-
+        # NOTE sema already matched each arg's type to its param, and an arg expr's own type is not known this early.
+        for arg, arg_type in zip(func_argv, func_note.extras['ptypes']):
             if arg.get_op_type() == ast.OpType.OP_NONE:
-                # NOTE either check lexeme of literal for its value...
-                temp_lexeme: str = arg.get_data()[0][0]
-                temp_value = int(temp_lexeme) if temp_lexeme[0] != '\'' else ord(temp_lexeme[1])
-                self.results.append(ir_types.IRPushArg(temp_value, True, arg_type))
+                # NOTE either use the literal's value, where a name gives its address...
+                temp_value: str | int = arg.accept_visitor(self)
+                self.results.append(ir_types.IRPushArg(temp_value, type(temp_value) == int, arg_type))
             else:
-                # ... or just process a temporary value from an arg. expr.
-                temp_arg_addr: str = arg.accept_visitor(self)
-                self.results.append(ir_types.IRPushArg(temp_arg_addr, False, arg_type))
+                # ... or just process a temporary value from an arg. expr, which is a constant for a negated literal like `-4`.
+                temp_arg_addr: str | int = arg.accept_visitor(self)
+                self.results.append(ir_types.IRPushArg(temp_arg_addr, type(temp_arg_addr) == int, arg_type))
 
         self.results.append(ir_types.IRCallFunc(func_name))
 
@@ -323,12 +320,18 @@ class IREmitter(ASTVisitor):
         ret_label = self.generate_next_label()
         self.temp_exits.append(ret_label)
 
+        # NOTE every `return` copies into one result address, so the epilogue returns whichever value was chosen. A void function has none and returns nothing.
+        if node.get_type() != ast.DataType.VOID:
+            self.ret_addr = self.allocate_addr()
+            self.register_func_local(func_name, node.get_type(), self.ret_addr, False)
+
         node.get_body().accept_visitor(self)
 
         self.results.append(ir_types.IRLabel(ret_label))
-        self.results.append(ir_types.IRReturn(self.temp_returns.pop()))
+        self.results.append(ir_types.IRReturn(self.ret_addr))
 
         self.curr_func_name = None
+        self.ret_addr = None
         self.temp_exits.clear()
         self.release_all_addrs()
 
@@ -343,8 +346,7 @@ class IREmitter(ASTVisitor):
         falsy_body: ast.Stmt = node.get_alt_body()
         falsy_label = self.generate_next_label()
 
-        cond_addr = node.get_conditions().accept_visitor(self)
-        self.results.append(ir_types.IRJumpIf(falsy_label, ir_types.IROp.COMPARE_EQ, 0, cond_addr))
+        self.generate_cond_jump(falsy_label, node.get_conditions(), False)
 
         truthy_body.accept_visitor(self)
 
@@ -358,19 +360,33 @@ class IREmitter(ASTVisitor):
         else:
             self.results.append(ir_types.IRLabel(falsy_label))
 
-        self.toggle_addr_usage(cond_addr)
+    def visit_while(self, node: ast.Stmt):
+        body_label = self.generate_next_label()
+        cond_label = self.generate_next_label()
+        exit_label = self.generate_next_label()
+
+        # NOTE the loop is rotated into `if (cond) do { body } while (cond);`, so each iteration only runs the conditional jump at the bottom.
+        self.generate_cond_jump(exit_label, node.get_conditions(), False)
+        self.results.append(ir_types.IRLabel(body_label))
+
+        self.loop_labels.append((cond_label, exit_label))
+        node.get_body().accept_visitor(self)
+        self.loop_labels.pop()
+
+        self.results.append(ir_types.IRLabel(cond_label))
+        self.generate_cond_jump(body_label, node.get_conditions(), True)
+        self.results.append(ir_types.IRLabel(exit_label))
+
+    def visit_break(self, node: ast.Stmt):
+        self.results.append(ir_types.IRJump(self.loop_labels[-1][1]))
+
+    def visit_continue(self, node: ast.Stmt):
+        self.results.append(ir_types.IRJump(self.loop_labels[-1][0]))
 
     def visit_return(self, node: ast.Stmt):
-        result_dest = self.allocate_addr()
-        result_expr = node.get_result_expr()
-        result_src = result_expr.accept_visitor(self)
-        self.temp_returns.append(result_dest)
-        result_type = result_expr.deduce_early_type()
+        result_src = node.get_result_expr().accept_visitor(self)
 
-        if result_type == ast.DataType.UNKNOWN and type(result_expr) == ast.Call:
-            result_type = self.sem_table.get('.global').get(result_expr.get_name()).data_type
+        if self.ret_addr is not None:
+            self.results.append(ir_types.IRAssign(self.ret_addr, ir_types.IROp.NOP, result_src, None))
 
-        self.results.append(ir_types.IRAssign(result_dest, ir_types.IROp.NOP, result_src, None))
-        self.register_func_local(self.curr_func_name, result_type, result_dest, False)
         self.results.append(ir_types.IRJump(self.temp_exits[0]))
-        print(self.funcs.get(self.curr_func_name)) # debug
@@ -0,0 +1,193 @@
+"""
+    ir_inline.py\n
+    By DrkWithT\n
+    Inlines small non-recursive callees into their call sites across a program's CFGs, guided by a size / benefit budget.
+"""
+
+import copy
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_dce import get_referenced_addrs
+from DerkCC.DCCStages.ir_callgraph import get_call_graph, get_recursive_funcs, get_bottom_up_order
+
+## Constants ##
+
+# NOTE rough step count saved per inlined call: the call, yield copy, %r10/%r11 saves, and the callee's prologue / epilogue.
+CALL_OVERHEAD_COST = 10
+
+# NOTE extra budget per constant argument, as SCCP can usually fold the callee's uses of it.
+CONST_ARG_BONUS = 2
+
+## Utility functions ##
+
+def find_call_args(steps: ir_types.StepList, call_i: int, arity: int) -> list[int] | None:
+    """
+        Gives the indices of a call's IRPushArg steps in order, or `None` if they are not all in the same block after any earlier call.
+    """
+    results = []
+    step_i = call_i - 1
+
+    while step_i >= 0 and len(results) < arity:
+        step_type = steps[step_i].get_ir_type()
+
+        if step_type == ir_types.IRType.FUNC_CALL:
+            return None
+
+        if step_type == ir_types.IRType.ARGV_PUSH:
+            results.append(step_i)
+
+        step_i -= 1
+
+    if len(results) != arity:
+        return None
+
+    results.reverse()
+
+    return results
+
+## Inliner ##
+
+class InlinePass:
+    """
+        Replaces calls with a copy of the callee's blocks: each IRPushArg becomes a copy into the callee's renamed param, and each IRReturn becomes a copy into the IRStoreYield target plus a jump past the call.\n
+        NOTE Callees that are recursive are never inlined. A site is inlined when the callee's step count minus the call overhead and constant argument bonus fits `size_budget`, and while its caller has grown by at most `max_growth` steps.
+    """
+    name = 'inline'
+
+    def __init__(self, size_budget: int = 8, max_growth: int = 64):
+        self.size_budget = size_budget
+        self.max_growth = max_growth
+        self.site_count = 0
+        self.inlined_counts: dict[str, int] = {}
+
+    def run_program(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable) -> int:
+        cfg_table = {cfg.func_name: cfg for cfg in cfgs}
+        call_graph = get_call_graph(cfgs)
+        recursives = get_recursive_funcs(call_graph)
+        change_count = 0
+
+        for func_name in get_bottom_up_order(call_graph):
+            count = self.inline_calls(cfg_table[func_name], funcs, cfg_table, recursives)
+            self.inlined_counts[func_name] = count
+            change_count += count
+
+        return change_count
+
+    def get_inline_cost(self, callee_cfg: ir_cfg.ControlFlowGraph, args: list[ir_types.IRPushArg]) -> int:
+        const_count = len([arg for arg in args if type(arg.arg) == int])
+
+        return callee_cfg.get_step_count() - CALL_OVERHEAD_COST - len(args) - CONST_ARG_BONUS * const_count
+
+    def inline_calls(self, cfg: ir_cfg.ControlFlowGraph, funcs: ir_gen.FuncInfoTable, cfg_table: dict[str, ir_cfg.ControlFlowGraph], recursives: set[str]) -> int:
+        size_limit = cfg.get_step_count() + self.max_growth
+        inline_count = 0
+        block_id = 0
+
+        while block_id < len(cfg.blocks):
+            block = cfg.blocks[block_id]
+            site = None
+
+            for step_i, step in enumerate(block.steps):
+                if step.get_ir_type() != ir_types.IRType.FUNC_CALL or step.callee in recursives or step.callee not in cfg_table:
+                    continue
+
+                callee_cfg = cfg_table[step.callee]
+                param_count = len([entry for entry in funcs[step.callee] if entry[2]])
+                arg_ids = find_call_args(block.steps, step_i, param_count)
+
+                if arg_ids is None or cfg.get_step_count() + callee_cfg.get_step_count() > size_limit:
+                    continue
+
+                if self.get_inline_cost(callee_cfg, [block.steps[arg_i] for arg_i in arg_ids]) <= self.size_budget:
+                    site = (step_i, arg_ids)
+                    break
+
+            if site is None:
+                block_id += 1
+                continue
+
+            # NOTE resumes the scan at the continuation block, so calls after the inlined one are still seen.
+            block_id = self.inline_site(cfg, block_id, site[0], site[1], funcs, cfg_table[block.steps[site[0]].callee])
+            inline_count += 1
+
+        return inline_count
+
+    def inline_site(self, cfg: ir_cfg.ControlFlowGraph, block_id: int, call_i: int, arg_ids: list[int], funcs: ir_gen.FuncInfoTable, callee_cfg: ir_cfg.ControlFlowGraph) -> int:
+        """
+            Splices one callee body into the caller at a call, giving the block id of the code after the call.
+        """
+        prefix = f'{callee_cfg.func_name}.{self.site_count}'
+        self.site_count += 1
+
+        block = cfg.blocks[block_id]
+        callee_info = funcs[callee_cfg.func_name]
+        addr_renames = {addr: f'{prefix}.{addr}' for addr in get_referenced_addrs(callee_cfg)}
+        label_renames = {callee_block.label: cfg.new_label() for callee_block in callee_cfg.blocks if callee_block.label is not None}
+        params = [addr_renames.get(entry[1], f'{prefix}.{entry[1]}') for entry in callee_info if entry[2]]
+
+        yield_target = None
+        rest_i = call_i + 1
+
+        if rest_i < len(block.steps) and block.steps[rest_i].get_ir_type() == ir_types.IRType.STORE_YIELD:
+            yield_target = block.steps[rest_i].target
+            rest_i += 1
+
+        cont_label = cfg.new_label()
+        cont_block = ir_cfg.BasicBlock(cont_label, block.steps[rest_i:])
+
+        for param, arg_i in zip(params, arg_ids):
+            block.steps[arg_i] = ir_types.IRAssign(param, ir_types.IROp.NOP, block.steps[arg_i].arg, None)
+
+        block.steps = block.steps[:call_i]
+        body_blocks = [self.copy_block(callee_block, addr_renames, label_renames, yield_target, cont_label) for callee_block in callee_cfg.blocks]
+
+        cfg.blocks[block_id + 1:block_id + 1] = body_blocks + [cont_block]
+        cfg.recompute_edges()
+
+        # NOTE the callee's locals, params included, become plain locals of the caller.
+        for datatype, ir_addr, _ in callee_info:
+            if ir_addr in addr_renames:
+                funcs[cfg.func_name].append((datatype, addr_renames[ir_addr], False))
+
+        return block_id + 1 + len(body_blocks)
+
+    def copy_block(self, callee_block: ir_cfg.BasicBlock, addr_renames: dict[str, str], label_renames: dict[str, str], yield_target: str | None, cont_label: str) -> ir_cfg.BasicBlock:
+        steps = []
+
+        for callee_step in callee_block.steps:
+            step_type = callee_step.get_ir_type()
+
+            # NOTE params already got their values from the copies replacing IRPushArg.
+            if step_type == ir_types.IRType.LOAD_PARAM:
+                continue
+
+            if step_type == ir_types.IRType.RETURN:
+                if yield_target is not None:
+                    steps.append(ir_types.IRAssign(yield_target, ir_types.IROp.NOP, addr_renames[callee_step.result_addr], None))
+
+                steps.append(ir_types.IRJump(cont_label))
+                continue
+
+            # NOTE a tail call would leave the caller too, so it goes back to a plain call yielding the inlined result.
+            if step_type == ir_types.IRType.TAIL_CALL:
+                steps.append(ir_types.IRCallFunc(callee_step.callee))
+
+                if yield_target is not None:
+                    steps.append(ir_types.IRStoreYield(yield_target))
+
+                steps.append(ir_types.IRJump(cont_label))
+                continue
+
+            step = copy.deepcopy(callee_step)
+            step.replace_uses({use: addr_renames[use] for use in step.get_use_addrs()})
+            def_addr = step.get_def_addr()
+
+            if def_addr is not None:
+                step.set_def_addr(addr_renames[def_addr])
+
+            step.replace_jump_targets(label_renames)
+
+            steps.append(step)
+
+        return ir_cfg.BasicBlock(label_renames.get(callee_block.label), steps)
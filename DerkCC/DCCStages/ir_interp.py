@@ -0,0 +1,354 @@
+"""
+    ir_interp.py\n
+    By DrkWithT\n
+    Runs a program's IR directly with 32-bit / 8-bit integer semantics, so its behavior can be checked without an assembler. Each block is compiled once into Python closures instead of visiting every step as it runs.\n
+    Sources:
+    [Closure Generation: A Paradigm for Code Generation](https://www.cs.tufts.edu/~nr/cs257/archive/marc-feeley/closure-generation.pdf)
+"""
+
+import operator
+from typing import Callable
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_ssa import get_leading_phis
+
+## Constants ##
+
+# NOTE each IR call nests a few Python frames, so this stays well under Python's own recursion limit.
+MAX_CALL_DEPTH = 200
+
+# NOTE bounds how many blocks one run may enter, so a miscompiled loop fails instead of hanging.
+MAX_BLOCK_RUNS = 1_000_000
+
+# NOTE a jump target telling the run loop that the function returned or tail called.
+EXIT_BLOCK = -1
+
+## Aliases and Types ##
+
+class Frame(dict):
+    """
+        One function activation. The dict itself maps IR addresses to their values, so compiled steps index it directly.
+    """
+    __slots__ = ('args', 'depth', 'pushed', 'yield_value', 'result', 'tail_callee', 'prev_block')
+
+    def __init__(self, args: list[int], depth: int):
+        super().__init__()
+        self.args = args
+        self.depth = depth
+        self.pushed = []
+        self.yield_value = 0
+        self.result = 0
+        self.tail_callee = None
+        self.prev_block = EXIT_BLOCK
+
+StepFn = Callable[[Frame], None]
+JumpFn = Callable[[Frame], int]
+CompiledBlock = tuple[list[StepFn], JumpFn]
+
+## Utility functions ##
+
+def load_program(steps: ir_types.StepList, funcs: ir_gen.FuncInfoTable) -> "IRInterpreter":
+    """
+        Compiles the flat IR from `IREmitter.gen_ir_from_ast` for running.
+    """
+    return IRInterpreter(ir_cfg.build_program_cfgs(steps, funcs), funcs)
+
+def wrap_int32(value: int) -> int:
+    return ((value + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+
+def wrap_int8(value: int) -> int:
+    return ((value + 0x80) & 0xFF) - 0x80
+
+def get_wrapper(size: int) -> Callable[[int], int]:
+    """
+        Gives the truncation for storing into an address of `size` bytes, like `ir_types.wrap_int` but specialized.
+    """
+    if size == 4:
+        return wrap_int32
+
+    if size == 1:
+        return wrap_int8
+
+    return lambda value: ir_types.wrap_int(value, size)
+
+def divide_int32(lhs: int, rhs: int) -> int:
+    quotient = ir_types.fold_ir_op(ir_types.IROp.DIVIDE, lhs, rhs)
+
+    if quotient is None:
+        raise RuntimeError(f'ir_interp.py [Error]: Division trap on {lhs} / {rhs}!\n')
+
+    return quotient
+
+# NOTE operands are always stored already wrapped, so these match `fold_ir_op` once their result is wrapped too.
+BINARY_OP_FUNCS = {
+    ir_types.IROp.ADD: operator.add,
+    ir_types.IROp.SUBTRACT: operator.sub,
+    ir_types.IROp.MULTIPLY: operator.mul,
+    ir_types.IROp.DIVIDE: divide_int32,
+    ir_types.IROp.SHIFT_LEFT: operator.lshift,
+    ir_types.IROp.SHIFT_RIGHT: operator.rshift,
+    ir_types.IROp.SHIFT_RIGHT_LOGICAL: lambda lhs, rhs: (lhs & 0xFFFFFFFF) >> rhs,
+    ir_types.IROp.MULTIPLY_HIGH: lambda lhs, rhs: (lhs * rhs) >> 32,
+    ir_types.IROp.COMPARE_EQ: operator.eq,
+    ir_types.IROp.COMPARE_NEQ: operator.ne,
+    ir_types.IROp.COMPARE_LT: operator.lt,
+    ir_types.IROp.COMPARE_LTE: operator.le,
+    ir_types.IROp.COMPARE_GT: operator.gt,
+    ir_types.IROp.COMPARE_GTE: operator.ge
+}
+
+UNARY_OP_FUNCS = {
+    ir_types.IROp.NOP: lambda value: value,
+    ir_types.IROp.NEGATE: operator.neg
+}
+
+## Interpreter ##
+
+class IRInterpreter:
+    """
+        Compiles every function of a program's CFGs into lists of closures per block, then runs them on a call stack of `Frame` dicts. Each step's result is truncated to its destination's size from the function's local records.\n
+        NOTE An IRTailCall reuses the run loop instead of nesting a Python call, so tail recursion runs in constant depth like the `jmp` GASEmitter gives it. Reading an address never written, a division trap, or going past `max_call_depth` calls or `max_block_runs` blocks raises a RuntimeError.
+    """
+    def __init__(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable, max_call_depth: int = MAX_CALL_DEPTH, max_block_runs: int = MAX_BLOCK_RUNS):
+        self.max_call_depth = max_call_depth
+        self.max_block_runs = max_block_runs
+        self.block_runs = 0
+        self.compiled: dict[str, list[CompiledBlock]] = {cfg.func_name: self.compile_func(cfg, funcs[cfg.func_name]) for cfg in cfgs}
+
+    def run(self, func_name: str = 'main', args: list[int] | None = None) -> int:
+        self.block_runs = 0
+
+        try:
+            return self.call_func(func_name, [wrap_int32(arg) for arg in args or []], 0)
+        except KeyError as addr_error:
+            raise RuntimeError(f'ir_interp.py [Error]: Read of unset address {addr_error} or call of unknown function!\n')
+
+    def call_func(self, func_name: str, args: list[int], depth: int) -> int:
+        if depth >= self.max_call_depth:
+            raise RuntimeError(f'ir_interp.py [Error]: Call depth passed {self.max_call_depth} in {func_name}!\n')
+
+        while True:
+            blocks = self.compiled[func_name]
+            frame = Frame(args, depth)
+            block_id = 0
+
+            while block_id != EXIT_BLOCK:
+                self.block_runs += 1
+
+                if self.block_runs > self.max_block_runs:
+                    raise RuntimeError(f'ir_interp.py [Error]: Ran over {self.max_block_runs} blocks in {func_name}!\n')
+
+                steps, jump = blocks[block_id]
+
+                for step in steps:
+                    step(frame)
+
+                frame.prev_block = block_id
+                block_id = jump(frame)
+
+            if frame.tail_callee is None:
+                return frame.result
+
+            func_name, args = frame.tail_callee, frame.pushed
+
+    def compile_func(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> list[CompiledBlock]:
+        label_ids = {block.label: block_id for block_id, block in enumerate(cfg.blocks) if block.label is not None}
+        sizes = {ir_addr: ir_gen.get_local_size(func_info, ir_addr) for _, ir_addr, _ in func_info}
+        param_count = 0
+        results = []
+
+        for block_id, block in enumerate(cfg.blocks):
+            phis = get_leading_phis(block)
+            steps = [self.compile_phis(phis, label_ids, sizes)] if phis else []
+
+            for step in block.steps[len(phis):]:
+                step_type = step.get_ir_type()
+
+                if step_type in ir_cfg.TERMINATOR_TYPES:
+                    break
+
+                if step_type == ir_types.IRType.LOAD_PARAM:
+                    steps.append(self.compile_load_param(step.target, param_count, sizes))
+                    param_count += 1
+                else:
+                    steps.append(self.compile_step(step, sizes))
+
+            results.append((steps, self.compile_jump(cfg, block_id, label_ids)))
+
+        return results
+
+    def compile_phis(self, phis: list[ir_types.IRPhi], label_ids: dict[str, int], sizes: dict[str, int]) -> StepFn:
+        # NOTE all incoming values are read before any phi is written, as phis of a block assign in parallel. Semi-pruned SSA may pass a phi a value never set on that path, which reads as 0 since only a dead use could see it.
+        moves = [(phi.dest, get_wrapper(sizes.get(phi.dest, 4)), {label_ids[pred_label]: arg for pred_label, arg in phi.args.items()}) for phi in phis]
+
+        def run_phis(frame: Frame):
+            values = []
+
+            for dest, wrap, args in moves:
+                arg = args[frame.prev_block]
+                values.append((dest, wrap(frame.get(arg, 0) if type(arg) == str else arg)))
+
+            for dest, value in values:
+                frame[dest] = value
+
+        return run_phis
+
+    def compile_load_param(self, target: str, param_i: int, sizes: dict[str, int]) -> StepFn:
+        wrap = get_wrapper(sizes.get(target, 4))
+
+        def load_param(frame: Frame):
+            frame[target] = wrap(frame.args[param_i])
+
+        return load_param
+
+    def compile_step(self, step: ir_types.IRStep, sizes: dict[str, int]) -> StepFn:
+        step_type = step.get_ir_type()
+
+        if step_type == ir_types.IRType.ADDR_ASSIGN:
+            return self.compile_assign(step, get_wrapper(sizes.get(step.dest, 4)))
+
+        if step_type == ir_types.IRType.LOAD_CONSTANT:
+            addr, value = step.addr, get_wrapper(sizes.get(step.addr, 4))(step.value)
+
+            def load_const(frame: Frame):
+                frame[addr] = value
+
+            return load_const
+
+        if step_type == ir_types.IRType.ARGV_PUSH:
+            arg = step.arg
+
+            if type(arg) == int:
+                value = wrap_int32(arg)
+                return lambda frame: frame.pushed.append(value)
+
+            return lambda frame: frame.pushed.append(frame[arg])
+
+        if step_type == ir_types.IRType.FUNC_CALL:
+            callee = step.callee
+
+            def call_func(frame: Frame):
+                frame.yield_value = self.call_func(callee, frame.pushed, frame.depth + 1)
+                frame.pushed = []
+
+            return call_func
+
+        if step_type == ir_types.IRType.STORE_YIELD:
+            target, wrap = step.target, get_wrapper(sizes.get(step.target, 4))
+
+            def store_yield(frame: Frame):
+                frame[target] = wrap(frame.yield_value)
+
+            return store_yield
+
+        raise RuntimeError(f'ir_interp.py [Error]: Cannot run IR step {step}!\n')
+
+    def compile_assign(self, step: ir_types.IRAssign, wrap: Callable[[int], int]) -> StepFn:
+        dest, arg0, arg1 = step.dest, step.arg0, step.arg1
+
+        if step.op in UNARY_OP_FUNCS:
+            unary_fn = UNARY_OP_FUNCS[step.op]
+
+            if type(arg0) == int:
+                value = wrap(unary_fn(arg0))
+
+                def assign_const(frame: Frame):
+                    frame[dest] = value
+
+                return assign_const
+
+            def assign_unary(frame: Frame):
+                frame[dest] = wrap(unary_fn(frame[arg0]))
+
+            return assign_unary
+
+        binary_fn = BINARY_OP_FUNCS.get(step.op)
+
+        if binary_fn is None:
+            raise RuntimeError(f'ir_interp.py [Error]: Cannot run IR op {step.op.name}!\n')
+
+        # NOTE specializing on which operands are constants saves a type check per run.
+        if type(arg0) == str and type(arg1) == str:
+            def assign_addrs(frame: Frame):
+                frame[dest] = wrap(binary_fn(frame[arg0], frame[arg1]))
+
+            return assign_addrs
+
+        if type(arg0) == str:
+            def assign_addr_const(frame: Frame):
+                frame[dest] = wrap(binary_fn(frame[arg0], arg1))
+
+            return assign_addr_const
+
+        if type(arg1) == str:
+            def assign_const_addr(frame: Frame):
+                frame[dest] = wrap(binary_fn(arg0, frame[arg1]))
+
+            return assign_const_addr
+
+        def assign_consts(frame: Frame):
+            frame[dest] = wrap(binary_fn(arg0, arg1))
+
+        return assign_consts
+
+    def compile_jump(self, cfg: ir_cfg.ControlFlowGraph, block_id: int, label_ids: dict[str, int]) -> JumpFn:
+        terminator = cfg.blocks[block_id].get_terminator()
+        next_id = block_id + 1
+
+        if terminator is None:
+            if next_id >= len(cfg.blocks):
+                raise RuntimeError(f'ir_interp.py [Error]: Control falls off the end of {cfg.func_name}!\n')
+
+            return lambda frame: next_id
+
+        match terminator.get_ir_type():
+            case ir_types.IRType.JUMP:
+                target_id = label_ids[terminator.target]
+                return lambda frame: target_id
+            case ir_types.IRType.JUMP_IF:
+                target_id = label_ids[terminator.target]
+                compare_fn = BINARY_OP_FUNCS[terminator.op]
+                arg0, arg1 = terminator.arg0, terminator.arg1
+
+                if type(arg0) == str and type(arg1) == str:
+                    return lambda frame: target_id if compare_fn(frame[arg0], frame[arg1]) else next_id
+
+                if type(arg0) == str:
+                    return lambda frame: target_id if compare_fn(frame[arg0], arg1) else next_id
+
+                if type(arg1) == str:
+                    return lambda frame: target_id if compare_fn(arg0, frame[arg1]) else next_id
+
+                taken = compare_fn(arg0, arg1)
+                return lambda frame: target_id if taken else next_id
+            case ir_types.IRType.JUMP_TABLE:
+                target_ids = [label_ids[target] for target in terminator.targets]
+                default_id = label_ids[terminator.default]
+                arg, low = terminator.arg, terminator.low
+
+                def jump_by_table(frame: Frame) -> int:
+                    offset = frame[arg] - low
+                    return target_ids[offset] if 0 <= offset < len(target_ids) else default_id
+
+                return jump_by_table
+            case ir_types.IRType.RETURN:
+                result_addr = terminator.result_addr
+
+                # NOTE a void function's return leaves the frame's result at 0.
+                if result_addr is None:
+                    return lambda frame: EXIT_BLOCK
+
+                def return_value(frame: Frame) -> int:
+                    frame.result = frame[result_addr]
+                    return EXIT_BLOCK
+
+                return return_value
+            case ir_types.IRType.TAIL_CALL:
+                callee = terminator.callee
+
+                def tail_call(frame: Frame) -> int:
+                    frame.tail_callee = callee
+                    return EXIT_BLOCK
+
+                return tail_call
@@ -0,0 +1,260 @@
+"""
+    ir_jumps.py\n
+    By DrkWithT\n
+    Branch simplification over the IR CFG: folds constant conditional jumps, threads jump chains and branches on just-assigned constants, inverts branches over lone jumps, drops jumps to the next block, then merges straight-line blocks.
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_dce import remove_unreachable_blocks
+
+## Utility functions ##
+
+def is_jump_only(block: ir_cfg.BasicBlock) -> bool:
+    return len(block.steps) == 1 and block.steps[0].get_ir_type() == ir_types.IRType.JUMP
+
+def is_branch_only(block: ir_cfg.BasicBlock) -> bool:
+    return len(block.steps) == 1 and block.steps[0].get_ir_type() == ir_types.IRType.JUMP_IF
+
+def make_branch_result(step: ir_types.IRJumpIf, arg0: int, arg1: int) -> bool | None:
+    """
+        Gives whether a conditional jump with these constant operands is taken, or `None` if that can't be known.
+    """
+    result = ir_types.fold_ir_op(step.op, arg0, arg1)
+
+    if result is None:
+        return None
+
+    return result != 0
+
+## Jump Threading Pass ##
+
+class JumpThreadingPass:
+    """
+        Cleans up the branches left by the short-circuit and `if` lowering in IREmitter. Runs its rewrites until none apply, and unreachable blocks are dropped between them.\n
+        NOTE A branch on an address is only threaded from a predecessor that assigned it a constant in the same block, so the assignment itself stays for DCE to judge.
+    """
+    name = 'jump-thread'
+
+    def __init__(self):
+        self.func_info: ir_gen.FuncInfo = None
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        self.func_info = func_info
+        change_count = 0
+
+        while True:
+            round_count = self.fold_constant_branches(cfg)
+            round_count += self.thread_jumps(cfg)
+            round_count += self.thread_known_branches(cfg)
+            cfg.recompute_edges()
+            round_count += remove_unreachable_blocks(cfg)
+            round_count += self.invert_branches(cfg)
+            round_count += self.drop_next_jumps(cfg)
+            round_count += self.merge_blocks(cfg)
+
+            if round_count == 0:
+                break
+
+            change_count += round_count
+
+        return change_count
+
+    def fold_constant_branches(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        change_count = 0
+
+        for block in cfg.blocks:
+            terminator = block.get_terminator()
+
+            if terminator is None or terminator.get_ir_type() != ir_types.IRType.JUMP_IF:
+                continue
+
+            if type(terminator.arg0) != int or type(terminator.arg1) != int:
+                continue
+
+            taken = make_branch_result(terminator, terminator.arg0, terminator.arg1)
+
+            if taken is None:
+                continue
+
+            if taken:
+                block.steps[-1] = ir_types.IRJump(terminator.target)
+            else:
+                block.steps.pop()
+
+            change_count += 1
+
+        if change_count > 0:
+            cfg.recompute_edges()
+
+        return change_count
+
+    def resolve_target(self, cfg: ir_cfg.ControlFlowGraph, label: str) -> str:
+        """
+            Follows a jump target through blocks that only jump onward or are empty, stopping if the chain loops.
+        """
+        seen = set()
+        block_id = cfg.get_block_id(label)
+
+        while block_id not in seen:
+            seen.add(block_id)
+            block = cfg.blocks[block_id]
+
+            if is_jump_only(block):
+                block_id = cfg.get_block_id(block.steps[0].target)
+            elif not block.steps and block_id + 1 < len(cfg.blocks):
+                block_id += 1
+            else:
+                break
+
+        return cfg.ensure_label(block_id)
+
+    def thread_jumps(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        change_count = 0
+
+        for block in cfg.blocks:
+            terminator = block.get_terminator()
+
+            if terminator is None:
+                continue
+
+            renames = {target: self.resolve_target(cfg, target) for target in terminator.get_jump_targets()}
+            renames = {target: final_target for target, final_target in renames.items() if final_target != target}
+
+            if renames:
+                terminator.replace_jump_targets(renames)
+                change_count += len(renames)
+
+        return change_count
+
+    def get_known_value(self, block: ir_cfg.BasicBlock, item: str | int) -> int | None:
+        """
+            Gives the constant an operand holds at the end of the block, if the block's last write to it was a constant.
+        """
+        if type(item) == int:
+            return item
+
+        for step in reversed(block.steps):
+            if step.get_def_addr() != item:
+                continue
+
+            if step.get_ir_type() == ir_types.IRType.LOAD_CONSTANT:
+                return ir_types.wrap_int(step.value, ir_gen.get_local_size(self.func_info, item))
+
+            if step.get_ir_type() == ir_types.IRType.ADDR_ASSIGN and step.op == ir_types.IROp.NOP and type(step.arg0) == int:
+                return ir_types.wrap_int(step.arg0, ir_gen.get_local_size(self.func_info, item))
+
+            return None
+
+        return None
+
+    def thread_known_branches(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        """
+            Sends a predecessor straight to the branch outcome when it jumps or falls into a block holding only a conditional jump on values it just set.
+        """
+        change_count = 0
+
+        for block_id, block in enumerate(cfg.blocks):
+            terminator = block.get_terminator()
+
+            if terminator is None:
+                branch_id = block_id + 1
+            elif terminator.get_ir_type() not in (ir_types.IRType.JUMP, ir_types.IRType.JUMP_IF):
+                continue
+            else:
+                branch_id = cfg.get_block_id(terminator.target)
+
+            if branch_id >= len(cfg.blocks) - 1 or not is_branch_only(cfg.blocks[branch_id]):
+                continue
+
+            branch = cfg.blocks[branch_id].steps[0]
+            arg0 = self.get_known_value(block, branch.arg0)
+            arg1 = self.get_known_value(block, branch.arg1)
+
+            if arg0 is None or arg1 is None:
+                continue
+
+            taken = make_branch_result(branch, arg0, arg1)
+
+            if taken is None:
+                continue
+
+            new_target = branch.target if taken else cfg.ensure_label(branch_id + 1)
+
+            if terminator is None:
+                block.steps.append(ir_types.IRJump(new_target))
+            else:
+                terminator.target = new_target
+
+            change_count += 1
+
+        return change_count
+
+    def invert_branches(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        """
+            Turns `JumpIf <cond> L1; Jump L2; L1:` into `JumpIf <not cond> L2; L1:`.
+        """
+        change_count = 0
+
+        for block_id, block in enumerate(cfg.blocks[:-2]):
+            terminator = block.get_terminator()
+            next_block = cfg.blocks[block_id + 1]
+
+            if terminator is None or terminator.get_ir_type() != ir_types.IRType.JUMP_IF:
+                continue
+
+            if not is_jump_only(next_block) or next_block.preds != [block_id] or terminator.target != cfg.blocks[block_id + 2].label:
+                continue
+
+            terminator.op = ir_types.IR_OP_INVERSES[terminator.op]
+            terminator.target = next_block.steps[0].target
+            # NOTE the branch still falls into the lone jump's block, so it must be emptied to reach L1.
+            next_block.steps.clear()
+            change_count += 1
+
+        if change_count > 0:
+            cfg.recompute_edges()
+
+        return change_count
+
+    def drop_next_jumps(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        change_count = 0
+
+        for block_id, block in enumerate(cfg.blocks[:-1]):
+            terminator = block.get_terminator()
+
+            if terminator is None or terminator.get_ir_type() not in (ir_types.IRType.JUMP, ir_types.IRType.JUMP_IF):
+                continue
+
+            # NOTE a conditional jump to the next block goes there either way, and its operands have no side effects.
+            if terminator.target == cfg.blocks[block_id + 1].label:
+                block.steps.pop()
+                change_count += 1
+
+        if change_count > 0:
+            cfg.recompute_edges()
+
+        return change_count
+
+    def merge_blocks(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        """
+            Appends a block to the one before it when that is its only way in and the earlier block only falls through into it.
+        """
+        change_count = 0
+        block_id = 0
+
+        while block_id < len(cfg.blocks) - 1:
+            block = cfg.blocks[block_id]
+            next_block = cfg.blocks[block_id + 1]
+
+            if block.get_terminator() is None and next_block.preds == [block_id]:
+                block.steps.extend(next_block.steps)
+                del cfg.blocks[block_id + 1]
+                cfg.recompute_edges()
+                change_count += 1
+                continue
+
+            block_id += 1
+
+        return change_count
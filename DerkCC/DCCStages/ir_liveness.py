@@ -0,0 +1,85 @@
+"""
+    ir_liveness.py\n
+    By DrkWithT\n
+    Backwards dataflow analysis of which IR addresses are live (still to be read) at each block boundary of a CFG.
+"""
+
+from collections import deque
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+
+## Aliases and Types ##
+
+AddrSet = set[str]
+
+## Utility functions ##
+
+def get_block_use_def(block: ir_cfg.BasicBlock) -> tuple[AddrSet, AddrSet]:
+    """
+        Gives the addresses read before any write in the block (upward exposed uses) and the addresses written in the block.
+    """
+    uses = set()
+    defs = set()
+
+    for step in block.steps:
+        for use in step.get_use_addrs():
+            if use not in defs:
+                uses.add(use)
+
+        def_addr = step.get_def_addr()
+
+        if def_addr is not None:
+            defs.add(def_addr)
+
+    return (uses, defs)
+
+## Liveness ##
+
+class LivenessInfo:
+    """
+        Holds live-in and live-out address sets per block, solved by a worklist until nothing changes.\n
+        NOTE Meant for non-SSA IR, so phis are not given any per-edge treatment.
+    """
+    live_in: list[AddrSet]
+    live_out: list[AddrSet]
+
+    def __init__(self, cfg: ir_cfg.ControlFlowGraph):
+        block_count = len(cfg.blocks)
+        use_defs = [get_block_use_def(block) for block in cfg.blocks]
+        self.live_in = [set() for _ in range(block_count)]
+        self.live_out = [set() for _ in range(block_count)]
+
+        # NOTE visiting blocks in postorder first makes most functions settle in one or two sweeps.
+        reachable = cfg.get_reverse_postorder()
+        reachable_set = set(reachable)
+        pending = deque(reachable)
+        pending.extend(block_id for block_id in range(block_count) if block_id not in reachable_set)
+        queued = set(pending)
+
+        while pending:
+            block_id = pending.pop()
+            queued.discard(block_id)
+
+            block_uses, block_defs = use_defs[block_id]
+            new_out = set()
+
+            for succ_id in cfg.blocks[block_id].succs:
+                new_out |= self.live_in[succ_id]
+
+            new_in = block_uses | (new_out - block_defs)
+            self.live_out[block_id] = new_out
+
+            if new_in == self.live_in[block_id]:
+                continue
+
+            self.live_in[block_id] = new_in
+
+            for pred_id in cfg.blocks[block_id].preds:
+                if pred_id not in queued:
+                    queued.add(pred_id)
+                    pending.appendleft(pred_id)
+
+    def get_live_in(self, block_id: int) -> AddrSet:
+        return self.live_in[block_id]
+
+    def get_live_out(self, block_id: int) -> AddrSet:
+        return self.live_out[block_id]
@@ -0,0 +1,208 @@
+"""
+    ir_loops.py\n
+    By DrkWithT\n
+    Finds natural loops in the IR CFG from their back edges, then hoists loop-invariant computations into a preheader block before each loop (LICM).\n
+    Sources:
+    [Compilers: Principles, Techniques, and Tools, 2nd ed., section 9.6: Loops in Flow Graphs](https://en.wikipedia.org/wiki/Compilers:_Principles,_Techniques,_and_Tools)
+"""
+
+import dataclasses
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_liveness import LivenessInfo
+
+## Constants ##
+
+HOISTABLE_TYPES = (ir_types.IRType.ADDR_ASSIGN, ir_types.IRType.LOAD_CONSTANT)
+
+## Aliases and Types ##
+
+@dataclasses.dataclass
+class NaturalLoop:
+    """
+        Models a loop by its header plus every block that reaches one of its latches without passing the header. Back edges sharing a header make one loop.
+    """
+    header: int
+    latches: ir_cfg.BlockIds
+    blocks: set[int]
+
+    def get_exiting_blocks(self, cfg: ir_cfg.ControlFlowGraph) -> ir_cfg.BlockIds:
+        return sorted(block_id for block_id in self.blocks if any(succ_id not in self.blocks for succ_id in cfg.blocks[block_id].succs))
+
+    def get_exit_blocks(self, cfg: ir_cfg.ControlFlowGraph) -> ir_cfg.BlockIds:
+        return sorted(set(succ_id for block_id in self.blocks for succ_id in cfg.blocks[block_id].succs if succ_id not in self.blocks))
+
+## Utility functions ##
+
+def find_natural_loops(cfg: ir_cfg.ControlFlowGraph) -> list[NaturalLoop]:
+    """
+        Gives the CFG's natural loops with inner loops before the loops containing them.
+    """
+    loops: dict[int, NaturalLoop] = {}
+
+    for block_id, block in enumerate(cfg.blocks):
+        if not cfg.is_reachable(block_id):
+            continue
+
+        for succ_id in block.succs:
+            if not cfg.dominates(succ_id, block_id):
+                continue
+
+            loop = loops.setdefault(succ_id, NaturalLoop(succ_id, [], {succ_id}))
+            loop.latches.append(block_id)
+            pending = [block_id]
+
+            while pending:
+                member_id = pending.pop()
+
+                if member_id in loop.blocks:
+                    continue
+
+                loop.blocks.add(member_id)
+                pending.extend(pred_id for pred_id in cfg.blocks[member_id].preds if cfg.is_reachable(pred_id))
+
+    return sorted(loops.values(), key=lambda loop: (len(loop.blocks), loop.header))
+
+def get_loop_depths(cfg: ir_cfg.ControlFlowGraph, loops: list[NaturalLoop]) -> list[int]:
+    """
+        Gives how many loops contain each block.
+    """
+    results = [0 for _ in cfg.blocks]
+
+    for loop in loops:
+        for block_id in loop.blocks:
+            results[block_id] += 1
+
+    return results
+
+## LICM Pass ##
+
+class LoopInvariantCodeMotionPass:
+    """
+        Moves an assignment out of a loop when its operands are constants or only defined outside the loop (or by other hoisted steps), so it gives the same value each iteration.\n
+        NOTE The IR isn't in SSA form here, so the destination must be written once in the loop and never read before that write. It must also not be live out of the loop unless the step runs before every exit. Divisions are only hoisted from blocks running before every exit, as hoisting one that never ran could trap.
+    """
+    name = 'licm'
+
+    def __init__(self):
+        self.hoisted_counts: dict[str, int] = {}
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        done_headers = set()
+        hoist_count = 0
+
+        # NOTE inserting a preheader shifts the block ids, so loops are found again after each one.
+        while True:
+            loop = next((loop for loop in find_natural_loops(cfg) if id(cfg.blocks[loop.header]) not in done_headers), None)
+
+            if loop is None:
+                break
+
+            done_headers.add(id(cfg.blocks[loop.header]))
+            hoist_count += self.hoist_loop(cfg, loop)
+
+        self.hoisted_counts[cfg.func_name] = hoist_count
+
+        return hoist_count
+
+    def hoist_loop(self, cfg: ir_cfg.ControlFlowGraph, loop: NaturalLoop) -> int:
+        hoisted = self.find_invariants(cfg, loop)
+
+        if not hoisted:
+            return 0
+
+        preheader_id = self.get_preheader(cfg, loop)
+
+        if preheader_id is None:
+            return 0
+
+        hoisted_ids = set(id(step) for step in hoisted)
+
+        for block in cfg.blocks:
+            block.steps = [step for step in block.steps if id(step) not in hoisted_ids]
+
+        preheader = cfg.blocks[preheader_id]
+        insert_at = len(preheader.steps) - (1 if preheader.get_terminator() is not None else 0)
+        preheader.steps[insert_at:insert_at] = hoisted
+
+        return len(hoisted)
+
+    def find_invariants(self, cfg: ir_cfg.ControlFlowGraph, loop: NaturalLoop) -> ir_types.StepList:
+        """
+            Gives the loop's invariant steps in an order where each one comes after the hoisted steps it reads.
+        """
+        liveness = LivenessInfo(cfg)
+        def_counts: dict[str, int] = {}
+
+        for block_id in loop.blocks:
+            for step in cfg.blocks[block_id].steps:
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None:
+                    def_counts[def_addr] = def_counts.get(def_addr, 0) + 1
+
+        exiting_ids = loop.get_exiting_blocks(cfg)
+        exit_live = set()
+
+        for exit_id in loop.get_exit_blocks(cfg):
+            exit_live |= liveness.get_live_in(exit_id)
+
+        header_live = liveness.get_live_in(loop.header)
+        loop_order = [block_id for block_id in cfg.get_reverse_postorder() if block_id in loop.blocks]
+        hoisted: ir_types.StepList = []
+        hoisted_addrs = set()
+        changed = True
+
+        while changed:
+            changed = False
+
+            for block_id in loop_order:
+                runs_before_exits = all(cfg.dominates(block_id, exiting_id) for exiting_id in exiting_ids)
+
+                for step in cfg.blocks[block_id].steps:
+                    if step.get_ir_type() not in HOISTABLE_TYPES or step.get_def_addr() in hoisted_addrs:
+                        continue
+
+                    def_addr = step.get_def_addr()
+
+                    if def_counts[def_addr] != 1 or def_addr in header_live:
+                        continue
+
+                    if any(use in def_counts and use not in hoisted_addrs for use in step.get_use_addrs()):
+                        continue
+
+                    if not runs_before_exits and (def_addr in exit_live or step.get_ir_type() == ir_types.IRType.ADDR_ASSIGN and step.op == ir_types.IROp.DIVIDE):
+                        continue
+
+                    hoisted.append(step)
+                    hoisted_addrs.add(def_addr)
+                    changed = True
+
+        return hoisted
+
+    def get_preheader(self, cfg: ir_cfg.ControlFlowGraph, loop: NaturalLoop) -> int | None:
+        """
+            Gives a block running just before the loop is entered, inserting an empty one before the header if needed. Gives `None` when a loop block falls into the header, as nothing can go between them.
+        """
+        header = cfg.blocks[loop.header]
+        outside_preds = [pred_id for pred_id in header.preds if pred_id not in loop.blocks]
+
+        if len(outside_preds) == 1 and cfg.blocks[outside_preds[0]].succs == [loop.header]:
+            return outside_preds[0]
+
+        if loop.header == 0 or (loop.header - 1 in loop.blocks and cfg.blocks[loop.header - 1].falls_through()):
+            return None
+
+        preheader_label = cfg.new_label()
+
+        for pred_id in outside_preds:
+            terminator = cfg.blocks[pred_id].get_terminator()
+
+            if terminator is not None and header.label in terminator.get_jump_targets():
+                terminator.replace_jump_targets({header.label: preheader_label})
+
+        cfg.blocks.insert(loop.header, ir_cfg.BasicBlock(preheader_label, []))
+        cfg.recompute_edges()
+
+        return loop.header
@@ -0,0 +1,190 @@
+"""
+    ir_lvn.py\n
+    By DrkWithT\n
+    Value numbering over basic blocks for common subexpression elimination. Blocks with a lone predecessor continue their predecessor's table (superlocal value numbering), so a condition's subexpressions are reused inside the `if` body too.
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_copyprop import CopyPropagationPass
+
+## Aliases and Types ##
+
+# NOTE models an expression as (op, arg0 value number, arg1 value number, result size)
+ExprKey = tuple[ir_types.IROp, int, int | None, int]
+
+class ValueTable:
+    """
+        Tracks which value number each address holds, which expressions were computed, and which addresses still hold each value.
+    """
+    addr_vns: dict[str, int]
+    exprs: dict[ExprKey, int]
+    holders: dict[int, list[str]]
+
+    def __init__(self):
+        self.addr_vns = {}
+        self.exprs = {}
+        self.holders = {}
+
+    def clone(self) -> "ValueTable":
+        result = ValueTable()
+        result.addr_vns = dict(self.addr_vns)
+        result.exprs = dict(self.exprs)
+        result.holders = {vn: list(addrs) for vn, addrs in self.holders.items()}
+
+        return result
+
+    def assign(self, addr: str, vn: int):
+        old_vn = self.addr_vns.get(addr)
+
+        if old_vn is not None and addr in self.holders.get(old_vn, []):
+            self.holders[old_vn].remove(addr)
+
+        self.addr_vns[addr] = vn
+        self.holders.setdefault(vn, []).append(addr)
+
+    def find_holder(self, vn: int) -> str | None:
+        for addr in self.holders.get(vn, []):
+            if self.addr_vns.get(addr) == vn:
+                return addr
+
+        return None
+
+## LVN Pass ##
+
+class ValueNumberingPass:
+    """
+        Replaces recomputed expressions with copies of an address still holding the earlier result, then lets copy propagation clean up.\n
+        NOTE Expressions are forgotten at each IRCallFunc, since GASEmitter would otherwise keep their holders alive in the caller-saved registers it pushes around calls. `removed_counts` keeps the number of redundant computations removed per function.
+    """
+    name = 'lvn'
+
+    def __init__(self):
+        self.removed_counts: dict[str, int] = {}
+        self.const_vns: dict[int, int] = {}
+        self.vn_consts: dict[int, int] = {}
+        self.vn_count = 0
+        self.func_info: ir_gen.FuncInfo = None
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        self.func_info = func_info
+        block_tables: dict[int, ValueTable] = {}
+        rewrite_count = 0
+
+        for block_id in cfg.get_reverse_postorder():
+            preds = cfg.blocks[block_id].preds
+
+            if len(preds) == 1 and preds[0] in block_tables:
+                table = block_tables[preds[0]].clone()
+            else:
+                table = ValueTable()
+
+            rewrite_count += self.number_block(cfg.blocks[block_id], table)
+            block_tables[block_id] = table
+
+        if rewrite_count > 0:
+            CopyPropagationPass().run(cfg, func_info)
+
+        self.removed_counts[cfg.func_name] = self.removed_counts.get(cfg.func_name, 0) + rewrite_count
+
+        return rewrite_count
+
+    def new_vn(self) -> int:
+        self.vn_count += 1
+
+        return self.vn_count
+
+    def get_vn(self, table: ValueTable, item: str | int) -> int:
+        if type(item) == int:
+            if item not in self.const_vns:
+                vn = self.new_vn()
+                self.const_vns[item] = vn
+                self.vn_consts[vn] = item
+
+            return self.const_vns[item]
+
+        if item not in table.addr_vns:
+            table.assign(item, self.new_vn())
+
+        return table.addr_vns[item]
+
+    def make_key(self, op: ir_types.IROp, vn0: int, vn1: int | None, size: int) -> ExprKey:
+        # NOTE canonical operand order lets `a + b` match `b + a` and `a < b` match `b > a`.
+        if vn1 is not None and vn1 < vn0:
+            if op in ir_types.COMMUTATIVE_OPS:
+                return (op, vn1, vn0, size)
+
+            if op in ir_types.SWAPPED_COMPARES:
+                return (ir_types.SWAPPED_COMPARES[op], vn1, vn0, size)
+
+        return (op, vn0, vn1, size)
+
+    def number_block(self, block: ir_cfg.BasicBlock, table: ValueTable) -> int:
+        rewrite_count = 0
+
+        for step_i, step in enumerate(block.steps):
+            step_type = step.get_ir_type()
+
+            if step_type == ir_types.IRType.FUNC_CALL:
+                table.exprs.clear()
+                continue
+
+            def_addr = step.get_def_addr()
+
+            if def_addr is None:
+                continue
+
+            if step_type == ir_types.IRType.LOAD_CONSTANT:
+                table.assign(def_addr, self.get_vn(table, ir_types.wrap_int(step.value, ir_gen.get_local_size(self.func_info, def_addr))))
+            elif step_type == ir_types.IRType.ADDR_ASSIGN:
+                vn, replacement = self.number_assign(step, table)
+
+                if replacement is not None:
+                    block.steps[step_i] = ir_types.IRAssign(def_addr, ir_types.IROp.NOP, replacement, None)
+                    rewrite_count += 1
+
+                table.assign(def_addr, vn)
+            else:
+                table.assign(def_addr, self.new_vn())
+
+        return rewrite_count
+
+    def number_assign(self, step: ir_types.IRAssign, table: ValueTable) -> tuple[int, str | int | None]:
+        """
+            Gives the value number of an assignment, plus an earlier holder or constant to copy from when its expression is redundant.
+        """
+        size = ir_gen.get_local_size(self.func_info, step.dest)
+        vn0 = self.get_vn(table, step.arg0)
+        vn1 = self.get_vn(table, step.arg1) if step.arg1 is not None else None
+        const0 = self.vn_consts.get(vn0)
+        const1 = self.vn_consts.get(vn1) if vn1 is not None else 0
+
+        if const0 is not None and const1 is not None:
+            folded = ir_types.fold_ir_op(step.op, const0, const1)
+
+            if folded is not None:
+                folded = ir_types.wrap_int(folded, size)
+                replacement = folded if step.op != ir_types.IROp.NOP or step.arg0 != folded else None
+
+                return (self.get_vn(table, folded), replacement)
+
+        if step.op == ir_types.IROp.NOP and type(step.arg0) == str and size == ir_gen.get_local_size(self.func_info, step.arg0):
+            return (vn0, None)
+
+        key = self.make_key(step.op, vn0, vn1, size)
+
+        if key not in table.exprs:
+            table.exprs[key] = self.new_vn()
+            return (table.exprs[key], None)
+
+        vn = table.exprs[key]
+        holder = self.find_holder_or_const(table, vn)
+
+        return (vn, holder if holder != step.dest else None)
+
+    def find_holder_or_const(self, table: ValueTable, vn: int) -> str | int | None:
+        if vn in self.vn_consts:
+            return self.vn_consts[vn]
+
+        return table.find_holder(vn)
@@ -0,0 +1,256 @@
+"""
+    ir_passes.py\n
+    By DrkWithT\n
+    Runs a pipeline of IR passes over a program's CFGs between IREmitter and GASEmitter, with `-O0` / `-O1` / `-O2` presets, optional IR verification after each pass, and timing, step count, and memory stats per pass.
+"""
+
+import dataclasses
+import time
+import tracemalloc
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_ssa import SCCPPass, get_leading_phis
+from DerkCC.DCCStages.ir_copyprop import CopyPropagationPass
+from DerkCC.DCCStages.ir_lvn import ValueNumberingPass
+from DerkCC.DCCStages.ir_dce import DeadCodePass
+from DerkCC.DCCStages.ir_jumps import JumpThreadingPass
+from DerkCC.DCCStages.ir_compact import AddressCompactionPass
+from DerkCC.DCCStages.ir_inline import InlinePass
+from DerkCC.DCCStages.ir_tailcall import TailCallPass
+from DerkCC.DCCStages.ir_loops import LoopInvariantCodeMotionPass
+from DerkCC.DCCStages.ir_strength import StrengthReductionPass
+from DerkCC.DCCStages.ir_ranges import ValueRangePass
+from DerkCC.DCCStages.ir_consteval import ConstCallPass
+from DerkCC.DCCStages.ir_callgraph import DeadFunctionPass
+from DerkCC.DCCStages.ir_specialize import SpecializePass
+from DerkCC.DCCStages.ir_switch import SwitchLoweringPass
+from DerkCC.DCCStages.ir_simplify import AlgebraicSimplifyPass
+from DerkCC.DCCStages.ir_reassoc import ReassociatePass
+
+## Constants ##
+
+# NOTE passes keep stats per run, so presets list pass classes and each pipeline makes fresh instances.
+OPT_LEVEL_PASSES = {
+    '-O0': [],
+    '-O1': [
+        DeadFunctionPass,
+        SCCPPass,
+        AlgebraicSimplifyPass,
+        CopyPropagationPass,
+        ValueNumberingPass,
+        DeadCodePass,
+        JumpThreadingPass,
+        DeadCodePass,
+        AddressCompactionPass
+    ],
+    '-O2': [
+        ConstCallPass,
+        SpecializePass,
+        TailCallPass,
+        InlinePass,
+        DeadFunctionPass,
+        SCCPPass,
+        AlgebraicSimplifyPass,
+        ValueRangePass,
+        CopyPropagationPass,
+        ValueNumberingPass,
+        ReassociatePass,
+        LoopInvariantCodeMotionPass,
+        StrengthReductionPass,
+        CopyPropagationPass,
+        DeadCodePass,
+        JumpThreadingPass,
+        SwitchLoweringPass,
+        DeadCodePass,
+        AddressCompactionPass
+    ]
+}
+
+## Aliases and Types ##
+
+@dataclasses.dataclass
+class PassStats:
+    """
+        Records one run of a pass over one function, or over the whole program when `func_name` is `None`. `peak_bytes` is only measured when the PassManager tracks memory.
+    """
+    pass_name: str
+    func_name: str | None
+    changes: int
+    seconds: float
+    steps_before: int
+    steps_after: int
+    peak_bytes: int | None
+
+    def get_step_delta(self) -> int:
+        return self.steps_after - self.steps_before
+
+## Utility functions ##
+
+def get_pipeline(opt_level: str) -> list:
+    if opt_level not in OPT_LEVEL_PASSES:
+        raise RuntimeError(f'ir_passes.py [Error]: Unknown optimization level {opt_level}!\n')
+
+    return [pass_type() for pass_type in OPT_LEVEL_PASSES[opt_level]]
+
+def is_program_pass(opt_pass) -> bool:
+    return hasattr(opt_pass, 'run_program')
+
+def verify_cfg(cfg: ir_cfg.ControlFlowGraph, funcs: ir_gen.FuncInfoTable) -> list[str]:
+    """
+        Gives a message per broken invariant of a function's CFG: labels, terminator placement, edges, phi placement, calls, returns, and addresses read without any definition.\n
+        NOTE Reads in unreachable blocks aren't checked, as a pass may strand a block, like the return block after TailCallPass, for DeadCodePass to drop.
+    """
+    results = []
+    labels = [block.label for block in cfg.blocks if block.label is not None]
+    defined = set()
+    used = set()
+    return_kinds = set()
+
+    if not cfg.blocks or cfg.blocks[0].label != cfg.func_name:
+        results.append(f'entry block is not labeled {cfg.func_name}')
+
+    if len(labels) != len(set(labels)):
+        results.append('duplicate block labels')
+
+    for block_id, block in enumerate(cfg.blocks):
+        phi_count = len(get_leading_phis(block))
+
+        for step_i, step in enumerate(block.steps):
+            step_type = step.get_ir_type()
+
+            if step_type == ir_types.IRType.LABEL:
+                results.append(f'block #{block_id} holds a label step')
+            elif step_type in ir_cfg.TERMINATOR_TYPES and step_i != len(block.steps) - 1:
+                results.append(f'block #{block_id} has a terminator before its end')
+            elif step_type == ir_types.IRType.PHI and step_i >= phi_count:
+                results.append(f'block #{block_id} has a phi after other steps')
+            elif step_type in (ir_types.IRType.FUNC_CALL, ir_types.IRType.TAIL_CALL) and step.callee not in funcs:
+                results.append(f'block #{block_id} calls unknown function {step.callee}')
+            elif step_type == ir_types.IRType.RETURN:
+                return_kinds.add(step.result_addr is None)
+
+            for target in step.get_jump_targets():
+                if target not in labels:
+                    results.append(f'block #{block_id} jumps to missing label {target}')
+
+            def_addr = step.get_def_addr()
+
+            if def_addr is not None:
+                defined.add(def_addr)
+
+            if cfg.is_reachable(block_id):
+                used.update(step.get_use_addrs())
+
+        for succ_id in block.succs:
+            if block_id not in cfg.blocks[succ_id].preds:
+                results.append(f'edge #{block_id} -> #{succ_id} is missing its pred')
+
+        if block.falls_through() and block_id == len(cfg.blocks) - 1 and cfg.is_reachable(block_id):
+            results.append('control falls off the last block')
+
+    if len(return_kinds) > 1:
+        results.append('returns both with and without a result')
+
+    for addr in sorted(used - defined):
+        results.append(f'{addr} is read but never defined')
+
+    return results
+
+## Pass Manager ##
+
+class PassManager:
+    """
+        Runs each pass of a pipeline in order: a function pass's `run` on every CFG, or a program pass's `run_program` once. Every run is timed and its step counts and changes are kept in `stats`.\n
+        NOTE Memory tracking uses tracemalloc, which slows every allocation, so it's off unless asked for. With `verify` on, the IR is checked before the first pass and after each pass so a broken invariant names the pass that made it.
+    """
+    def __init__(self, passes: list, verify: bool = False, track_memory: bool = False):
+        self.passes = passes
+        self.verify = verify
+        self.track_memory = track_memory
+        self.stats: list[PassStats] = []
+
+    def run(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable) -> int:
+        change_count = 0
+
+        if self.verify:
+            self.verify_program(cfgs, funcs, 'IREmitter')
+
+        if self.track_memory:
+            tracemalloc.start()
+
+        try:
+            for opt_pass in self.passes:
+                if is_program_pass(opt_pass):
+                    change_count += self.run_timed(opt_pass, None, cfgs, lambda: opt_pass.run_program(cfgs, funcs))
+                else:
+                    for cfg in cfgs:
+                        change_count += self.run_timed(opt_pass, cfg.func_name, [cfg], lambda: opt_pass.run(cfg, funcs[cfg.func_name]))
+
+                if self.verify:
+                    self.verify_program(cfgs, funcs, opt_pass.name)
+        finally:
+            if self.track_memory:
+                tracemalloc.stop()
+
+        return change_count
+
+    def run_timed(self, opt_pass, func_name: str | None, cfgs: list[ir_cfg.ControlFlowGraph], run_pass) -> int:
+        steps_before = sum(cfg.get_step_count() for cfg in cfgs)
+        peak_bytes = None
+
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            base_bytes = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        changes = run_pass()
+        seconds = time.perf_counter() - start
+
+        if self.track_memory:
+            peak_bytes = tracemalloc.get_traced_memory()[1] - base_bytes
+
+        self.stats.append(PassStats(opt_pass.name, func_name, changes, seconds, steps_before, sum(cfg.get_step_count() for cfg in cfgs), peak_bytes))
+
+        return changes
+
+    def verify_program(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable, stage_name: str):
+        for cfg in cfgs:
+            problems = verify_cfg(cfg, funcs)
+
+            if problems:
+                details = '\n'.join(f'  {problem}' for problem in problems)
+                raise RuntimeError(f'ir_passes.py [Error]: Invalid IR in {cfg.func_name} after {stage_name}!\n{details}\n')
+
+    def get_report(self) -> list[str]:
+        """
+            Gives a table summing the stats of each pass over all its runs.
+        """
+        totals: dict[str, list] = {}
+
+        for stats in self.stats:
+            total = totals.setdefault(stats.pass_name, [0, 0, 0.0, 0, None])
+            total[0] += 1
+            total[1] += stats.changes
+            total[2] += stats.seconds
+            total[3] += stats.get_step_delta()
+
+            if stats.peak_bytes is not None:
+                total[4] = max(total[4] or 0, stats.peak_bytes)
+
+        results = [f'{"pass":<14}{"runs":>6}{"changes":>9}{"ms":>10}{"steps":>8}{"peak KiB":>10}']
+
+        for pass_name, (runs, changes, seconds, step_delta, peak_bytes) in totals.items():
+            peak_text = '-' if peak_bytes is None else f'{peak_bytes / 1024:.1f}'
+            results.append(f'{pass_name:<14}{runs:>6}{changes:>9}{seconds * 1000:>10.3f}{step_delta:>+8}{peak_text:>10}')
+
+        return results
+
+def optimize_program(steps: ir_types.StepList, funcs: ir_gen.FuncInfoTable, opt_level: str = '-O1', verify: bool = False) -> ir_types.StepList:
+    """
+        Runs a preset pipeline over the flat IR from `IREmitter.gen_ir_from_ast`, giving flat IR for GASEmitter.
+    """
+    cfgs = ir_cfg.build_program_cfgs(steps, funcs)
+    PassManager(get_pipeline(opt_level), verify).run(cfgs, funcs)
+
+    return ir_cfg.flatten_cfgs(cfgs)
@@ -0,0 +1,368 @@
+"""
+    ir_ranges.py\n
+    By DrkWithT\n
+    Value range analysis over the IR CFG: finds an interval for each address at every point from constants, `char` widths, and the branches taken to get there. Conditional jumps whose outcome is decided get folded, and arithmetic that can't wrap gets marked.\n
+    Sources:
+    [Abstract Interpretation: A Unified Lattice Model for Static Analysis of Programs](https://www.di.ens.fr/~cousot/COUSOTpapers/publications.www/CousotCousot-POPL-77-ACM-p238--252-1977.pdf)
+"""
+
+import heapq
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_dce import remove_unreachable_blocks
+
+## Constants ##
+
+# NOTE a block's entry ranges widen to their type bounds after this many changes, so loops reach a fixed point quickly.
+WIDEN_AFTER = 3
+
+# NOTE rounds of plain re-evaluation after widening, which win back bounds like `i < n` that widening jumped past.
+NARROW_ROUNDS = 2
+
+# NOTE exact results before truncation, except that division gives `None` where it traps.
+CORNER_OP_FUNCS = {
+    ir_types.IROp.MULTIPLY: lambda arg0, arg1: arg0 * arg1,
+    ir_types.IROp.MULTIPLY_HIGH: lambda arg0, arg1: (arg0 * arg1) >> 32,
+    ir_types.IROp.DIVIDE: lambda arg0, arg1: ir_types.fold_ir_op(ir_types.IROp.DIVIDE, arg0, arg1)
+}
+
+NO_WRAP_OPS = (ir_types.IROp.ADD, ir_types.IROp.SUBTRACT, ir_types.IROp.MULTIPLY, ir_types.IROp.NEGATE, ir_types.IROp.SHIFT_LEFT)
+
+## Aliases and Types ##
+
+# NOTE models an inclusive interval [low, high].
+ValueRange = tuple[int, int]
+
+# NOTE an address missing from a map may hold any value of its type, and a map of `None` means no path reaches that point.
+RangeMap = dict[str, ValueRange]
+
+## Utility functions ##
+
+def get_type_range(size: int) -> ValueRange:
+    bits = size * 8
+
+    return (-(1 << (bits - 1)), (1 << (bits - 1)) - 1)
+
+def join_range_maps(lhs: RangeMap | None, rhs: RangeMap | None) -> RangeMap | None:
+    if lhs is None:
+        return rhs
+
+    if rhs is None:
+        return lhs
+
+    return {addr: (min(lhs[addr][0], rhs[addr][0]), max(lhs[addr][1], rhs[addr][1])) for addr in lhs.keys() & rhs.keys()}
+
+def get_corners(op: ir_types.IROp, lhs: ValueRange, rhs: ValueRange) -> ValueRange | None:
+    """
+        Gives the hull of an operation over the corners of its operand ranges, which bounds it when the operation is monotonic in each operand.
+    """
+    results = [CORNER_OP_FUNCS[op](arg0, arg1) for arg0 in lhs for arg1 in rhs]
+
+    if None in results:
+        return None
+
+    return (min(results), max(results))
+
+def eval_op_range(op: ir_types.IROp, lhs: ValueRange, rhs: ValueRange | None) -> ValueRange | None:
+    """
+        Gives the exact range of an operation's result before truncation, or `None` when nothing useful is known.
+    """
+    match op:
+        case ir_types.IROp.NOP:
+            return lhs
+        case ir_types.IROp.NEGATE:
+            return (-lhs[1], -lhs[0])
+        case ir_types.IROp.ADD:
+            return (lhs[0] + rhs[0], lhs[1] + rhs[1])
+        case ir_types.IROp.SUBTRACT:
+            return (lhs[0] - rhs[1], lhs[1] - rhs[0])
+        case ir_types.IROp.MULTIPLY | ir_types.IROp.MULTIPLY_HIGH:
+            return get_corners(op, lhs, rhs)
+        case ir_types.IROp.DIVIDE:
+            # NOTE truncating division is monotonic in each operand while the divisor keeps one sign.
+            return get_corners(op, lhs, rhs) if rhs[0] > 0 or rhs[1] < 0 else None
+
+    if op in ir_types.IR_OP_INVERSES:
+        outcome = compare_ranges(op, lhs, rhs)
+        return (0, 1) if outcome is None else (int(outcome), int(outcome))
+
+    if rhs[0] != rhs[1] or not 0 <= rhs[0] < 32:
+        return None
+
+    shift = rhs[0]
+
+    match op:
+        case ir_types.IROp.SHIFT_LEFT:
+            return (lhs[0] << shift, lhs[1] << shift)
+        case ir_types.IROp.SHIFT_RIGHT:
+            return (lhs[0] >> shift, lhs[1] >> shift)
+        case ir_types.IROp.SHIFT_RIGHT_LOGICAL:
+            if lhs[0] >= 0:
+                return (lhs[0] >> shift, lhs[1] >> shift)
+
+            return (0, 0xFFFFFFFF >> shift) if shift > 0 else None
+
+    return None
+
+def compare_ranges(op: ir_types.IROp, lhs: ValueRange, rhs: ValueRange) -> bool | None:
+    """
+        Gives the outcome of a comparison between any values of two ranges, or `None` if it can go either way.
+    """
+    match op:
+        case ir_types.IROp.COMPARE_LT:
+            return True if lhs[1] < rhs[0] else False if lhs[0] >= rhs[1] else None
+        case ir_types.IROp.COMPARE_LTE:
+            return True if lhs[1] <= rhs[0] else False if lhs[0] > rhs[1] else None
+        case ir_types.IROp.COMPARE_GT | ir_types.IROp.COMPARE_GTE:
+            return compare_ranges(ir_types.SWAPPED_COMPARES[op], rhs, lhs)
+        case ir_types.IROp.COMPARE_EQ:
+            if lhs[0] == lhs[1] == rhs[0] == rhs[1]:
+                return True
+
+            return False if lhs[1] < rhs[0] or rhs[1] < lhs[0] else None
+        case ir_types.IROp.COMPARE_NEQ:
+            outcome = compare_ranges(ir_types.IROp.COMPARE_EQ, lhs, rhs)
+            return None if outcome is None else not outcome
+
+    return None
+
+def refine_ranges(op: ir_types.IROp, lhs: ValueRange, rhs: ValueRange) -> tuple[ValueRange, ValueRange] | None:
+    """
+        Narrows two operand ranges to the values where the comparison holds, giving `None` if it never does.
+    """
+    match op:
+        case ir_types.IROp.COMPARE_LT:
+            lhs, rhs = (lhs[0], min(lhs[1], rhs[1] - 1)), (max(rhs[0], lhs[0] + 1), rhs[1])
+        case ir_types.IROp.COMPARE_LTE:
+            lhs, rhs = (lhs[0], min(lhs[1], rhs[1])), (max(rhs[0], lhs[0]), rhs[1])
+        case ir_types.IROp.COMPARE_GT | ir_types.IROp.COMPARE_GTE:
+            refined = refine_ranges(ir_types.SWAPPED_COMPARES[op], rhs, lhs)
+            return None if refined is None else (refined[1], refined[0])
+        case ir_types.IROp.COMPARE_EQ:
+            lhs = rhs = (max(lhs[0], rhs[0]), min(lhs[1], rhs[1]))
+        case ir_types.IROp.COMPARE_NEQ:
+            # NOTE only an endpoint equal to a single known value can be cut off.
+            if rhs[0] == rhs[1]:
+                lhs = (lhs[0] + (lhs[0] == rhs[0]), lhs[1] - (lhs[1] == rhs[0]))
+
+            if lhs[0] == lhs[1]:
+                rhs = (rhs[0] + (rhs[0] == lhs[0]), rhs[1] - (rhs[1] == lhs[0]))
+
+    if lhs[0] > lhs[1] or rhs[0] > rhs[1]:
+        return None
+
+    return (lhs, rhs)
+
+## Value Range Pass ##
+
+class ValueRangePass:
+    """
+        Solves ranges forward over the CFG, narrowing them along each edge of a conditional jump by its condition, then folds every IRJumpIf whose outcome is the same for all values reaching it. An IRAssign whose exact result always fits its destination gets `no_wrap` set.\n
+        NOTE Entry ranges join by their hull and are widened to their type bounds after `WIDEN_AFTER` changes, then narrowed for `NARROW_ROUNDS` rounds. Params and call results start at their type's full range, so a `char` is always within [-128, 127].
+    """
+    name = 'ranges'
+
+    def __init__(self):
+        self.sizes: dict[str, int] = {}
+        self.func_info: ir_gen.FuncInfo = None
+        self.folded_counts: dict[str, int] = {}
+        self.no_wrap_counts: dict[str, int] = {}
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        self.sizes = {}
+        self.func_info = func_info
+        entry_maps = self.solve(cfg)
+        fold_count = 0
+        no_wrap_count = 0
+
+        for block_id, block in enumerate(cfg.blocks):
+            ranges = entry_maps[block_id]
+
+            if ranges is None:
+                continue
+
+            ranges = dict(ranges)
+
+            for step in block.steps:
+                if step.get_ir_type() == ir_types.IRType.ADDR_ASSIGN and step.op in NO_WRAP_OPS and not step.no_wrap and self.eval_assign(step, ranges) is not None:
+                    step.no_wrap = True
+                    no_wrap_count += 1
+
+                if step.get_ir_type() == ir_types.IRType.JUMP_IF:
+                    outcome = compare_ranges(step.op, self.get_range(step.arg0, ranges), self.get_range(step.arg1, ranges))
+
+                    if outcome is True:
+                        block.steps[-1] = ir_types.IRJump(step.target)
+                    elif outcome is False:
+                        block.steps.pop()
+
+                    fold_count += outcome is not None
+                    break
+
+                self.transfer_step(step, ranges)
+
+        if fold_count > 0:
+            cfg.recompute_edges()
+            remove_unreachable_blocks(cfg)
+
+        self.folded_counts[cfg.func_name] = fold_count
+        self.no_wrap_counts[cfg.func_name] = no_wrap_count
+
+        return fold_count + no_wrap_count
+
+    def get_size(self, addr: str) -> int:
+        if addr not in self.sizes:
+            self.sizes[addr] = ir_gen.get_local_size(self.func_info, addr)
+
+        return self.sizes[addr]
+
+    def get_type_range(self, addr: str) -> ValueRange:
+        return get_type_range(self.get_size(addr))
+
+    def get_range(self, item: str | int, ranges: RangeMap) -> ValueRange:
+        if type(item) == int:
+            return (item, item)
+
+        return ranges.get(item) or self.get_type_range(item)
+
+    def set_range(self, addr: str, value: ValueRange | None, ranges: RangeMap):
+        """
+            Records an address's new range, forgetting it when it's unknown or covers the whole type.
+        """
+        type_range = self.get_type_range(addr)
+
+        if value is None or value[0] <= type_range[0] and value[1] >= type_range[1]:
+            ranges.pop(addr, None)
+        else:
+            ranges[addr] = value
+
+    def eval_assign(self, step: ir_types.IRAssign, ranges: RangeMap) -> ValueRange | None:
+        """
+            Gives an assignment's result range when it fits the destination without truncating, otherwise `None`.
+        """
+        result = eval_op_range(step.op, self.get_range(step.arg0, ranges), None if step.arg1 is None else self.get_range(step.arg1, ranges))
+        type_range = self.get_type_range(step.dest)
+
+        if result is None or result[0] < type_range[0] or result[1] > type_range[1]:
+            return None
+
+        return result
+
+    def transfer_step(self, step: ir_types.IRStep, ranges: RangeMap):
+        def_addr = step.get_def_addr()
+
+        if def_addr is None:
+            return
+
+        match step.get_ir_type():
+            case ir_types.IRType.ADDR_ASSIGN:
+                self.set_range(def_addr, self.eval_assign(step, ranges), ranges)
+            case ir_types.IRType.LOAD_CONSTANT:
+                value = ir_types.wrap_int(step.value, self.get_size(def_addr))
+                self.set_range(def_addr, (value, value), ranges)
+            case _:
+                self.set_range(def_addr, None, ranges)
+
+    def narrow_edge(self, step: ir_types.IRJumpIf, op: ir_types.IROp, ranges: RangeMap) -> RangeMap | None:
+        refined = refine_ranges(op, self.get_range(step.arg0, ranges), self.get_range(step.arg1, ranges))
+
+        if refined is None:
+            return None
+
+        results = dict(ranges)
+
+        for item, value in zip((step.arg0, step.arg1), refined):
+            if type(item) == str:
+                old_value = self.get_range(item, results)
+                self.set_range(item, (max(old_value[0], value[0]), min(old_value[1], value[1])), results)
+
+        return results
+
+    def get_out_edges(self, cfg: ir_cfg.ControlFlowGraph, block_id: int, ranges: RangeMap) -> list[tuple[int, RangeMap | None]]:
+        ranges = dict(ranges)
+        terminator = cfg.blocks[block_id].get_terminator()
+
+        for step in cfg.blocks[block_id].steps:
+            if step is not terminator:
+                self.transfer_step(step, ranges)
+
+        if terminator is None:
+            return [(block_id + 1, ranges)] if block_id + 1 < len(cfg.blocks) else []
+
+        match terminator.get_ir_type():
+            case ir_types.IRType.JUMP:
+                return [(cfg.get_block_id(terminator.target), ranges)]
+            case ir_types.IRType.JUMP_IF:
+                return [
+                    (cfg.get_block_id(terminator.target), self.narrow_edge(terminator, terminator.op, ranges)),
+                    (block_id + 1, self.narrow_edge(terminator, ir_types.IR_OP_INVERSES[terminator.op], ranges))
+                ]
+            case ir_types.IRType.JUMP_TABLE:
+                # NOTE a table's edges are not narrowed, so each target gets the ranges its arg had before the jump.
+                return [(cfg.get_block_id(target), ranges) for target in terminator.get_jump_targets()]
+
+        return []
+
+    def solve(self, cfg: ir_cfg.ControlFlowGraph) -> list[RangeMap | None]:
+        """
+            Gives each block's entry ranges, visiting blocks in reverse postorder until none change.
+        """
+        order = {block_id: order_i for order_i, block_id in enumerate(cfg.get_reverse_postorder())}
+        results: list[RangeMap | None] = [None for _ in cfg.blocks]
+        change_counts = [0 for _ in cfg.blocks]
+        results[0] = {}
+        pending = [(0, 0)]
+        queued = {0}
+
+        while pending:
+            _, block_id = heapq.heappop(pending)
+            queued.discard(block_id)
+
+            for succ_id, edge_ranges in self.get_out_edges(cfg, block_id, results[block_id]):
+                old_ranges = results[succ_id]
+                new_ranges = join_range_maps(old_ranges, edge_ranges)
+
+                if new_ranges is None or new_ranges == old_ranges:
+                    continue
+
+                if old_ranges is not None and change_counts[succ_id] >= WIDEN_AFTER:
+                    new_ranges = self.widen(old_ranges, new_ranges)
+
+                results[succ_id] = new_ranges
+                change_counts[succ_id] += 1
+
+                if succ_id not in queued:
+                    queued.add(succ_id)
+                    heapq.heappush(pending, (order.get(succ_id, len(order)), succ_id))
+
+        for _ in range(NARROW_ROUNDS):
+            results = self.narrow(cfg, results)
+
+        return results
+
+    def narrow(self, cfg: ir_cfg.ControlFlowGraph, entry_maps: list[RangeMap | None]) -> list[RangeMap | None]:
+        """
+            Recomputes every entry from its incoming edges without widening. Starting from a fixed point, this only shrinks ranges and stays sound.
+        """
+        results: list[RangeMap | None] = [None for _ in cfg.blocks]
+        results[0] = {}
+
+        for block_id, ranges in enumerate(entry_maps):
+            if ranges is None:
+                continue
+
+            for succ_id, edge_ranges in self.get_out_edges(cfg, block_id, ranges):
+                results[succ_id] = join_range_maps(results[succ_id], edge_ranges)
+
+        return results
+
+    def widen(self, old_ranges: RangeMap, new_ranges: RangeMap) -> RangeMap:
+        results = {}
+
+        for addr, (low, high) in new_ranges.items():
+            type_low, type_high = self.get_type_range(addr)
+            old_low, old_high = old_ranges[addr]
+            self.set_range(addr, (low if low >= old_low else type_low, high if high <= old_high else type_high), results)
+
+        return results
@@ -0,0 +1,225 @@
+"""
+    ir_reassoc.py\n
+    By DrkWithT\n
+    Tree-height reduction for chains of integer adds or multiplies. Parser.parse_term gives left-leaning trees, so `a + b + c + d` waits on three adds in a row. Rebuilding a chain as a balanced tree lets an out-of-order core run its adds side by side. Constants in a chain are also folded into one.\n
+    Sources:
+    [Tree height reduction (Baer and Bovet)](https://dl.acm.org/doi/10.1145/321439.321444)
+"""
+
+import heapq
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+
+## Constants ##
+
+REASSOC_OPS = (ir_types.IROp.ADD, ir_types.IROp.MULTIPLY)
+
+# NOTE the result of combining no operands.
+OP_IDENTITIES = {
+    ir_types.IROp.ADD: 0,
+    ir_types.IROp.MULTIPLY: 1
+}
+
+# NOTE rough cycles per op on a recent x86-64 core. Other ops take 1, and copies take 0 as register renaming hides them.
+OP_LATENCIES = {
+    ir_types.IROp.NOP: 0,
+    ir_types.IROp.MULTIPLY: 3,
+    ir_types.IROp.MULTIPLY_HIGH: 3,
+    ir_types.IROp.DIVIDE: 26
+}
+
+## Aliases and Types ##
+
+# NOTE one operand of a chain with the cycle its value is ready at.
+ChainLeaf = tuple[int, str | int]
+
+## Utility functions ##
+
+def get_op_latency(op: ir_types.IROp) -> int:
+    return OP_LATENCIES.get(op, 1)
+
+def get_critical_path(steps: ir_types.StepList) -> int:
+    """
+        Gives the cycles a straight-line run of steps needs when each IRAssign starts as soon as its operands are ready, a simple model of an out-of-order core with enough ALUs.
+    """
+    ready_times: dict[str, int] = {}
+    result = 0
+
+    for step in steps:
+        def_addr = step.get_def_addr()
+
+        if def_addr is None:
+            continue
+
+        start = max([ready_times.get(addr, 0) for addr in step.get_use_addrs()], default=0)
+        ready_times[def_addr] = start + (get_op_latency(step.op) if step.get_ir_type() == ir_types.IRType.ADDR_ASSIGN else 0)
+        result = max(result, ready_times[def_addr])
+
+    return result
+
+def count_addr_refs(cfg: ir_cfg.ControlFlowGraph) -> tuple[dict[str, int], dict[str, int]]:
+    use_counts: dict[str, int] = {}
+    def_counts: dict[str, int] = {}
+
+    for block in cfg.blocks:
+        for step in block.steps:
+            for addr in step.get_use_addrs():
+                use_counts[addr] = use_counts.get(addr, 0) + 1
+
+            def_addr = step.get_def_addr()
+
+            if def_addr is not None:
+                def_counts[def_addr] = def_counts.get(def_addr, 0) + 1
+
+    return (use_counts, def_counts)
+
+## Reassociation Pass ##
+
+class ReassociatePass:
+    """
+        Walks each block from its end, taking every add or multiply not yet taken as the root of a chain. An operand joins the chain when it's a 4-byte temporary written once by the same op earlier in the block and read only by its parent, and that op's own operands keep their values up to the root.\n
+        NOTE The new tree combines the two earliest ready operands first, so a late operand like a product is added last. It reuses the chain's temporaries and sits where the root was. 32-bit adds and multiplies wrap modulo 2^32 in any order, so the result is the same, but `no_wrap` can't carry over to the new partial sums.
+    """
+    name = 'reassoc'
+
+    def __init__(self):
+        self.rebuilt_counts: dict[str, int] = {}
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        use_counts, def_counts = count_addr_refs(cfg)
+        rebuilt_count = 0
+
+        for block in cfg.blocks:
+            rebuilt_count += self.reassociate_block(block, func_info, use_counts, def_counts)
+
+        self.rebuilt_counts[cfg.func_name] = rebuilt_count
+
+        return rebuilt_count
+
+    def reassociate_block(self, block: ir_cfg.BasicBlock, func_info: ir_gen.FuncInfo, use_counts: dict[str, int], def_counts: dict[str, int]) -> int:
+        def_ids: dict[str, list[int]] = {}
+        ready_times: list[int] = []
+        addr_ready: dict[str, int] = {}
+
+        for step_i, step in enumerate(block.steps):
+            def_addr = step.get_def_addr()
+            start = max([addr_ready.get(addr, 0) for addr in step.get_use_addrs()], default=0)
+            ready_times.append(start + (get_op_latency(step.op) if step.get_ir_type() == ir_types.IRType.ADDR_ASSIGN else 0))
+
+            if def_addr is not None:
+                def_ids.setdefault(def_addr, []).append(step_i)
+                addr_ready[def_addr] = ready_times[step_i]
+
+        taken_ids = set()
+        rewrites: dict[int, ir_types.StepList] = {}
+
+        for root_i in reversed(range(len(block.steps))):
+            root = block.steps[root_i]
+
+            if root_i in taken_ids or root.get_ir_type() != ir_types.IRType.ADDR_ASSIGN or root.op not in REASSOC_OPS:
+                continue
+
+            chain_ids = []
+            leaves = []
+            old_ready = self.collect_chain(block, root_i, root_i, func_info, use_counts, def_counts, def_ids, ready_times, chain_ids, leaves)
+            taken_ids.update(chain_ids)
+            new_steps = self.rebuild_chain(root, [block.steps[chain_i].dest for chain_i in sorted(chain_ids)], leaves)
+
+            # NOTE a chain is only rebuilt when its result is ready sooner or it drops an op.
+            if new_steps[-1][0] < old_ready or len(new_steps) < len(chain_ids) + 1:
+                rewrites[root_i] = [step for _, step in new_steps]
+
+                for chain_i in chain_ids:
+                    rewrites[chain_i] = []
+
+        if not rewrites:
+            return 0
+
+        block.steps = [new_step for step_i, step in enumerate(block.steps) for new_step in rewrites.get(step_i, [step])]
+
+        return len([step_i for step_i, new_steps in rewrites.items() if new_steps])
+
+    def is_chain_temp(self, block: ir_cfg.BasicBlock, item: str | int, op: ir_types.IROp, user_i: int, root_i: int, func_info: ir_gen.FuncInfo, use_counts: dict[str, int], def_counts: dict[str, int], def_ids: dict[str, list[int]]) -> int | None:
+        """
+            Gives the step index of an operand's defining step if it can join the chain, else `None`.
+        """
+        if type(item) != str or use_counts.get(item) != 1 or def_counts.get(item) != 1 or item not in def_ids:
+            return None
+
+        def_i = def_ids[item][0]
+        def_step = block.steps[def_i]
+
+        if def_i >= user_i or def_step.get_ir_type() != ir_types.IRType.ADDR_ASSIGN or def_step.op != op or ir_gen.get_local_size(func_info, item) != 4:
+            return None
+
+        # NOTE the tree is computed at the root, so each operand must still hold the value it had here.
+        for addr in def_step.get_use_addrs():
+            if any(def_i < other_i < root_i for other_i in def_ids.get(addr, [])):
+                return None
+
+        return def_i
+
+    def collect_chain(self, block: ir_cfg.BasicBlock, step_i: int, root_i: int, func_info: ir_gen.FuncInfo, use_counts: dict[str, int], def_counts: dict[str, int], def_ids: dict[str, list[int]], ready_times: list[int], chain_ids: list[int], leaves: list[ChainLeaf]) -> int:
+        """
+            Gathers the chain below a step into `chain_ids` and `leaves`, giving the cycle its current tree is ready at.
+        """
+        step = block.steps[step_i]
+        operand_ready = []
+
+        for item in (step.arg0, step.arg1):
+            def_i = self.is_chain_temp(block, item, step.op, step_i, root_i, func_info, use_counts, def_counts, def_ids)
+
+            if def_i is None:
+                earlier_ids = [other_i for other_i in def_ids.get(item, []) if other_i < step_i] if type(item) == str else []
+                ready = ready_times[earlier_ids[-1]] if earlier_ids else 0
+                leaves.append((ready, item))
+                operand_ready.append(ready)
+            else:
+                chain_ids.append(def_i)
+                operand_ready.append(self.collect_chain(block, def_i, root_i, func_info, use_counts, def_counts, def_ids, ready_times, chain_ids, leaves))
+
+        return max(operand_ready) + get_op_latency(step.op)
+
+    def rebuild_chain(self, root: ir_types.IRAssign, temps: list[str], leaves: list[ChainLeaf]) -> list[tuple[int, ir_types.IRAssign]]:
+        """
+            Gives the new steps with the cycle each one's result is ready at, folding the chain's constants into one operand. Only the last step writes the root's destination.
+        """
+        op = root.op
+        latency = get_op_latency(op)
+        const_value = OP_IDENTITIES[op]
+
+        for _, item in leaves:
+            if type(item) == int:
+                const_value = ir_types.fold_ir_op(op, const_value, item)
+
+        pending = [(ready, order, item) for order, (ready, item) in enumerate(leaves) if type(item) == str]
+
+        if const_value != OP_IDENTITIES[op]:
+            pending.append((0, len(leaves), const_value))
+
+        if op == ir_types.IROp.MULTIPLY and const_value == 0 or not pending:
+            return [(0, ir_types.IRAssign(root.dest, ir_types.IROp.NOP, const_value, None))]
+
+        if len(pending) == 1:
+            return [(pending[0][0], ir_types.IRAssign(root.dest, ir_types.IROp.NOP, pending[0][2], None))]
+
+        heapq.heapify(pending)
+        results = []
+        order = len(leaves) + 1
+
+        while len(pending) > 1:
+            ready0, _, item0 = heapq.heappop(pending)
+            ready1, _, item1 = heapq.heappop(pending)
+            dest = temps[len(results)] if len(pending) > 0 else root.dest
+
+            # NOTE constants stay on the right, where GASEmitter and later passes look for immediates.
+            if type(item0) == int:
+                item0, item1 = item1, item0
+
+            ready = max(ready0, ready1) + latency
+            results.append((ready, ir_types.IRAssign(dest, op, item0, item1)))
+            heapq.heappush(pending, (ready, order, dest))
+            order += 1
+
+        return results
@@ -0,0 +1,503 @@
+"""
+    ir_serial.py\n
+    By DrkWithT\n
+    Saves and loads a program's IR with its FuncInfoTable, as readable text or as compact binary. Loading either form gives back steps and local records equal to the saved ones.\n
+    Sources:
+    [LEB128 encoding](https://en.wikipedia.org/wiki/LEB128)
+"""
+
+import re
+from DerkCC.DCCStages.ir_visitor import IRVisitor
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+from DerkCC.DCCStages.ast_nodes import DataType
+
+## Constants ##
+
+BINARY_MAGIC = b'DIR\x01'
+
+# NOTE tags an operand in the binary form, as operands may be addresses, constants, or missing.
+OPERAND_NONE = 0
+OPERAND_ADDR = 1
+OPERAND_INT = 2
+
+INT_PATTERN = re.compile(r'-?\d+')
+
+# NOTE an address or label must not read as a constant or split into several tokens.
+NAME_PATTERN = re.compile(r'[A-Za-z_.][\w.]*')
+
+## Aliases and Types ##
+
+IRProgram = tuple[ir_types.StepList, ir_gen.FuncInfoTable]
+
+## Utility functions ##
+
+def check_name(name: str) -> str:
+    # NOTE `nowrap` is reserved as the flag ending an assignment line.
+    if type(name) != str or not NAME_PATTERN.fullmatch(name) or name == 'nowrap':
+        raise RuntimeError(f'ir_serial.py [Error]: Cannot save name {name!r}!\n')
+
+    return name
+
+def check_push_arg(step: ir_types.IRPushArg):
+    # NOTE the immediate flag is not saved, as it always follows the arg's kind.
+    if step.immediate != (type(step.arg) == int):
+        raise RuntimeError(f'ir_serial.py [Error]: Immediate flag does not match arg of {step}!\n')
+
+def dump_ir_text(steps: ir_types.StepList, funcs: ir_gen.FuncInfoTable) -> str:
+    return IRTextWriter().write_all(steps, funcs)
+
+def load_ir_text(text: str) -> IRProgram:
+    return IRTextReader(text).read_all()
+
+def dump_ir_binary(steps: ir_types.StepList, funcs: ir_gen.FuncInfoTable) -> bytes:
+    return IRBinaryWriter().write_all(steps, funcs)
+
+def load_ir_binary(data: bytes) -> IRProgram:
+    return IRBinaryReader(data).read_all()
+
+## Text Form ##
+
+class IRTextWriter(IRVisitor):
+    """
+        Writes one line per step in the notation of the IRType comments. The local records come first as `func` headers with indented `local` lines, and the steps follow with each label unindented.
+    """
+    def write_all(self, steps: ir_types.StepList, funcs: ir_gen.FuncInfoTable) -> str:
+        lines = ['; DerkCC IR']
+
+        for func_name, func_info in funcs.items():
+            lines.append(f'func {check_name(func_name)}')
+
+            for datatype, ir_addr, is_param in func_info:
+                lines.append(f'    local {datatype.name} {check_name(ir_addr)}{" param" if is_param else ""}')
+
+        lines.append('')
+
+        for step in steps:
+            line = step.accept_visitor(self)
+            lines.append(line if step.get_ir_type() == ir_types.IRType.LABEL else f'    {line}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_operand(self, item: str | int) -> str:
+        return str(item) if type(item) == int else check_name(item)
+
+    def visit_label(self, step: ir_types.IRStep) -> str:
+        return f'{check_name(step.title)}:'
+
+    def visit_return(self, step: ir_types.IRStep) -> str:
+        return 'Return' if step.result_addr is None else f'Return {self.write_operand(step.result_addr)}'
+
+    def visit_jump(self, step: ir_types.IRStep) -> str:
+        return f'Jump {check_name(step.target)}'
+
+    def visit_jump_if(self, step: ir_types.IRStep) -> str:
+        return f'JumpIf {check_name(step.target)} {step.op.name} {self.write_operand(step.arg0)} {self.write_operand(step.arg1)}'
+
+    def visit_jump_table(self, step: ir_types.IRStep) -> str:
+        targets = [check_name(target) for target in step.targets]
+
+        return f'JumpTable {check_name(step.arg)} {step.low} {check_name(step.default)} {" ".join(targets)}'
+
+    def visit_push_arg(self, step: ir_types.IRStep) -> str:
+        check_push_arg(step)
+
+        return f'PushArg {self.write_operand(step.arg)} {step.arg_type.name}'
+
+    def visit_store_yield(self, step: ir_types.IRStep) -> str:
+        return f'StoreYield {check_name(step.target)}'
+
+    def visit_load_param(self, step: ir_types.IRStep) -> str:
+        return f'LoadParam {check_name(step.target)}'
+
+    def visit_call_func(self, step: ir_types.IRStep) -> str:
+        return f'Call {check_name(step.callee)}'
+
+    def visit_tail_call(self, step: ir_types.IRStep) -> str:
+        return f'TailCall {check_name(step.callee)}'
+
+    def visit_assign(self, step: ir_types.IRStep) -> str:
+        args = [self.write_operand(arg) for arg in (step.arg0, step.arg1) if arg is not None]
+
+        if step.no_wrap:
+            args.append('nowrap')
+
+        return f'{check_name(step.dest)} = {step.op.name} {" ".join(args)}'
+
+    def visit_load_const(self, step: ir_types.IRStep) -> str:
+        return f'{check_name(step.addr)} = ${step.value}'
+
+    def visit_phi(self, step: ir_types.IRStep) -> str:
+        args = [f'{check_name(pred_label)}:{self.write_operand(arg)}' for pred_label, arg in step.args.items()]
+
+        return f'{check_name(step.dest)} = Phi {" ".join(args)}'.rstrip()
+
+class IRTextReader:
+    """
+        Parses the text from IRTextWriter. Blank lines and lines starting with `;` are skipped.
+    """
+    def __init__(self, text: str):
+        self.lines = text.splitlines()
+        self.line_n = 0
+
+    def error(self, message: str) -> RuntimeError:
+        return RuntimeError(f'ir_serial.py [Error]: {message} at IR line {self.line_n}!\n')
+
+    def read_operand(self, token: str) -> str | int:
+        if INT_PATTERN.fullmatch(token):
+            return int(token)
+
+        return self.read_name(token)
+
+    def read_name(self, token: str) -> str:
+        if not NAME_PATTERN.fullmatch(token):
+            raise self.error(f'Invalid name {token!r}')
+
+        return token
+
+    def read_enum(self, enum_type, token: str):
+        if token not in enum_type.__members__:
+            raise self.error(f'Unknown {enum_type.__name__} {token!r}')
+
+        return enum_type[token]
+
+    def read_all(self) -> IRProgram:
+        steps = []
+        funcs = {}
+        func_info = None
+
+        for line in self.lines:
+            self.line_n += 1
+            tokens = line.split()
+
+            if not tokens or tokens[0].startswith(';'):
+                continue
+
+            if tokens[0] == 'func' and len(tokens) == 2:
+                func_info = funcs.setdefault(self.read_name(tokens[1]), [])
+            elif tokens[0] == 'local' and len(tokens) in (3, 4):
+                if func_info is None or steps:
+                    raise self.error('Local record outside of a func header')
+
+                if len(tokens) == 4 and tokens[3] != 'param':
+                    raise self.error(f'Unknown local flag {tokens[3]!r}')
+
+                func_info.append((self.read_enum(DataType, tokens[1]), self.read_name(tokens[2]), len(tokens) == 4))
+            else:
+                steps.append(self.read_step(tokens))
+
+        return (steps, funcs)
+
+    def read_step(self, tokens: list[str]) -> ir_types.IRStep:
+        keyword = tokens[0]
+        argc = len(tokens) - 1
+
+        if argc == 0 and keyword.endswith(':'):
+            return ir_types.IRLabel(self.read_name(keyword[:-1]))
+
+        if argc >= 2 and tokens[1] == '=':
+            return self.read_def_step(self.read_name(keyword), tokens[2:])
+
+        match (keyword, argc):
+            case ('Return', 0):
+                return ir_types.IRReturn(None)
+            case ('Return', 1):
+                return ir_types.IRReturn(self.read_operand(tokens[1]))
+            case ('Jump', 1):
+                return ir_types.IRJump(self.read_name(tokens[1]))
+            case ('JumpIf', 4):
+                return ir_types.IRJumpIf(self.read_name(tokens[1]), self.read_enum(ir_types.IROp, tokens[2]), self.read_operand(tokens[3]), self.read_operand(tokens[4]))
+            case ('JumpTable', _) if argc >= 4 and INT_PATTERN.fullmatch(tokens[2]):
+                return ir_types.IRJumpTable(self.read_name(tokens[1]), int(tokens[2]), [self.read_name(token) for token in tokens[4:]], self.read_name(tokens[3]))
+            case ('PushArg', 2):
+                arg = self.read_operand(tokens[1])
+                return ir_types.IRPushArg(arg, type(arg) == int, self.read_enum(DataType, tokens[2]))
+            case ('StoreYield', 1):
+                return ir_types.IRStoreYield(self.read_name(tokens[1]))
+            case ('LoadParam', 1):
+                return ir_types.IRLoadParam(self.read_name(tokens[1]))
+            case ('Call', 1):
+                return ir_types.IRCallFunc(self.read_name(tokens[1]))
+            case ('TailCall', 1):
+                return ir_types.IRTailCall(self.read_name(tokens[1]))
+
+        raise self.error(f'Invalid step {" ".join(tokens)!r}')
+
+    def read_def_step(self, dest: str, tokens: list[str]) -> ir_types.IRStep:
+        if len(tokens) == 1 and tokens[0].startswith('$') and INT_PATTERN.fullmatch(tokens[0][1:]):
+            return ir_types.IRLoadConst(dest, int(tokens[0][1:]))
+
+        if tokens and tokens[0] == 'Phi':
+            args = {}
+
+            for token in tokens[1:]:
+                pred_label, sep, arg = token.rpartition(':')
+
+                if not sep:
+                    raise self.error(f'Invalid phi arg {token!r}')
+
+                args[self.read_name(pred_label)] = self.read_operand(arg)
+
+            return ir_types.IRPhi(dest, args)
+
+        no_wrap = len(tokens) > 2 and tokens[-1] == 'nowrap'
+
+        if no_wrap:
+            tokens = tokens[:-1]
+
+        if len(tokens) in (2, 3):
+            args = [self.read_operand(token) for token in tokens[1:]]
+            return ir_types.IRAssign(dest, self.read_enum(ir_types.IROp, tokens[0]), args[0], args[1] if len(args) == 2 else None, no_wrap)
+
+        raise self.error(f'Invalid definition of {dest}')
+
+## Binary Form ##
+
+class IRBinaryWriter(IRVisitor):
+    """
+        Writes the magic bytes, a table of every name used, the local records, then each step as its IRType value followed by its fields. Names are indices into the table, and all integers are LEB128 varints, with signed ones zigzag encoded first.
+    """
+    def __init__(self):
+        self.names: dict[str, int] = {}
+        self.body = bytearray()
+
+    def write_all(self, steps: ir_types.StepList, funcs: ir_gen.FuncInfoTable) -> bytes:
+        self.write_uint(len(funcs))
+
+        for func_name, func_info in funcs.items():
+            self.write_name(func_name)
+            self.write_uint(len(func_info))
+
+            for datatype, ir_addr, is_param in func_info:
+                self.write_uint(datatype.value)
+                self.write_name(ir_addr)
+                self.write_uint(int(is_param))
+
+        self.write_uint(len(steps))
+
+        for step in steps:
+            self.write_uint(step.get_ir_type().value)
+            step.accept_visitor(self)
+
+        header = bytearray(BINARY_MAGIC)
+        self.write_uint(len(self.names), header)
+
+        for name in self.names:
+            encoded = name.encode('utf-8')
+            self.write_uint(len(encoded), header)
+            header += encoded
+
+        return bytes(header + self.body)
+
+    def write_uint(self, value: int, out: bytearray | None = None):
+        out = self.body if out is None else out
+
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+
+        out.append(value)
+
+    def write_int(self, value: int):
+        self.write_uint(value * 2 if value >= 0 else -value * 2 - 1)
+
+    def write_name(self, name: str):
+        if type(name) != str:
+            raise RuntimeError(f'ir_serial.py [Error]: Cannot save name {name!r}!\n')
+
+        self.write_uint(self.names.setdefault(name, len(self.names)))
+
+    def write_operand(self, item: str | int | None):
+        if item is None:
+            self.write_uint(OPERAND_NONE)
+        elif type(item) == int:
+            self.write_uint(OPERAND_INT)
+            self.write_int(item)
+        else:
+            self.write_uint(OPERAND_ADDR)
+            self.write_name(item)
+
+    def visit_label(self, step: ir_types.IRStep):
+        self.write_name(step.title)
+
+    def visit_return(self, step: ir_types.IRStep):
+        self.write_operand(step.result_addr)
+
+    def visit_jump(self, step: ir_types.IRStep):
+        self.write_name(step.target)
+
+    def visit_jump_if(self, step: ir_types.IRStep):
+        self.write_name(step.target)
+        self.write_uint(step.op.value)
+        self.write_operand(step.arg0)
+        self.write_operand(step.arg1)
+
+    def visit_jump_table(self, step: ir_types.IRStep):
+        self.write_name(step.arg)
+        self.write_int(step.low)
+        self.write_name(step.default)
+        self.write_uint(len(step.targets))
+
+        for target in step.targets:
+            self.write_name(target)
+
+    def visit_push_arg(self, step: ir_types.IRStep):
+        check_push_arg(step)
+        self.write_operand(step.arg)
+        self.write_uint(step.arg_type.value)
+
+    def visit_store_yield(self, step: ir_types.IRStep):
+        self.write_name(step.target)
+
+    def visit_load_param(self, step: ir_types.IRStep):
+        self.write_name(step.target)
+
+    def visit_call_func(self, step: ir_types.IRStep):
+        self.write_name(step.callee)
+
+    def visit_tail_call(self, step: ir_types.IRStep):
+        self.write_name(step.callee)
+
+    def visit_assign(self, step: ir_types.IRStep):
+        self.write_name(step.dest)
+        self.write_uint(step.op.value)
+        self.write_operand(step.arg0)
+        self.write_operand(step.arg1)
+        self.write_uint(int(step.no_wrap))
+
+    def visit_load_const(self, step: ir_types.IRStep):
+        self.write_name(step.addr)
+        self.write_int(step.value)
+
+    def visit_phi(self, step: ir_types.IRStep):
+        self.write_name(step.dest)
+        self.write_uint(len(step.args))
+
+        for pred_label, arg in step.args.items():
+            self.write_name(pred_label)
+            self.write_operand(arg)
+
+class IRBinaryReader:
+    """
+        Parses the bytes from IRBinaryWriter.
+    """
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+        self.names: list[str] = []
+
+    def error(self, message: str) -> RuntimeError:
+        return RuntimeError(f'ir_serial.py [Error]: {message} at IR byte {self.pos}!\n')
+
+    def read_uint(self) -> int:
+        result = 0
+        shift = 0
+
+        while True:
+            if self.pos >= len(self.data):
+                raise self.error('Unexpected end of data')
+
+            byte = self.data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            shift += 7
+
+            if byte < 0x80:
+                return result
+
+    def read_int(self) -> int:
+        value = self.read_uint()
+
+        return value >> 1 if value % 2 == 0 else -(value >> 1) - 1
+
+    def read_name(self) -> str:
+        name_i = self.read_uint()
+
+        if name_i >= len(self.names):
+            raise self.error(f'Bad name index {name_i}')
+
+        return self.names[name_i]
+
+    def read_operand(self) -> str | int | None:
+        tag = self.read_uint()
+
+        if tag == OPERAND_NONE:
+            return None
+
+        if tag == OPERAND_INT:
+            return self.read_int()
+
+        if tag == OPERAND_ADDR:
+            return self.read_name()
+
+        raise self.error(f'Bad operand tag {tag}')
+
+    def read_enum(self, enum_type):
+        value = self.read_uint()
+
+        try:
+            return enum_type(value)
+        except ValueError:
+            raise self.error(f'Bad {enum_type.__name__} value {value}')
+
+    def read_all(self) -> IRProgram:
+        if self.data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            raise self.error('Missing DerkCC IR magic')
+
+        self.pos = len(BINARY_MAGIC)
+
+        for _ in range(self.read_uint()):
+            name_len = self.read_uint()
+
+            if self.pos + name_len > len(self.data):
+                raise self.error('Unexpected end of data')
+
+            self.names.append(self.data[self.pos:self.pos + name_len].decode('utf-8'))
+            self.pos += name_len
+
+        funcs = {}
+
+        for _ in range(self.read_uint()):
+            func_info = funcs.setdefault(self.read_name(), [])
+
+            for _ in range(self.read_uint()):
+                func_info.append((self.read_enum(DataType), self.read_name(), bool(self.read_uint())))
+
+        steps = [self.read_step() for _ in range(self.read_uint())]
+
+        if self.pos != len(self.data):
+            raise self.error('Trailing data')
+
+        return (steps, funcs)
+
+    def read_step(self) -> ir_types.IRStep:
+        match self.read_enum(ir_types.IRType):
+            case ir_types.IRType.LABEL:
+                return ir_types.IRLabel(self.read_name())
+            case ir_types.IRType.RETURN:
+                return ir_types.IRReturn(self.read_operand())
+            case ir_types.IRType.JUMP:
+                return ir_types.IRJump(self.read_name())
+            case ir_types.IRType.JUMP_IF:
+                return ir_types.IRJumpIf(self.read_name(), self.read_enum(ir_types.IROp), self.read_operand(), self.read_operand())
+            case ir_types.IRType.JUMP_TABLE:
+                arg, low, default = self.read_name(), self.read_int(), self.read_name()
+                return ir_types.IRJumpTable(arg, low, [self.read_name() for _ in range(self.read_uint())], default)
+            case ir_types.IRType.ARGV_PUSH:
+                arg = self.read_operand()
+                return ir_types.IRPushArg(arg, type(arg) == int, self.read_enum(DataType))
+            case ir_types.IRType.STORE_YIELD:
+                return ir_types.IRStoreYield(self.read_name())
+            case ir_types.IRType.LOAD_PARAM:
+                return ir_types.IRLoadParam(self.read_name())
+            case ir_types.IRType.FUNC_CALL:
+                return ir_types.IRCallFunc(self.read_name())
+            case ir_types.IRType.TAIL_CALL:
+                return ir_types.IRTailCall(self.read_name())
+            case ir_types.IRType.ADDR_ASSIGN:
+                return ir_types.IRAssign(self.read_name(), self.read_enum(ir_types.IROp), self.read_operand(), self.read_operand(), bool(self.read_uint()))
+            case ir_types.IRType.LOAD_CONSTANT:
+                return ir_types.IRLoadConst(self.read_name(), self.read_int())
+            case ir_types.IRType.PHI:
+                dest = self.read_name()
+                return ir_types.IRPhi(dest, {self.read_name(): self.read_operand() for _ in range(self.read_uint())})
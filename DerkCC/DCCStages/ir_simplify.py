@@ -0,0 +1,196 @@
+"""
+    ir_simplify.py\n
+    By DrkWithT\n
+    Rule-driven algebraic simplification of single IRAssign and IRJumpIf steps: identities like `x + 0`, annihilators like `x * 0`, operations of an address with itself, and a canonical operand order putting constants on the right.\n
+    Sources:
+    [Peephole optimization](https://en.wikipedia.org/wiki/Peephole_optimization)
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_dce import remove_unreachable_blocks
+
+## Constants ##
+
+INT_MIN = -2**31
+
+# NOTE `op x 0` gives `x` for these.
+RIGHT_ZERO_IDENTITY_OPS = (ir_types.IROp.ADD, ir_types.IROp.SUBTRACT, ir_types.IROp.SHIFT_LEFT, ir_types.IROp.SHIFT_RIGHT, ir_types.IROp.SHIFT_RIGHT_LOGICAL)
+
+# NOTE `op 0 x` gives 0 for these, whatever the shift count.
+LEFT_ZERO_ANNIHILATOR_OPS = (ir_types.IROp.SHIFT_LEFT, ir_types.IROp.SHIFT_RIGHT, ir_types.IROp.SHIFT_RIGHT_LOGICAL)
+
+# NOTE maps ops of an address with itself to their result: `x - x` is 0, and `x <= x` always holds.
+SELF_OP_RESULTS = {
+    ir_types.IROp.SUBTRACT: 0,
+    ir_types.IROp.COMPARE_EQ: 1,
+    ir_types.IROp.COMPARE_NEQ: 0,
+    ir_types.IROp.COMPARE_LT: 0,
+    ir_types.IROp.COMPARE_LTE: 1,
+    ir_types.IROp.COMPARE_GT: 0,
+    ir_types.IROp.COMPARE_GTE: 1
+}
+
+## Aliases and Types ##
+
+# NOTE a rule gives the steps replacing its step, where `[]` drops it, or `None` when it doesn't apply.
+RuleResult = ir_types.StepList | None
+
+## Utility functions ##
+
+def is_const(item: str | int | None, value: int) -> bool:
+    return type(item) == int and ir_types.wrap_int(item) == value
+
+def make_copy(step: ir_types.IRAssign, value: str | int) -> ir_types.StepList:
+    return [ir_types.IRAssign(step.dest, ir_types.IROp.NOP, value, None)]
+
+## Assignment rules ##
+
+def put_const_right(step: ir_types.IRAssign) -> RuleResult:
+    """
+        Swaps `c op x` to `x op c` for commutative ops and comparisons, so later rules and LVN only look for constants on the right.
+    """
+    if type(step.arg0) != int or type(step.arg1) != str:
+        return None
+
+    if step.op in ir_types.COMMUTATIVE_OPS:
+        return [ir_types.IRAssign(step.dest, step.op, step.arg1, step.arg0, step.no_wrap)]
+
+    if step.op in ir_types.SWAPPED_COMPARES:
+        return [ir_types.IRAssign(step.dest, ir_types.SWAPPED_COMPARES[step.op], step.arg1, step.arg0)]
+
+    return None
+
+def sub_const_to_add(step: ir_types.IRAssign) -> RuleResult:
+    """
+        Turns `x - c` into `x + -c`, so sums of constants meet one op. INT_MIN is its own negation, so its sum might wrap where the difference didn't.
+    """
+    if step.op != ir_types.IROp.SUBTRACT or type(step.arg0) != str or type(step.arg1) != int or is_const(step.arg1, 0):
+        return None
+
+    addend = ir_types.wrap_int(-step.arg1)
+
+    return [ir_types.IRAssign(step.dest, ir_types.IROp.ADD, step.arg0, addend, step.no_wrap and addend != INT_MIN)]
+
+def drop_identity(step: ir_types.IRAssign) -> RuleResult:
+    if step.op in RIGHT_ZERO_IDENTITY_OPS and is_const(step.arg1, 0):
+        return make_copy(step, step.arg0)
+
+    if step.op in (ir_types.IROp.MULTIPLY, ir_types.IROp.DIVIDE) and is_const(step.arg1, 1):
+        return make_copy(step, step.arg0)
+
+    return None
+
+def make_negation(step: ir_types.IRAssign) -> RuleResult:
+    """
+        Turns `0 - x`, `x * -1`, and `x / -1` into a negation. The last only differs for INT_MIN, where `idiv` traps and C leaves the result undefined.
+    """
+    if step.op == ir_types.IROp.SUBTRACT and is_const(step.arg0, 0) and type(step.arg1) == str:
+        return [ir_types.IRAssign(step.dest, ir_types.IROp.NEGATE, step.arg1, None)]
+
+    if step.op in (ir_types.IROp.MULTIPLY, ir_types.IROp.DIVIDE) and type(step.arg0) == str and is_const(step.arg1, -1):
+        return [ir_types.IRAssign(step.dest, ir_types.IROp.NEGATE, step.arg0, None)]
+
+    return None
+
+def fold_annihilator(step: ir_types.IRAssign) -> RuleResult:
+    if step.op in (ir_types.IROp.MULTIPLY, ir_types.IROp.MULTIPLY_HIGH) and is_const(step.arg1, 0):
+        return make_copy(step, 0)
+
+    if step.op in LEFT_ZERO_ANNIHILATOR_OPS and is_const(step.arg0, 0):
+        return make_copy(step, 0)
+
+    return None
+
+def fold_self_op(step: ir_types.IRAssign) -> RuleResult:
+    if type(step.arg0) != str or step.arg0 != step.arg1 or step.op not in SELF_OP_RESULTS:
+        return None
+
+    return make_copy(step, SELF_OP_RESULTS[step.op])
+
+## Branch rules ##
+
+def put_branch_const_right(step: ir_types.IRJumpIf) -> RuleResult:
+    if type(step.arg0) != int or type(step.arg1) != str:
+        return None
+
+    return [ir_types.IRJumpIf(step.target, ir_types.SWAPPED_COMPARES[step.op], step.arg1, step.arg0)]
+
+def fold_self_branch(step: ir_types.IRJumpIf) -> RuleResult:
+    """
+        Decides `JumpIf` on an address compared with itself: a branch always taken becomes an IRJump, and one never taken is dropped.
+    """
+    if type(step.arg0) != str or step.arg0 != step.arg1 or step.op not in SELF_OP_RESULTS:
+        return None
+
+    return [ir_types.IRJump(step.target)] if SELF_OP_RESULTS[step.op] else []
+
+# NOTE rules are tried in order on each step until none applies, so canonical forms come first.
+ASSIGN_RULES = (put_const_right, sub_const_to_add, drop_identity, make_negation, fold_annihilator, fold_self_op)
+
+BRANCH_RULES = (put_branch_const_right, fold_self_branch)
+
+## Simplify Pass ##
+
+class AlgebraicSimplifyPass:
+    """
+        Rewrites each step by the first rule matching it, then tries the rules again on the result until it settles. Rules only look at one step, so they never need to know where an address was defined.\n
+        NOTE Copies left by the rules are for copy propagation and DCE to clean up. `rule_counts` keeps how often each rule fired over all functions.
+    """
+    name = 'simplify'
+
+    def __init__(self):
+        self.rewrite_counts: dict[str, int] = {}
+        self.rule_counts: dict[str, int] = {}
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        rewrite_count = 0
+        branch_changed = False
+
+        for block in cfg.blocks:
+            steps = []
+
+            for step in block.steps:
+                results, count = self.simplify_step(step)
+                steps.extend(results)
+                rewrite_count += count
+                branch_changed = branch_changed or (count > 0 and step.get_ir_type() == ir_types.IRType.JUMP_IF)
+
+            block.steps = steps
+
+        if branch_changed:
+            cfg.recompute_edges()
+            remove_unreachable_blocks(cfg)
+
+        self.rewrite_counts[cfg.func_name] = rewrite_count
+
+        return rewrite_count
+
+    def simplify_step(self, step: ir_types.IRStep) -> tuple[ir_types.StepList, int]:
+        rewrite_count = 0
+
+        while True:
+            match step.get_ir_type():
+                case ir_types.IRType.ADDR_ASSIGN:
+                    rules = ASSIGN_RULES
+                case ir_types.IRType.JUMP_IF:
+                    rules = BRANCH_RULES
+                case _:
+                    return ([step], rewrite_count)
+
+            for rule in rules:
+                results = rule(step)
+
+                if results is not None:
+                    break
+            else:
+                return ([step], rewrite_count)
+
+            rewrite_count += 1
+            self.rule_counts[rule.__name__] = self.rule_counts.get(rule.__name__, 0) + 1
+
+            if not results:
+                return ([], rewrite_count)
+
+            step = results[0]
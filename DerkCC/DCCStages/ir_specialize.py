@@ -0,0 +1,166 @@
+"""
+    ir_specialize.py\n
+    By DrkWithT\n
+    Clones functions called with a mix of constant and variable arguments, fixing the constant params in each clone. Clones are folded and branch-pruned, then matching call sites are redirected, all within a code growth budget.
+"""
+
+import copy
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_ssa import SCCPPass
+from DerkCC.DCCStages.ir_dce import DeadCodePass
+from DerkCC.DCCStages.ir_jumps import JumpThreadingPass
+from DerkCC.DCCStages.ir_inline import find_call_args
+
+## Constants ##
+
+# NOTE total steps that clones may add to a program.
+MAX_CLONE_GROWTH = 64
+
+# NOTE callees over this many steps are never cloned, as each clone copies the whole body first.
+MAX_CLONE_SIZE = 48
+
+## Aliases and Types ##
+
+# NOTE names one specialization: the callee plus its fixed `(param index, value)` pairs.
+CloneKey = tuple[str, tuple[tuple[int, int], ...]]
+
+# NOTE a call site by its function, block id, call step index, and IRPushArg step indices.
+CallSite = tuple[str, int, int, list[int]]
+
+## Utility functions ##
+
+def clean_clone(cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo):
+    for opt_pass in (SCCPPass(), DeadCodePass(), JumpThreadingPass(), DeadCodePass()):
+        opt_pass.run(cfg, func_info)
+
+def get_clean_size(cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+    """
+        Gives a function's step count after the same cleanup a clone gets, so a clone is only judged by what its constants fold away.
+    """
+    copy_cfg = ir_cfg.ControlFlowGraph(cfg.func_name, copy.deepcopy(cfg.blocks))
+    clean_clone(copy_cfg, list(func_info))
+
+    return copy_cfg.get_step_count()
+
+## Specialization Pass ##
+
+class SpecializePass:
+    """
+        Groups call sites by callee and by which args are constants, then makes one clone per group with each constant's IRLoadParam turned into a copy of it. The clone keeps the remaining params in order, so a redirected site just drops its constant IRPushArg steps.\n
+        NOTE Groups with more sites go first. A clone is kept only if SCCP, DCE, and jump threading fold away more of it than of its callee given the same cleanup, and it fits the growth left. Calls with all constant args are left to ConstCallPass.
+    """
+    name = 'specialize'
+
+    def __init__(self, max_growth: int = MAX_CLONE_GROWTH, max_clone_size: int = MAX_CLONE_SIZE):
+        self.max_growth = max_growth
+        self.max_clone_size = max_clone_size
+        self.clone_count = 0
+        self.clones: dict[CloneKey, str] = {}
+        self.redirected_counts: dict[str, int] = {}
+
+    def run_program(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable) -> int:
+        cfg_table = {cfg.func_name: cfg for cfg in cfgs}
+        sites = self.find_sites(cfgs, funcs, cfg_table)
+        redirects: dict[tuple[str, int], list[tuple[int, list[int], str]]] = {}
+        growth = 0
+
+        for key in sorted(sites, key=lambda key: (-len(sites[key]), cfg_table[key[0]].get_step_count())):
+            callee_cfg = cfg_table[key[0]]
+
+            if callee_cfg.get_step_count() > self.max_clone_size:
+                continue
+
+            clone_cfg = self.make_clone(callee_cfg, dict(key[1]), funcs)
+            clone_size = clone_cfg.get_step_count()
+
+            # NOTE every fixed param drops its IRLoadParam, so only folding past that counts as a gain.
+            if clone_size + len(key[1]) >= get_clean_size(callee_cfg, funcs[key[0]]) or growth + clone_size > self.max_growth:
+                del funcs[clone_cfg.func_name]
+                self.clone_count -= 1
+                continue
+
+            growth += clone_size
+            self.clones[key] = clone_cfg.func_name
+            cfgs.insert(cfgs.index(callee_cfg) + len([name for name in self.clones.values() if name.startswith(f'{key[0]}.spec')]), clone_cfg)
+
+            for func_name, block_id, call_i, const_arg_ids in sites[key]:
+                redirects.setdefault((func_name, block_id), []).append((call_i, const_arg_ids, clone_cfg.func_name))
+
+        # NOTE sites are only rewritten once all clones are made, as dropping pushes shifts the step indices of later sites.
+        for (func_name, block_id), block_redirects in redirects.items():
+            block = cfg_table[func_name].blocks[block_id]
+            dropped_ids = set()
+
+            for call_i, const_arg_ids, clone_name in block_redirects:
+                block.steps[call_i] = ir_types.IRCallFunc(clone_name)
+                dropped_ids.update(const_arg_ids)
+
+            block.steps = [step for step_i, step in enumerate(block.steps) if step_i not in dropped_ids]
+            self.redirected_counts[func_name] = self.redirected_counts.get(func_name, 0) + len(block_redirects)
+
+        return sum(len(block_redirects) for block_redirects in redirects.values())
+
+    def find_sites(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable, cfg_table: dict[str, ir_cfg.ControlFlowGraph]) -> dict[CloneKey, list[CallSite]]:
+        results: dict[CloneKey, list[CallSite]] = {}
+
+        for cfg in cfgs:
+            for block_id, block in enumerate(cfg.blocks):
+                for step_i, step in enumerate(block.steps):
+                    if step.get_ir_type() != ir_types.IRType.FUNC_CALL or step.callee not in cfg_table:
+                        continue
+
+                    param_count = len([entry for entry in funcs[step.callee] if entry[2]])
+                    arg_ids = find_call_args(block.steps, step_i, param_count)
+
+                    if arg_ids is None:
+                        continue
+
+                    consts = tuple((param_i, block.steps[arg_i].arg) for param_i, arg_i in enumerate(arg_ids) if type(block.steps[arg_i].arg) == int)
+
+                    if 0 < len(consts) < param_count:
+                        const_arg_ids = [arg_ids[param_i] for param_i, _ in consts]
+                        results.setdefault((step.callee, consts), []).append((cfg.func_name, block_id, step_i, const_arg_ids))
+
+        return results
+
+    def make_clone(self, callee_cfg: ir_cfg.ControlFlowGraph, fixed_args: dict[int, int], funcs: ir_gen.FuncInfoTable) -> ir_cfg.ControlFlowGraph:
+        clone_name = f'{callee_cfg.func_name}.spec{self.clone_count}'
+
+        # NOTE IR reloaded from a file or already run through -O2 may hold earlier clones, which must not be overwritten.
+        while clone_name in funcs:
+            self.clone_count += 1
+            clone_name = f'{callee_cfg.func_name}.spec{self.clone_count}'
+
+        self.clone_count += 1
+
+        clone_cfg = ir_cfg.ControlFlowGraph(clone_name, copy.deepcopy(callee_cfg.blocks))
+        label_renames = {block.label: clone_cfg.new_label() for block in clone_cfg.blocks[1:] if block.label is not None}
+        label_renames[callee_cfg.func_name] = clone_name
+        fixed_addrs = set()
+        param_i = 0
+
+        for block in clone_cfg.blocks:
+            block.label = label_renames.get(block.label)
+
+            for step_i, step in enumerate(block.steps):
+                step_type = step.get_ir_type()
+
+                step.replace_jump_targets(label_renames)
+
+                if step_type == ir_types.IRType.LOAD_PARAM:
+                    if param_i in fixed_args:
+                        block.steps[step_i] = ir_types.IRAssign(step.target, ir_types.IROp.NOP, fixed_args[param_i], None)
+                        fixed_addrs.add(step.target)
+
+                    param_i += 1
+
+        # NOTE the fixed params become plain locals, listed after the params left.
+        clone_info = [(datatype, ir_addr, is_param and ir_addr not in fixed_addrs) for datatype, ir_addr, is_param in funcs[callee_cfg.func_name]]
+        funcs[clone_name] = sorted(clone_info, key=lambda entry: not entry[2])
+
+        clone_cfg.recompute_edges()
+        clean_clone(clone_cfg, funcs[clone_name])
+
+        return clone_cfg
@@ -0,0 +1,482 @@
+"""
+    ir_ssa.py\n
+    By DrkWithT\n
+    Converts a function's CFG into SSA form and back, plus a sparse conditional constant propagation (SCCP) pass on top of it.\n
+    Sources:
+    [Efficiently Computing SSA Form (Cytron et al.)](https://www.cs.utexas.edu/~pingali/CS380C/2010/papers/ssaCytron.pdf)\n
+    [Constant Propagation with Conditional Branches (Wegman, Zadeck)](https://www.cs.wustl.edu/~cytron/531Pages/f11/Resources/Papers/cprop.pdf)
+"""
+
+from enum import Enum, auto
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+
+## Utility functions ##
+
+def get_leading_phis(block: ir_cfg.BasicBlock) -> list[ir_types.IRPhi]:
+    results = []
+
+    for step in block.steps:
+        if step.get_ir_type() != ir_types.IRType.PHI:
+            break
+
+        results.append(step)
+
+    return results
+
+## SSA Builder ##
+
+class SSABuilder:
+    """
+        Renames every IR address definition into a unique version `<addr>.<n>` and places phi steps at iterated dominance frontiers (semi-pruned SSA).\n
+        NOTE `destruct()` maps versions back onto their original addresses, so it expects conventional SSA: no pass may let two versions of one address overlap. Constant substitution and dead step removal are fine.
+    """
+    bases: dict[str, str]
+    added_labels: set[str]
+    version_counts: dict[str, int]
+
+    def __init__(self):
+        self.bases = {}
+        self.added_labels = set()
+        self.version_counts = {}
+
+    def get_base(self, addr: str) -> str:
+        return self.bases.get(addr, addr)
+
+    def new_version(self, addr: str) -> str:
+        version_n = self.version_counts.get(addr, 0) + 1
+        self.version_counts[addr] = version_n
+
+        versioned = f'{addr}.{version_n}'
+        self.bases[versioned] = addr
+
+        return versioned
+
+    def construct(self, cfg: ir_cfg.ControlFlowGraph):
+        # NOTE phi args are keyed by predecessor labels, so every block needs one while in SSA form.
+        for block_id in range(len(cfg.blocks)):
+            if cfg.blocks[block_id].label is None:
+                self.added_labels.add(cfg.ensure_label(block_id))
+
+        rpo = cfg.get_reverse_postorder()
+        frontiers = cfg.get_dom_frontiers()
+        def_blocks: dict[str, set[int]] = {}
+        live_across = set()
+
+        for block_id in rpo:
+            killed = set()
+
+            for step in cfg.blocks[block_id].steps:
+                for use in step.get_use_addrs():
+                    if use not in killed:
+                        live_across.add(use)
+
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None:
+                    killed.add(def_addr)
+                    def_blocks.setdefault(def_addr, set()).add(block_id)
+
+        for addr in def_blocks:
+            if addr not in live_across:
+                continue
+
+            pending = list(def_blocks[addr])
+            phi_blocks = set()
+
+            while pending:
+                block_id = pending.pop()
+
+                for front_id in frontiers[block_id]:
+                    if front_id in phi_blocks:
+                        continue
+
+                    phi_blocks.add(front_id)
+                    cfg.blocks[front_id].steps.insert(0, ir_types.IRPhi(addr, {}))
+
+                    if front_id not in def_blocks[addr]:
+                        pending.append(front_id)
+
+        self.rename_all(cfg)
+
+    def rename_all(self, cfg: ir_cfg.ControlFlowGraph):
+        stacks: dict[str, list[str]] = {}
+
+        # NOTE walks the dominator tree without recursion: a pending entry with `True` pops the names its block pushed.
+        pending = [(0, False, None)]
+
+        while pending:
+            block_id, is_exit, pushed = pending.pop()
+
+            if is_exit:
+                for addr in pushed:
+                    stacks[addr].pop()
+                continue
+
+            block = cfg.blocks[block_id]
+            pushed = []
+
+            for step in block.steps:
+                if step.get_ir_type() != ir_types.IRType.PHI:
+                    step.replace_uses({use: stacks[use][-1] for use in step.get_use_addrs() if stacks.get(use)})
+
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None:
+                    versioned = self.new_version(def_addr)
+                    step.set_def_addr(versioned)
+                    stacks.setdefault(def_addr, []).append(versioned)
+                    pushed.append(def_addr)
+
+            for succ_id in block.succs:
+                for phi in get_leading_phis(cfg.blocks[succ_id]):
+                    phi_base = self.get_base(phi.dest)
+                    phi.args[block.label] = stacks[phi_base][-1] if stacks.get(phi_base) else phi_base
+
+            pending.append((block_id, True, pushed))
+
+            for child_id in reversed(cfg.get_dom_children(block_id)):
+                pending.append((child_id, False, None))
+
+    def destruct(self, cfg: ir_cfg.ControlFlowGraph):
+        """
+            Replaces phis with copies on their incoming edges, splitting conditional edges as needed, then strips all versions.
+        """
+        edge_copies: dict[tuple[str, str], ir_types.StepList] = {}
+
+        for block in cfg.blocks:
+            phis = get_leading_phis(block)
+            del block.steps[:len(phis)]
+
+            for phi in phis:
+                dest_base = self.get_base(phi.dest)
+
+                for pred_label, value in phi.args.items():
+                    value_base = self.get_base(value) if type(value) == str else value
+
+                    if value_base == dest_base:
+                        continue
+
+                    edge_copies.setdefault((pred_label, block.label), []).append(ir_types.IRAssign(dest_base, ir_types.IROp.NOP, value_base, None))
+
+        for block in cfg.blocks:
+            for step in block.steps:
+                step.replace_uses({use: self.get_base(use) for use in step.get_use_addrs()})
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None:
+                    step.set_def_addr(self.get_base(def_addr))
+
+        for (pred_label, succ_label), copies in edge_copies.items():
+            copy_dests = set(copy.dest for copy in copies)
+
+            if any(copy.arg0 in copy_dests for copy in copies):
+                raise RuntimeError(f'ir_ssa.py [Error]: Non-conventional SSA copies on edge {pred_label} -> {succ_label}!\n')
+
+            self.place_edge_copies(cfg, pred_label, succ_label, copies)
+
+        jump_targets = set()
+
+        for block in cfg.blocks:
+            terminator = block.get_terminator()
+
+            if terminator is not None:
+                jump_targets.update(terminator.get_jump_targets())
+
+        for block in cfg.blocks:
+            if block.label in self.added_labels and block.label not in jump_targets:
+                block.label = None
+
+        self.bases.clear()
+        self.added_labels.clear()
+        self.version_counts.clear()
+        cfg.recompute_edges()
+
+    def place_edge_copies(self, cfg: ir_cfg.ControlFlowGraph, pred_label: str, succ_label: str, copies: ir_types.StepList):
+        pred_id = cfg.get_block_id(pred_label)
+        pred = cfg.blocks[pred_id]
+        terminator = pred.get_terminator()
+
+        if terminator is None:
+            pred.steps.extend(copies)
+            return
+
+        if terminator.get_ir_type() == ir_types.IRType.JUMP:
+            pred.steps[-1:-1] = copies
+            return
+
+        # NOTE a conditional jump's or jump table's edges are split so the copies only run on the edge into the phi's block.
+        if succ_label in terminator.get_jump_targets():
+            split_label = cfg.new_label()
+            terminator.replace_jump_targets({succ_label: split_label})
+            cfg.blocks.append(ir_cfg.BasicBlock(split_label, [step for step in copies] + [ir_types.IRJump(succ_label)]))
+
+        next_id = pred_id + 1
+
+        if pred.falls_through() and next_id < len(cfg.blocks) and cfg.blocks[next_id].label == succ_label:
+            cfg.blocks.insert(next_id, ir_cfg.BasicBlock(None, [ir_types.IRAssign(copy.dest, copy.op, copy.arg0, None) for copy in copies]))
+
+## SCCP ##
+
+class LatticeMark(Enum):
+    TOP = auto()    # NOTE not yet known, may still be any constant
+    BOTTOM = auto() # NOTE known to vary at runtime
+
+LatticeValue = LatticeMark | int
+
+def meet_values(lhs: LatticeValue, rhs: LatticeValue) -> LatticeValue:
+    if lhs == LatticeMark.TOP:
+        return rhs
+
+    if rhs == LatticeMark.TOP or lhs == rhs:
+        return lhs
+
+    return LatticeMark.BOTTOM
+
+class SCCPPass:
+    """
+        Sparse conditional constant propagation: finds addresses holding one constant on every executable path, substitutes them, folds decided conditional jumps, and deletes blocks that can never run.
+    """
+    name = 'sccp'
+
+    def __init__(self):
+        self.values: dict[str, LatticeValue] = {}
+        self.sizes: dict[str, int] = {}
+        self.users: dict[str, list[tuple[int, ir_types.IRStep]]] = {}
+        self.label_ids: dict[str, int] = {}
+        self.exec_blocks: set[int] = set()
+        self.exec_edges: set[tuple[int, int]] = set()
+        self.flow_work: list[tuple[int, int]] = []
+        self.ssa_work: list[str] = []
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        ssa = SSABuilder()
+        ssa.construct(cfg)
+
+        self.propagate(cfg, ssa, func_info)
+        change_count = self.rewrite(cfg)
+
+        ssa.destruct(cfg)
+
+        return change_count
+
+    def get_value(self, item: str | int | None) -> LatticeValue:
+        if type(item) == int:
+            return item
+
+        # NOTE addresses without any definition are read before being set, so they can't be trusted as constants.
+        return self.values.get(item, LatticeMark.BOTTOM)
+
+    def set_value(self, addr: str, value: LatticeValue):
+        if self.values.get(addr) != value:
+            self.values[addr] = value
+            self.ssa_work.append(addr)
+
+    def propagate(self, cfg: ir_cfg.ControlFlowGraph, ssa: SSABuilder, func_info: ir_gen.FuncInfo):
+        self.values.clear()
+        self.sizes.clear()
+        self.users.clear()
+        self.exec_blocks.clear()
+        self.exec_edges.clear()
+        self.flow_work = [(-1, 0)]
+        self.ssa_work = []
+        self.label_ids = {block.label: block_id for block_id, block in enumerate(cfg.blocks)}
+
+        for block_id, block in enumerate(cfg.blocks):
+            for step in block.steps:
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None:
+                    self.values[def_addr] = LatticeMark.TOP
+                    self.sizes[def_addr] = ir_gen.get_local_size(func_info, ssa.get_base(def_addr))
+
+                for use in step.get_use_addrs():
+                    self.users.setdefault(use, []).append((block_id, step))
+
+        while self.flow_work or self.ssa_work:
+            if self.flow_work:
+                pred_id, block_id = self.flow_work.pop()
+
+                if (pred_id, block_id) in self.exec_edges:
+                    continue
+
+                self.exec_edges.add((pred_id, block_id))
+                first_visit = block_id not in self.exec_blocks
+                self.exec_blocks.add(block_id)
+
+                for step in cfg.blocks[block_id].steps:
+                    if step.get_ir_type() == ir_types.IRType.PHI:
+                        self.visit_phi(block_id, step)
+                    elif first_visit:
+                        self.visit_step(cfg, block_id, step)
+
+                if first_visit and cfg.blocks[block_id].get_terminator() is None:
+                    for succ_id in cfg.blocks[block_id].succs:
+                        self.flow_work.append((block_id, succ_id))
+            else:
+                addr = self.ssa_work.pop()
+
+                for block_id, step in self.users.get(addr, []):
+                    if block_id not in self.exec_blocks:
+                        continue
+
+                    if step.get_ir_type() == ir_types.IRType.PHI:
+                        self.visit_phi(block_id, step)
+                    else:
+                        self.visit_step(cfg, block_id, step)
+
+    def visit_phi(self, block_id: int, step: ir_types.IRPhi):
+        result = LatticeMark.TOP
+
+        for pred_label, value in step.args.items():
+            if (self.label_ids.get(pred_label), block_id) in self.exec_edges:
+                result = meet_values(result, self.get_value(value))
+
+        self.set_value(step.dest, result)
+
+    def visit_step(self, cfg: ir_cfg.ControlFlowGraph, block_id: int, step: ir_types.IRStep):
+        step_type = step.get_ir_type()
+
+        if step_type == ir_types.IRType.ADDR_ASSIGN:
+            self.set_value(step.dest, self.eval_assign(step))
+        elif step_type == ir_types.IRType.LOAD_CONSTANT:
+            self.set_value(step.addr, ir_types.wrap_int(step.value, self.sizes.get(step.addr)))
+        elif step_type == ir_types.IRType.JUMP:
+            self.flow_work.append((block_id, self.label_ids[step.target]))
+        elif step_type == ir_types.IRType.JUMP_IF:
+            taken = self.eval_condition(step)
+            taken_edge = (block_id, self.label_ids[step.target])
+            fallthrough_edge = (block_id, block_id + 1)
+
+            if taken == LatticeMark.BOTTOM:
+                self.flow_work.append(taken_edge)
+                self.flow_work.append(fallthrough_edge)
+            elif taken != LatticeMark.TOP:
+                self.flow_work.append(taken_edge if taken else fallthrough_edge)
+        elif step_type == ir_types.IRType.JUMP_TABLE:
+            index = self.get_value(step.arg)
+
+            if index == LatticeMark.BOTTOM:
+                targets = step.get_jump_targets()
+            elif index != LatticeMark.TOP:
+                targets = [step.get_target(index)]
+            else:
+                targets = []
+
+            for target in targets:
+                self.flow_work.append((block_id, self.label_ids[target]))
+        else:
+            def_addr = step.get_def_addr()
+
+            # NOTE params and call results come from outside this function.
+            if def_addr is not None:
+                self.set_value(def_addr, LatticeMark.BOTTOM)
+
+    def eval_assign(self, step: ir_types.IRAssign) -> LatticeValue:
+        arg0_value = self.get_value(step.arg0)
+        arg1_value = self.get_value(step.arg1) if step.arg1 is not None else 0
+        arg_values = [arg0_value, arg1_value]
+
+        if LatticeMark.BOTTOM in arg_values:
+            return LatticeMark.BOTTOM
+
+        if LatticeMark.TOP in arg_values:
+            return LatticeMark.TOP
+
+        folded = ir_types.fold_ir_op(step.op, arg0_value, arg1_value)
+
+        if folded is None:
+            return LatticeMark.BOTTOM
+
+        return ir_types.wrap_int(folded, self.sizes.get(step.dest))
+
+    def eval_condition(self, step: ir_types.IRJumpIf) -> LatticeValue:
+        arg_values = [self.get_value(step.arg0), self.get_value(step.arg1)]
+
+        if LatticeMark.BOTTOM in arg_values:
+            return LatticeMark.BOTTOM
+
+        if LatticeMark.TOP in arg_values:
+            return LatticeMark.TOP
+
+        return ir_types.fold_ir_op(step.op, arg_values[0], arg_values[1])
+
+    def rewrite(self, cfg: ir_cfg.ControlFlowGraph) -> int:
+        change_count = 0
+        constants = {addr: value for addr, value in self.values.items() if type(value) == int}
+        kept_blocks = []
+
+        for block_id, block in enumerate(cfg.blocks):
+            if block_id not in self.exec_blocks:
+                change_count += len(block.steps)
+                continue
+
+            kept_blocks.append(block)
+
+            for phi in get_leading_phis(block):
+                for pred_label in list(phi.args.keys()):
+                    if (self.label_ids.get(pred_label), block_id) not in self.exec_edges:
+                        del phi.args[pred_label]
+
+            for step in block.steps:
+                step.replace_uses(constants)
+
+            terminator = block.get_terminator()
+
+            if terminator is not None and terminator.get_ir_type() == ir_types.IRType.JUMP_IF:
+                taken = self.eval_condition(terminator)
+
+                if type(taken) == int:
+                    change_count += 1
+
+                    if taken:
+                        block.steps[-1] = ir_types.IRJump(terminator.target)
+                    else:
+                        block.steps.pop()
+            elif terminator is not None and terminator.get_ir_type() == ir_types.IRType.JUMP_TABLE:
+                index = self.get_value(terminator.arg)
+
+                # NOTE only the entry a constant index picks was marked executable, so the table can't stay.
+                if type(index) == int:
+                    block.steps[-1] = ir_types.IRJump(terminator.get_target(index))
+                    change_count += 1
+
+        cfg.blocks = kept_blocks
+        change_count += self.remove_constant_defs(cfg, constants)
+        cfg.recompute_edges()
+
+        return change_count
+
+    def remove_constant_defs(self, cfg: ir_cfg.ControlFlowGraph, constants: dict[str, int]) -> int:
+        """
+            Drops definitions of constant addresses that lost all their readers. Any that are still read, e.g. by a return, become plain constant copies.
+        """
+        change_count = 0
+        read_addrs = set()
+
+        for block in cfg.blocks:
+            for step in block.steps:
+                read_addrs.update(step.get_use_addrs())
+
+        for block in cfg.blocks:
+            kept_steps = []
+
+            for step in block.steps:
+                def_addr = step.get_def_addr()
+                step_type = step.get_ir_type()
+                removable = step_type in (ir_types.IRType.ADDR_ASSIGN, ir_types.IRType.LOAD_CONSTANT, ir_types.IRType.PHI)
+
+                if def_addr not in constants or not removable:
+                    kept_steps.append(step)
+                elif def_addr not in read_addrs:
+                    change_count += 1
+                elif step_type == ir_types.IRType.ADDR_ASSIGN and (step.op != ir_types.IROp.NOP or step.arg0 != constants[def_addr]):
+                    kept_steps.append(ir_types.IRAssign(def_addr, ir_types.IROp.NOP, constants[def_addr], None))
+                    change_count += 1
+                else:
+                    kept_steps.append(step)
+
+            block.steps = kept_steps
+
+        return change_count
@@ -0,0 +1,288 @@
+"""
+    ir_strength.py\n
+    By DrkWithT\n
+    Strength reduction of multiplies and divides by constants into shifts, adds, and multiplies by a "magic" reciprocal.\n
+    Sources:
+    [Hacker's Delight, 2nd ed., chapter 10: Integer Division by Constants](https://en.wikipedia.org/wiki/Hacker%27s_Delight)
+    [Division by Invariant Integers using Multiplication](https://gmplib.org/~tege/divcnst-pldi94.pdf)
+"""
+
+import functools
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ast_nodes import DataType
+
+## Aliases and Types ##
+
+# NOTE models one step of a multiply plan on the running product `p` of `x`: ('shl', k) is p << k, ('lea', k) is p + (p << k), ('add_x', k) is (p << k) + x, and ('sub_x', k) is (p << k) - x.
+MulStep = tuple[str, int]
+MulPlan = tuple[int, tuple[MulStep, ...]]
+
+## Constants ##
+
+# NOTE a plan costing more single-cycle steps than this loses to `imul`, whose latency is about 3 cycles.
+MAX_MUL_COST = 3
+
+# NOTE `lea` scales an index by 2, 4, or 8 at most.
+MAX_LEA_SHIFT = 3
+
+## Utility functions ##
+
+def count_trailing_zeros(value: int) -> int:
+    return (value & -value).bit_length() - 1
+
+@functools.cache
+def get_mul_plan(factor: int) -> MulPlan:
+    """
+        Gives the cheapest known (cost, steps) for multiplying by a positive `factor`. A shift then add that fits one `lea` costs 1.
+    """
+    if factor == 1:
+        return (0, ())
+
+    if factor % 2 == 0:
+        shift = count_trailing_zeros(factor)
+        cost, steps = get_mul_plan(factor >> shift)
+
+        return (cost + 1, steps + (('shl', shift),))
+
+    candidates = []
+
+    for shift in range(1, MAX_LEA_SHIFT + 1):
+        if factor % ((1 << shift) + 1) == 0:
+            cost, steps = get_mul_plan(factor // ((1 << shift) + 1))
+            candidates.append((cost + 1, steps + (('lea', shift),)))
+
+    shift = count_trailing_zeros(factor - 1)
+    cost, steps = get_mul_plan((factor - 1) >> shift)
+    candidates.append((cost + (1 if shift <= MAX_LEA_SHIFT else 2), steps + (('add_x', shift),)))
+
+    shift = count_trailing_zeros(factor + 1)
+    cost, steps = get_mul_plan((factor + 1) >> shift)
+    candidates.append((cost + 2, steps + (('sub_x', shift),)))
+
+    return min(candidates, key=lambda candidate: candidate[0])
+
+def get_div_magic(divisor: int) -> tuple[int, int]:
+    """
+        Gives the signed 32-bit magic multiplier and post-shift for dividing by `divisor`, which must not be -1, 0, or 1. This follows Hacker's Delight figure 10-1.
+    """
+    two31 = 1 << 31
+    abs_divisor = abs(divisor)
+    t = two31 + (1 if divisor < 0 else 0)
+    abs_nc = t - 1 - t % abs_divisor
+    p = 31
+    q1, r1 = divmod(two31, abs_nc)
+    q2, r2 = divmod(two31, abs_divisor)
+
+    while True:
+        p += 1
+        q1, r1 = 2 * q1, 2 * r1
+
+        if r1 >= abs_nc:
+            q1 += 1
+            r1 -= abs_nc
+
+        q2, r2 = 2 * q2, 2 * r2
+
+        if r2 >= abs_divisor:
+            q2 += 1
+            r2 -= abs_divisor
+
+        delta = abs_divisor - r2
+
+        if not (q1 < delta or (q1 == delta and r1 == 0)):
+            break
+
+    magic = ir_types.wrap_int(q2 + 1)
+
+    if divisor < 0:
+        magic = ir_types.wrap_int(-magic)
+
+    return (magic, p - 32)
+
+def get_no_wrap_product(step: ir_types.IRStep) -> tuple[str, int] | None:
+    """
+        Gives `(x, c)` for a step `x * c` marked `no_wrap`, whose result is then the exact product.
+    """
+    if step.get_ir_type() != ir_types.IRType.ADDR_ASSIGN or step.op != ir_types.IROp.MULTIPLY or not step.no_wrap:
+        return None
+
+    if type(step.arg0) == str and type(step.arg1) == int and step.arg0 != step.dest:
+        return (step.arg0, ir_types.wrap_int(step.arg1))
+
+    if type(step.arg0) == int and type(step.arg1) == str and step.arg1 != step.dest:
+        return (step.arg1, ir_types.wrap_int(step.arg0))
+
+    return None
+
+## Strength Reduction Pass ##
+
+class StrengthReductionPass:
+    """
+        Rewrites `x * c` and `x / c` for a constant `c`, giving the same 32-bit result as `fold_ir_op` for every `x`. Multiplies become shifts and adds when that is cheaper than `imul`, signed division by a power of two shifts with a rounding bias, and other divisors multiply by a magic reciprocal.\n
+        NOTE Every intermediate value goes to a fresh `int` temporary and only the last step writes the destination, so a `char` result is still truncated once.\n
+        A quotient `(x * c1) / c2` whose product ValueRangePass marked `no_wrap` is exact when `c2` is positive and divides `c1`, so it becomes `x * (c1 / c2)`. A wrapped product could lose that, so unmarked ones are divided as usual.
+    """
+    name = 'strength'
+
+    def __init__(self):
+        self.temp_count = 0
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        reduce_count = 0
+
+        for block in cfg.blocks:
+            steps = []
+
+            # NOTE maps each no-wrap product's address to its `(x, c)` while neither address is written again in the block.
+            products: dict[str, tuple[str, int]] = {}
+
+            for step in block.steps:
+                reduced = self.reduce_step(step, products)
+                def_addr = step.get_def_addr()
+
+                if def_addr is not None:
+                    products = {addr: product for addr, product in products.items() if def_addr not in (addr, product[0])}
+                    product = get_no_wrap_product(step)
+
+                    if product is not None:
+                        products[def_addr] = product
+
+                if reduced is None:
+                    steps.append(step)
+                    continue
+
+                for temp_step in reduced[:-1]:
+                    func_info.append((DataType.INT, temp_step.dest, False))
+
+                steps.extend(reduced)
+                reduce_count += 1
+
+            block.steps = steps
+
+        return reduce_count
+
+    def reduce_step(self, step: ir_types.IRStep, products: dict[str, tuple[str, int]] | None = None) -> ir_types.StepList | None:
+        """
+            Gives the steps replacing a multiply or divide by a constant, where only the last one writes the step's destination, or `None` to keep it. `products` holds the no-wrap products reaching the step.
+        """
+        if step.get_ir_type() != ir_types.IRType.ADDR_ASSIGN:
+            return None
+
+        results = None
+
+        if step.op == ir_types.IROp.MULTIPLY:
+            if type(step.arg0) == str and type(step.arg1) == int:
+                results = self.reduce_multiply(step.arg0, ir_types.wrap_int(step.arg1))
+            elif type(step.arg0) == int and type(step.arg1) == str:
+                results = self.reduce_multiply(step.arg1, ir_types.wrap_int(step.arg0))
+        elif step.op == ir_types.IROp.DIVIDE and type(step.arg0) == str and type(step.arg1) == int:
+            product = (products or {}).get(step.arg0)
+            divisor = ir_types.wrap_int(step.arg1)
+
+            if product is not None and divisor > 0 and product[1] % divisor == 0:
+                results = self.reduce_exact_quotient(product[0], product[1] // divisor)
+            else:
+                results = self.reduce_divide(step.arg0, divisor)
+
+        if results is not None:
+            results[-1].dest = step.dest
+
+        return results
+
+    def emit_chain(self, ops: list[tuple[ir_types.IROp, str | int | None, str | int | None]]) -> ir_types.StepList:
+        """
+            Turns (op, arg0, arg1) entries into steps writing fresh temporaries, where an arg of `None` reads the previous step's result.
+        """
+        results = []
+
+        for op, arg0, arg1 in ops:
+            prev = results[-1].dest if results else None
+            arg0 = prev if arg0 is None else arg0
+
+            if arg1 is None and op not in (ir_types.IROp.NOP, ir_types.IROp.NEGATE):
+                arg1 = prev
+
+            results.append(ir_types.IRAssign(f'sr.{self.temp_count}', op, arg0, arg1))
+            self.temp_count += 1
+
+        return results
+
+    def reduce_multiply(self, value: str, factor: int) -> ir_types.StepList | None:
+        if factor == 0:
+            return [ir_types.IRAssign(None, ir_types.IROp.NOP, 0, None)]
+
+        cost, plan = get_mul_plan(abs(factor))
+
+        if factor < 0:
+            cost += 1
+
+        if cost > MAX_MUL_COST:
+            return None
+
+        results = []
+        product = value
+
+        for kind, shift in plan:
+            if kind == 'shl':
+                results += self.emit_chain([(ir_types.IROp.SHIFT_LEFT, product, shift)])
+            else:
+                addend = product if kind == 'lea' else value
+                add_op = ir_types.IROp.SUBTRACT if kind == 'sub_x' else ir_types.IROp.ADD
+                results += self.emit_chain([(ir_types.IROp.SHIFT_LEFT, product, shift), (add_op, None, addend)])
+
+            product = results[-1].dest
+
+        if factor < 0:
+            results += self.emit_chain([(ir_types.IROp.NEGATE, product, None)])
+
+        return results or [ir_types.IRAssign(None, ir_types.IROp.NOP, value, None)]
+
+    def reduce_exact_quotient(self, value: str, factor: int) -> ir_types.StepList:
+        """
+            Gives the steps for `value * factor`, which replaced an exact quotient of a no-wrap product. NOTE It's no bigger than that product, so it can't wrap either.
+        """
+        return self.reduce_multiply(value, factor) or [ir_types.IRAssign(None, ir_types.IROp.MULTIPLY, value, factor, True)]
+
+    def reduce_divide(self, value: str, divisor: int) -> ir_types.StepList | None:
+        if divisor == 0:
+            return None
+
+        if divisor in (1, -1):
+            return [ir_types.IRAssign(None, ir_types.IROp.NOP if divisor == 1 else ir_types.IROp.NEGATE, value, None)]
+
+        abs_divisor = abs(divisor)
+
+        if abs_divisor & (abs_divisor - 1) == 0:
+            shift = count_trailing_zeros(abs_divisor)
+
+            # NOTE adding 2^k - 1 to a negative dividend makes the arithmetic shift round toward zero like C division.
+            if shift == 1:
+                ops = [(ir_types.IROp.SHIFT_RIGHT_LOGICAL, value, 31)]
+            else:
+                ops = [(ir_types.IROp.SHIFT_RIGHT, value, 31), (ir_types.IROp.SHIFT_RIGHT_LOGICAL, None, 32 - shift)]
+
+            ops += [(ir_types.IROp.ADD, value, None), (ir_types.IROp.SHIFT_RIGHT, None, shift)]
+        else:
+            magic, shift = get_div_magic(divisor)
+            ops = [(ir_types.IROp.MULTIPLY_HIGH, value, magic)]
+
+            if divisor > 0 and magic < 0:
+                ops.append((ir_types.IROp.ADD, None, value))
+            elif divisor < 0 and magic > 0:
+                ops.append((ir_types.IROp.SUBTRACT, None, value))
+
+            if shift > 0:
+                ops.append((ir_types.IROp.SHIFT_RIGHT, None, shift))
+
+            results = self.emit_chain(ops)
+            quotient = results[-1].dest
+
+            # NOTE adds one to a negative quotient, as the magic product rounds toward negative infinity.
+            return results + self.emit_chain([(ir_types.IROp.SHIFT_RIGHT_LOGICAL, quotient, 31), (ir_types.IROp.ADD, quotient, None)])
+
+        if divisor < 0:
+            ops.append((ir_types.IROp.NEGATE, None, None))
+
+        return self.emit_chain(ops)
@@ -0,0 +1,177 @@
+"""
+    ir_switch.py\n
+    By DrkWithT\n
+    Lowers if-else chains testing one address for equality against distinct constants, as DerkCC has no `switch` yet. Dense chains become a bounds-checked jump table, and sparse ones become a balanced tree of compares.\n
+    Sources:
+    [Branch tables](https://en.wikipedia.org/wiki/Branch_table)
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_ssa import get_leading_phis
+from DerkCC.DCCStages.ir_dce import remove_unreachable_blocks
+from DerkCC.DCCStages.ir_jumps import is_branch_only
+
+## Constants ##
+
+# NOTE shorter chains are left alone, as they take about as many compares as a lowering would.
+MIN_SWITCH_CASES = 4
+
+# NOTE a table's span, from its lowest to highest case, is capped to keep `.rodata` small.
+MAX_TABLE_SPAN = 256
+
+# NOTE the least share of a table's entries that must be real cases, as the rest go to the default.
+MIN_TABLE_DENSITY = 0.5
+
+# NOTE a tree stops splitting at this many cases, tested in a row. It must stay under MIN_SWITCH_CASES, or a leaf could be lowered again.
+MAX_LEAF_CASES = 3
+
+## Aliases and Types ##
+
+# NOTE one chain as its tested address, its `(constant, case label)` pairs in test order, and its default label.
+SwitchChain = tuple[str, list[tuple[int, str]], str]
+
+## Utility functions ##
+
+def get_equality_test(step: ir_types.IRStep) -> tuple[str, int] | None:
+    """
+        Gives the address and constant of a conditional jump on `addr == const` or `addr != const`, in either operand order.
+    """
+    if step.get_ir_type() != ir_types.IRType.JUMP_IF or step.op not in (ir_types.IROp.COMPARE_EQ, ir_types.IROp.COMPARE_NEQ):
+        return None
+
+    if type(step.arg0) == str and type(step.arg1) == int:
+        return (step.arg0, step.arg1)
+
+    if type(step.arg0) == int and type(step.arg1) == str:
+        return (step.arg1, step.arg0)
+
+    return None
+
+def is_dense(values: list[int]) -> bool:
+    span = max(values) - min(values) + 1
+
+    return span <= MAX_TABLE_SPAN and len(values) >= span * MIN_TABLE_DENSITY
+
+## Switch Lowering Pass ##
+
+class SwitchLoweringPass:
+    """
+        Finds chains where each test block jumps to its case on a match and otherwise goes on to a block holding only the next test, whose only way in is that edge. The chain's first test is replaced and the later test blocks are left unreachable.\n
+        NOTE This runs late, after jump threading has cleaned up the chains IREmitter makes, since SCCP and value ranges learn nothing from the IRJumpTable it may leave beyond which of its targets run. Chains whose targets begin with phis are skipped, as lowering changes their preds.
+    """
+    name = 'switch'
+
+    def __init__(self, min_cases: int = MIN_SWITCH_CASES):
+        self.min_cases = min_cases
+        self.table_counts: dict[str, int] = {}
+        self.tree_counts: dict[str, int] = {}
+
+    def run(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int:
+        table_count = 0
+        tree_count = 0
+        block_id = 0
+
+        while block_id < len(cfg.blocks):
+            chain = self.find_chain(cfg, block_id)
+
+            if chain is None:
+                block_id += 1
+                continue
+
+            head = cfg.blocks[block_id]
+            addr, cases, default = chain
+
+            if is_dense([value for value, _ in cases]):
+                head.steps[-1] = self.make_table(addr, cases, default)
+                table_count += 1
+            else:
+                tree_blocks = self.make_tree(cfg, addr, sorted(cases), default)
+                head.steps[-1:] = tree_blocks[0].steps
+                cfg.blocks[block_id + 1:block_id + 1] = tree_blocks[1:]
+                tree_count += 1
+
+            cfg.recompute_edges()
+            remove_unreachable_blocks(cfg)
+            block_id = cfg.blocks.index(head) + 1
+
+        self.table_counts[cfg.func_name] = table_count
+        self.tree_counts[cfg.func_name] = tree_count
+
+        return table_count + tree_count
+
+    def find_chain(self, cfg: ir_cfg.ControlFlowGraph, block_id: int) -> SwitchChain | None:
+        terminator = cfg.blocks[block_id].get_terminator()
+        head_test = None if terminator is None else get_equality_test(terminator)
+
+        if head_test is None:
+            return None
+
+        addr = head_test[0]
+        cases: list[tuple[int, str]] = []
+        test_id = block_id
+
+        while True:
+            test_step = cfg.blocks[test_id].steps[-1]
+            test = get_equality_test(test_step)
+
+            # NOTE a repeated constant can never match again, so its test just starts the default.
+            if test is None or test[0] != addr or test[1] in [value for value, _ in cases] or test_id + 1 >= len(cfg.blocks):
+                break
+
+            taken_id = cfg.get_block_id(test_step.target)
+
+            if test_step.op == ir_types.IROp.COMPARE_EQ:
+                case_id, next_id = taken_id, test_id + 1
+            else:
+                case_id, next_id = test_id + 1, taken_id
+
+            if case_id == next_id:
+                break
+
+            cases.append((test[1], cfg.ensure_label(case_id)))
+            next_block = cfg.blocks[next_id]
+
+            if not is_branch_only(next_block) or next_block.preds != [test_id]:
+                test_id = next_id
+                break
+
+            test_id = next_id
+
+        if len(cases) < self.min_cases:
+            return None
+
+        default = cfg.ensure_label(test_id)
+
+        if any(get_leading_phis(cfg.blocks[cfg.get_block_id(label)]) for label in [default, *[label for _, label in cases]]):
+            return None
+
+        return (addr, cases, default)
+
+    def make_table(self, addr: str, cases: list[tuple[int, str]], default: str) -> ir_types.IRJumpTable:
+        low = min(value for value, _ in cases)
+        targets = [default] * (max(value for value, _ in cases) - low + 1)
+
+        for value, label in cases:
+            targets[value - low] = label
+
+        return ir_types.IRJumpTable(addr, low, targets, default)
+
+    def make_tree(self, cfg: ir_cfg.ControlFlowGraph, addr: str, cases: list[tuple[int, str]], default: str) -> list[ir_cfg.BasicBlock]:
+        """
+            Lays out a tree over cases sorted by value: each node jumps to its upper half on `addr >= middle` and falls into its lower half. The first block is unlabeled, as it goes into the chain's head block.
+        """
+        if len(cases) <= MAX_LEAF_CASES:
+            results = [ir_cfg.BasicBlock(None, [ir_types.IRJumpIf(label, ir_types.IROp.COMPARE_EQ, addr, value)]) for value, label in cases]
+            results.append(ir_cfg.BasicBlock(None, [ir_types.IRJump(default)]))
+
+            return results
+
+        middle = len(cases) // 2
+        upper_blocks = self.make_tree(cfg, addr, cases[middle:], default)
+        upper_blocks[0].label = cfg.new_label()
+
+        node = ir_cfg.BasicBlock(None, [ir_types.IRJumpIf(upper_blocks[0].label, ir_types.IROp.COMPARE_GTE, addr, cases[middle][0])])
+
+        return [node] + self.make_tree(cfg, addr, cases[:middle], default) + upper_blocks
@@ -0,0 +1,171 @@
+"""
+    ir_tailcall.py\n
+    By DrkWithT\n
+    Finds calls whose result is returned as is, like `return f(...)`. A function calling itself there loops back to its body with its params reassigned, and any other such call becomes an IRTailCall for GASEmitter to emit as a `jmp`.
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+from DerkCC.DCCStages.ir_copyprop import is_plain_copy
+from DerkCC.DCCStages.ir_inline import find_call_args
+
+## Utility functions ##
+
+def get_return_size(cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo) -> int | None:
+    for block in cfg.blocks:
+        terminator = block.get_terminator()
+
+        if terminator is not None and terminator.get_ir_type() == ir_types.IRType.RETURN:
+            return ir_gen.get_local_size(func_info, terminator.result_addr) if terminator.result_addr is not None else None
+
+    return None
+
+def is_tail_call(cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo, block_id: int, call_i: int, result_size: int) -> bool:
+    """
+        Checks that a call's result only passes through same-size copies and jumps before being returned, so returning it directly changes nothing.
+    """
+    block = cfg.blocks[block_id]
+    step_i = call_i + 1
+
+    if step_i >= len(block.steps) or block.steps[step_i].get_ir_type() != ir_types.IRType.STORE_YIELD:
+        return False
+
+    value = block.steps[step_i].target
+    step_i += 1
+    seen = {block_id}
+
+    while True:
+        steps = cfg.blocks[block_id].steps
+
+        if step_i >= len(steps):
+            # NOTE the path falls into the next block.
+            block_id += 1
+            step_i = 0
+
+            if block_id >= len(cfg.blocks) or block_id in seen:
+                return False
+
+            seen.add(block_id)
+            continue
+
+        step = steps[step_i]
+        step_type = step.get_ir_type()
+
+        if is_plain_copy(step) and step.arg0 == value and ir_gen.get_local_size(func_info, step.dest) == result_size:
+            value = step.dest
+        elif step_type == ir_types.IRType.JUMP:
+            block_id = cfg.get_block_id(step.target)
+            step_i = 0
+
+            if block_id in seen:
+                return False
+
+            seen.add(block_id)
+            continue
+        elif step_type == ir_types.IRType.RETURN:
+            return step.result_addr == value and ir_gen.get_local_size(func_info, value) == result_size
+        else:
+            return False
+
+        step_i += 1
+
+## Tail Call Pass ##
+
+class TailCallPass:
+    """
+        Rewrites calls in tail position. A self call copies its args into fresh temporaries, then those into the params, before jumping past the entry's IRLoadParam steps, so recursion like `gcd` runs in one stack frame. Calls to other functions keep their IRPushArg steps but end the block as an IRTailCall.\n
+        NOTE A call is only a tail call when the callee's result size matches every address it is copied through, as GASEmitter would otherwise need to truncate or extend the value after the call.
+    """
+    name = 'tail-call'
+
+    def __init__(self):
+        self.site_count = 0
+        self.self_counts: dict[str, int] = {}
+        self.sibling_counts: dict[str, int] = {}
+
+    def run_program(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable) -> int:
+        result_sizes = {cfg.func_name: get_return_size(cfg, funcs[cfg.func_name]) for cfg in cfgs}
+        change_count = 0
+
+        for cfg in cfgs:
+            change_count += self.rewrite_tail_calls(cfg, funcs[cfg.func_name], result_sizes)
+
+        return change_count
+
+    def rewrite_tail_calls(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo, result_sizes: dict[str, int | None]) -> int:
+        params = [entry for entry in func_info if entry[2]]
+        body_label = None
+        self_count = 0
+        sibling_count = 0
+
+        for block_id, block in enumerate(cfg.blocks):
+            # NOTE only the last call of a block can be followed by nothing but copies and jumps.
+            call_ids = [step_i for step_i, step in enumerate(block.steps) if step.get_ir_type() == ir_types.IRType.FUNC_CALL]
+
+            if not call_ids:
+                continue
+
+            call_i = call_ids[-1]
+            callee = block.steps[call_i].callee
+            result_size = result_sizes.get(callee)
+
+            if result_size is None or not is_tail_call(cfg, func_info, block_id, call_i, result_size):
+                continue
+
+            if callee != cfg.func_name:
+                block.steps[call_i:] = [ir_types.IRTailCall(callee)]
+                sibling_count += 1
+                continue
+
+            arg_ids = find_call_args(block.steps, call_i, len(params))
+
+            if arg_ids is None:
+                continue
+
+            if body_label is None:
+                body_label = cfg.new_label()
+
+            self.loop_self_call(block, call_i, arg_ids, params, func_info, body_label)
+            self_count += 1
+
+        if body_label is not None:
+            self.split_entry(cfg, body_label)
+
+        if self_count + sibling_count > 0:
+            cfg.recompute_edges()
+
+        self.self_counts[cfg.func_name] = self_count
+        self.sibling_counts[cfg.func_name] = sibling_count
+
+        return self_count + sibling_count
+
+    def loop_self_call(self, block: ir_cfg.BasicBlock, call_i: int, arg_ids: list[int], params: ir_gen.FuncInfo, func_info: ir_gen.FuncInfo, body_label: str):
+        """
+            Replaces a self call with a parallel assignment of its args to the params plus a jump to the function body.
+        """
+        prefix = f'tail.{self.site_count}'
+        self.site_count += 1
+        param_copies = []
+
+        # NOTE args may read params assigned before them, so all of them are saved first.
+        for (datatype, param, _), arg_i in zip(params, arg_ids):
+            temp = f'{prefix}.{param}'
+            block.steps[arg_i] = ir_types.IRAssign(temp, ir_types.IROp.NOP, block.steps[arg_i].arg, None)
+            param_copies.append(ir_types.IRAssign(param, ir_types.IROp.NOP, temp, None))
+            func_info.append((datatype, temp, False))
+
+        block.steps[call_i:] = param_copies + [ir_types.IRJump(body_label)]
+
+    def split_entry(self, cfg: ir_cfg.ControlFlowGraph, body_label: str):
+        """
+            Moves the entry's steps after its IRLoadParam ones into a new block, which self tail calls jump to, as the params must not be reloaded from their registers.
+        """
+        entry = cfg.get_entry()
+        load_count = 0
+
+        while load_count < len(entry.steps) and entry.steps[load_count].get_ir_type() == ir_types.IRType.LOAD_PARAM:
+            load_count += 1
+
+        cfg.blocks.insert(1, ir_cfg.BasicBlock(body_label, entry.steps[load_count:]))
+        entry.steps = entry.steps[:load_count]
@@ -21,6 +21,9 @@ class IRType(Enum):
     LOAD_PARAM = auto()   # StoreParam <addr>
     ADDR_ASSIGN = auto()   # <addr> = <addr> <op> <addr>
     LOAD_CONSTANT = auto() # $<integral>
+    PHI = auto()           # <addr> = Phi <pred-label: addr>... (SSA only)
+    TAIL_CALL = auto()     # TailCall <name>
+    JUMP_TABLE = auto()    # JumpTable <addr> <low> <default> <name>...
 
 class IROp(Enum):
     CALL = auto()
@@ -37,6 +40,10 @@ class IROp(Enum):
     COMPARE_GTE = auto()
     SET_VALUE = auto()
     NOP = auto()
+    SHIFT_LEFT = auto()          # <addr> = <addr> << <count>
+    SHIFT_RIGHT = auto()         # <addr> = <addr> >> <count>, copying the sign bit
+    SHIFT_RIGHT_LOGICAL = auto() # <addr> = <addr> >> <count>, filling with zeros
+    MULTIPLY_HIGH = auto()       # <addr> = upper 32 bits of the signed 64-bit product
 
 AST_OP_IR_MATCHES = {
     "OP_CALL": IROp.CALL,
@@ -66,6 +73,29 @@ AST_OP_IR_INVERSES = {
     "OP_GTE": IROp.COMPARE_LT
 }
 
+# NOTE maps a comparison to its negation, like AST_OP_IR_INVERSES does for AST ops.
+IR_OP_INVERSES = {
+    IROp.COMPARE_EQ: IROp.COMPARE_NEQ,
+    IROp.COMPARE_NEQ: IROp.COMPARE_EQ,
+    IROp.COMPARE_LT: IROp.COMPARE_GTE,
+    IROp.COMPARE_LTE: IROp.COMPARE_GT,
+    IROp.COMPARE_GT: IROp.COMPARE_LTE,
+    IROp.COMPARE_GTE: IROp.COMPARE_LT
+}
+
+# NOTE these give the same result with their operands swapped.
+COMMUTATIVE_OPS = (IROp.ADD, IROp.MULTIPLY, IROp.MULTIPLY_HIGH, IROp.COMPARE_EQ, IROp.COMPARE_NEQ)
+
+# NOTE maps a comparison to the one giving the same result with swapped operands: `a < b` is `b > a`.
+SWAPPED_COMPARES = {
+    IROp.COMPARE_EQ: IROp.COMPARE_EQ,
+    IROp.COMPARE_NEQ: IROp.COMPARE_NEQ,
+    IROp.COMPARE_LT: IROp.COMPARE_GT,
+    IROp.COMPARE_LTE: IROp.COMPARE_GTE,
+    IROp.COMPARE_GT: IROp.COMPARE_LT,
+    IROp.COMPARE_GTE: IROp.COMPARE_LTE
+}
+
 DATATYPE_SIZES = {
     "CHAR": 1,
     "INT": 4,
@@ -73,17 +103,115 @@ DATATYPE_SIZES = {
     "UNKNOWN": 0
 }
 
+# NOTE maps IR addresses to replacement addresses or constants for IRStep.replace_uses().
+UseSubstitutes = dict[str, str | int]
+
+## Utility functions ##
+
+def wrap_int(value: int, size: int = 4) -> int:
+    """
+        Truncates a value to a signed integer of `size` bytes, like storing it into a C object of that size.
+    """
+    bits = size * 8
+    value &= (1 << bits) - 1
+
+    if value >= 1 << (bits - 1):
+        value -= 1 << bits
+
+    return value
+
+def fold_ir_op(op: IROp, arg0: int, arg1: int | None) -> int | None:
+    """
+        Evaluates an IR operation on constants with 32-bit signed semantics. Gives `None` when the result can't be known at compile time, e.g. division by zero.
+    """
+    match op:
+        case IROp.NOP:
+            return wrap_int(arg0)
+        case IROp.NEGATE:
+            return wrap_int(-arg0)
+        case IROp.ADD:
+            return wrap_int(arg0 + arg1)
+        case IROp.SUBTRACT:
+            return wrap_int(arg0 - arg1)
+        case IROp.MULTIPLY:
+            return wrap_int(arg0 * arg1)
+        case IROp.DIVIDE:
+            # NOTE C division truncates toward zero, and INT_MIN / -1 traps in idiv.
+            if arg1 == 0 or wrap_int(arg0) == -2**31 and arg1 == -1:
+                return None
+
+            quotient = abs(arg0) // abs(arg1)
+            return wrap_int(quotient if (arg0 < 0) == (arg1 < 0) else -quotient)
+        case IROp.SHIFT_LEFT:
+            return wrap_int(arg0 << arg1)
+        case IROp.SHIFT_RIGHT:
+            return wrap_int(wrap_int(arg0) >> arg1)
+        case IROp.SHIFT_RIGHT_LOGICAL:
+            return wrap_int((arg0 & 0xFFFFFFFF) >> arg1)
+        case IROp.MULTIPLY_HIGH:
+            return wrap_int((wrap_int(arg0) * wrap_int(arg1)) >> 32)
+        case IROp.COMPARE_EQ:
+            return int(arg0 == arg1)
+        case IROp.COMPARE_NEQ:
+            return int(arg0 != arg1)
+        case IROp.COMPARE_LT:
+            return int(arg0 < arg1)
+        case IROp.COMPARE_LTE:
+            return int(arg0 <= arg1)
+        case IROp.COMPARE_GT:
+            return int(arg0 > arg1)
+        case IROp.COMPARE_GTE:
+            return int(arg0 >= arg1)
+
+    return None
+
+def substitute_use(item: str | int | None, substitutes: UseSubstitutes) -> str | int | None:
+    if type(item) == str and item in substitutes:
+        return substitutes[item]
+
+    return item
+
+## IR models ##
+
 class IRStep:
     def get_ir_type(self) -> IRType:
         pass
 
+    def get_def_addr(self) -> str | None:
+        """
+            Gives the IR address this step writes, if any.
+        """
+        return None
+
+    def set_def_addr(self, addr: str):
+        pass
+
+    def get_use_addrs(self) -> list[str]:
+        """
+            Gives the IR addresses this step reads. Constants are left out.
+        """
+        return []
+
+    def replace_uses(self, substitutes: UseSubstitutes):
+        """
+            Rewrites read addresses by `substitutes`. Operands that can't hold an immediate only take address replacements.
+        """
+        pass
+
+    def get_jump_targets(self) -> list[str]:
+        """
+            Gives the labels this step may jump to, without repeats. Fallthrough is left out.
+        """
+        return []
+
+    def replace_jump_targets(self, renames: dict[str, str]):
+        pass
+
     def accept_visitor(self, visitor) -> "any":
         pass
 
 StepList = list[IRStep]
 
-## IR models ##
-
 @dataclasses.dataclass
 class IRLabel(IRStep):
     title: str
@@ -96,11 +224,23 @@ class IRLabel(IRStep):
 
 @dataclasses.dataclass
 class IRReturn(IRStep):
-    result_addr: str
+    """
+        NOTE `result_addr` is `None` when a void function returns.
+    """
+    result_addr: str | None
 
     def get_ir_type(self) -> IRType:
         return IRType.RETURN
 
+    def get_use_addrs(self) -> list[str]:
+        return [self.result_addr] if type(self.result_addr) == str else []
+
+    def replace_uses(self, substitutes: UseSubstitutes):
+        replacement = substitute_use(self.result_addr, substitutes)
+
+        if type(replacement) == str:
+            self.result_addr = replacement
+
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_return(self)
 
@@ -111,6 +251,12 @@ class IRJump(IRStep):
     def get_ir_type(self) -> IRType:
         return IRType.JUMP
 
+    def get_jump_targets(self) -> list[str]:
+        return [self.target]
+
+    def replace_jump_targets(self, renames: dict[str, str]):
+        self.target = renames.get(self.target, self.target)
+
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_jump(self)
 
@@ -124,9 +270,62 @@ class IRJumpIf(IRStep):
     def get_ir_type(self) -> IRType:
         return IRType.JUMP_IF
 
+    def get_use_addrs(self) -> list[str]:
+        return [arg for arg in (self.arg0, self.arg1) if type(arg) == str]
+
+    def replace_uses(self, substitutes: UseSubstitutes):
+        self.arg0 = substitute_use(self.arg0, substitutes)
+        self.arg1 = substitute_use(self.arg1, substitutes)
+
+    def get_jump_targets(self) -> list[str]:
+        return [self.target]
+
+    def replace_jump_targets(self, renames: dict[str, str]):
+        self.target = renames.get(self.target, self.target)
+
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_jump_if(self)
 
+@dataclasses.dataclass
+class IRJumpTable(IRStep):
+    """
+        Jumps to `targets[arg - low]` when `arg` is in that range, else to `default`. Like IRJump, it never falls through. Only SwitchLoweringPass makes these, so earlier passes don't see them.
+    """
+    arg: str
+    low: int
+    targets: list[str]
+    default: str
+
+    def get_ir_type(self) -> IRType:
+        return IRType.JUMP_TABLE
+
+    def get_use_addrs(self) -> list[str]:
+        return [self.arg]
+
+    def replace_uses(self, substitutes: UseSubstitutes):
+        replacement = substitute_use(self.arg, substitutes)
+
+        if type(replacement) == str:
+            self.arg = replacement
+
+    def get_jump_targets(self) -> list[str]:
+        return list(dict.fromkeys([*self.targets, self.default]))
+
+    def get_target(self, value: int) -> str:
+        """
+            Gives the label this table jumps to when its arg holds `value`.
+        """
+        offset = value - self.low
+
+        return self.targets[offset] if 0 <= offset < len(self.targets) else self.default
+
+    def replace_jump_targets(self, renames: dict[str, str]):
+        self.targets = [renames.get(target, target) for target in self.targets]
+        self.default = renames.get(self.default, self.default)
+
+    def accept_visitor(self, visitor) -> "any":
+        return visitor.visit_jump_table(self)
+
 @dataclasses.dataclass
 class IRPushArg(IRStep):
     arg: str | int
@@ -136,6 +335,13 @@ class IRPushArg(IRStep):
     def get_ir_type(self) -> IRType:
         return IRType.ARGV_PUSH
 
+    def get_use_addrs(self) -> list[str]:
+        return [self.arg] if type(self.arg) == str else []
+
+    def replace_uses(self, substitutes: UseSubstitutes):
+        self.arg = substitute_use(self.arg, substitutes)
+        self.immediate = type(self.arg) == int
+
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_push_arg(self)
 
@@ -149,6 +355,19 @@ class IRCallFunc(IRStep):
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_call_func(self)
 
+@dataclasses.dataclass
+class IRTailCall(IRStep):
+    """
+        Calls a function in place of returning, so the callee's result goes straight to the caller's caller. Like IRReturn, it ends its function's path.
+    """
+    callee: str
+
+    def get_ir_type(self) -> IRType:
+        return IRType.TAIL_CALL
+
+    def accept_visitor(self, visitor) -> "any":
+        return visitor.visit_tail_call(self)
+
 @dataclasses.dataclass
 class IRStoreYield(IRStep):
     target: str
@@ -156,6 +375,12 @@ class IRStoreYield(IRStep):
     def get_ir_type(self) -> IRType:
         return IRType.STORE_YIELD
 
+    def get_def_addr(self) -> str | None:
+        return self.target
+
+    def set_def_addr(self, addr: str):
+        self.target = addr
+
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_store_yield(self)
 
@@ -166,19 +391,42 @@ class IRLoadParam(IRStep):
     def get_ir_type(self) -> IRType:
         return IRType.LOAD_PARAM
 
+    def get_def_addr(self) -> str | None:
+        return self.target
+
+    def set_def_addr(self, addr: str):
+        self.target = addr
+
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_load_param(self)
 
 @dataclasses.dataclass
 class IRAssign(IRStep):
+    """
+        NOTE `no_wrap` marks arithmetic proven by ValueRangePass to fit its destination without truncating, which lets StrengthReductionPass divide such a product exactly. It's left out of comparisons, and a pass changing the operation or giving an operand a different value must clear it.
+    """
     dest: str
     op: IROp
     arg0: str | int
     arg1: str | int | None
+    no_wrap: bool = dataclasses.field(default=False, compare=False, repr=False)
 
     def get_ir_type(self) -> IRType:
         return IRType.ADDR_ASSIGN
 
+    def get_def_addr(self) -> str | None:
+        return self.dest
+
+    def set_def_addr(self, addr: str):
+        self.dest = addr
+
+    def get_use_addrs(self) -> list[str]:
+        return [arg for arg in (self.arg0, self.arg1) if type(arg) == str]
+
+    def replace_uses(self, substitutes: UseSubstitutes):
+        self.arg0 = substitute_use(self.arg0, substitutes)
+        self.arg1 = substitute_use(self.arg1, substitutes)
+
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_assign(self)
 
@@ -190,5 +438,38 @@ class IRLoadConst(IRStep):
     def get_ir_type(self) -> IRType:
         return IRType.LOAD_CONSTANT
 
+    def get_def_addr(self) -> str | None:
+        return self.addr
+
+    def set_def_addr(self, addr: str):
+        self.addr = addr
+
     def accept_visitor(self, visitor) -> "any":
         return visitor.visit_load_const(self)
+
+@dataclasses.dataclass
+class IRPhi(IRStep):
+    """
+        NOTE Only exists while a function is in SSA form, and always leads its block. Each incoming value is keyed by its predecessor block's label.
+    """
+    dest: str
+    args: dict[str, str | int]
+
+    def get_ir_type(self) -> IRType:
+        return IRType.PHI
+
+    def get_def_addr(self) -> str | None:
+        return self.dest
+
+    def set_def_addr(self, addr: str):
+        self.dest = addr
+
+    def get_use_addrs(self) -> list[str]:
+        return [arg for arg in self.args.values() if type(arg) == str]
+
+    def replace_uses(self, substitutes: UseSubstitutes):
+        for pred_label in self.args:
+            self.args[pred_label] = substitute_use(self.args[pred_label], substitutes)
+
+    def accept_visitor(self, visitor) -> "any":
+        return visitor.visit_phi(self)
@@ -19,6 +19,9 @@ class IRVisitor:
     def visit_jump_if(self, step: ir_bits.IRStep) -> "any":
         pass
 
+    def visit_jump_table(self, step: ir_bits.IRStep) -> "any":
+        pass
+
     def visit_push_arg(self, step: ir_bits.IRStep) -> "any":
         pass
 
@@ -31,8 +34,14 @@ class IRVisitor:
     def visit_call_func(self, step: ir_bits.IRStep) -> "any":
         pass
 
+    def visit_tail_call(self, step: ir_bits.IRStep) -> "any":
+        pass
+
     def visit_assign(self, step: ir_bits.IRStep) -> "any":
         pass
 
     def visit_load_const(self, step: ir_bits.IRStep) -> "any":
         pass
+
+    def visit_phi(self, step: ir_bits.IRStep) -> "any":
+        pass
@@ -0,0 +1,54 @@
+"""
+    mir_callconv.py\n
+    By DrkWithT\n
+    Picks each function's calling convention and works out which registers its calls clobber. Exported functions keep System V, while functions only called from inside the program take two more args in registers, skip the variadic %al count, and save no registers, as their callers are told exactly which registers they write instead.\n
+    Sources:
+    [x86 calling conventions](https://en.wikipedia.org/wiki/X86_calling_conventions)
+"""
+
+import DerkCC.DCCStages.mir_types as mir
+from DerkCC.DCCStages.ir_callgraph import CallGraph, EXPORTED_ROOTS, get_reachable_funcs, get_recursive_funcs
+from DerkCC.DCCStages.mir_regalloc import ALLOCATABLE_REGS, SCRATCH_REG, get_written_regs
+
+## Constants ##
+
+# NOTE every register a function may write, in the order clobber sets are listed.
+WRITABLE_REGS = (*ALLOCATABLE_REGS, SCRATCH_REG)
+
+## Utility functions ##
+
+def choose_conventions(call_graph: CallGraph, roots = EXPORTED_ROOTS) -> dict[str, mir.CallingConv]:
+    """
+        Gives each function of the call graph its convention. Only functions a root reaches are internal, as nothing in the program calls the rest.\n
+        NOTE When none of the roots is defined, as in a file of helpers only, every function may be called from outside, so all keep System V.
+    """
+    if not any(root in call_graph for root in roots):
+        return {func_name: mir.SYSV_CONV for func_name in call_graph}
+
+    internals = get_reachable_funcs(call_graph, roots) - set(roots)
+    recursives = get_recursive_funcs(call_graph)
+    results = {}
+
+    for func_name in call_graph:
+        if func_name not in internals:
+            results[func_name] = mir.SYSV_CONV
+        elif func_name in recursives:
+            results[func_name] = mir.FAST_SAVED_CONV
+        else:
+            results[func_name] = mir.FAST_CONV
+
+    return results
+
+def get_assumed_clobbers(conv: mir.CallingConv) -> tuple[str, ...]:
+    """
+        Gives the registers a call must assume a callee of `conv` overwrites when its body isn't allocated yet or isn't in the program.
+    """
+    return tuple(reg for reg in WRITABLE_REGS if reg not in conv.preserved_regs)
+
+def get_clobbered_regs(mfunc: mir.MFunction) -> tuple[str, ...]:
+    """
+        Gives the registers an allocated function can overwrite: all it or its callees write, except those its convention keeps.
+    """
+    written_regs = get_written_regs(mfunc)
+
+    return tuple(reg for reg in WRITABLE_REGS if reg in written_regs and reg not in mfunc.conv.preserved_regs)
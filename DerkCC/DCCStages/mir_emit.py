@@ -0,0 +1,134 @@
+"""
+    mir_emit.py\n
+    By DrkWithT\n
+    Generates GNU assembler for x64 through machine IR: instruction selection, register allocation, frame lowering, and a peephole cleanup run on real instructions before the final print.
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+import DerkCC.DCCStages.mir_types as mir
+from DerkCC.DCCStages.gas_gen import ASMLines, roundup_offset
+from DerkCC.DCCStages.ir_callgraph import EXPORTED_ROOTS, get_call_graph, get_bottom_up_order
+from DerkCC.DCCStages.mir_callconv import choose_conventions, get_clobbered_regs
+from DerkCC.DCCStages.mir_select import InstructionSelector
+from DerkCC.DCCStages.mir_regalloc import GraphColorAllocator, FRAME_REG
+
+## Constants ##
+
+STACK_REG = '%rsp'
+
+# NOTE the stack pointer must be 16-byte aligned at each call.
+STACK_ALIGN = 16
+
+## Utility functions ##
+
+def lower_frame(mfunc: mir.MFunction):
+    """
+        Adds the prologue and an epilogue before each exit. Spill slots sit just below the saved %rbp, with the callee-saved registers pushed under them.
+    """
+    frame_reg = mir.PhysReg(FRAME_REG)
+    stack_reg = mir.PhysReg(STACK_REG)
+    saved_bytes = 8 * len(mfunc.saved_regs)
+
+    # NOTE %rsp is 16-byte aligned once %rbp is pushed, so the slots and saved registers together keep that.
+    frame_size = roundup_offset(mfunc.frame_size + saved_bytes, STACK_ALIGN) - saved_bytes
+    prologue = [mir.MInstr(mir.MOp.PUSH, [frame_reg], 8), mir.MInstr(mir.MOp.MOV, [stack_reg, frame_reg], 8)]
+
+    if frame_size > 0:
+        prologue.append(mir.MInstr(mir.MOp.SUB, [mir.Immediate(frame_size), stack_reg], 8))
+
+    prologue.extend(mir.MInstr(mir.MOp.PUSH, [reg], 8) for reg in mfunc.saved_regs)
+
+    epilogue = [mir.MInstr(mir.MOp.POP, [reg], 8) for reg in reversed(mfunc.saved_regs)]
+    epilogue.append(mir.MInstr(mir.MOp.MOV, [frame_reg, stack_reg], 8))
+    epilogue.append(mir.MInstr(mir.MOp.POP, [frame_reg], 8))
+
+    for block in mfunc.blocks:
+        instrs = []
+
+        for instr in block.instrs:
+            if instr.op in (mir.MOp.RET, mir.MOp.TAIL_JMP):
+                instrs.extend(mir.MInstr(step.op, list(step.operands), step.size) for step in epilogue)
+
+            instrs.append(instr)
+
+        block.instrs = instrs
+
+    mfunc.blocks[0].instrs[0:0] = prologue
+
+def drop_redundant_instrs(mfunc: mir.MFunction) -> int:
+    """
+        Drops copies of a register into itself and jumps to the next block, giving how many went.\n
+        NOTE A dropped `movl %eax, %eax` would have cleared the upper half of %rax, but every 4-byte register is last written at 4 bytes, which clears it already.
+    """
+    dropped_count = 0
+
+    for block_id, block in enumerate(mfunc.blocks):
+        next_label = mfunc.blocks[block_id + 1].label if block_id + 1 < len(mfunc.blocks) else None
+        instrs = []
+
+        for instr_i, instr in enumerate(block.instrs):
+            if instr.is_move() and instr.operands[0] == instr.operands[1]:
+                dropped_count += 1
+            elif instr.op == mir.MOp.JMP and instr_i == len(block.instrs) - 1 and instr.operands[0].name == next_label:
+                dropped_count += 1
+            else:
+                instrs.append(instr)
+
+        block.instrs = instrs
+
+    return dropped_count
+
+## Machine Emitter ##
+
+class MachineEmitter:
+    """
+        Emits a whole program like GASEmitter, but by lowering each function's CFG to machine IR and allocating its registers before printing. `mfuncs` keeps the finished machine functions in program order.
+
+        NOTE Functions no caller outside the program can reach from `roots` get the fast internal convention of mir_callconv.py. Callees are allocated before their callers, so each call to an internal function only clobbers what that function writes.
+    """
+    func_info: ir_gen.FuncInfoTable
+    roots: tuple[str, ...]
+    selector: InstructionSelector
+    allocator: GraphColorAllocator
+    mfuncs: list[mir.MFunction]
+    dropped_counts: dict[str, int]
+
+    def __init__(self, funcs: ir_gen.FuncInfoTable, roots = EXPORTED_ROOTS):
+        self.func_info = funcs
+        self.roots = tuple(roots)
+        self.selector = InstructionSelector()
+        self.allocator = GraphColorAllocator()
+        self.mfuncs = []
+        self.dropped_counts = {}
+
+    def emit_all(self, steps: ir_types.StepList) -> ASMLines:
+        results = ['# generated by DCC v0.1 alpha\n', '.text\n']
+
+        cfgs = ir_cfg.build_program_cfgs(steps, self.func_info)
+        cfg_table = {cfg.func_name: cfg for cfg in cfgs}
+        call_graph = get_call_graph(cfgs)
+        self.selector.callee_convs = choose_conventions(call_graph, self.roots)
+        mfunc_table = {func_name: self.emit_function(cfg_table[func_name]) for func_name in get_bottom_up_order(call_graph)}
+        self.mfuncs = [mfunc_table[cfg.func_name] for cfg in cfgs]
+
+        for mfunc in self.mfuncs:
+            results.extend(mfunc.to_gas())
+
+        # NOTE marks the stack as not executable, which the linker otherwise warns about.
+        results.append('.section .note.GNU-stack,"",@progbits\n')
+
+        return results
+
+    def emit_function(self, cfg: ir_cfg.ControlFlowGraph) -> mir.MFunction:
+        mfunc = self.selector.select_function(cfg, self.func_info[cfg.func_name], self.selector.get_callee_conv(cfg.func_name))
+        self.allocator.allocate(mfunc)
+
+        # NOTE an exported function could be swapped for another at link time, so calls to it assume all System V allows.
+        if not mfunc.exported:
+            self.selector.callee_clobbers[mfunc.name] = get_clobbered_regs(mfunc)
+        lower_frame(mfunc)
+        self.dropped_counts[mfunc.name] = drop_redundant_instrs(mfunc)
+
+        return mfunc
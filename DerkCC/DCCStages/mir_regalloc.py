@@ -0,0 +1,255 @@
+"""
+    mir_regalloc.py\n
+    By DrkWithT\n
+    Graph coloring register allocation over machine IR. Virtual registers are colored with x86-64 registers or spilled to stack slots, then instructions left with operands x86 can't encode are rewritten through a scratch register.\n
+    Sources:
+    [Register allocation via coloring (Chaitin et al.)](https://doi.org/10.1016/0096-0551(81)90048-5)\n
+    [Improvements to graph coloring register allocation (Briggs et al.)](https://dl.acm.org/doi/10.1145/177492.177575)
+"""
+
+from collections import deque
+import DerkCC.DCCStages.mir_types as mir
+from DerkCC.DCCStages.gas_gen import roundup_offset
+
+## Constants ##
+
+# NOTE caller-saved registers come first, so callee-saved ones are only taken by values live across a call or when the rest run out.
+ALLOCATABLE_REGS = ('%rax', '%rcx', '%rdx', '%rsi', '%rdi', '%r8', '%r9', '%r10', '%rbx', '%r12', '%r13', '%r14', '%r15')
+
+# NOTE never allocated, so spill fixups can always use it.
+SCRATCH_REG = '%r11'
+
+FRAME_REG = '%rbp'
+
+# NOTE these can't write their result to memory.
+REG_DEST_MOPS = (mir.MOp.IMUL, mir.MOp.MOVSX, mir.MOp.MOVZX, mir.MOp.LEA)
+
+## Aliases and Types ##
+
+RegSet = set[mir.Register]
+
+## Utility functions ##
+
+def legalize_instr(instr: mir.MInstr) -> mir.MInstrList:
+    """
+        Gives the instructions doing `instr` once spilled registers became memory operands. An op needing a register destination works in the scratch register, and an op left with two memory operands loads its source there first.
+    """
+    dest = instr.operands[-1] if instr.operands else None
+
+    if instr.op in REG_DEST_MOPS and type(dest) == mir.Memory:
+        scratch = mir.PhysReg(SCRATCH_REG, dest.size)
+        results = []
+
+        if mir.OPERAND_ROLES[instr.op][-1] == mir.OperandRole.USE_DEF:
+            results.append(mir.MInstr(mir.MOp.MOV, [dest, scratch], dest.size))
+
+        instr.operands[-1] = scratch
+        results.append(instr)
+        results.append(mir.MInstr(mir.MOp.MOV, [scratch, dest], dest.size))
+
+        return results
+
+    if len([operand for operand in instr.operands if type(operand) == mir.Memory]) == 2:
+        src = instr.operands[0]
+        scratch = mir.PhysReg(SCRATCH_REG, src.size)
+        instr.operands[0] = scratch
+
+        return [mir.MInstr(mir.MOp.MOV, [src, scratch], src.size), instr]
+
+    return [instr]
+
+def get_written_regs(mfunc: mir.MFunction) -> set[str]:
+    """
+        Gives the names of the physical registers an allocated function writes, counting what its calls clobber.
+    """
+    return {reg.name for instr in mfunc.get_instrs() for reg in instr.get_defs() if type(reg) == mir.PhysReg}
+
+## Liveness ##
+
+class MachineLiveness:
+    """
+        Holds the registers live out of each machine block, virtual and physical alike, solved by a worklist like ir_liveness.LivenessInfo.
+    """
+    live_out: list[RegSet]
+
+    def __init__(self, mfunc: mir.MFunction):
+        block_count = len(mfunc.blocks)
+        use_defs = [self.get_block_use_def(block) for block in mfunc.blocks]
+        live_in = [set() for _ in range(block_count)]
+        self.live_out = [set() for _ in range(block_count)]
+        pending = deque(reversed(range(block_count)))
+        queued = set(pending)
+
+        while pending:
+            block_id = pending.popleft()
+            queued.discard(block_id)
+
+            block_uses, block_defs = use_defs[block_id]
+            new_out = set()
+
+            for succ_id in mfunc.blocks[block_id].succs:
+                new_out |= live_in[succ_id]
+
+            new_in = block_uses | (new_out - block_defs)
+            self.live_out[block_id] = new_out
+
+            if new_in == live_in[block_id]:
+                continue
+
+            live_in[block_id] = new_in
+
+            for pred_id in mfunc.blocks[block_id].preds:
+                if pred_id not in queued:
+                    queued.add(pred_id)
+                    pending.append(pred_id)
+
+    def get_block_use_def(self, block: mir.MBlock) -> tuple[RegSet, RegSet]:
+        uses = set()
+        defs = set()
+
+        for instr in block.instrs:
+            uses.update(reg for reg in instr.get_uses() if reg not in defs)
+            defs.update(instr.get_defs())
+
+        return (uses, defs)
+
+## Graph Coloring Allocator ##
+
+class GraphColorAllocator:
+    """
+        Builds an interference graph of virtual registers, where a physical register written while a virtual one is live rules it out for that one. Nodes are simplified Briggs-style, pushing a spill candidate optimistically when all are constrained, then colored in reverse.\n
+        NOTE A color is picked to match a register the node is copied to or from when possible, so the copy becomes a self move for MachineEmitter to drop. Spill costs just count occurrences, with no loop weighting yet.
+    """
+    name = 'regalloc'
+
+    def __init__(self, reg_names: tuple[str, ...] = ALLOCATABLE_REGS):
+        self.reg_names = reg_names
+        self.spill_counts: dict[str, int] = {}
+        self.adjacent: dict[mir.VirtualReg, set[mir.VirtualReg]] = {}
+        self.forbidden: dict[mir.VirtualReg, set[str]] = {}
+        self.partners: dict[mir.VirtualReg, list[mir.Register]] = {}
+        self.costs: dict[mir.VirtualReg, int] = {}
+
+    def allocate(self, mfunc: mir.MFunction) -> int:
+        self.build_graph(mfunc)
+        colors, spilled = self.color_graph()
+        assignments: dict[mir.VirtualReg, mir.Operand] = {vreg: mir.PhysReg(reg) for vreg, reg in colors.items()}
+        spill_offset = 0
+
+        for vreg in sorted(spilled, key=lambda vreg: vreg.index):
+            slot_size = mfunc.vreg_sizes[vreg.index]
+            spill_offset = roundup_offset(spill_offset + slot_size, slot_size)
+            assignments[vreg] = mir.Memory(-spill_offset, mir.PhysReg(FRAME_REG), size=slot_size)
+
+        for block in mfunc.blocks:
+            instrs = []
+
+            for instr in block.instrs:
+                instr.replace_regs(assignments)
+                instrs.extend(legalize_instr(instr))
+
+            block.instrs = instrs
+
+        # NOTE a register the convention keeps is saved when written here or by a callee that doesn't keep it.
+        written_regs = get_written_regs(mfunc)
+        mfunc.frame_size = spill_offset
+        mfunc.saved_regs = [mir.PhysReg(reg) for reg in mfunc.conv.preserved_regs if reg in written_regs]
+        self.spill_counts[mfunc.name] = len(spilled)
+
+        return len(spilled)
+
+    def build_graph(self, mfunc: mir.MFunction):
+        self.adjacent = {}
+        self.forbidden = {}
+        self.partners = {}
+        self.costs = {}
+        liveness = MachineLiveness(mfunc)
+
+        for instr in mfunc.get_instrs():
+            for reg in instr.get_defs() + instr.get_uses():
+                self.add_node(reg)
+
+        for block_id, block in enumerate(mfunc.blocks):
+            live = set(liveness.live_out[block_id])
+
+            for instr in reversed(block.instrs):
+                defs = instr.get_defs()
+                uses = instr.get_uses()
+
+                # NOTE a copy's source and destination hold the same value, so they don't interfere there.
+                if instr.is_move():
+                    src, dest = instr.operands
+                    live.discard(src)
+                    self.add_partners(src, dest)
+
+                for def_reg in defs:
+                    for live_reg in live:
+                        self.add_edge(def_reg, live_reg)
+
+                live.difference_update(defs)
+                live.update(uses)
+
+    def add_node(self, reg: mir.Register):
+        if type(reg) != mir.VirtualReg:
+            return
+
+        self.adjacent.setdefault(reg, set())
+        self.forbidden.setdefault(reg, set())
+        self.partners.setdefault(reg, [])
+        self.costs[reg] = self.costs.get(reg, 0) + 1
+
+    def add_partners(self, src: mir.Register, dest: mir.Register):
+        if type(src) == mir.VirtualReg:
+            self.partners[src].append(dest)
+
+        if type(dest) == mir.VirtualReg:
+            self.partners[dest].append(src)
+
+    def add_edge(self, first: mir.Register, second: mir.Register):
+        if first == second:
+            return
+
+        if type(first) == mir.VirtualReg and type(second) == mir.VirtualReg:
+            self.adjacent[first].add(second)
+            self.adjacent[second].add(first)
+        elif type(first) == mir.VirtualReg:
+            self.forbidden[first].add(second.name)
+        elif type(second) == mir.VirtualReg:
+            self.forbidden[second].add(first.name)
+
+    def color_graph(self) -> tuple[dict[mir.VirtualReg, str], list[mir.VirtualReg]]:
+        reg_count = len(self.reg_names)
+        remaining = set(self.adjacent)
+        stack = []
+
+        def get_degree(vreg: mir.VirtualReg) -> int:
+            return len(self.adjacent[vreg] & remaining) + len(self.forbidden[vreg] & set(self.reg_names))
+
+        while remaining:
+            trivial = [vreg for vreg in remaining if get_degree(vreg) < reg_count]
+
+            if trivial:
+                vreg = min(trivial, key=lambda vreg: vreg.index)
+            else:
+                vreg = min(remaining, key=lambda vreg: (self.costs[vreg] / get_degree(vreg), vreg.index))
+
+            stack.append(vreg)
+            remaining.remove(vreg)
+
+        colors: dict[mir.VirtualReg, str] = {}
+        spilled = []
+
+        while stack:
+            vreg = stack.pop()
+            taken = self.forbidden[vreg] | {colors[other] for other in self.adjacent[vreg] if other in colors}
+            free_regs = [reg for reg in self.reg_names if reg not in taken]
+
+            if not free_regs:
+                spilled.append(vreg)
+                continue
+
+            partner_regs = [partner.name if type(partner) == mir.PhysReg else colors.get(partner) for partner in self.partners[vreg]]
+            preferred = [reg for reg in partner_regs if reg in free_regs]
+            colors[vreg] = preferred[0] if preferred else free_regs[0]
+
+        return (colors, spilled)
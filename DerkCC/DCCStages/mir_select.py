@@ -0,0 +1,340 @@
+"""
+    mir_select.py\n
+    By DrkWithT\n
+    Instruction selection from a program's IR CFGs into machine IR. Every IR address becomes a virtual register of its size, and each IR step becomes x86-64 instructions in two-address form, leaving register choice to mir_regalloc.py.
+"""
+
+import DerkCC.DCCStages.ir_types as ir_types
+import DerkCC.DCCStages.ir_gen as ir_gen
+import DerkCC.DCCStages.ir_cfg as ir_cfg
+import DerkCC.DCCStages.mir_types as mir
+from DerkCC.DCCStages.gas_gen import RET_REG
+from DerkCC.DCCStages.ir_visitor import IRVisitor
+from DerkCC.DCCStages.mir_callconv import get_assumed_clobbers
+
+## Constants ##
+
+IR_COMPARE_CONDS = {
+    ir_types.IROp.COMPARE_EQ: 'e',
+    ir_types.IROp.COMPARE_NEQ: 'ne',
+    ir_types.IROp.COMPARE_LT: 'l',
+    ir_types.IROp.COMPARE_LTE: 'le',
+    ir_types.IROp.COMPARE_GT: 'g',
+    ir_types.IROp.COMPARE_GTE: 'ge'
+}
+
+# NOTE IR ops done by one two-address instruction on a copy of the first operand.
+IR_TWO_ADDRESS_MOPS = {
+    ir_types.IROp.ADD: mir.MOp.ADD,
+    ir_types.IROp.SUBTRACT: mir.MOp.SUB,
+    ir_types.IROp.MULTIPLY: mir.MOp.IMUL,
+    ir_types.IROp.SHIFT_LEFT: mir.MOp.SHL,
+    ir_types.IROp.SHIFT_RIGHT: mir.MOp.SAR,
+    ir_types.IROp.SHIFT_RIGHT_LOGICAL: mir.MOp.SHR
+}
+
+SHIFT_OPS = (ir_types.IROp.SHIFT_LEFT, ir_types.IROp.SHIFT_RIGHT, ir_types.IROp.SHIFT_RIGHT_LOGICAL)
+
+## Utility functions ##
+
+def get_phys_reg(name: str, size: int = 4) -> mir.PhysReg:
+    return mir.PhysReg(name, size)
+
+## Instruction Selector ##
+
+class InstructionSelector(IRVisitor):
+    """
+        Visits the steps of each IR block, appending machine instructions to the matching MBlock. Arithmetic is done at 32 bits like C's integer promotion: `char` operands are sign-extended first, and a `char` result keeps the low byte.\n
+        NOTE An IRPushArg's value is copied into a new virtual register at the push, as a compacted address may be written again before the call, and only moved into its argument register at the call, as lowering a later arg may need the registers earlier args go in.
+
+        Calls follow the callee's entry in `callee_convs`, System V if it has none, and define the registers its `callee_clobbers` entry lists, or all its convention allows when it has none.
+    """
+    callee_convs: dict[str, mir.CallingConv]
+    callee_clobbers: dict[str, tuple[str, ...]]
+    func_info: ir_gen.FuncInfo
+    mfunc: mir.MFunction
+    addr_regs: dict[str, mir.VirtualReg]
+    pending_args: list[mir.Operand]
+    param_count: int
+    instrs: mir.MInstrList
+    jump_table_count: int
+
+    def __init__(self):
+        super().__init__()
+        self.callee_convs = {}
+        self.callee_clobbers = {}
+        self.func_info = None
+        self.mfunc = None
+        self.addr_regs = {}
+        self.pending_args = []
+        self.param_count = 0
+        self.instrs = None
+        self.jump_table_count = 0
+
+    def select_program(self, cfgs: list[ir_cfg.ControlFlowGraph], funcs: ir_gen.FuncInfoTable) -> list[mir.MFunction]:
+        return [self.select_function(cfg, funcs[cfg.func_name]) for cfg in cfgs]
+
+    def select_function(self, cfg: ir_cfg.ControlFlowGraph, func_info: ir_gen.FuncInfo, conv: mir.CallingConv = mir.SYSV_CONV) -> mir.MFunction:
+        self.func_info = func_info
+        self.mfunc = mir.MFunction(cfg.func_name, conv, conv == mir.SYSV_CONV)
+        self.addr_regs = {}
+        self.pending_args = []
+        self.param_count = 0
+
+        for block in cfg.blocks:
+            mblock = mir.MBlock(block.label, [], list(block.preds), list(block.succs))
+            self.mfunc.blocks.append(mblock)
+            self.instrs = mblock.instrs
+
+            for step in block.steps:
+                step.accept_visitor(self)
+
+        return self.mfunc
+
+    def get_callee_conv(self, callee: str) -> mir.CallingConv:
+        return self.callee_convs.get(callee, mir.SYSV_CONV)
+
+    def get_callee_clobbers(self, callee: str) -> tuple[mir.PhysReg, ...]:
+        clobbers = self.callee_clobbers.get(callee, get_assumed_clobbers(self.get_callee_conv(callee)))
+
+        return tuple(get_phys_reg(reg, 8) for reg in clobbers)
+
+    def emit(self, op: mir.MOp, operands: list[mir.Operand], size: int = 4, **extras):
+        self.instrs.append(mir.MInstr(op, operands, size, **extras))
+
+    def get_vreg(self, ir_addr: str) -> mir.VirtualReg:
+        if ir_addr not in self.addr_regs:
+            self.addr_regs[ir_addr] = self.mfunc.new_vreg(ir_gen.get_local_size(self.func_info, ir_addr))
+
+        return self.addr_regs[ir_addr]
+
+    def get_operand(self, item: str | int) -> mir.Operand:
+        return mir.Immediate(ir_types.wrap_int(item)) if type(item) == int else self.get_vreg(item)
+
+    def get_int_operand(self, item: str | int) -> mir.Operand:
+        """
+            Gives an IR operand as a 32-bit value, sign-extending a `char` into a new virtual register.
+        """
+        operand = self.get_operand(item)
+
+        if type(operand) == mir.VirtualReg and operand.size == 1:
+            result = self.mfunc.new_vreg(4)
+            self.emit(mir.MOp.MOVSX, [operand, result])
+            return result
+
+        return operand
+
+    def get_reg_operand(self, item: str | int) -> mir.Operand:
+        """
+            Gives an IR operand as a 32-bit register, for instructions taking no immediate.
+        """
+        operand = self.get_int_operand(item)
+
+        if type(operand) == mir.Immediate:
+            result = self.mfunc.new_vreg(4)
+            self.emit_move(result, operand)
+            return result
+
+        return operand
+
+    def emit_move(self, dest: mir.Operand, src: mir.Operand):
+        """
+            Copies `src` into `dest` at the width of `dest`, truncating or sign-extending as storing into a C object of that size would.
+        """
+        if type(src) == mir.Immediate:
+            self.emit(mir.MOp.MOV, [mir.Immediate(ir_types.wrap_int(src.value, dest.size)), dest], dest.size)
+        elif src.size < dest.size:
+            self.emit(mir.MOp.MOVSX, [src, dest], dest.size)
+        else:
+            self.emit(mir.MOp.MOV, [mir.with_size(src, dest.size), dest], dest.size)
+
+    def emit_compare(self, op: ir_types.IROp, arg0: str | int, arg1: str | int) -> str:
+        """
+            Emits a `cmp` of two IR operands, giving the condition code for `op`. NOTE `cmp` can't take an immediate as its 2nd operand, so a constant on the left is swapped over or loaded first.
+        """
+        lhs = self.get_int_operand(arg0)
+        rhs = self.get_int_operand(arg1)
+
+        if type(lhs) == mir.Immediate and type(rhs) != mir.Immediate:
+            lhs, rhs = rhs, lhs
+            op = ir_types.SWAPPED_COMPARES[op]
+        elif type(lhs) == mir.Immediate:
+            lhs = self.get_reg_operand(arg0)
+
+        self.emit(mir.MOp.CMP, [rhs, lhs])
+
+        return IR_COMPARE_CONDS[op]
+
+    def emit_pending_args(self, conv: mir.CallingConv) -> tuple[mir.PhysReg, ...]:
+        """
+            Moves the pending args into the registers of `conv`, giving the registers used.
+        """
+        if len(self.pending_args) > len(conv.arg_regs):
+            raise RuntimeError(f'mir_select.py [Error]: Could not allocate arg register, stack args unsupported!\n')
+
+        arg_regs = tuple(get_phys_reg(reg, 8) for reg in conv.arg_regs[:len(self.pending_args)])
+
+        # NOTE args go over as 32-bit values, so a callee's `char` param just takes the low byte.
+        for arg_reg, arg in zip(arg_regs, self.pending_args):
+            self.emit_move(mir.with_size(arg_reg, 4), arg)
+
+        self.pending_args = []
+
+        return arg_regs
+
+    def visit_return(self, step: ir_types.IRStep):
+        if step.result_addr is None:
+            self.emit(mir.MOp.RET, [])
+            return
+
+        self.emit_move(get_phys_reg(RET_REG), self.get_operand(step.result_addr))
+        self.emit(mir.MOp.RET, [], implicit_uses=(get_phys_reg(RET_REG, 8),))
+
+    def visit_jump(self, step: ir_types.IRStep):
+        self.emit(mir.MOp.JMP, [mir.LabelRef(step.target)])
+
+    def visit_jump_if(self, step: ir_types.IRStep):
+        cond = self.emit_compare(step.op, step.arg0, step.arg1)
+        self.emit(mir.MOp.JCC, [mir.LabelRef(step.target)], cond=cond)
+
+    def visit_jump_table(self, step: ir_types.IRStep):
+        table_label = f'.Ljt{self.jump_table_count}'
+        self.jump_table_count += 1
+        index = get_phys_reg('%rax')
+        table = get_phys_reg('%rdx', 8)
+
+        # NOTE the unsigned `ja` also sends args below `low` to the default, and writing %eax clears the upper half of %rax for the indexed load.
+        self.emit_move(index, self.get_operand(step.arg))
+
+        if step.low != 0:
+            self.emit(mir.MOp.SUB, [mir.Immediate(step.low), index])
+
+        self.emit(mir.MOp.CMP, [mir.Immediate(len(step.targets) - 1), index])
+        self.emit(mir.MOp.JCC, [mir.LabelRef(step.default)], cond='a')
+        self.emit(mir.MOp.LEA, [mir.Memory(table_label, None, size=8), table], 8)
+        self.emit(mir.MOp.MOVSX, [mir.Memory(0, table, mir.with_size(index, 8), 4), mir.with_size(index, 8)], 8)
+        self.emit(mir.MOp.ADD, [table, mir.with_size(index, 8)], 8)
+        self.emit(mir.MOp.JMP_INDIRECT, [mir.with_size(index, 8)], 8)
+        self.mfunc.jump_tables.append((table_label, list(step.targets)))
+
+    def visit_push_arg(self, step: ir_types.IRStep):
+        arg = self.get_operand(step.arg)
+
+        if type(arg) == mir.VirtualReg:
+            copy = self.mfunc.new_vreg(arg.size)
+            self.emit_move(copy, arg)
+            arg = copy
+
+        self.pending_args.append(arg)
+
+    def visit_store_yield(self, step: ir_types.IRStep):
+        self.emit_move(self.get_vreg(step.target), get_phys_reg(RET_REG))
+
+    def visit_load_param(self, step: ir_types.IRStep):
+        if self.param_count >= len(self.mfunc.conv.arg_regs):
+            raise RuntimeError(f'mir_select.py [Error]: Could not allocate arg register, stack args unsupported!\n')
+
+        arg_reg = get_phys_reg(self.mfunc.conv.arg_regs[self.param_count])
+        self.param_count += 1
+
+        self.emit_move(self.get_vreg(step.target), arg_reg)
+
+    def visit_call_func(self, step: ir_types.IRStep):
+        conv = self.get_callee_conv(step.callee)
+        arg_regs = self.emit_pending_args(conv)
+        ret_reg = get_phys_reg(RET_REG)
+
+        # NOTE %al holds the vector register count for variadic callees.
+        if conv.sets_vector_count:
+            self.emit(mir.MOp.XOR, [ret_reg, ret_reg])
+            arg_regs = (*arg_regs, mir.with_size(ret_reg, 8))
+
+        self.emit(mir.MOp.CALL, [mir.LabelRef(step.callee)], implicit_uses=arg_regs, implicit_defs=self.get_callee_clobbers(step.callee))
+
+    def visit_tail_call(self, step: ir_types.IRStep):
+        conv = self.get_callee_conv(step.callee)
+
+        # NOTE the callee returns straight to this function's caller, so it must keep every register this function's convention keeps, or it's called normally.
+        if not set(self.mfunc.conv.preserved_regs) <= set(conv.preserved_regs):
+            self.visit_call_func(step)
+            self.emit(mir.MOp.RET, [], implicit_uses=(get_phys_reg(RET_REG, 8),))
+            return
+
+        arg_regs = self.emit_pending_args(conv)
+        self.emit(mir.MOp.TAIL_JMP, [mir.LabelRef(step.callee)], implicit_uses=arg_regs, implicit_defs=self.get_callee_clobbers(step.callee))
+
+    def visit_assign(self, step: ir_types.IRStep):
+        dest = self.get_vreg(step.dest)
+        op = step.op
+
+        if op == ir_types.IROp.NOP:
+            self.emit_move(dest, self.get_operand(step.arg0))
+        elif op in IR_COMPARE_CONDS:
+            cond = self.emit_compare(op, step.arg0, step.arg1)
+
+            if dest.size == 1:
+                self.emit(mir.MOp.SETCC, [dest], 1, cond=cond)
+            else:
+                flag = self.mfunc.new_vreg(1)
+                self.emit(mir.MOp.SETCC, [flag], 1, cond=cond)
+                self.emit(mir.MOp.MOVZX, [flag, dest])
+        elif op in (ir_types.IROp.DIVIDE, ir_types.IROp.MULTIPLY_HIGH):
+            self.emit_wide_op(step, dest)
+        elif op == ir_types.IROp.NEGATE:
+            result = dest if dest.size == 4 else self.mfunc.new_vreg(4)
+            self.emit_move(result, self.get_operand(step.arg0))
+            self.emit(mir.MOp.NEG, [result])
+            self.emit_result(dest, result)
+        elif op in IR_TWO_ADDRESS_MOPS:
+            self.emit_two_address_op(step, dest)
+        else:
+            raise RuntimeError(f'mir_select.py [Error]: Cannot select IR op {op.name}!\n')
+
+    def emit_two_address_op(self, step: ir_types.IRAssign, dest: mir.VirtualReg):
+        """
+            Lowers `dest = arg0 op arg1` to `mov arg0, dest` then `op arg1, dest`. NOTE the copy would overwrite an `arg1` that is `dest`, so that case swaps commutative operands or works in a new register.
+        """
+        arg0, arg1 = step.arg0, step.arg1
+
+        if arg1 == step.dest and arg0 != step.dest and step.op in ir_types.COMMUTATIVE_OPS:
+            arg0, arg1 = arg1, arg0
+
+        rhs = self.get_int_operand(arg1)
+
+        # NOTE a shift by a register must count by %cl.
+        if step.op in SHIFT_OPS and type(rhs) != mir.Immediate:
+            count = get_phys_reg('%rcx')
+            self.emit_move(count, rhs)
+            rhs = mir.with_size(count, 1)
+
+        result = dest if dest.size == 4 and arg1 != step.dest else self.mfunc.new_vreg(4)
+        self.emit_move(result, self.get_operand(arg0))
+        self.emit(IR_TWO_ADDRESS_MOPS[step.op], [rhs, result])
+        self.emit_result(dest, result)
+
+    def emit_wide_op(self, step: ir_types.IRAssign, dest: mir.VirtualReg):
+        """
+            Lowers division and the high half of a product, which take their first operand in %eax and give results in %eax and %edx.
+        """
+        low = get_phys_reg('%rax')
+        high = get_phys_reg('%rdx')
+        self.emit_move(low, self.get_operand(step.arg0))
+        rhs = self.get_reg_operand(step.arg1)
+
+        if step.op == ir_types.IROp.DIVIDE:
+            self.emit(mir.MOp.CDQ, [], implicit_uses=(low,), implicit_defs=(high,))
+            self.emit(mir.MOp.IDIV, [rhs], implicit_uses=(low, high), implicit_defs=(low, high))
+            self.emit_move(dest, low)
+        else:
+            self.emit(mir.MOp.IMUL_WIDE, [rhs], implicit_uses=(low,), implicit_defs=(low, high))
+            self.emit_move(dest, high)
+
+    def emit_result(self, dest: mir.VirtualReg, result: mir.VirtualReg):
+        if result != dest:
+            self.emit_move(dest, result)
+
+    def visit_load_const(self, step: ir_types.IRStep):
+        self.emit_move(self.get_vreg(step.addr), mir.Immediate(step.value))
+
+    def visit_phi(self, step: ir_types.IRStep):
+        raise RuntimeError(f'mir_select.py [Error]: Cannot select IR in SSA form, found {step}!\n')
@@ -0,0 +1,366 @@
+"""
+    mir_types.py\n
+    By DrkWithT\n
+    Defines machine IR types: x86-64 instructions over virtual or physical registers, with explicit operand sizes and the two-address form of x86 arithmetic, where the destination is also the first source.\n
+    Sources:
+    [x86-64 instruction reference](https://www.felixcloutier.com/x86/)\n
+    [LLVM MachineInstr](https://llvm.org/docs/CodeGenerator.html#machineinstr)
+"""
+
+import dataclasses
+from enum import Enum, auto
+from DerkCC.DCCStages.gas_gen import translate_reg, deduce_postfix, ARG_REGS_64
+
+## Aliases and Types ##
+
+class MOp(Enum):
+    MOV = auto()          # mov <src>, <dst>
+    MOVSX = auto()        # movs<src size><dst size> <src>, <dst>
+    MOVZX = auto()        # movz<src size><dst size> <src>, <dst>
+    LEA = auto()          # lea <mem>, <dst>
+    ADD = auto()          # add <src>, <dst>
+    SUB = auto()          # sub <src>, <dst>
+    IMUL = auto()         # imul <src>, <dst>
+    IMUL_WIDE = auto()    # imul <src>, giving %edx:%eax = %eax * <src>
+    IDIV = auto()         # idiv <src>, dividing %edx:%eax
+    CDQ = auto()          # cltd, sign-extending %eax into %edx
+    NEG = auto()          # neg <dst>
+    SHL = auto()          # sal <count>, <dst>
+    SAR = auto()          # sar <count>, <dst>
+    SHR = auto()          # shr <count>, <dst>
+    XOR = auto()          # xor <src>, <dst>
+    CMP = auto()          # cmp <src>, <dst>, setting flags by <dst> - <src>
+    SETCC = auto()        # set<cond> <dst>
+    JMP = auto()          # jmp <label>
+    JCC = auto()          # j<cond> <label>
+    JMP_INDIRECT = auto() # jmp *<src>
+    CALL = auto()         # call <label>
+    TAIL_JMP = auto()     # jmp <label>, leaving this function
+    RET = auto()          # ret
+    PUSH = auto()         # push <src>
+    POP = auto()          # pop <dst>
+
+class OperandRole(Enum):
+    USE = auto()
+    DEF = auto()
+    USE_DEF = auto()
+
+# NOTE explicit operands in AT&T order, so a two-address op's last operand is both read and written.
+OPERAND_ROLES = {
+    MOp.MOV: (OperandRole.USE, OperandRole.DEF),
+    MOp.MOVSX: (OperandRole.USE, OperandRole.DEF),
+    MOp.MOVZX: (OperandRole.USE, OperandRole.DEF),
+    MOp.LEA: (OperandRole.USE, OperandRole.DEF),
+    MOp.ADD: (OperandRole.USE, OperandRole.USE_DEF),
+    MOp.SUB: (OperandRole.USE, OperandRole.USE_DEF),
+    MOp.IMUL: (OperandRole.USE, OperandRole.USE_DEF),
+    MOp.IMUL_WIDE: (OperandRole.USE,),
+    MOp.IDIV: (OperandRole.USE,),
+    MOp.CDQ: (),
+    MOp.NEG: (OperandRole.USE_DEF,),
+    MOp.SHL: (OperandRole.USE, OperandRole.USE_DEF),
+    MOp.SAR: (OperandRole.USE, OperandRole.USE_DEF),
+    MOp.SHR: (OperandRole.USE, OperandRole.USE_DEF),
+    MOp.XOR: (OperandRole.USE, OperandRole.USE_DEF),
+    MOp.CMP: (OperandRole.USE, OperandRole.USE),
+    MOp.SETCC: (OperandRole.DEF,),
+    MOp.JMP: (OperandRole.USE,),
+    MOp.JCC: (OperandRole.USE,),
+    MOp.JMP_INDIRECT: (OperandRole.USE,),
+    MOp.CALL: (OperandRole.USE,),
+    MOp.TAIL_JMP: (OperandRole.USE,),
+    MOp.RET: (),
+    MOp.PUSH: (OperandRole.USE,),
+    MOp.POP: (OperandRole.DEF,)
+}
+
+MOP_NAMES = {
+    MOp.MOV: 'mov',
+    MOp.LEA: 'lea',
+    MOp.ADD: 'add',
+    MOp.SUB: 'sub',
+    MOp.IMUL: 'imul',
+    MOp.IMUL_WIDE: 'imul',
+    MOp.IDIV: 'idiv',
+    MOp.NEG: 'neg',
+    MOp.SHL: 'sal',
+    MOp.SAR: 'sar',
+    MOp.SHR: 'shr',
+    MOp.XOR: 'xor',
+    MOp.CMP: 'cmp',
+    MOp.PUSH: 'push',
+    MOp.POP: 'pop'
+}
+
+# NOTE these end a block, so nothing may follow them in it.
+TERMINATOR_MOPS = (MOp.JMP, MOp.JMP_INDIRECT, MOp.TAIL_JMP, MOp.RET)
+
+# NOTE System V callees give these back unchanged.
+CALLEE_SAVED_REGS = ('%rbx', '%r12', '%r13', '%r14', '%r15')
+
+# NOTE %r11 stays out, as it's the scratch register for spill fixups.
+FAST_ARG_REGS = (*ARG_REGS_64, '%r10', '%rax')
+
+## Operands ##
+
+@dataclasses.dataclass(frozen=True)
+class VirtualReg:
+    """
+        An unbounded register of one function. NOTE `size` is the width this operand reads or writes, so views of one register at different widths compare equal.
+    """
+    index: int
+    size: int = dataclasses.field(default=4, compare=False)
+
+    def __str__(self) -> str:
+        return f'%v{self.index}{deduce_postfix(self.size)}'
+
+@dataclasses.dataclass(frozen=True)
+class PhysReg:
+    """
+        An x86-64 register by its 64-bit name, like `%rax`. NOTE as with VirtualReg, `size` only picks which part is accessed.
+    """
+    name: str
+    size: int = dataclasses.field(default=8, compare=False)
+
+    def __str__(self) -> str:
+        return self.name if self.size == 8 else translate_reg(self.name, self.size)
+
+@dataclasses.dataclass(frozen=True)
+class Immediate:
+    value: int
+
+    def __str__(self) -> str:
+        return f'${self.value}'
+
+@dataclasses.dataclass(frozen=True)
+class Memory:
+    """
+        A memory operand `disp(base, index, scale)` of `size` bytes. A symbol as `disp` without a base is addressed relative to `%rip`.
+    """
+    disp: int | str
+    base: PhysReg | VirtualReg | None
+    index: PhysReg | VirtualReg | None = None
+    scale: int = 1
+    size: int = 4
+
+    def get_regs(self) -> list:
+        return [reg for reg in (self.base, self.index) if reg is not None]
+
+    def __str__(self) -> str:
+        if self.base is None and self.index is None:
+            return f'{self.disp}(%rip)'
+
+        disp_text = '' if self.disp == 0 else str(self.disp)
+        index_text = '' if self.index is None else f',{self.index},{self.scale}'
+
+        return f'{disp_text}({self.base or ""}{index_text})'
+
+@dataclasses.dataclass(frozen=True)
+class LabelRef:
+    name: str
+
+    def __str__(self) -> str:
+        return self.name
+
+Register = VirtualReg | PhysReg
+Operand = VirtualReg | PhysReg | Immediate | Memory | LabelRef
+
+@dataclasses.dataclass(frozen=True)
+class CallingConv:
+    """
+        How a function takes its args and which registers it gives back unchanged. `sets_vector_count` is System V's count of vector args in %al, which variadic callees read.
+    """
+    name: str
+    arg_regs: tuple[str, ...]
+    preserved_regs: tuple[str, ...]
+    sets_vector_count: bool
+
+SYSV_CONV = CallingConv('sysv', tuple(ARG_REGS_64), CALLEE_SAVED_REGS, True)
+
+# NOTE only for functions called from inside the program. Their callers know which registers they write, so they save none.
+FAST_CONV = CallingConv('fast', FAST_ARG_REGS, (), False)
+
+# NOTE for recursive internal functions, as what they write isn't known yet when their calls to each other are lowered.
+FAST_SAVED_CONV = CallingConv('fast_saved', FAST_ARG_REGS, CALLEE_SAVED_REGS, False)
+
+## Utility functions ##
+
+def is_reg(operand: Operand) -> bool:
+    return type(operand) in (VirtualReg, PhysReg)
+
+def with_size(operand: Operand, size: int) -> Operand:
+    """
+        Gives the view of a register or memory operand at another width. Immediates and labels have no width.
+    """
+    if type(operand) in (VirtualReg, PhysReg, Memory):
+        return dataclasses.replace(operand, size=size)
+
+    return operand
+
+## Machine IR models ##
+
+@dataclasses.dataclass
+class MInstr:
+    """
+        One x86-64 instruction. `size` gives the mnemonic's suffix, and `cond` the condition code of SETCC and JCC, like `l` or `ge`.\n
+        NOTE Fixed registers an instruction reads or writes without naming them, like the `%edx:%eax` of IDIV or the registers a call clobbers, go in `implicit_uses` and `implicit_defs`.
+    """
+    op: MOp
+    operands: list[Operand]
+    size: int = 4
+    cond: str | None = None
+    implicit_uses: tuple[PhysReg, ...] = ()
+    implicit_defs: tuple[PhysReg, ...] = ()
+
+    def get_uses(self) -> list[Register]:
+        """
+            Gives the registers this instruction reads, including the base and index of any memory operand.
+        """
+        results = list(self.implicit_uses)
+
+        # NOTE `xor %r, %r` only zeroes its register, so it doesn't read it.
+        if self.op == MOp.XOR and self.operands[0] == self.operands[1]:
+            return results
+
+        for operand, role in zip(self.operands, OPERAND_ROLES[self.op]):
+            if type(operand) == Memory:
+                results.extend(operand.get_regs())
+            elif is_reg(operand) and role != OperandRole.DEF:
+                results.append(operand)
+
+        return results
+
+    def get_defs(self) -> list[Register]:
+        results = list(self.implicit_defs)
+
+        for operand, role in zip(self.operands, OPERAND_ROLES[self.op]):
+            if is_reg(operand) and role != OperandRole.USE:
+                results.append(operand)
+
+        return results
+
+    def is_move(self) -> bool:
+        """
+            Tells if this only copies one register into another, so both could share a register.
+        """
+        return self.op == MOp.MOV and all(is_reg(operand) for operand in self.operands)
+
+    def is_terminator(self) -> bool:
+        return self.op in TERMINATOR_MOPS
+
+    def replace_regs(self, assignments: dict[VirtualReg, Operand]):
+        """
+            Rewrites virtual registers by `assignments`, keeping each operand's width.
+        """
+        def replace(operand: Operand) -> Operand:
+            if type(operand) == VirtualReg and operand in assignments:
+                return with_size(assignments[operand], operand.size)
+
+            if type(operand) == Memory:
+                return dataclasses.replace(operand, base=replace(operand.base), index=replace(operand.index))
+
+            return operand
+
+        self.operands = [replace(operand) for operand in self.operands]
+
+    def get_mnemonic(self) -> str:
+        match self.op:
+            case MOp.MOVSX | MOp.MOVZX:
+                return f'mov{"s" if self.op == MOp.MOVSX else "z"}{deduce_postfix(self.operands[0].size)}{deduce_postfix(self.operands[1].size)}'
+            case MOp.CDQ:
+                return 'cltd'
+            case MOp.SETCC:
+                return f'set{self.cond}'
+            case MOp.JCC:
+                return f'j{self.cond}'
+            case MOp.JMP | MOp.JMP_INDIRECT | MOp.TAIL_JMP:
+                return 'jmp'
+            case MOp.CALL:
+                return 'call'
+            case MOp.RET:
+                return 'ret'
+
+        return f'{MOP_NAMES[self.op]}{deduce_postfix(self.size)}'
+
+    def __str__(self) -> str:
+        operand_texts = [str(operand) for operand in self.operands]
+
+        if self.op == MOp.JMP_INDIRECT:
+            operand_texts[0] = f'*{operand_texts[0]}'
+
+        if not operand_texts:
+            return self.get_mnemonic()
+
+        return f'{self.get_mnemonic()} {", ".join(operand_texts)}'
+
+MInstrList = list[MInstr]
+
+@dataclasses.dataclass
+class MBlock:
+    """
+        A machine basic block, made from one IR basic block. NOTE like ir_cfg.BasicBlock, its successors and fallthrough follow the IR block's.
+    """
+    label: str | None
+    instrs: MInstrList
+    preds: list[int] = dataclasses.field(default_factory=list)
+    succs: list[int] = dataclasses.field(default_factory=list)
+
+class MFunction:
+    """
+        A function's machine blocks in layout order, with its calling convention and register and frame state. `vreg_sizes` holds the widest view of each virtual register, and `jump_tables` the `(table label, target labels)` pairs its jump tables read from `.rodata`. Only `exported` functions get a `.globl`.
+    """
+    name: str
+    conv: CallingConv
+    exported: bool
+    blocks: list[MBlock]
+    vreg_sizes: list[int]
+    jump_tables: list[tuple[str, list[str]]]
+    frame_size: int
+    saved_regs: list[PhysReg]
+
+    def __init__(self, name: str, conv: CallingConv = SYSV_CONV, exported: bool = True):
+        self.name = name
+        self.conv = conv
+        self.exported = exported
+        self.blocks = []
+        self.vreg_sizes = []
+        self.jump_tables = []
+        self.frame_size = 0
+        self.saved_regs = []
+
+    def new_vreg(self, size: int = 4) -> VirtualReg:
+        self.vreg_sizes.append(size)
+
+        return VirtualReg(len(self.vreg_sizes) - 1, size)
+
+    def get_instr_count(self) -> int:
+        return sum(len(block.instrs) for block in self.blocks)
+
+    def get_instrs(self) -> MInstrList:
+        return [instr for block in self.blocks for instr in block.instrs]
+
+    def to_gas(self) -> list[str]:
+        results = [f'.globl {self.name}\n'] if self.exported else []
+
+        for block in self.blocks:
+            if block.label is not None:
+                results.append(f'{block.label}:\n')
+
+            for instr in block.instrs:
+                results.append(f'\t{instr}\n')
+
+        # NOTE entries are offsets from the table, so it needs no relocations when linked as PIE.
+        for table_label, targets in self.jump_tables:
+            results.append('.section .rodata\n')
+            results.append('.balign 4\n')
+            results.append(f'{table_label}:\n')
+
+            for target in targets:
+                results.append(f'\t.long {target} - {table_label}\n')
+
+            results.append('.text\n')
+
+        return results
+
+    def dump(self) -> str:
+        return ''.join(self.to_gas())
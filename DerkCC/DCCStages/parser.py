@@ -236,6 +236,7 @@ class Parser:
     
     def parse_expr(self) -> ast.Expr:
         if self.match_token(TokenChoice.current, [TokenTag.IDENTIFIER]):
+            name_hop_n = len(self.lexer.token_hops) - 1
             self.consume_token([])
             prev_name_token = self.prev
 
@@ -244,10 +245,10 @@ class Parser:
                 self.consume_token([])
                 return ast.Binary(ast.Literal((prev_name_token, None), ast.OpType.OP_NONE), self.parse_expr(), ast.OpType.OP_ASSIGN)
 
-            # NOTE Weird fix: backtrack to prepare for parsing a name-started expression!
-            self.lexer.unwind_hop()
-            self.lexer.unwind_hop()
-            self.lexer.unwind_hop()
+            # NOTE Weird fix: backtrack to prepare for parsing a name-started expression! The name may be followed by any spacing or none, as in `f(n, 2)`.
+            while len(self.lexer.token_hops) > name_hop_n:
+                self.lexer.unwind_hop()
+
             self.consume_token([])
 
             return self.parse_or()
@@ -314,6 +315,10 @@ class Parser:
             return self.parse_if()
         elif self.match_token(TokenChoice.current, [TokenTag.KEYWORD]) and temp_lexeme == 'return':
             return self.parse_return()
+        elif self.match_token(TokenChoice.current, [TokenTag.KEYWORD]) and temp_lexeme == 'while':
+            return self.parse_while()
+        elif self.match_token(TokenChoice.current, [TokenTag.KEYWORD]) and (temp_lexeme == 'break' or temp_lexeme == 'continue'):
+            return self.parse_loop_jump()
         elif self.match_token(TokenChoice.current, [TokenTag.TYPENAME_VOID, TokenTag.TYPENAME_CHAR, TokenTag.TYPENAME_INT]):
             return self.parse_variable()
         else:
@@ -397,6 +402,26 @@ class Parser:
 
         return self.parse_block()
 
+    def parse_while(self) -> ast.Stmt:
+        self.consume_token([])
+        self.consume_token([TokenTag.PAREN_OPEN])
+
+        temp_cond = self.parse_expr()
+
+        self.consume_token([TokenTag.PAREN_CLOSE])
+
+        return ast.While(temp_cond, self.parse_block())
+
+    def parse_loop_jump(self) -> ast.Stmt:
+        temp_lexeme = self.peek_curr()[0]
+        self.consume_token([])
+        self.consume_token([TokenTag.SEMICOLON])
+
+        if temp_lexeme == 'break':
+            return ast.Break()
+
+        return ast.Continue()
+
     def parse_return(self) -> ast.Stmt:
         self.consume_token([]) # NOTE skip 'return' since the expr matters most!
 
@@ -103,6 +103,9 @@ class SemanticChecker(ASTVisitor):
         self.errors: list[ErrorChunk] = []
         self.semantic_info: SemanticsTable = {}
 
+        # NOTE counts enclosing `while` loops, since `break` / `continue` need one.
+        self.loop_depth = 0
+
     def check_ast(self, tops: list[nodes.Stmt]) -> list[ErrorChunk]:
         for stmt in tops:
             stmt.accept_visitor(self)
@@ -233,9 +236,9 @@ class SemanticChecker(ASTVisitor):
         for arg_i in range(argc):
             arg = call_argv[arg_i]
 
-            arg_name = '<name>' if arg.get_op_type() == nodes.OpType.OP_NONE else arg.data[0][0] # NOTE get identifier if literal...
-            arg_type = arg.deduce_early_type()
-            arg_type = arg_type if arg_type != nodes.DataType.UNKNOWN else self.scopes.get_current_scope().get(arg_name).data_type or nodes.DataType.VOID
+            # NOTE check the arg like any other expr, which gives a name's declared type or an expr's result type.
+            arg_name, arg_type = arg.accept_visitor(self)
+            arg_name = arg_name or '<expr>'
 
             if arg_type != param_types[arg_i]:
                 self.errors.append((
@@ -337,6 +340,37 @@ class SemanticChecker(ASTVisitor):
         if else_body_opt is not None:
             else_body_opt.accept_visitor(self)
 
+    def visit_while(self, node: nodes.While):
+        if self.scopes.at_global_scope():
+            self.errors.append((
+                '<while-stmt>',
+                self.current_scope_name,
+                f'Invalid placement of while!'
+            ))
+            return
+
+        node.get_conditions().accept_visitor(self)
+
+        self.loop_depth += 1
+        node.get_body().accept_visitor(self)
+        self.loop_depth -= 1
+
+    def visit_break(self, node: nodes.Break):
+        if self.loop_depth == 0:
+            self.errors.append((
+                'break;',
+                self.current_scope_name,
+                f'Invalid placement of break outside a loop!'
+            ))
+
+    def visit_continue(self, node: nodes.Continue):
+        if self.loop_depth == 0:
+            self.errors.append((
+                'continue;',
+                self.current_scope_name,
+                f'Invalid placement of continue outside a loop!'
+            ))
+
     def visit_return(self, node: nodes.Return):
         if self.scopes.at_global_scope():
             self.errors.append((
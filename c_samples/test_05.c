@@ -0,0 +1,22 @@
+// test_05.c
+// Added by DrkWithT
+
+int pickSign(int x) {
+    int debug = 0;
+    int verbose = debug;
+
+    if (verbose == 1) {
+        return 0;
+    }
+
+    if (x < 0) {
+        return -1;
+    }
+
+    return 1;
+}
+
+int main() {
+    int sign = pickSign(5);
+    return 0;
+}
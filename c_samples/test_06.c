@@ -0,0 +1,16 @@
+// test_06.c
+// Added by DrkWithT
+
+int sameSum(int a, int b) {
+    if (a + b != b + a) {
+        return 0;
+    }
+
+    int sum = a + b;
+    return sum;
+}
+
+int main() {
+    int x = sameSum(2, 3);
+    return 0;
+}
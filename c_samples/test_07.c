@@ -0,0 +1,48 @@
+// test_07.c
+// Added by DrkWithT
+
+int sumTo(int n) {
+    int total = 0;
+    int i = 0;
+
+    while (i < n) {
+        int step = n * 2;
+        i = i + 1;
+
+        if (i == 5) {
+            continue;
+        }
+
+        if (total > 1000) {
+            break;
+        }
+
+        total = total + step;
+    }
+
+    return total;
+}
+
+int gridSum(int n) {
+    int total = 0;
+    int row = 0;
+
+    while (row < n) {
+        int col = 0;
+
+        while (col < n) {
+            total = total + row * 4;
+            col = col + 1;
+        }
+
+        row = row + 1;
+    }
+
+    return total;
+}
+
+int main() {
+    int result = sumTo(10);
+    int grid = gridSum(3);
+    return 0;
+}
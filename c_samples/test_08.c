@@ -0,0 +1,47 @@
+// test_08.c
+// Added by DrkWithT
+
+int classify(int a) {
+    int result = 0;
+
+    if (a < 10) {
+        if (a < 20) {
+            result = 1;
+        } else {
+            result = 2;
+        }
+    }
+
+    return result;
+}
+
+int clampChar(char c) {
+    int result = c;
+
+    if (c > 200) {
+        result = 200;
+    }
+
+    if (c < 0 - 128) {
+        result = 0 - 128;
+    }
+
+    return result;
+}
+
+int countUp(int n) {
+    int i = 0;
+
+    while (i < n) {
+        i = i + 1;
+    }
+
+    return i;
+}
+
+int main() {
+    int kind = classify(5);
+    int clamped = clampChar('a');
+    int count = countUp(4);
+    return 0;
+}
@@ -0,0 +1,31 @@
+// test_09.c
+// Added by DrkWithT
+
+int fib(int n) {
+    if (n < 2) {
+        return n;
+    }
+
+    return fib(n - 1) + fib(n - 2);
+}
+
+int spin(int n) {
+    int count = 0;
+
+    while (count < n) {
+        count = count + 1;
+    }
+
+    return count;
+}
+
+int share(int d) {
+    return 100 / d;
+}
+
+int main() {
+    int a = fib(20);
+    int b = spin(100000);
+    int c = share(0);
+    return a + fib(3);
+}
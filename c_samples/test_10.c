@@ -0,0 +1,37 @@
+// test_10.c
+// Added by DrkWithT
+
+int scale(int x, int mode) {
+    int result = x;
+
+    if (mode == 1) {
+        result = x * 2;
+    }
+
+    if (mode == 2) {
+        result = x * 4;
+    }
+
+    if (mode == 3) {
+        result = 0 - x;
+    }
+
+    return result;
+}
+
+int bump(int x, int step) {
+    return x + step;
+}
+
+int run(int n) {
+    int a = scale(n, 2);
+    int b = scale(n + 1, 2);
+    int c = scale(n, 3);
+    int d = bump(n, 1);
+    return a + b + c + d;
+}
+
+int main() {
+    int r = run(5);
+    return 0;
+}
@@ -0,0 +1,64 @@
+// test_11.c
+// Added by DrkWithT
+
+int dispatch(int op) {
+    int result = 0;
+
+    if (op == 1) {
+        result = 10;
+    } else {
+        if (op == 2) {
+            result = 20;
+        } else {
+            if (op == 3) {
+                result = 30;
+            } else {
+                if (op == 5) {
+                    result = 50;
+                } else {
+                    if (op == 6) {
+                        result = 60;
+                    } else {
+                        result = 0 - 1;
+                    }
+                }
+            }
+        }
+    }
+
+    return result;
+}
+
+int lookup(int key) {
+    if (key == 3) {
+        return 1;
+    } else {
+        if (key == 40) {
+            return 2;
+        } else {
+            if (key == 100) {
+                return 3;
+            } else {
+                if (key == 1000) {
+                    return 4;
+                } else {
+                    if (key == 0 - 7) {
+                        return 5;
+                    } else {
+                        if (key == 77777) {
+                            return 6;
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    return 0;
+}
+
+int main() {
+    int a = dispatch(3);
+    int b = lookup(100);
+    return 0;
+}
@@ -0,0 +1,26 @@
+// test_12.c
+// Added by DrkWithT
+
+int algebra(int x, int y) {
+    int a = x + 0;
+    int b = 1 * y;
+    int c = a - a;
+    int d = 0 - b;
+    int e = x * 0;
+    int f = y - 3;
+
+    if (x < x) {
+        return 99;
+    }
+
+    if (0 < y) {
+        return a + b + c + d + e + f;
+    }
+
+    return 5 * x;
+}
+
+int main() {
+    int r = algebra(3, 4);
+    return r;
+}
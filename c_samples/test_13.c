@@ -0,0 +1,28 @@
+// test_13.c
+// Added by DrkWithT
+
+int sumChain(int a, int b, int c, int d) {
+    int e = a * 3;
+    int f = b - 7;
+    int g = c * d;
+    int h = d + 11;
+
+    return a + b + c + d + e + f + g + h + 5;
+}
+
+int productChain(int a, int b, int c, int d) {
+    return a * 2 * b * c * 3 * d;
+}
+
+int mixedChain(int a, int b, int c) {
+    int t = a + b;
+    a = 4;
+
+    return t + c + a + b;
+}
+
+int main() {
+    int s = sumChain(1, 2, 3, 4);
+    int p = productChain(1, 2, 3, 4);
+    return s + p + mixedChain(1, 2, 3);
+}
@@ -0,0 +1,28 @@
+// test_14.c
+// Added by DrkWithT
+
+int twice(int n) {
+    return n + n;
+}
+
+int pressure(int a, int b, int c, int d, int e, int f) {
+    return a * b + (c * d + e * f) * (a - b + (c - d));
+}
+
+int guarded(int a, int b, int c, int d) {
+    return a * b + twice(c * d + a);
+}
+
+int compare(int a, int b, int c, int d) {
+    if (a * b < (c * d + a * c) * (b - d)) {
+        return 1;
+    }
+
+    return 0;
+}
+
+int main() {
+    int p = pressure(1, 2, 3, 4, 5, 6);
+    int g = guarded(1, 2, 3, 4);
+    return p + g + compare(1, 2, 3, 4);
+}
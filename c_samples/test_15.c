@@ -0,0 +1,38 @@
+// test_15.c
+// Added by DrkWithT
+
+int spread(int a, int b, int c, int d, int e, int f, int g, int h) {
+    return a - b + c - d + e - f + g - h * 2;
+}
+
+int step(int x) {
+    return x * 3 + 1;
+}
+
+int countDown(int n, int acc) {
+    if (n < 1) {
+        return acc;
+    }
+
+    int next = acc + step(n);
+
+    return countDown(n - 1, next);
+}
+
+int walk(int n) {
+    int total = 0;
+    int i = 0;
+
+    while (i < n) {
+        total = total + step(i) + i;
+        i = i + 1;
+    }
+
+    return total;
+}
+
+int main() {
+    int s = spread(1, 2, 3, 4, 5, 6, 7, 8);
+    int w = walk(10);
+    return s + w + countDown(5, 0);
+}
@@ -0,0 +1,16 @@
+// test_16.c
+// Added by DrkWithT
+
+void touch(int x) {
+    int y = x + 1;
+}
+
+int bump(int x) {
+    touch(x);
+    return x + 1;
+}
+
+int main() {
+    touch(3);
+    return bump(4);
+}
@@ -0,0 +1,23 @@
+// test_17.c
+// Added by DrkWithT
+
+int loop(int n, int acc) {
+    if (n == 0) {
+        return acc;
+    }
+
+    return loop(n - 1, acc + n);
+}
+
+int count(int n, int acc) {
+    if (n == 0) {
+        return acc;
+    }
+
+    int r = count(n - 1, acc + n);
+    return r + 1;
+}
+
+int main() {
+    return loop(10, 0) + count(10, 0);
+}
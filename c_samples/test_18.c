@@ -0,0 +1,12 @@
+// test_18.c
+// Added by DrkWithT
+
+int offset(int x, int d) {
+    return x + d;
+}
+
+int main() {
+    int a = offset(10, -4);
+    int b = offset(-3, -2);
+    return a + b + offset(a, 0 - a);
+}
@@ -0,0 +1,55 @@
+// test_19.c
+// Added by DrkWithT
+
+int blend(int x, int mode) {
+    int total = 0;
+    int i = 0;
+
+    while (i < x) {
+        total = total + i * 3 + x;
+
+        if (total > 1000) {
+            total = total - 1000;
+        }
+
+        i = i + 1;
+    }
+
+    if (mode == 1) {
+        total = total * 2;
+    }
+
+    if (mode == 2) {
+        total = 0 - total;
+    }
+
+    if (mode == 3) {
+        total = total + 7;
+    }
+
+    if (mode == 4) {
+        total = total - 5;
+    }
+
+    return total;
+}
+
+int mix(int n) {
+    int a = blend(n, 1) + blend(n + 1, 1) + blend(n + 2, 1);
+    int b = blend(n, 2) + blend(n + 3, 2);
+    int c = blend(n, 3) + blend(n + 1, 3);
+    int d = blend(n, 4);
+    return a + b + c + d;
+}
+
+int main() {
+    int i = 0;
+    int total = 0;
+
+    while (i < 4) {
+        total = total + mix(i);
+        i = i + 1;
+    }
+
+    return total;
+}
@@ -0,0 +1,11 @@
+// test_bad_05.c
+
+int main() {
+    int a = 0;
+
+    if (a == 0) {
+        break;
+    }
+
+    return a;
+}
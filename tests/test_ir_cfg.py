@@ -0,0 +1,76 @@
+"""
+    test_ir_cfg.py\n
+    Added by DrkWithT\n
+    Unit tests for basic block and CFG construction over generated IR.
+"""
+
+import unittest
+import DerkCC.DCCStages.parser as par
+import DerkCC.DCCStages.semantics as sem
+import DerkCC.DCCStages.ir_gen as irgen
+import DerkCC.DCCStages.ir_cfg as ircfg
+
+def gen_ir_impl(file_path: str):
+    parser = par.Parser()
+    checker = sem.SemanticChecker()
+
+    with open(file_path) as src:
+        parser.use_source(src.read())
+        ok, ast = parser.parse_all()
+
+        if not ok:
+            print(f'Parse failed in {file_path}!')
+            return None
+
+        errors = checker.check_ast(ast)
+
+        if len(errors) > 0:
+            print(f'Semantic validation failed for {file_path}!')
+            return None
+
+        ir_maker = irgen.IREmitter(checker.eject_semantic_info())
+        ir_result = ir_maker.gen_ir_from_ast(ast)
+
+        return (ir_result, ir_maker.get_func_infos())
+
+class CFGTester(unittest.TestCase):
+    def test_round_trip(self):
+        for file_path in ['./c_samples/test_01.c', './c_samples/test_02.c', './c_samples/test_03.c', './c_samples/test_04.c', './c_samples/test_04a.c']:
+            ir_result, funcs = gen_ir_impl(file_path)
+            cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+
+            for cfg in cfgs:
+                print(cfg.dump())
+
+            self.assertEqual(ircfg.flatten_cfgs(cfgs), ir_result)
+            self.assertEqual([cfg.func_name for cfg in cfgs], list(funcs.keys()))
+
+    def test_if_else_diamond(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_03.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+        ret_id = cfg.get_block_id('L0')
+        else_id = cfg.get_block_id('L1')
+
+        self.assertEqual(cfg.func_name, 'maxOfTwo')
+        self.assertEqual(cfg.get_entry().succs, [else_id, 1])
+        self.assertEqual(cfg.get_idom(ret_id), 0)
+        self.assertEqual(cfg.get_idom(else_id), 0)
+        self.assertTrue(cfg.dominates(0, ret_id))
+        self.assertFalse(cfg.dominates(else_id, ret_id))
+
+        # NOTE the jump after the `then` branch's return and the L2 join label are dead.
+        self.assertFalse(cfg.is_reachable(cfg.get_block_id('L2')))
+        self.assertEqual(cfg.get_reverse_postorder()[0], 0)
+        self.assertNotIn(cfg.get_block_id('L2'), cfg.get_reverse_postorder())
+
+    def test_short_circuit_edges(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_04.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+        truthy_id = cfg.get_block_id('L2')
+
+        self.assertEqual(len(cfg.blocks[truthy_id].preds), 2)
+        self.assertEqual(cfg.get_idom(truthy_id), 0)
+        self.assertEqual(cfg.to_steps(), ir_result)
+
+if __name__ == '__main__':
+    unittest.main()
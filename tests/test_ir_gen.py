@@ -8,6 +8,10 @@ import unittest
 import DerkCC.DCCStages.parser as par
 import DerkCC.DCCStages.semantics as sem
 import DerkCC.DCCStages.ir_gen as irgen
+import DerkCC.DCCStages.ir_types as ir
+import DerkCC.DCCStages.ast_nodes as ast
+import DerkCC.DCCStages.ir_interp as irinterp
+from tests.test_ir_cfg import gen_ir_impl
 
 def test_impl(file_path: str):
     parser = par.Parser()
@@ -51,3 +55,117 @@ class IRGenTester(unittest.TestCase):
 
     # def test_good_4a(self):
     #     self.assertTrue(test_impl('./c_samples/test_04a.c'))
+
+    def test_char_arg(self):
+        ir_result, _ = gen_ir_impl('./c_samples/test_08.c')
+
+        self.assertIn(ir.IRPushArg(97, True, ast.DataType.CHAR), ir_result)
+
+    def test_expr_arg(self):
+        ir_result, _ = gen_ir_impl('./c_samples/test_09.c')
+
+        self.assertIn(ir.IRPushArg('v2', False, ast.DataType.INT), ir_result)
+        self.assertIn(ir.IRPushArg('v4', False, ast.DataType.INT), ir_result)
+
+    def test_void_return(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_16.c')
+        touch_steps = get_func_steps(ir_result, 'touch')
+
+        # NOTE a void function gets no result address, so its return reads nothing.
+        self.assertEqual(touch_steps[-1], ir.IRReturn(None))
+        self.assertEqual([entry[1] for entry in funcs['touch'] if not entry[2]], ['v1'])
+        self.assertEqual(get_func_steps(ir_result, 'bump')[-1], ir.IRReturn('v1'))
+
+class CondLoweringTester(unittest.TestCase):
+    def test_fused_compare(self):
+        ir_result, _ = gen_ir_impl('./c_samples/test_03.c')
+        jump_ifs = [step for step in ir_result if step.get_ir_type() == ir.IRType.JUMP_IF]
+        compares = [step for step in ir_result if step.get_ir_type() == ir.IRType.ADDR_ASSIGN and step.op != ir.IROp.NOP]
+
+        # NOTE `if (a < b)` skips its body on `a >= b` with no 0/1 value in between.
+        self.assertEqual(jump_ifs, [ir.IRJumpIf('L1', ir.IROp.COMPARE_GTE, 'v0', 'v1')])
+        self.assertEqual(compares, [])
+
+    def test_short_circuit_branches(self):
+        ir_result, _ = gen_ir_impl('./c_samples/test_04.c')
+        jump_ifs = [step for step in ir_result if step.get_ir_type() == ir.IRType.JUMP_IF]
+
+        # NOTE `a != b || a != c`: a true lhs enters the body, and a false rhs skips it.
+        self.assertEqual(jump_ifs, [
+            ir.IRJumpIf('L2', ir.IROp.COMPARE_NEQ, 'v1', 'v2'),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_EQ, 'v1', 'v3')
+        ])
+        self.assertEqual(ir_result[ir_result.index(jump_ifs[1]) + 1], ir.IRLabel('L2'))
+
+class LoopLoweringTester(unittest.TestCase):
+    def test_rotated_while(self):
+        ir_result, _ = gen_ir_impl('./c_samples/test_07.c')
+        sum_to = ir_result[:ir_result.index(ir.IRLabel('gridSum'))]
+        jump_ifs = [step for step in sum_to if step.get_ir_type() == ir.IRType.JUMP_IF]
+
+        # NOTE the guard skips the loop on a false condition, and the copy at the bottom re-enters the body on a true one.
+        self.assertEqual(jump_ifs[0], ir.IRJumpIf('L3', ir.IROp.COMPARE_GTE, 'v3', 'v0'))
+        self.assertEqual(sum_to[sum_to.index(jump_ifs[0]) + 1], ir.IRLabel('L1'))
+        self.assertEqual(jump_ifs[-1], ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 'v3', 'v0'))
+        self.assertEqual(sum_to[sum_to.index(jump_ifs[-1]) - 1], ir.IRLabel('L2'))
+        self.assertEqual(sum_to[sum_to.index(jump_ifs[-1]) + 1], ir.IRLabel('L3'))
+
+    def test_break_and_continue(self):
+        ir_result, _ = gen_ir_impl('./c_samples/test_07.c')
+        sum_to = ir_result[:ir_result.index(ir.IRLabel('gridSum'))]
+        jumps = [step for step in sum_to if step.get_ir_type() == ir.IRType.JUMP]
+
+        # NOTE `continue` goes to the loop's condition and `break` past it, before the return's jump.
+        self.assertEqual(jumps, [ir.IRJump('L2'), ir.IRJump('L3'), ir.IRJump('L0')])
+
+def get_func_steps(ir_result: ir.StepList, func_name: str) -> ir.StepList:
+    start = ir_result.index(ir.IRLabel(func_name))
+    ends = [step_i for step_i, step in enumerate(ir_result) if step_i > start and step.get_ir_type() == ir.IRType.LABEL and step.title[0] != 'L']
+
+    return ir_result[start:ends[0] if ends else len(ir_result)]
+
+def get_peak_temps(steps: ir.StepList, func_info: irgen.FuncInfo) -> int:
+    """
+        Gives the most unrecorded temporaries live at once in straight-line steps.
+    """
+    locals = {entry[1] for entry in func_info}
+    live = set()
+    result = 0
+
+    for step in reversed(steps):
+        live.discard(step.get_def_addr())
+        live.update(addr for addr in step.get_use_addrs() if addr not in locals)
+        result = max(result, len(live))
+
+    return result
+
+class OperandOrderTester(unittest.TestCase):
+    def test_needier_side_first(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_14.c')
+        pressure = get_func_steps(ir_result, 'pressure')
+        assigns = [step for step in pressure if step.get_ir_type() == ir.IRType.ADDR_ASSIGN]
+
+        # NOTE `a * b` needs one temporary and its rhs three, so holding `a * b` across the rhs would need four.
+        self.assertEqual(get_peak_temps(pressure, funcs['pressure']), 3)
+        self.assertEqual(assigns[-4:-1], [ir.IRAssign('v13', ir.IROp.MULTIPLY, 'v9', 'v12'), ir.IRAssign('v14', ir.IROp.MULTIPLY, 'v0', 'v1'), ir.IRAssign('v15', ir.IROp.ADD, 'v14', 'v13')])
+        self.assertEqual(irinterp.load_program(ir_result, funcs).run('pressure', [2, 3, 4, 5, 6, 7]), 6 + 62 * -2)
+
+    def test_call_keeps_order(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_14.c')
+        guarded = get_func_steps(ir_result, 'guarded')
+
+        self.assertEqual(guarded[5], ir.IRAssign('v5', ir.IROp.MULTIPLY, 'v0', 'v1'))
+        self.assertEqual(guarded.index(ir.IRCallFunc('twice')), 9)
+
+    def test_condition_order(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_14.c')
+        compare = get_func_steps(ir_result, 'compare')
+
+        self.assertEqual(get_peak_temps(compare, funcs['compare']), 2)
+        self.assertIn(ir.IRJumpIf('L4', ir.IROp.COMPARE_GTE, 'v10', 'v9'), compare)
+
+    def test_peak_need(self):
+        # NOTE holding the first side's result while the second runs costs one more temporary, unless the first is a leaf.
+        self.assertEqual(irgen.get_peak_need(1, 3), 4)
+        self.assertEqual(irgen.get_peak_need(3, 1), 3)
+        self.assertEqual(irgen.get_peak_need(0, 2), 2)
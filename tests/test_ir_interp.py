@@ -0,0 +1,201 @@
+"""
+    test_ir_interp.py\n
+    Added by DrkWithT\n
+    Unit tests for running IR with the closure-compiled interpreter, before and after the optimization passes.
+"""
+
+import unittest
+import DerkCC.DCCStages.ast_nodes as ast
+import DerkCC.DCCStages.ir_types as ir
+import DerkCC.DCCStages.ir_cfg as ircfg
+import DerkCC.DCCStages.ir_ssa as irssa
+import DerkCC.DCCStages.ir_loops as irloops
+import DerkCC.DCCStages.ir_strength as irstrength
+import DerkCC.DCCStages.ir_compact as ircompact
+import DerkCC.DCCStages.ir_tailcall as irtailcall
+import DerkCC.DCCStages.ir_interp as irinterp
+import DerkCC.DCCStages.ir_passes as irpasses
+from tests.test_ir_cfg import gen_ir_impl
+
+def sum_to(n: int) -> int:
+    total = 0
+    i = 0
+
+    while i < n:
+        i += 1
+
+        if i == 5:
+            continue
+
+        if total > 1000:
+            break
+
+        total += n * 2
+
+    return total
+
+def make_gcd_cfg() -> ircfg.ControlFlowGraph:
+    return ircfg.build_cfg([
+        ir.IRLabel('gcd'),
+        ir.IRLoadParam('a'),
+        ir.IRLoadParam('b'),
+        ir.IRJumpIf('L1', ir.IROp.COMPARE_NEQ, 'b', 0),
+        ir.IRAssign('r', ir.IROp.NOP, 'a', None),
+        ir.IRJump('L0'),
+        ir.IRLabel('L1'),
+        ir.IRAssign('t', ir.IROp.SUBTRACT, 'a', 'b'),
+        ir.IRJumpIf('L2', ir.IROp.COMPARE_GTE, 't', 0),
+        ir.IRAssign('t', ir.IROp.NEGATE, 't', None),
+        ir.IRLabel('L2'),
+        ir.IRPushArg('b', False, ast.DataType.INT),
+        ir.IRPushArg('t', False, ast.DataType.INT),
+        ir.IRCallFunc('gcd'),
+        ir.IRStoreYield('y'),
+        ir.IRAssign('r', ir.IROp.NOP, 'y', None),
+        ir.IRJump('L0'),
+        ir.IRLabel('L0'),
+        ir.IRReturn('r')
+    ])
+
+GCD_INFO = [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'b', True), (ast.DataType.INT, 'r', False), (ast.DataType.INT, 't', False), (ast.DataType.INT, 'y', False)]
+
+class InterpreterTester(unittest.TestCase):
+    def test_runs_sample(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        interp = irinterp.load_program(ir_result, funcs)
+
+        self.assertEqual(interp.run(), 0)
+        self.assertEqual([interp.run('sumTo', [n]) for n in range(-2, 40)], [sum_to(n) for n in range(-2, 40)])
+        self.assertEqual(interp.run('gridSum', [3]), 36)
+
+    def test_ops_match_folding(self):
+        values = [0, 1, -1, 7, -7, 31, 1000, -65536, 2**31 - 1, -2**31]
+
+        for op in irinterp.BINARY_OP_FUNCS:
+            for lhs in values:
+                for rhs in values:
+                    if op in (ir.IROp.SHIFT_LEFT, ir.IROp.SHIFT_RIGHT, ir.IROp.SHIFT_RIGHT_LOGICAL) and not 0 <= rhs < 32:
+                        continue
+
+                    expected = ir.fold_ir_op(op, lhs, rhs)
+
+                    if expected is None:
+                        continue
+
+                    cfg = ircfg.build_cfg([ir.IRLabel('f'), ir.IRLoadParam('p'), ir.IRAssign('r', op, 'p', rhs), ir.IRReturn('r')])
+                    interp = irinterp.IRInterpreter([cfg], {'f': [(ast.DataType.INT, 'p', True)]})
+
+                    self.assertEqual(interp.run('f', [lhs]), expected, f'{op.name} {lhs} {rhs}')
+
+    def test_char_wraps(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('p'),
+            ir.IRAssign('c', ir.IROp.ADD, 'p', 100),
+            ir.IRAssign('r', ir.IROp.NOP, 'c', None),
+            ir.IRReturn('r')
+        ])
+        interp = irinterp.IRInterpreter([cfg], {'f': [(ast.DataType.INT, 'p', True), (ast.DataType.CHAR, 'c', False)]})
+
+        self.assertEqual(interp.run('f', [100]), -56)
+        self.assertEqual(interp.run('f', [2**32 + 1]), 101)
+
+    def test_errors(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('p'),
+            ir.IRAssign('r', ir.IROp.DIVIDE, 10, 'p'),
+            ir.IRLabel('L0'),
+            ir.IRJumpIf('L0', ir.IROp.COMPARE_EQ, 'r', 10),
+            ir.IRReturn('u')
+        ])
+        interp = irinterp.IRInterpreter([cfg], {'f': [(ast.DataType.INT, 'p', True)]}, max_block_runs=100)
+
+        with self.assertRaises(RuntimeError):
+            interp.run('f', [0])
+
+        with self.assertRaises(RuntimeError):
+            interp.run('f', [1])
+
+        with self.assertRaises(RuntimeError):
+            interp.run('f', [2])
+
+    def test_passes_keep_behavior(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        expected = irinterp.IRInterpreter(cfgs, funcs)
+        expected_results = [(expected.run('sumTo', [n]), expected.run('gridSum', [n])) for n in range(-2, 20)]
+
+        for cfg in cfgs:
+            for opt_pass in (irloops.LoopInvariantCodeMotionPass(), irstrength.StrengthReductionPass(), ircompact.AddressCompactionPass()):
+                opt_pass.run(cfg, funcs[cfg.func_name])
+
+        actual = irinterp.IRInterpreter(cfgs, funcs)
+
+        self.assertEqual([(actual.run('sumTo', [n]), actual.run('gridSum', [n])) for n in range(-2, 20)], expected_results)
+
+    def test_runs_ssa(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+
+        for cfg in cfgs:
+            irssa.SSABuilder().construct(cfg)
+
+        self.assertNotEqual(irssa.get_leading_phis(cfgs[0].blocks[cfgs[0].get_block_id('L1')]), [])
+
+        interp = irinterp.IRInterpreter(cfgs, funcs)
+
+        self.assertEqual([interp.run('sumTo', [n]) for n in range(12)], [sum_to(n) for n in range(12)])
+
+    def test_tail_calls_run_flat(self):
+        funcs = {'gcd': list(GCD_INFO)}
+        plain = irinterp.IRInterpreter([make_gcd_cfg()], funcs)
+
+        self.assertEqual(plain.run('gcd', [84, 36]), 12)
+
+        # NOTE subtracting 1 each time recurses once per unit, past the interpreter's call depth.
+        with self.assertRaises(RuntimeError):
+            plain.run('gcd', [1000, 1])
+
+        cfg = make_gcd_cfg()
+        irtailcall.TailCallPass().run_program([cfg], funcs)
+        looped = irinterp.IRInterpreter([cfg], funcs)
+
+        self.assertEqual(looped.run('gcd', [1000, 1]), 1)
+        self.assertEqual(looped.run('gcd', [-84, 36]), plain.run('gcd', [-84, 36]))
+
+    def test_sibling_tail_call(self):
+        cfgs = [
+            ircfg.build_cfg([ir.IRLabel('inner'), ir.IRLoadParam('x'), ir.IRAssign('y', ir.IROp.MULTIPLY, 'x', 3), ir.IRReturn('y')]),
+            ircfg.build_cfg([
+                ir.IRLabel('outer'),
+                ir.IRLoadParam('p'),
+                ir.IRAssign('q', ir.IROp.ADD, 'p', 1),
+                ir.IRPushArg('q', False, ast.DataType.INT),
+                ir.IRCallFunc('inner'),
+                ir.IRStoreYield('t'),
+                ir.IRReturn('t')
+            ])
+        ]
+        funcs = {
+            'inner': [(ast.DataType.INT, 'x', True), (ast.DataType.INT, 'y', False)],
+            'outer': [(ast.DataType.INT, 'p', True), (ast.DataType.INT, 'q', False), (ast.DataType.INT, 't', False)]
+        }
+
+        self.assertEqual(irtailcall.TailCallPass().run_program(cfgs, funcs), 1)
+        self.assertEqual(irinterp.IRInterpreter(cfgs, funcs).run('outer', [4]), 15)
+
+    def test_void_calls(self):
+        for opt_level in ('-O0', '-O1', '-O2'):
+            ir_result, funcs = gen_ir_impl('./c_samples/test_16.c')
+            interp = irinterp.load_program(irpasses.optimize_program(ir_result, funcs, opt_level), funcs)
+
+            self.assertEqual(interp.run(), 5, opt_level)
+
+        # NOTE a void function run directly gives 0.
+        ir_result, funcs = gen_ir_impl('./c_samples/test_16.c')
+
+        self.assertEqual(irinterp.load_program(ir_result, funcs).run('touch', [7]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
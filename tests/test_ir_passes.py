@@ -0,0 +1,1158 @@
+"""
+    test_ir_passes.py\n
+    Added by DrkWithT\n
+    Unit tests for the scalar IR optimization passes.
+"""
+
+import unittest
+import DerkCC.DCCStages.ast_nodes as ast
+import DerkCC.DCCStages.ir_types as ir
+import DerkCC.DCCStages.ir_cfg as ircfg
+import DerkCC.DCCStages.ir_dce as irdce
+import DerkCC.DCCStages.ir_copyprop as ircopyprop
+import DerkCC.DCCStages.ir_lvn as irlvn
+import DerkCC.DCCStages.ir_jumps as irjumps
+import DerkCC.DCCStages.ir_compact as ircompact
+import DerkCC.DCCStages.ir_inline as irinline
+import DerkCC.DCCStages.ir_tailcall as irtailcall
+import DerkCC.DCCStages.ir_strength as irstrength
+import DerkCC.DCCStages.ir_loops as irloops
+import DerkCC.DCCStages.ir_passes as irpasses
+import DerkCC.DCCStages.ir_ranges as irranges
+import DerkCC.DCCStages.ir_consteval as irconsteval
+import DerkCC.DCCStages.ir_callgraph as ircallgraph
+import DerkCC.DCCStages.ir_specialize as irspecialize
+import DerkCC.DCCStages.ir_switch as irswitch
+import DerkCC.DCCStages.ir_simplify as irsimplify
+import DerkCC.DCCStages.ir_reassoc as irreassoc
+import DerkCC.DCCStages.ir_interp as irinterp
+import DerkCC.DCCStages.ir_ssa as irssa
+import DerkCC.DCCStages.gas_gen as asmgen
+from tests.test_ir_cfg import gen_ir_impl
+
+def find_steps(cfg: ircfg.ControlFlowGraph, ir_type: ir.IRType) -> ir.StepList:
+    return [step for block in cfg.blocks for step in block.steps if step.get_ir_type() == ir_type]
+
+class DeadCodeTester(unittest.TestCase):
+    def test_unused_locals(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_01.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+
+        removed = irdce.DeadCodePass().run(cfg, funcs['main'])
+        print(cfg.dump())
+
+        # NOTE `x` and `y` are never read, so only the return value's copy stays.
+        self.assertEqual(removed, 2)
+        self.assertEqual(find_steps(cfg, ir.IRType.ADDR_ASSIGN), [ir.IRAssign('v0', ir.IROp.NOP, 0, None)])
+        self.assertEqual(funcs['main'], [(ast.DataType.INT, 'v0', False)])
+
+        asm_text = ''.join(asmgen.GASEmitter(funcs).emit_all(ircfg.flatten_cfgs([cfg])))
+        self.assertIn('subq $4, %rbp', asm_text)
+
+    def test_unreachable_blocks(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_03.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+
+        irdce.DeadCodePass().run(cfg, funcs['maxOfTwo'])
+        print(cfg.dump())
+
+        self.assertEqual([block.label for block in cfg.blocks if block.label is not None], ['maxOfTwo', 'L1', 'L0'])
+        self.assertEqual(len(find_steps(cfg, ir.IRType.JUMP)), 2)
+
+    def test_params_kept(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRLoadParam('b'),
+            ir.IRAssign('t', ir.IROp.ADD, 'a', 1),
+            ir.IRAssign('u', ir.IROp.MULTIPLY, 't', 2),
+            ir.IRPushArg('b', False, ast.DataType.INT),
+            ir.IRCallFunc('g'),
+            ir.IRStoreYield('v'),
+            ir.IRReturn('b')
+        ])
+        func_info = [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'b', True), (ast.DataType.INT, 'u', False)]
+
+        irdce.DeadCodePass().run(cfg, func_info)
+
+        # NOTE dead chains go in one run, but the call itself must stay.
+        self.assertEqual(cfg.to_steps(), [
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRLoadParam('b'),
+            ir.IRPushArg('b', False, ast.DataType.INT),
+            ir.IRCallFunc('g'),
+            ir.IRReturn('b')
+        ])
+        self.assertEqual(func_info, [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'b', True)])
+
+class CopyPropagationTester(unittest.TestCase):
+    def test_chained_assign(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_04.c')
+        old_asm = ''.join(asmgen.GASEmitter({name: list(info) for name, info in funcs.items()}).emit_all(ir_result))
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+
+        ircopyprop.CopyPropagationPass().run(cfg, funcs['main'])
+        print(cfg.dump())
+
+        new_asm = ''.join(asmgen.GASEmitter(funcs).emit_all(cfg.to_steps()))
+
+        # NOTE `a = b = c` leaves no copies, as every read goes straight to the constant 42.
+        self.assertEqual(cfg.blocks[0].steps[0], ir.IRJumpIf('L2', ir.IROp.COMPARE_NEQ, 42, 42))
+        self.assertLess(new_asm.count('\tmov'), old_asm.count('\tmov'))
+
+    def test_coalesce_into_def(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 'a', 0),
+            ir.IRAssign('t', ir.IROp.ADD, 'a', 3),
+            ir.IRAssign('x', ir.IROp.NOP, 't', None),
+            ir.IRJump('L2'),
+            ir.IRLabel('L1'),
+            ir.IRAssign('x', ir.IROp.NOP, 0, None),
+            ir.IRLabel('L2'),
+            ir.IRReturn('x')
+        ])
+        func_info = [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'x', False)]
+
+        ircopyprop.CopyPropagationPass().run(cfg, func_info)
+
+        # NOTE `x` is read past the join, so only coalescing can drop the copy of `t`.
+        self.assertEqual(cfg.to_steps(), [
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 'a', 0),
+            ir.IRAssign('x', ir.IROp.ADD, 'a', 3),
+            ir.IRJump('L2'),
+            ir.IRLabel('L1'),
+            ir.IRAssign('x', ir.IROp.NOP, 0, None),
+            ir.IRLabel('L2'),
+            ir.IRReturn('x')
+        ])
+
+    def test_truncating_copy_kept(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRAssign('c', ir.IROp.NOP, 'a', None),
+            ir.IRAssign('d', ir.IROp.NOP, 300, None),
+            ir.IRAssign('r', ir.IROp.ADD, 'c', 'd'),
+            ir.IRReturn('r')
+        ])
+        func_info = [(ast.DataType.INT, 'a', True), (ast.DataType.CHAR, 'c', False), (ast.DataType.CHAR, 'd', False)]
+
+        ircopyprop.CopyPropagationPass().run(cfg, func_info)
+
+        self.assertEqual(cfg.blocks[0].steps[1:4], [
+            ir.IRAssign('c', ir.IROp.NOP, 'a', None),
+            ir.IRAssign('d', ir.IROp.NOP, 300, None),
+            ir.IRAssign('r', ir.IROp.ADD, 'c', 'd')
+        ])
+
+class ValueNumberingTester(unittest.TestCase):
+    def test_commuted_sum(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_06.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+        lvn_pass = irlvn.ValueNumberingPass()
+
+        lvn_pass.run(cfg, funcs['sameSum'])
+        print(cfg.dump())
+
+        # NOTE `b + a` reuses `a + b`, and so does the body's `a + b` as its block's only way in is the condition.
+        self.assertEqual(cfg.blocks[0].steps[2:4], [
+            ir.IRAssign('v3', ir.IROp.ADD, 'v0', 'v1'),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_EQ, 'v3', 'v3')
+        ])
+        self.assertEqual(cfg.blocks[2].steps[0], ir.IRAssign('v2', ir.IROp.NOP, 'v3', None))
+        self.assertEqual(lvn_pass.removed_counts, {'sameSum': 2})
+
+    def test_reuse_into_branch(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRLoadParam('b'),
+            ir.IRAssign('t', ir.IROp.COMPARE_LT, 'a', 'b'),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_EQ, 't', 0),
+            ir.IRAssign('u', ir.IROp.COMPARE_GT, 'b', 'a'),
+            ir.IRReturn('u'),
+            ir.IRLabel('L1'),
+            ir.IRAssign('a', ir.IROp.ADD, 'a', 1),
+            ir.IRAssign('v', ir.IROp.COMPARE_LT, 'a', 'b'),
+            ir.IRReturn('v')
+        ])
+        func_info = [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'b', True), (ast.DataType.INT, 't', False), (ast.DataType.INT, 'u', False), (ast.DataType.INT, 'v', False)]
+
+        removed = irlvn.ValueNumberingPass().run(cfg, func_info)
+
+        # NOTE `b > a` in the lone successor is `t`, but `a < b` after reassigning `a` is a new value.
+        self.assertEqual(removed, 1)
+        self.assertEqual(find_steps(cfg, ir.IRType.RETURN)[0], ir.IRReturn('t'))
+        self.assertEqual(cfg.blocks[2].steps[1], ir.IRAssign('v', ir.IROp.COMPARE_LT, 'a', 'b'))
+
+    def test_call_invalidates(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRAssign('t', ir.IROp.MULTIPLY, 'a', 3),
+            ir.IRAssign('u', ir.IROp.MULTIPLY, 3, 'a'),
+            ir.IRCallFunc('g'),
+            ir.IRAssign('v', ir.IROp.MULTIPLY, 'a', 3),
+            ir.IRAssign('w', ir.IROp.ADD, 'u', 'v'),
+            ir.IRAssign('x', ir.IROp.ADD, 'w', 't'),
+            ir.IRReturn('x')
+        ])
+        func_info = [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 't', False), (ast.DataType.INT, 'u', False), (ast.DataType.INT, 'v', False), (ast.DataType.INT, 'w', False), (ast.DataType.INT, 'x', False)]
+
+        removed = irlvn.ValueNumberingPass().run(cfg, func_info)
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(len(find_steps(cfg, ir.IRType.ADDR_ASSIGN)), 4)
+
+    def test_truncated_result_kept(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRAssign('c', ir.IROp.ADD, 'a', 200),
+            ir.IRAssign('t', ir.IROp.ADD, 'a', 200),
+            ir.IRAssign('r', ir.IROp.SUBTRACT, 't', 'c'),
+            ir.IRReturn('r')
+        ])
+        func_info = [(ast.DataType.INT, 'a', True), (ast.DataType.CHAR, 'c', False), (ast.DataType.INT, 't', False), (ast.DataType.INT, 'r', False)]
+
+        self.assertEqual(irlvn.ValueNumberingPass().run(cfg, func_info), 0)
+
+class JumpThreadingTester(unittest.TestCase):
+    def test_short_circuit_cleanup(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_04.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+        old_branch_count = len(find_steps(cfg, ir.IRType.JUMP)) + len(find_steps(cfg, ir.IRType.JUMP_IF))
+
+        irjumps.JumpThreadingPass().run(cfg, funcs['main'])
+        print(cfg.dump())
+
+        # NOTE only the `then` body's jump over the final `return` stays.
+        self.assertEqual(find_steps(cfg, ir.IRType.JUMP), [ir.IRJump('L0')])
+        self.assertEqual([step.target for step in find_steps(cfg, ir.IRType.JUMP_IF)], ['L2', 'L1'])
+        self.assertLess(len(find_steps(cfg, ir.IRType.JUMP)) + len(find_steps(cfg, ir.IRType.JUMP_IF)), old_branch_count)
+
+    def test_chain_and_merge(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 1, 0),
+            ir.IRJumpIf('L2', ir.IROp.COMPARE_GT, 'a', 0),
+            ir.IRAssign('a', ir.IROp.NOP, 0, None),
+            ir.IRJump('L3'),
+            ir.IRLabel('L1'),
+            ir.IRJump('L3'),
+            ir.IRLabel('L2'),
+            ir.IRJump('L1'),
+            ir.IRLabel('L3'),
+            ir.IRLabel('L4'),
+            ir.IRReturn('a')
+        ])
+
+        irjumps.JumpThreadingPass().run(cfg, [(ast.DataType.INT, 'a', True)])
+
+        # NOTE `L2` goes by way of `L1` and the empty `L3` to `L4`, and the straight path becomes one block.
+        self.assertEqual(cfg.to_steps(), [
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRJumpIf('L4', ir.IROp.COMPARE_GT, 'a', 0),
+            ir.IRAssign('a', ir.IROp.NOP, 0, None),
+            ir.IRLabel('L4'),
+            ir.IRReturn('a')
+        ])
+
+    def test_known_flag_branch(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 'a', 0),
+            ir.IRAssign('t', ir.IROp.NOP, 1, None),
+            ir.IRJump('L2'),
+            ir.IRLabel('L1'),
+            ir.IRAssign('t', ir.IROp.NOP, 0, None),
+            ir.IRLabel('L2'),
+            ir.IRJumpIf('L3', ir.IROp.COMPARE_EQ, 0, 't'),
+            ir.IRReturn('a'),
+            ir.IRLabel('L3'),
+            ir.IRReturn('t')
+        ])
+
+        irjumps.JumpThreadingPass().run(cfg, [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 't', False)])
+
+        # NOTE both flag values decide the branch, so its block becomes unreachable.
+        self.assertEqual(len(find_steps(cfg, ir.IRType.JUMP_IF)), 1)
+        self.assertEqual(cfg.blocks[1].steps, [ir.IRAssign('t', ir.IROp.NOP, 1, None), ir.IRJump('Lf.0')])
+        self.assertEqual(cfg.blocks[2].steps, [ir.IRAssign('t', ir.IROp.NOP, 0, None), ir.IRJump('L3')])
+
+    def test_inverted_branch_keeps_target(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRAssign('r', ir.IROp.NOP, 0, None),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_NEQ, 'a', 5),
+            ir.IRJump('L2'),
+            ir.IRLabel('L1'),
+            ir.IRAssign('r', ir.IROp.NOP, 1, None),
+            ir.IRLabel('L2'),
+            ir.IRReturn('r')
+        ])
+        func_info = [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'r', False)]
+
+        irjumps.JumpThreadingPass().run(cfg, func_info)
+        interp = irinterp.IRInterpreter([cfg], {'f': func_info})
+
+        # NOTE the lone `Jump L2` is emptied, so the inverted branch's fallthrough still runs `L1`.
+        self.assertEqual(find_steps(cfg, ir.IRType.JUMP_IF), [ir.IRJumpIf('L2', ir.IROp.COMPARE_EQ, 'a', 5)])
+        self.assertEqual([interp.run('f', [5]), interp.run('f', [4])], [0, 1])
+
+class AddressCompactionTester(unittest.TestCase):
+    def test_sizes_kept_apart(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_02.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+
+        removed = ircompact.AddressCompactionPass().run(cfg, funcs['main'])
+        print(cfg.dump())
+
+        addrs = irdce.get_referenced_addrs(cfg)
+        char_addrs = [entry[1] for entry in funcs['main'] if entry[0] == ast.DataType.CHAR]
+
+        # NOTE the `char` gets its own address, as sharing with an `int` would change its size.
+        self.assertEqual(removed, 7)
+        self.assertEqual(len(addrs), 5)
+        self.assertEqual(len(char_addrs), 1)
+        self.assertEqual(len([step for step in cfg.blocks[0].steps if step.get_def_addr() == char_addrs[0]]), 1)
+        self.assertEqual(len(funcs['main']), len(set(entry[1] for entry in funcs['main'])))
+
+    def test_live_across_branch(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('p'),
+            ir.IRAssign('v0', ir.IROp.ADD, 'p', 1),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 'p', 0),
+            ir.IRAssign('v1', ir.IROp.NOP, 2, None),
+            ir.IRAssign('v2', ir.IROp.ADD, 'v1', 'v1'),
+            ir.IRReturn('v2'),
+            ir.IRLabel('L1'),
+            ir.IRReturn('v0')
+        ])
+        func_info = [(ast.DataType.INT, 'p', True)]
+
+        ircompact.AddressCompactionPass().run(cfg, func_info)
+
+        # NOTE `v0` is live through the fallthrough path, so `v1` and `v2` can only share with each other.
+        self.assertEqual(cfg.to_steps(), [
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a0'),
+            ir.IRAssign('a1', ir.IROp.ADD, 'a0', 1),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 'a0', 0),
+            ir.IRAssign('a2', ir.IROp.NOP, 2, None),
+            ir.IRAssign('a2', ir.IROp.ADD, 'a2', 'a2'),
+            ir.IRReturn('a2'),
+            ir.IRLabel('L1'),
+            ir.IRReturn('a1')
+        ])
+        self.assertEqual(func_info, [(ast.DataType.INT, 'a0', True)])
+
+    def test_long_chain(self):
+        temp_count = 5000
+        steps = [ir.IRLabel('f'), ir.IRAssign('v0', ir.IROp.NOP, 0, None)]
+
+        for temp_i in range(1, temp_count):
+            steps.append(ir.IRAssign(f'v{temp_i}', ir.IROp.ADD, f'v{temp_i - 1}', 1))
+
+        steps.append(ir.IRReturn(f'v{temp_count - 1}'))
+        cfg = ircfg.build_cfg(steps)
+
+        removed = ircompact.AddressCompactionPass().run(cfg, [])
+
+        self.assertEqual(removed, temp_count - 1)
+        self.assertEqual(irdce.get_referenced_addrs(cfg), {'a0'})
+
+class InlineTester(unittest.TestCase):
+    def test_leaf_call(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_03.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        inliner = irinline.InlinePass()
+
+        self.assertEqual(inliner.run_program(cfgs, funcs), 1)
+        print(cfgs[1].dump())
+
+        # NOTE the callee's params become plain locals holding the pushed constants.
+        self.assertEqual(find_steps(cfgs[1], ir.IRType.FUNC_CALL), [])
+        self.assertEqual(cfgs[1].blocks[0].steps, [
+            ir.IRAssign('maxOfTwo.0.v0', ir.IROp.NOP, 420, None),
+            ir.IRAssign('maxOfTwo.0.v1', ir.IROp.NOP, 69, None)
+        ])
+        self.assertIn((ast.DataType.INT, 'maxOfTwo.0.v0', False), funcs['main'])
+        self.assertEqual(inliner.inlined_counts, {'maxOfTwo': 0, 'main': 1})
+
+        irssa.SCCPPass().run(cfgs[1], funcs['main'])
+        irjumps.JumpThreadingPass().run(cfgs[1], funcs['main'])
+
+        self.assertEqual(cfgs[1].to_steps(), [ir.IRLabel('main'), ir.IRAssign('v0', ir.IROp.NOP, 0, None), ir.IRReturn('v0')])
+
+    def test_result_copied(self):
+        cfgs = [
+            ircfg.build_cfg([
+                ir.IRLabel('twice'),
+                ir.IRLoadParam('x'),
+                ir.IRAssign('r', ir.IROp.ADD, 'x', 'x'),
+                ir.IRReturn('r')
+            ]),
+            ircfg.build_cfg([
+                ir.IRLabel('main'),
+                ir.IRLoadParam('p'),
+                ir.IRPushArg('p', False, ast.DataType.INT),
+                ir.IRCallFunc('twice'),
+                ir.IRStoreYield('t'),
+                ir.IRReturn('t')
+            ])
+        ]
+        funcs = {'twice': [(ast.DataType.INT, 'x', True), (ast.DataType.INT, 'r', False)], 'main': [(ast.DataType.INT, 'p', True)]}
+
+        irinline.InlinePass().run_program(cfgs, funcs)
+
+        self.assertEqual(cfgs[1].to_steps(), [
+            ir.IRLabel('main'),
+            ir.IRLoadParam('p'),
+            ir.IRAssign('twice.0.x', ir.IROp.NOP, 'p', None),
+            ir.IRLabel('Lmain.0'),
+            ir.IRAssign('twice.0.r', ir.IROp.ADD, 'twice.0.x', 'twice.0.x'),
+            ir.IRAssign('t', ir.IROp.NOP, 'twice.0.r', None),
+            ir.IRJump('Lmain.1'),
+            ir.IRLabel('Lmain.1'),
+            ir.IRReturn('t')
+        ])
+        self.assertEqual(funcs['main'], [(ast.DataType.INT, 'p', True), (ast.DataType.INT, 'twice.0.x', False), (ast.DataType.INT, 'twice.0.r', False)])
+
+    def test_recursion_and_budget(self):
+        cfgs = [
+            ircfg.build_cfg([ir.IRLabel('ping'), ir.IRCallFunc('pong'), ir.IRReturn('r')]),
+            ircfg.build_cfg([ir.IRLabel('pong'), ir.IRCallFunc('ping'), ir.IRReturn('r')]),
+            ircfg.build_cfg([ir.IRLabel('big')] + [ir.IRAssign('r', ir.IROp.ADD, 'r', 1) for _ in range(30)] + [ir.IRReturn('r')]),
+            ircfg.build_cfg([ir.IRLabel('main'), ir.IRCallFunc('ping'), ir.IRCallFunc('big'), ir.IRReturn('r')])
+        ]
+        funcs = {'ping': [], 'pong': [], 'big': [], 'main': []}
+
+        # NOTE `ping` and `pong` call each other, and `big` is over budget.
+        self.assertEqual(irinline.InlinePass().run_program(cfgs, funcs), 0)
+        self.assertEqual(len(find_steps(cfgs[3], ir.IRType.FUNC_CALL)), 2)
+
+class TailCallTester(unittest.TestCase):
+    def test_self_call_loops(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('gcd'),
+            ir.IRLoadParam('a'),
+            ir.IRLoadParam('b'),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_NEQ, 'b', 0),
+            ir.IRAssign('r', ir.IROp.NOP, 'a', None),
+            ir.IRJump('L0'),
+            ir.IRLabel('L1'),
+            ir.IRAssign('t', ir.IROp.SUBTRACT, 'a', 'b'),
+            ir.IRPushArg('b', False, ast.DataType.INT),
+            ir.IRPushArg('t', False, ast.DataType.INT),
+            ir.IRCallFunc('gcd'),
+            ir.IRStoreYield('y'),
+            ir.IRAssign('r', ir.IROp.NOP, 'y', None),
+            ir.IRJump('L0'),
+            ir.IRLabel('L0'),
+            ir.IRReturn('r')
+        ])
+        funcs = {'gcd': [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'b', True), (ast.DataType.INT, 'r', False)]}
+        tail_pass = irtailcall.TailCallPass()
+
+        self.assertEqual(tail_pass.run_program([cfg], funcs), 1)
+        print(cfg.dump())
+
+        # NOTE the args go through temporaries, as `t` is computed from `b` before `b` is reassigned.
+        self.assertEqual(tail_pass.self_counts, {'gcd': 1})
+        self.assertEqual(cfg.blocks[0].steps, [ir.IRLoadParam('a'), ir.IRLoadParam('b')])
+        self.assertEqual(cfg.blocks[1].label, 'Lgcd.0')
+        self.assertEqual(cfg.blocks[cfg.get_block_id('L1')].steps, [
+            ir.IRAssign('t', ir.IROp.SUBTRACT, 'a', 'b'),
+            ir.IRAssign('tail.0.a', ir.IROp.NOP, 'b', None),
+            ir.IRAssign('tail.0.b', ir.IROp.NOP, 't', None),
+            ir.IRAssign('a', ir.IROp.NOP, 'tail.0.a', None),
+            ir.IRAssign('b', ir.IROp.NOP, 'tail.0.b', None),
+            ir.IRJump('Lgcd.0')
+        ])
+        self.assertEqual(find_steps(cfg, ir.IRType.FUNC_CALL), [])
+        self.assertEqual(cfg.blocks[1].preds, [0, cfg.get_block_id('L1')])
+
+    def test_sibling_call_jumps(self):
+        cfgs = [
+            ircfg.build_cfg([ir.IRLabel('inner'), ir.IRLoadParam('x'), ir.IRReturn('x')]),
+            ircfg.build_cfg([
+                ir.IRLabel('outer'),
+                ir.IRLoadParam('p'),
+                ir.IRPushArg('p', False, ast.DataType.INT),
+                ir.IRCallFunc('inner'),
+                ir.IRStoreYield('t'),
+                ir.IRAssign('r', ir.IROp.NOP, 't', None),
+                ir.IRReturn('r')
+            ])
+        ]
+        funcs = {
+            'inner': [(ast.DataType.INT, 'x', True)],
+            'outer': [(ast.DataType.INT, 'p', True), (ast.DataType.INT, 't', False), (ast.DataType.INT, 'r', False)]
+        }
+
+        self.assertEqual(irtailcall.TailCallPass().run_program(cfgs, funcs), 1)
+        self.assertEqual(cfgs[1].blocks[0].steps[-2:], [ir.IRPushArg('p', False, ast.DataType.INT), ir.IRTailCall('inner')])
+        self.assertEqual(cfgs[1].blocks[0].succs, [])
+
+        asm_text = ''.join(asmgen.GASEmitter(funcs).emit_all(ircfg.flatten_cfgs(cfgs)))
+        print(asm_text)
+
+        self.assertIn('\tpopq %rbp\n\tjmp inner\n', asm_text)
+        self.assertIn('\tmovl -4(%rbp), %edi\n', asm_text)
+        self.assertNotIn('call inner', asm_text)
+
+    def test_narrowed_result_kept(self):
+        cfgs = [
+            ircfg.build_cfg([ir.IRLabel('wide'), ir.IRLoadParam('x'), ir.IRReturn('x')]),
+            ircfg.build_cfg([
+                ir.IRLabel('narrow'),
+                ir.IRCallFunc('wide'),
+                ir.IRStoreYield('t'),
+                ir.IRAssign('r', ir.IROp.NOP, 't', None),
+                ir.IRReturn('r')
+            ])
+        ]
+        funcs = {'wide': [(ast.DataType.INT, 'x', True)], 'narrow': [(ast.DataType.CHAR, 'r', False)]}
+
+        # NOTE `r` truncates the call's result, so the call can't return for `narrow`.
+        self.assertEqual(irtailcall.TailCallPass().run_program(cfgs, funcs), 0)
+        self.assertEqual(len(find_steps(cfgs[1], ir.IRType.FUNC_CALL)), 1)
+
+class StrengthReductionTester(unittest.TestCase):
+    INPUTS = [0, 1, -1, 2, -2, 7, -7, 1000, -1000, 2**31 - 1, -2**31, -2**31 + 1, 123456789, -987654321] + [(n * 2654435761) % 2**32 - 2**31 for n in range(200)]
+    FACTORS = list(range(-40, 41)) + [100, 641, 1000, 7919, -7919, 65537, 2**30, -2**30, 2**31 - 1, -2**31]
+
+    def eval_steps(self, steps: ir.StepList, value: int) -> int:
+        env = {'x': value}
+
+        for step in steps:
+            arg0 = env[step.arg0] if type(step.arg0) == str else step.arg0
+            arg1 = env[step.arg1] if type(step.arg1) == str else step.arg1
+            env[step.dest] = ir.fold_ir_op(step.op, arg0, arg1)
+
+        return env['d']
+
+    def check_op(self, op: ir.IROp):
+        reduced_count = 0
+
+        for factor in self.FACTORS:
+            cfg = ircfg.build_cfg([ir.IRLabel('f'), ir.IRLoadParam('x'), ir.IRAssign('d', op, 'x', factor), ir.IRReturn('d')])
+
+            if irstrength.StrengthReductionPass().run(cfg, [(ast.DataType.INT, 'x', True)]) == 0:
+                continue
+
+            reduced_count += 1
+            steps = find_steps(cfg, ir.IRType.ADDR_ASSIGN)
+
+            self.assertNotIn(op, [step.op for step in steps])
+
+            for value in self.INPUTS:
+                expected = ir.fold_ir_op(op, value, factor)
+
+                if expected is not None:
+                    self.assertEqual(self.eval_steps(steps, value), expected, f'x = {value}, factor = {factor}')
+
+        return reduced_count
+
+    def test_multiply_exact(self):
+        self.assertGreater(self.check_op(ir.IROp.MULTIPLY), 60)
+
+    def test_divide_exact(self):
+        # NOTE only division by zero stays.
+        self.assertEqual(self.check_op(ir.IROp.DIVIDE), len(self.FACTORS) - 1)
+
+    def test_reduced_shapes(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('x'),
+            ir.IRAssign('d', ir.IROp.MULTIPLY, 'x', 10),
+            ir.IRAssign('e', ir.IROp.DIVIDE, 'd', 4),
+            ir.IRAssign('g', ir.IROp.DIVIDE, 'e', 7),
+            ir.IRAssign('h', ir.IROp.MULTIPLY, 'g', 1234567),
+            ir.IRReturn('h')
+        ])
+        funcs = {'f': [(ast.DataType.INT, 'x', True), (ast.DataType.INT, 'd', False), (ast.DataType.INT, 'e', False), (ast.DataType.INT, 'g', False), (ast.DataType.INT, 'h', False)]}
+
+        self.assertEqual(irstrength.StrengthReductionPass().run(cfg, funcs['f']), 3)
+        print(cfg.dump())
+
+        # NOTE `x * 10` is `lea (x, x, 4)` then a shift, and `e / 4` adds its bias before shifting.
+        steps = find_steps(cfg, ir.IRType.ADDR_ASSIGN)
+        self.assertEqual(steps[:7], [
+            ir.IRAssign('sr.0', ir.IROp.SHIFT_LEFT, 'x', 2),
+            ir.IRAssign('sr.1', ir.IROp.ADD, 'sr.0', 'x'),
+            ir.IRAssign('d', ir.IROp.SHIFT_LEFT, 'sr.1', 1),
+            ir.IRAssign('sr.3', ir.IROp.SHIFT_RIGHT, 'd', 31),
+            ir.IRAssign('sr.4', ir.IROp.SHIFT_RIGHT_LOGICAL, 'sr.3', 30),
+            ir.IRAssign('sr.5', ir.IROp.ADD, 'd', 'sr.4'),
+            ir.IRAssign('e', ir.IROp.SHIFT_RIGHT, 'sr.5', 2)
+        ])
+        self.assertEqual(steps[7].op, ir.IROp.MULTIPLY_HIGH)
+        self.assertEqual(steps[-1], ir.IRAssign('h', ir.IROp.MULTIPLY, 'g', 1234567))
+        self.assertIn((ast.DataType.INT, 'sr.0', False), funcs['f'])
+
+        asm_text = ''.join(asmgen.GASEmitter(funcs).emit_all(cfg.to_steps()))
+        print(asm_text)
+
+        self.assertIn('\tsall $2, %eax\n', asm_text)
+        self.assertIn('\timull %edx\n', asm_text)
+        self.assertIn('\timull %edx, %eax\n', asm_text)
+        self.assertNotIn('nop', asm_text)
+
+    def test_exact_quotient(self):
+        for no_wrap in (True, False):
+            cfg = ircfg.build_cfg([
+                ir.IRLabel('f'),
+                ir.IRLoadParam('x'),
+                ir.IRAssign('t', ir.IROp.MULTIPLY, 'x', 12, no_wrap),
+                ir.IRAssign('d', ir.IROp.DIVIDE, 't', 4),
+                ir.IRAssign('e', ir.IROp.DIVIDE, 't', 5),
+                ir.IRReturn('d')
+            ])
+            irstrength.StrengthReductionPass().run(cfg, [(ast.DataType.INT, 'x', True)])
+            steps = find_steps(cfg, ir.IRType.ADDR_ASSIGN)
+            d_i = [step.dest for step in steps].index('d')
+            print(cfg.dump())
+
+            # NOTE only a product that can't wrap is divided exactly, so `t / 4` is `x * 3` as a `lea`, while `t / 5` still needs the magic multiply.
+            if no_wrap:
+                self.assertEqual(steps[d_i - 1:d_i + 1], [ir.IRAssign('sr.3', ir.IROp.SHIFT_LEFT, 'x', 1), ir.IRAssign('d', ir.IROp.ADD, 'sr.3', 'x')])
+            else:
+                self.assertEqual(steps[d_i].op, ir.IROp.SHIFT_RIGHT)
+
+            self.assertIn(ir.IROp.MULTIPLY_HIGH, [step.op for step in steps])
+
+            for value in self.INPUTS:
+                if no_wrap and abs(value * 12) >= 2**31:
+                    continue
+
+                self.assertEqual(self.eval_steps(steps, value), ir.fold_ir_op(ir.IROp.DIVIDE, ir.fold_ir_op(ir.IROp.MULTIPLY, value, 12), 4), f'x = {value}')
+
+class LoopTester(unittest.TestCase):
+    def test_natural_loops(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[1]
+        loops = irloops.find_natural_loops(cfg)
+
+        # NOTE the inner loop comes first, and both are only entered through their headers.
+        self.assertEqual([cfg.blocks[loop.header].label for loop in loops], ['L10', 'L7'])
+        self.assertEqual(loops[0].blocks, {cfg.get_block_id('L10'), cfg.get_block_id('L11')})
+        self.assertEqual(loops[0].latches, [cfg.get_block_id('L11')])
+        self.assertTrue(loops[0].blocks < loops[1].blocks)
+        self.assertEqual(loops[1].get_exit_blocks(cfg), [cfg.get_block_id('L9')])
+        self.assertEqual(irloops.get_loop_depths(cfg, loops)[cfg.get_block_id('L10')], 2)
+
+    def test_hoists_invariants(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+        licm_pass = irloops.LoopInvariantCodeMotionPass()
+
+        self.assertEqual(licm_pass.run(cfg, funcs['sumTo']), 2)
+        print(cfg.dump())
+
+        # NOTE the guard jumps past the loop, so a preheader goes between it and the header.
+        preheader_id = cfg.get_block_id('LsumTo.0')
+        self.assertEqual(licm_pass.hoisted_counts, {'sumTo': 2})
+        self.assertEqual(cfg.blocks[preheader_id].steps, [
+            ir.IRAssign('v5', ir.IROp.MULTIPLY, 'v0', 2),
+            ir.IRAssign('v4', ir.IROp.NOP, 'v5', None)
+        ])
+        self.assertEqual(cfg.blocks[preheader_id].succs, [cfg.get_block_id('L1')])
+        self.assertEqual(cfg.blocks[cfg.get_block_id('L1')].preds, [preheader_id, cfg.get_block_id('L2')])
+
+    def test_hoists_out_of_inner_loop_only(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[1]
+        licm_pass = irloops.LoopInvariantCodeMotionPass()
+
+        # NOTE `row * 4` is invariant in the inner loop, but `row` changes in the outer one.
+        self.assertEqual(licm_pass.run(cfg, funcs['gridSum']), 1)
+        self.assertEqual(cfg.blocks[cfg.get_block_id('LgridSum.0')].steps, [ir.IRAssign('v5', ir.IROp.MULTIPLY, 'v3', 4)])
+        self.assertEqual(cfg.blocks[cfg.get_block_id('LgridSum.0')].preds, [cfg.get_block_id('L7')])
+
+    def test_keeps_unsafe_steps(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('n'),
+            ir.IRLoadParam('k'),
+            ir.IRAssign('i', ir.IROp.NOP, 0, None),
+            ir.IRAssign('q', ir.IROp.NOP, 0, None),
+            ir.IRLabel('L1'),
+            ir.IRJumpIf('L2', ir.IROp.COMPARE_EQ, 'n', 0),
+            ir.IRAssign('q', ir.IROp.DIVIDE, 'k', 'n'),
+            ir.IRAssign('m', ir.IROp.ADD, 'k', 1),
+            ir.IRAssign('d', ir.IROp.DIVIDE, 'm', 'n'),
+            ir.IRAssign('i', ir.IROp.ADD, 'i', 'd'),
+            ir.IRLabel('L2'),
+            ir.IRAssign('i', ir.IROp.ADD, 'i', 1),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 'i', 10),
+            ir.IRReturn('q')
+        ])
+        licm_pass = irloops.LoopInvariantCodeMotionPass()
+
+        # NOTE only `m` moves: `q` is live after the loop and `d` could divide by zero had the guarded block never run.
+        self.assertEqual(licm_pass.run(cfg, []), 1)
+        self.assertEqual(cfg.blocks[0].steps[-1], ir.IRAssign('m', ir.IROp.ADD, 'k', 1))
+        self.assertEqual(len(find_steps(cfg, ir.IRType.ADDR_ASSIGN)), 7)
+
+class PassManagerTester(unittest.TestCase):
+    def test_presets_keep_behavior(self):
+        for opt_level in ('-O0', '-O1', '-O2'):
+            ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+            expected = irinterp.load_program(ir_result, funcs)
+            optimized = irinterp.load_program(irpasses.optimize_program(ir_result, funcs, opt_level, True), funcs)
+
+            self.assertEqual(optimized.run(), expected.run())
+
+            # NOTE at -O2 main's calls fold to constants, so the helpers are dropped as dead functions.
+            self.assertEqual(set(optimized.compiled), {'main'} if opt_level == '-O2' else {'sumTo', 'gridSum', 'main'})
+
+            for func_name in set(optimized.compiled) - {'main'}:
+                for n in range(-2, 20):
+                    self.assertEqual(optimized.run(func_name, [n]), expected.run(func_name, [n]), f'{opt_level} {func_name}({n})')
+
+    def test_stats(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        old_step_count = sum(cfg.get_step_count() for cfg in cfgs)
+        manager = irpasses.PassManager([irinline.InlinePass(), irdce.DeadCodePass()], track_memory=True)
+
+        manager.run(cfgs, funcs)
+        print('\n'.join(manager.get_report()))
+
+        # NOTE a program pass runs once for all functions, and a function pass once per function.
+        self.assertEqual([(stats.pass_name, stats.func_name) for stats in manager.stats], [('inline', None), ('dce', 'sumTo'), ('dce', 'gridSum'), ('dce', 'main')])
+        self.assertEqual(sum(stats.get_step_delta() for stats in manager.stats), sum(cfg.get_step_count() for cfg in cfgs) - old_step_count)
+        self.assertTrue(all(stats.peak_bytes is not None and stats.seconds >= 0 for stats in manager.stats))
+        self.assertEqual(len(manager.get_report()), 3)
+        self.assertEqual(irpasses.get_pipeline('-O0'), [])
+
+    def test_verify_names_pass(self):
+        class DropLoadsPass:
+            name = 'drop-loads'
+
+            def run(self, cfg: ircfg.ControlFlowGraph, func_info) -> int:
+                cfg.blocks[0].steps = [step for step in cfg.blocks[0].steps if step.get_ir_type() != ir.IRType.LOAD_PARAM]
+                return 1
+
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+
+        with self.assertRaisesRegex(RuntimeError, 'after drop-loads'):
+            irpasses.PassManager([irdce.DeadCodePass(), DropLoadsPass()], verify=True).run(cfgs, funcs)
+
+        cfg = ircfg.build_cfg([ir.IRLabel('f'), ir.IRLoadParam('a'), ir.IRJump('L0'), ir.IRLabel('L0'), ir.IRReturn('a')])
+        cfg.blocks[0].steps[-1].target = 'L9'
+
+        self.assertEqual(irpasses.verify_cfg(cfg, {'f': []}), ['block #0 jumps to missing label L9'])
+
+    def test_verify_void_functions(self):
+        for opt_level in ('-O0', '-O1', '-O2'):
+            ir_result, funcs = gen_ir_impl('./c_samples/test_16.c')
+            steps = irpasses.optimize_program(ir_result, funcs, opt_level, verify=True)
+
+            self.assertEqual(irinterp.load_program(steps, funcs).run(), 5, opt_level)
+
+        cfg = ircfg.build_cfg([ir.IRLabel('f'), ir.IRLoadParam('a'), ir.IRJumpIf('L0', ir.IROp.COMPARE_LT, 'a', 0), ir.IRReturn(None), ir.IRLabel('L0'), ir.IRReturn('a')])
+
+        self.assertEqual(irpasses.verify_cfg(cfg, {'f': []}), ['returns both with and without a result'])
+
+class ValueRangeTester(unittest.TestCase):
+    def run_ranges(self, file_path: str) -> tuple:
+        ir_result, funcs = gen_ir_impl(file_path)
+        expected = irinterp.load_program(ir_result, funcs)
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        range_pass = irranges.ValueRangePass()
+
+        for cfg in cfgs:
+            range_pass.run(cfg, funcs[cfg.func_name])
+
+        actual = irinterp.IRInterpreter(cfgs, funcs)
+
+        for cfg in cfgs[:-1]:
+            for n in range(-300, 300, 7):
+                self.assertEqual(actual.run(cfg.func_name, [n]), expected.run(cfg.func_name, [n]), f'{cfg.func_name}({n})')
+
+        return ({cfg.func_name: cfg for cfg in cfgs}, range_pass)
+
+    def test_nested_condition(self):
+        cfgs, range_pass = self.run_ranges('./c_samples/test_08.c')
+
+        # NOTE `a < 20` always holds inside `a < 10`, so its `else` goes away.
+        self.assertEqual(find_steps(cfgs['classify'], ir.IRType.JUMP_IF), [ir.IRJumpIf('L1', ir.IROp.COMPARE_GTE, 'v0', 10)])
+        self.assertEqual(range_pass.folded_counts['classify'], 1)
+        self.assertNotIn(ir.IRAssign('v2', ir.IROp.NOP, 2, None), find_steps(cfgs['classify'], ir.IRType.ADDR_ASSIGN))
+
+    def test_char_width(self):
+        cfgs, range_pass = self.run_ranges('./c_samples/test_08.c')
+
+        # NOTE a `char` param can't be over 200 or under -128.
+        self.assertEqual(find_steps(cfgs['clampChar'], ir.IRType.JUMP_IF), [])
+        self.assertEqual(range_pass.folded_counts['clampChar'], 2)
+
+    def test_loop_counters(self):
+        cfgs, range_pass = self.run_ranges('./c_samples/test_08.c')
+        increments = [step for step in find_steps(cfgs['countUp'], ir.IRType.ADDR_ASSIGN) if step.op == ir.IROp.ADD]
+
+        # NOTE `i < n` bounds `i` below INT_MAX inside the loop, so `i + 1` can't wrap.
+        self.assertEqual(increments, [ir.IRAssign('v3', ir.IROp.ADD, 'v2', 1)])
+        self.assertTrue(increments[0].no_wrap)
+
+        cfgs, range_pass = self.run_ranges('./c_samples/test_07.c')
+
+        # NOTE the inner loop's guard `col >= n` never holds, as `n > row >= 0`.
+        self.assertEqual(range_pass.folded_counts['gridSum'], 1)
+        self.assertEqual(len(find_steps(cfgs['gridSum'], ir.IRType.JUMP_IF)), 3)
+
+    def test_table_edges(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('pick'),
+            ir.IRLoadParam('p'),
+            ir.IRAssign('x', ir.IROp.NOP, 0, None),
+            ir.IRJumpIf('L3', ir.IROp.COMPARE_LT, 'p', 0),
+            ir.IRJumpTable('p', 1, ['L1'], 'L3'),
+            ir.IRLabel('L1'),
+            ir.IRAssign('x', ir.IROp.NOP, 5, None),
+            ir.IRLabel('L3'),
+            ir.IRJumpIf('L4', ir.IROp.COMPARE_EQ, 'x', 5),
+            ir.IRReturn('p'),
+            ir.IRLabel('L4'),
+            ir.IRReturn('x')
+        ])
+        range_pass = irranges.ValueRangePass()
+        range_pass.run(cfg, [(ast.DataType.INT, 'p', True), (ast.DataType.INT, 'x', False)])
+
+        # NOTE `x` is 5 when the table picks L1, so `x == 5` can't be folded from the other edge alone.
+        self.assertEqual(range_pass.folded_counts['pick'], 0)
+        self.assertEqual(find_steps(cfg, ir.IRType.JUMP_IF)[-1], ir.IRJumpIf('L4', ir.IROp.COMPARE_EQ, 'x', 5))
+
+    def test_range_math(self):
+        self.assertEqual(irranges.eval_op_range(ir.IROp.DIVIDE, (-7, 9), (2, 3)), (-3, 4))
+        self.assertIsNone(irranges.eval_op_range(ir.IROp.DIVIDE, (-7, 9), (-1, 1)))
+        self.assertEqual(irranges.eval_op_range(ir.IROp.SHIFT_RIGHT_LOGICAL, (-1, 5), (28, 28)), (0, 15))
+        self.assertEqual(irranges.refine_ranges(ir.IROp.COMPARE_GT, (0, 100), (50, 60)), ((51, 100), (50, 60)))
+        self.assertEqual(irranges.refine_ranges(ir.IROp.COMPARE_NEQ, (0, 10), (0, 0)), ((1, 10), (0, 0)))
+        self.assertIsNone(irranges.refine_ranges(ir.IROp.COMPARE_LT, (5, 9), (0, 5)))
+        self.assertIs(irranges.compare_ranges(ir.IROp.COMPARE_GTE, (3, 3), (-128, 3)), True)
+
+class ConstCallTester(unittest.TestCase):
+    def test_folds_pure_calls(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_09.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        const_pass = irconsteval.ConstCallPass()
+
+        self.assertEqual(const_pass.run_program(cfgs, funcs), 2)
+        self.assertEqual(const_pass.folded_counts, {'fib': 0, 'spin': 0, 'share': 0, 'main': 2})
+
+        main_steps = cfgs[-1].blocks[0].steps
+
+        self.assertIn(ir.IRAssign('v2', ir.IROp.NOP, 6765, None), main_steps)
+        self.assertIn(ir.IRAssign('v7', ir.IROp.NOP, 2, None), main_steps)
+        self.assertEqual([step.callee for step in main_steps if step.get_ir_type() == ir.IRType.FUNC_CALL], ['spin', 'share'])
+
+    def test_memo_and_limits(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_09.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        const_pass = irconsteval.ConstCallPass()
+        const_pass.run_program(cfgs, funcs)
+
+        # NOTE each fib(n) ran once, the loop went past its block budget, and the division trap stays for runtime.
+        self.assertEqual(sorted(key[1][0] for key in const_pass.memo if key[0] == 'fib'), list(range(21)))
+        self.assertIsNone(const_pass.memo[('spin', (100000,))])
+        self.assertIsNone(const_pass.memo[('share', (0,))])
+
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        const_pass = irconsteval.ConstCallPass(max_blocks=300_000)
+
+        self.assertEqual(const_pass.run_program(cfgs, funcs), 3)
+        self.assertEqual(const_pass.memo[('spin', (100000,))], 100000)
+
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+
+        self.assertEqual(irconsteval.ConstCallPass(max_depth=10).run_program(cfgs, funcs), 1)
+
+    def test_pure_funcs(self):
+        call_graph = {'a': {'b'}, 'b': {'ext'}, 'c': set(), 'd': {'c', 'd'}, 'e': {'f'}, 'f': {'e', 'a'}}
+
+        self.assertEqual(irconsteval.get_pure_funcs(call_graph), {'c', 'd'})
+
+class CallGraphTester(unittest.TestCase):
+    def test_sccs(self):
+        call_graph = {'main': {'a', 'c'}, 'a': {'b'}, 'b': {'a', 'ext'}, 'c': set(), 'd': {'d'}, 'e': {'main', 'c'}}
+
+        # NOTE every component comes after the ones it calls into.
+        self.assertEqual(ircallgraph.get_sccs(call_graph), [['a', 'b'], ['c'], ['main'], ['d'], ['e']])
+        self.assertEqual(ircallgraph.get_recursive_funcs(call_graph), {'a', 'b', 'd'})
+        self.assertEqual(ircallgraph.get_reachable_funcs(call_graph, ['main']), {'main', 'a', 'b', 'c'})
+        self.assertEqual(ircallgraph.get_callers(call_graph)['c'], {'main', 'e'})
+
+        dump = ircallgraph.dump_call_graph(call_graph)
+
+        self.assertIn('    label="scc #0";', dump)
+        self.assertIn('  "main" [shape=box];', dump)
+        self.assertIn('    "d" [style=dashed];', dump)
+        self.assertIn('  "b" -> "ext";', dump)
+
+    def test_program_graph(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_09.c')
+        call_graph = ircallgraph.get_call_graph(ircfg.build_program_cfgs(ir_result, funcs))
+
+        self.assertEqual(call_graph, {'fib': {'fib'}, 'spin': set(), 'share': set(), 'main': {'fib', 'spin', 'share'}})
+        self.assertEqual(ircallgraph.get_sccs(call_graph), [['fib'], ['spin'], ['share'], ['main']])
+
+    def test_dead_functions(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        dead_pass = ircallgraph.DeadFunctionPass()
+
+        self.assertEqual(dead_pass.run_program(cfgs, funcs), 0)
+
+        # NOTE once main's calls fold to constants, nothing reaches the helpers.
+        irconsteval.ConstCallPass().run_program(cfgs, funcs)
+
+        self.assertEqual(dead_pass.run_program(cfgs, funcs), 2)
+        self.assertEqual(dead_pass.removed_funcs, ['sumTo', 'gridSum'])
+        self.assertEqual([cfg.func_name for cfg in cfgs], ['main'])
+        self.assertEqual(list(funcs), ['main'])
+
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)[:-1]
+
+        self.assertEqual(ircallgraph.DeadFunctionPass().run_program(cfgs, funcs), 0)
+        self.assertEqual(ircallgraph.DeadFunctionPass(['sumTo']).run_program(cfgs, funcs), 1)
+        self.assertEqual([cfg.func_name for cfg in cfgs], ['sumTo'])
+
+class SpecializeTester(unittest.TestCase):
+    def test_clones_mixed_calls(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_10.c')
+        expected = irinterp.load_program(ir_result, funcs)
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        spec_pass = irspecialize.SpecializePass()
+
+        # NOTE both `scale(_, 2)` sites share a clone, while `bump(_, 1)` only saves its param load and stays.
+        self.assertEqual(spec_pass.run_program(cfgs, funcs), 3)
+        self.assertEqual(spec_pass.clones, {('scale', ((1, 2),)): 'scale.spec0', ('scale', ((1, 3),)): 'scale.spec1'})
+        self.assertEqual([cfg.func_name for cfg in cfgs], ['scale', 'scale.spec0', 'scale.spec1', 'bump', 'run', 'main'])
+        self.assertEqual(funcs['scale.spec0'], [(ast.DataType.INT, 'v0', True), (ast.DataType.INT, 'v2', False), (ast.DataType.INT, 'v3', False)])
+
+        clone_cfg = cfgs[1]
+
+        self.assertEqual(find_steps(clone_cfg, ir.IRType.JUMP_IF), [])
+        self.assertEqual(find_steps(clone_cfg, ir.IRType.LOAD_PARAM), [ir.IRLoadParam('v0')])
+
+        run_steps = [step for block in cfgs[4].blocks for step in block.steps]
+
+        self.assertEqual([step.callee for step in run_steps if step.get_ir_type() == ir.IRType.FUNC_CALL], ['scale.spec0', 'scale.spec0', 'scale.spec1', 'bump'])
+        self.assertEqual(len([step for step in run_steps if step.get_ir_type() == ir.IRType.ARGV_PUSH]), 5)
+
+        actual = irinterp.IRInterpreter(cfgs, funcs)
+
+        for n in range(-50, 50):
+            self.assertEqual(actual.run('run', [n]), expected.run('run', [n]), f'run({n})')
+
+    def test_growth_budget(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_10.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        spec_pass = irspecialize.SpecializePass(max_growth=5)
+
+        # NOTE the clone used by 2 sites goes first and uses up the budget.
+        self.assertEqual(spec_pass.run_program(cfgs, funcs), 2)
+        self.assertEqual(list(spec_pass.clones.values()), ['scale.spec0'])
+        self.assertNotIn('scale.spec1', funcs)
+
+        ir_result, funcs = gen_ir_impl('./c_samples/test_10.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+
+        self.assertEqual(irspecialize.SpecializePass(max_clone_size=4).run_program(cfgs, funcs), 0)
+
+    def test_repeated_pipeline(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_19.c')
+        expected = irinterp.load_program(ir_result, funcs).run()
+        steps = irpasses.optimize_program(ir_result, funcs, '-O2', True)
+        first_names = [cfg.func_name for cfg in ircfg.build_program_cfgs(steps, funcs)]
+        steps = irpasses.optimize_program(steps, funcs, '-O2', True)
+        second_names = [cfg.func_name for cfg in ircfg.build_program_cfgs(steps, funcs)]
+
+        # NOTE the budget leaves `blend(_, 4)` for the second run, whose clone must not take a name the first run gave out.
+        self.assertEqual(first_names, ['blend', 'blend.spec0', 'blend.spec1', 'blend.spec2', 'mix', 'main'])
+        self.assertEqual(second_names, ['blend.spec3', 'blend.spec1', 'blend.spec2', 'mix', 'main'])
+        self.assertEqual(irinterp.load_program(steps, funcs).run(), expected)
+
+class SwitchTester(unittest.TestCase):
+    def run_switch(self) -> tuple:
+        ir_result, funcs = gen_ir_impl('./c_samples/test_11.c')
+        expected = irinterp.load_program(ir_result, funcs)
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        switch_pass = irswitch.SwitchLoweringPass()
+        cleanup = [irssa.SCCPPass(), ircopyprop.CopyPropagationPass(), irdce.DeadCodePass(), irjumps.JumpThreadingPass(), switch_pass, irdce.DeadCodePass()]
+
+        # NOTE ConstCallPass would fold both calls in main, so the chains are lowered without it.
+        irpasses.PassManager(cleanup, verify=True).run(cfgs, funcs)
+        actual = irinterp.IRInterpreter(cfgs, funcs)
+
+        for func_name in ('dispatch', 'lookup'):
+            for n in [*range(-20, 120), 1000, 77777, 77776, -2**31, 2**31 - 1]:
+                self.assertEqual(actual.run(func_name, [n]), expected.run(func_name, [n]), f'{func_name}({n})')
+
+        return ({cfg.func_name: cfg for cfg in cfgs}, switch_pass, funcs)
+
+    def test_dense_table(self):
+        cfgs, switch_pass, _ = self.run_switch()
+        tables = find_steps(cfgs['dispatch'], ir.IRType.JUMP_TABLE)
+
+        # NOTE the missing case 4 gets the default's label.
+        self.assertEqual(len(tables), 1)
+        self.assertEqual((tables[0].arg, tables[0].low, len(tables[0].targets)), ('v0', 1, 6))
+        self.assertEqual(tables[0].targets[3], tables[0].default)
+        self.assertEqual(find_steps(cfgs['dispatch'], ir.IRType.JUMP_IF), [])
+        self.assertEqual((switch_pass.table_counts['dispatch'], switch_pass.tree_counts['dispatch']), (1, 0))
+
+    def test_sparse_tree(self):
+        cfgs, switch_pass, _ = self.run_switch()
+        branches = find_steps(cfgs['lookup'], ir.IRType.JUMP_IF)
+
+        # NOTE one split on the middle case, then 3 cases a side instead of up to 6 in a row.
+        self.assertEqual(find_steps(cfgs['lookup'], ir.IRType.JUMP_TABLE), [])
+        self.assertEqual([(step.op, step.arg1) for step in branches if step.op == ir.IROp.COMPARE_GTE], [(ir.IROp.COMPARE_GTE, 100)])
+        self.assertEqual(sorted(step.arg1 for step in branches if step.op == ir.IROp.COMPARE_EQ), [-7, 3, 40, 100, 1000, 77777])
+        self.assertEqual((switch_pass.table_counts['lookup'], switch_pass.tree_counts['lookup']), (0, 1))
+
+    def test_short_chain(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_11.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        switch_pass = irswitch.SwitchLoweringPass(min_cases=7)
+
+        irpasses.PassManager([irjumps.JumpThreadingPass(), switch_pass], verify=True).run(cfgs, funcs)
+
+        self.assertEqual(sum(switch_pass.table_counts.values()) + sum(switch_pass.tree_counts.values()), 0)
+
+    def test_passes_after_table(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_11.c')
+        expected = irinterp.load_program(ir_result, funcs)
+        cfgs, _, _ = self.run_switch()
+        range_pass = irranges.ValueRangePass()
+
+        # NOTE every entry of the table is reached from a param, so neither pass may drop its targets.
+        irpasses.PassManager([irssa.SCCPPass(), range_pass, irdce.DeadCodePass()], verify=True).run(list(cfgs.values()), funcs)
+        actual = irinterp.IRInterpreter(list(cfgs.values()), funcs)
+
+        self.assertEqual(len(find_steps(cfgs['dispatch'], ir.IRType.JUMP_TABLE)), 1)
+        self.assertEqual(range_pass.folded_counts['dispatch'], 0)
+
+        for n in range(-3, 10):
+            self.assertEqual(actual.run('dispatch', [n]), expected.run('dispatch', [n]), f'dispatch({n})')
+
+    def test_table_asm(self):
+        cfgs, _, funcs = self.run_switch()
+        asm_text = ''.join(asmgen.GASEmitter(funcs).emit_all(ircfg.flatten_cfgs([cfgs['dispatch']])))
+
+        self.assertIn('\tsubl $1, %eax\n\tcmpl $5, %eax\n', asm_text)
+        self.assertIn('\tmovslq (%rdx,%rax,4), %rax\n\taddq %rdx, %rax\n\tjmp *%rax\n.section .rodata\n.balign 4\n.Ljt0:\n', asm_text)
+        self.assertEqual(asm_text.count(' - .Ljt0\n'), 6)
+
+class SimplifyTester(unittest.TestCase):
+    def test_sample_rules(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_12.c')
+        expected = irinterp.load_program(ir_result, funcs)
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        simplify_pass = irsimplify.AlgebraicSimplifyPass()
+
+        self.assertEqual(simplify_pass.run(cfgs[0], funcs['algebra']), 9)
+
+        assigns = find_steps(cfgs[0], ir.IRType.ADDR_ASSIGN)
+
+        # NOTE `1 * y` is swapped before its identity is dropped, and `x < x` leaves only the jump past its `if`.
+        self.assertEqual(assigns[:7], [ir.IRAssign('v4', ir.IROp.NOP, 'v0', None), ir.IRAssign('v3', ir.IROp.NOP, 'v4', None), ir.IRAssign('v6', ir.IROp.NOP, 'v1', None), ir.IRAssign('v5', ir.IROp.NOP, 'v6', None), ir.IRAssign('v8', ir.IROp.NOP, 0, None), ir.IRAssign('v7', ir.IROp.NOP, 'v8', None), ir.IRAssign('v10', ir.IROp.NEGATE, 'v5', None)])
+        self.assertIn(ir.IRAssign('v12', ir.IROp.NOP, 0, None), assigns)
+        self.assertIn(ir.IRAssign('v14', ir.IROp.ADD, 'v1', -3), assigns)
+        self.assertIn(ir.IRAssign('v20', ir.IROp.MULTIPLY, 'v0', 5), assigns)
+        self.assertNotIn(ir.IRAssign('v2', ir.IROp.NOP, 99, None), assigns)
+        self.assertEqual(simplify_pass.rule_counts['put_const_right'], 2)
+
+        actual = irinterp.IRInterpreter(cfgs, funcs)
+
+        for x in range(-6, 7):
+            for y in range(-6, 7):
+                self.assertEqual(actual.run('algebra', [x, y]), expected.run('algebra', [x, y]), f'algebra({x}, {y})')
+
+    def test_step_rules(self):
+        simplify_pass = irsimplify.AlgebraicSimplifyPass()
+
+        self.assertEqual(simplify_pass.simplify_step(ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 0, 't')), ([ir.IRJumpIf('L1', ir.IROp.COMPARE_GT, 't', 0)], 1))
+        self.assertEqual(simplify_pass.simplify_step(ir.IRJumpIf('L1', ir.IROp.COMPARE_LTE, 't', 't')), ([ir.IRJump('L1')], 1))
+        self.assertEqual(simplify_pass.simplify_step(ir.IRJumpIf('L1', ir.IROp.COMPARE_NEQ, 't', 't')), ([], 1))
+        self.assertEqual(simplify_pass.simplify_step(ir.IRAssign('a', ir.IROp.COMPARE_GTE, 7, 't')), ([ir.IRAssign('a', ir.IROp.COMPARE_LTE, 't', 7)], 1))
+        self.assertEqual(simplify_pass.simplify_step(ir.IRAssign('a', ir.IROp.SHIFT_RIGHT, 0, 't')), ([ir.IRAssign('a', ir.IROp.NOP, 0, None)], 1))
+        self.assertEqual(simplify_pass.simplify_step(ir.IRAssign('a', ir.IROp.DIVIDE, 't', -1)), ([ir.IRAssign('a', ir.IROp.NEGATE, 't', None)], 1))
+        self.assertEqual(simplify_pass.simplify_step(ir.IRAssign('a', ir.IROp.DIVIDE, 't', 't')), ([ir.IRAssign('a', ir.IROp.DIVIDE, 't', 't')], 0))
+
+    def test_no_wrap_kept(self):
+        simplify_pass = irsimplify.AlgebraicSimplifyPass()
+        swapped = simplify_pass.simplify_step(ir.IRAssign('a', ir.IROp.ADD, 2, 't', True))[0][0]
+        small = simplify_pass.simplify_step(ir.IRAssign('a', ir.IROp.SUBTRACT, 't', 1, True))[0][0]
+        int_min = simplify_pass.simplify_step(ir.IRAssign('a', ir.IROp.SUBTRACT, 't', -2**31, True))[0][0]
+
+        # NOTE INT_MIN is its own negation, so its flag is dropped rather than judged again.
+        self.assertEqual((swapped, swapped.no_wrap), (ir.IRAssign('a', ir.IROp.ADD, 't', 2), True))
+        self.assertEqual((small, small.no_wrap), (ir.IRAssign('a', ir.IROp.ADD, 't', -1), True))
+        self.assertEqual((int_min, int_min.no_wrap), (ir.IRAssign('a', ir.IROp.ADD, 't', -2**31), False))
+
+class ReassociateTester(unittest.TestCase):
+    def test_balanced_chains(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_13.c')
+        expected = irinterp.load_program(ir_result, funcs)
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+        reassoc_pass = irreassoc.ReassociatePass()
+        old_paths = {cfg.func_name: irreassoc.get_critical_path(cfg.blocks[0].steps) for cfg in cfgs}
+
+        irpasses.PassManager([reassoc_pass], verify=True).run(cfgs, funcs)
+        new_paths = {cfg.func_name: irreassoc.get_critical_path(cfg.blocks[0].steps) for cfg in cfgs}
+
+        # NOTE by the latency model, the 9 term sum goes from 8 adds in a row to 4 and `a * 2 * b * c * 3 * d` from 5 multiplies to 3. test_mir.py times the emitted code.
+        self.assertEqual((old_paths['sumChain'], new_paths['sumChain']), (8, 5))
+        self.assertEqual((old_paths['productChain'], new_paths['productChain']), (15, 9))
+        self.assertEqual(reassoc_pass.rebuilt_counts, {'sumChain': 1, 'productChain': 1, 'mixedChain': 1, 'main': 0})
+        self.assertEqual(find_steps(cfgs[1], ir.IRType.ADDR_ASSIGN)[:4], [ir.IRAssign('v5', ir.IROp.MULTIPLY, 'v0', 'v1'), ir.IRAssign('v6', ir.IROp.MULTIPLY, 'v2', 'v3'), ir.IRAssign('v7', ir.IROp.MULTIPLY, 'v5', 6), ir.IRAssign('v9', ir.IROp.MULTIPLY, 'v6', 'v7')])
+
+        actual = irinterp.IRInterpreter(cfgs, funcs)
+
+        for args in [[1, 2, 3, 4], [-3, 7, 0, 5], [2**31 - 1, 2**31 - 1, -2**31, 3], [65536, 65536, -1, 9]]:
+            for func_name in ('sumChain', 'productChain'):
+                self.assertEqual(actual.run(func_name, args), expected.run(func_name, args), f'{func_name}{args}')
+
+            self.assertEqual(actual.run('mixedChain', args[:3]), expected.run('mixedChain', args[:3]), f'mixedChain{args[:3]}')
+
+    def test_redefined_operand(self):
+        steps = [ir.IRLabel('f'), ir.IRLoadParam('a'), ir.IRLoadParam('b'), ir.IRLoadParam('c'), ir.IRAssign('t0', ir.IROp.ADD, 'a', 'b'), ir.IRAssign('a', ir.IROp.NOP, 4, None), ir.IRAssign('t1', ir.IROp.ADD, 't0', 'c'), ir.IRAssign('t2', ir.IROp.ADD, 't1', 'a'), ir.IRAssign('t3', ir.IROp.ADD, 't2', 'b'), ir.IRReturn('t3')]
+        funcs = {'f': [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'b', True), (ast.DataType.INT, 'c', True)]}
+        cfg = ircfg.build_program_cfgs(steps, funcs)[0]
+
+        # NOTE `a + b` reads `a` before its copy of 4, so it stays put and `t0` is just an operand.
+        self.assertEqual(irreassoc.ReassociatePass().run(cfg, funcs['f']), 1)
+        self.assertEqual(cfg.blocks[0].steps[3:5], [ir.IRAssign('t0', ir.IROp.ADD, 'a', 'b'), ir.IRAssign('a', ir.IROp.NOP, 4, None)])
+        self.assertEqual(irinterp.IRInterpreter([cfg], funcs).run('f', [10, 20, 30]), 84)
+
+    def test_char_temp(self):
+        steps = [ir.IRLabel('f'), ir.IRLoadParam('a'), ir.IRLoadParam('b'), ir.IRAssign('t0', ir.IROp.ADD, 'a', 100), ir.IRAssign('t1', ir.IROp.ADD, 't0', 'b'), ir.IRAssign('t2', ir.IROp.ADD, 't1', 100), ir.IRReturn('t2')]
+        funcs = {'f': [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'b', True), (ast.DataType.CHAR, 't0', False)]}
+        cfg = ircfg.build_program_cfgs(steps, funcs)[0]
+
+        # NOTE `t0` truncates to a char, so only the adds above it may fold their constants.
+        irreassoc.ReassociatePass().run(cfg, funcs['f'])
+
+        self.assertEqual(cfg.blocks[0].steps[2], ir.IRAssign('t0', ir.IROp.ADD, 'a', 100))
+        self.assertEqual(irinterp.IRInterpreter([cfg], funcs).run('f', [100, 1]), 301 - 256)
+
+if __name__ == '__main__':
+    unittest.main()
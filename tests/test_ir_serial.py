@@ -0,0 +1,124 @@
+"""
+    test_ir_serial.py\n
+    Added by DrkWithT\n
+    Unit tests for saving and loading IR as text and binary.
+"""
+
+import unittest
+import DerkCC.DCCStages.ast_nodes as ast
+import DerkCC.DCCStages.ir_types as ir
+import DerkCC.DCCStages.ir_cfg as ircfg
+import DerkCC.DCCStages.ir_ssa as irssa
+import DerkCC.DCCStages.ir_strength as irstrength
+import DerkCC.DCCStages.ir_serial as irserial
+from tests.test_ir_cfg import gen_ir_impl
+
+SAMPLE_PATHS = ['./c_samples/test_01.c', './c_samples/test_02.c', './c_samples/test_03.c', './c_samples/test_04.c', './c_samples/test_04a.c', './c_samples/test_07.c', './c_samples/test_16.c', './c_samples/test_18.c']
+
+# NOTE covers every step kind, including the ones only passes make.
+HAND_STEPS = [
+    ir.IRLabel('f'),
+    ir.IRLoadParam('p'),
+    ir.IRLoadConst('k', -42),
+    ir.IRAssign('n', ir.IROp.NEGATE, 'p', None),
+    ir.IRAssign('h', ir.IROp.MULTIPLY_HIGH, 'n', -1431655765),
+    ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 0, 'h'),
+    ir.IRLabel('L0'),
+    ir.IRPhi('x.1', {'f': 'k', 'L1': 7}),
+    ir.IRPhi('x.2', {}),
+    ir.IRPushArg('x.1', False, ast.DataType.CHAR),
+    ir.IRPushArg(300, True, ast.DataType.INT),
+    ir.IRCallFunc('g'),
+    ir.IRStoreYield('y'),
+    ir.IRTailCall('g'),
+    ir.IRLabel('L2'),
+    ir.IRJumpTable('p', -1, ['L0', 'L1', 'L0'], 'L1'),
+    ir.IRLabel('L1'),
+    ir.IRReturn('y')
+]
+
+HAND_FUNCS = {
+    'f': [(ast.DataType.INT, 'p', True), (ast.DataType.CHAR, 'k', False), (ast.DataType.INT, 'sr.0', False)],
+    'g': []
+}
+
+class SerialTester(unittest.TestCase):
+    def test_text_round_trip(self):
+        for file_path in SAMPLE_PATHS:
+            ir_result, funcs = gen_ir_impl(file_path)
+            text = irserial.dump_ir_text(ir_result, funcs)
+
+            self.assertEqual(irserial.load_ir_text(text), (ir_result, funcs), file_path)
+            self.assertEqual(irserial.dump_ir_text(*irserial.load_ir_text(text)), text)
+
+    def test_binary_round_trip(self):
+        for file_path in SAMPLE_PATHS:
+            ir_result, funcs = gen_ir_impl(file_path)
+            data = irserial.dump_ir_binary(ir_result, funcs)
+
+            self.assertEqual(irserial.load_ir_binary(data), (ir_result, funcs), file_path)
+            self.assertLess(len(data), len(irserial.dump_ir_text(ir_result, funcs)))
+
+    def test_every_step_kind(self):
+        text = irserial.dump_ir_text(HAND_STEPS, HAND_FUNCS)
+
+        self.assertIn('    k = $-42\n', text)
+        self.assertIn('    x.1 = Phi f:k L1:7\n', text)
+        self.assertIn('    PushArg x.1 CHAR\n', text)
+        self.assertIn('    JumpTable p -1 L1 L0 L1 L0\n', text)
+        self.assertEqual(irserial.load_ir_text(text), (HAND_STEPS, HAND_FUNCS))
+        self.assertEqual(irserial.load_ir_binary(irserial.dump_ir_binary(HAND_STEPS, HAND_FUNCS)), (HAND_STEPS, HAND_FUNCS))
+
+    def test_no_wrap_flag(self):
+        steps = [ir.IRLabel('f'), ir.IRLoadParam('p'), ir.IRAssign('q', ir.IROp.ADD, 'p', 1, True), ir.IRReturn('q')]
+        text = irserial.dump_ir_text(steps, {'f': []})
+
+        # NOTE the flag is left out of step equality, so it's checked on its own.
+        self.assertIn('    q = ADD p 1 nowrap\n', text)
+        self.assertTrue(irserial.load_ir_text(text)[0][2].no_wrap)
+        self.assertTrue(irserial.load_ir_binary(irserial.dump_ir_binary(steps, {'f': []}))[0][2].no_wrap)
+        self.assertFalse(irserial.load_ir_text(irserial.dump_ir_text(HAND_STEPS, HAND_FUNCS))[0][3].no_wrap)
+
+    def test_negative_literal_args(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_18.c')
+        pushes = [step for step in ir_result if step.get_ir_type() == ir.IRType.ARGV_PUSH]
+
+        # NOTE a negated literal folds to a constant, so its push is an immediate like any other literal's.
+        self.assertIn(ir.IRPushArg(-4, True, ast.DataType.INT), pushes)
+        self.assertTrue(all(step.immediate == (type(step.arg) == int) for step in pushes))
+        self.assertEqual(irserial.load_ir_text(irserial.dump_ir_text(ir_result, funcs)), (ir_result, funcs))
+        self.assertEqual(irserial.load_ir_binary(irserial.dump_ir_binary(ir_result, funcs)), (ir_result, funcs))
+
+    def test_optimized_round_trip(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_07.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+
+        for cfg in cfgs:
+            irstrength.StrengthReductionPass().run(cfg, funcs[cfg.func_name])
+            irssa.SSABuilder().construct(cfg)
+
+        steps = ircfg.flatten_cfgs(cfgs)
+
+        self.assertEqual(irserial.load_ir_text(irserial.dump_ir_text(steps, funcs)), (steps, funcs))
+        self.assertEqual(irserial.load_ir_binary(irserial.dump_ir_binary(steps, funcs)), (steps, funcs))
+
+    def test_bad_input(self):
+        with self.assertRaises(RuntimeError):
+            irserial.load_ir_text('f:\n    v0 = FROB v1 v2\n')
+
+        with self.assertRaises(RuntimeError):
+            irserial.load_ir_text('f:\n    Jump 12\n')
+
+        with self.assertRaises(RuntimeError):
+            irserial.dump_ir_text([ir.IRLabel('f'), ir.IRPushArg('v0', True, ast.DataType.INT)], {'f': []})
+
+        data = irserial.dump_ir_binary(HAND_STEPS, HAND_FUNCS)
+
+        with self.assertRaises(RuntimeError):
+            irserial.load_ir_binary(data[:-1])
+
+        with self.assertRaises(RuntimeError):
+            irserial.load_ir_binary(b'ELF' + data[3:])
+
+if __name__ == '__main__':
+    unittest.main()
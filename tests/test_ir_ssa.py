@@ -0,0 +1,125 @@
+"""
+    test_ir_ssa.py\n
+    Added by DrkWithT\n
+    Unit tests for SSA construction / destruction and SCCP.
+"""
+
+import unittest
+import DerkCC.DCCStages.ast_nodes as ast
+import DerkCC.DCCStages.ir_types as ir
+import DerkCC.DCCStages.ir_cfg as ircfg
+import DerkCC.DCCStages.ir_ssa as irssa
+from tests.test_ir_cfg import gen_ir_impl
+
+class SSATester(unittest.TestCase):
+    def test_single_definitions(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_04.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+        irssa.SSABuilder().construct(cfg)
+        print(cfg.dump())
+
+        defs = [step.get_def_addr() for block in cfg.blocks for step in block.steps if step.get_def_addr() is not None]
+        join_phis = irssa.get_leading_phis(cfg.blocks[cfg.get_block_id('L0')])
+
+        self.assertEqual(len(defs), len(set(defs)))
+        self.assertEqual(set(phi.dest.split('.')[0] for phi in join_phis), {'v0'})
+
+    def test_round_trip(self):
+        for file_path in ['./c_samples/test_03.c', './c_samples/test_04.c', './c_samples/test_04a.c', './c_samples/test_05.c']:
+            ir_result, funcs = gen_ir_impl(file_path)
+            cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+            expected = [str(step) for step in ir_result]
+
+            for cfg in cfgs:
+                builder = irssa.SSABuilder()
+                builder.construct(cfg)
+                builder.destruct(cfg)
+
+            self.assertEqual([str(step) for step in ircfg.flatten_cfgs(cfgs)], expected)
+
+class SCCPTester(unittest.TestCase):
+    def test_flag_branch_folding(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_05.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+        old_count = cfg.get_step_count()
+
+        changes = irssa.SCCPPass().run(cfg, funcs['pickSign'])
+        print(cfg.dump())
+
+        jump_ifs = [step for block in cfg.blocks for step in block.steps if step.get_ir_type() == ir.IRType.JUMP_IF]
+        assigns = [step for block in cfg.blocks for step in block.steps if step.get_ir_type() == ir.IRType.ADDR_ASSIGN]
+
+        # NOTE only the `x < 0` test survives, and the `debug` / `verbose` flags are gone.
+        self.assertGreater(changes, 0)
+        self.assertLess(cfg.get_step_count(), old_count)
+        self.assertEqual(len(jump_ifs), 1)
+        self.assertEqual(jump_ifs[0].op, ir.IROp.COMPARE_GTE)
+        self.assertFalse(any(step.op == ir.IROp.NOP and step.arg0 == 0 and step.dest in ('B', 'C') for step in assigns))
+
+    def test_phi_copy_on_split_edge(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('p'),
+            ir.IRAssign('x', ir.IROp.NOP, 1, None),
+            ir.IRJumpIf('L1', ir.IROp.COMPARE_LT, 'p', 0),
+            ir.IRAssign('x', ir.IROp.NOP, 'p', None),
+            ir.IRLabel('L1'),
+            ir.IRReturn('x')
+        ])
+        irssa.SCCPPass().run(cfg, [(ast.DataType.INT, 'p', True)])
+        print(cfg.dump())
+
+        split_block = cfg.blocks[cfg.blocks[0].succs[0]]
+
+        # NOTE `x = 1` only runs on the taken edge, as the fallthrough path overwrites it.
+        self.assertEqual(cfg.blocks[0].steps, [ir.IRLoadParam('p'), ir.IRJumpIf(split_block.label, ir.IROp.COMPARE_LT, 'p', 0)])
+        self.assertEqual(split_block.steps, [ir.IRAssign('x', ir.IROp.NOP, 1, None), ir.IRJump('L1')])
+
+    def test_constant_return_value(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('g'),
+            ir.IRAssign('a', ir.IROp.NOP, 6, None),
+            ir.IRAssign('b', ir.IROp.MULTIPLY, 'a', 7),
+            ir.IRAssign('c', ir.IROp.COMPARE_GT, 'b', 40),
+            ir.IRJumpIf('L0', ir.IROp.COMPARE_EQ, 0, 'c'),
+            ir.IRAssign('b', ir.IROp.ADD, 'b', 1),
+            ir.IRLabel('L0'),
+            ir.IRReturn('b')
+        ])
+        irssa.SCCPPass().run(cfg, [(ast.DataType.CHAR, 'b', False)])
+        print(cfg.dump())
+
+        self.assertEqual(cfg.to_steps(), [
+            ir.IRLabel('g'),
+            ir.IRAssign('b', ir.IROp.NOP, 43, None),
+            ir.IRLabel('L0'),
+            ir.IRReturn('b')
+        ])
+
+    def test_constant_table_index(self):
+        cfg = ircfg.build_cfg([
+            ir.IRLabel('h'),
+            ir.IRAssign('k', ir.IROp.NOP, 2, None),
+            ir.IRJumpTable('k', 1, ['L1', 'L2', 'L3'], 'L4'),
+            ir.IRLabel('L1'),
+            ir.IRReturn(10),
+            ir.IRLabel('L2'),
+            ir.IRReturn(20),
+            ir.IRLabel('L3'),
+            ir.IRReturn(30),
+            ir.IRLabel('L4'),
+            ir.IRReturn(0)
+        ])
+        irssa.SCCPPass().run(cfg, [(ast.DataType.INT, 'k', False)])
+        print(cfg.dump())
+
+        # NOTE only the entry for 2 is executable, so the table becomes a plain jump to it.
+        self.assertEqual(cfg.to_steps(), [
+            ir.IRLabel('h'),
+            ir.IRJump('L2'),
+            ir.IRLabel('L2'),
+            ir.IRReturn(20)
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,299 @@
+"""
+    test_mir.py\n
+    Added by DrkWithT\n
+    Unit tests for machine IR: instruction selection, register allocation, and running the emitted assembly.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+import DerkCC.DCCStages.ast_nodes as ast
+import DerkCC.DCCStages.ir_types as ir
+import DerkCC.DCCStages.ir_cfg as ircfg
+import DerkCC.DCCStages.ir_passes as irpasses
+import DerkCC.DCCStages.ir_interp as irinterp
+import DerkCC.DCCStages.mir_types as mir
+import DerkCC.DCCStages.mir_select as mirselect
+import DerkCC.DCCStages.mir_regalloc as mirregalloc
+import DerkCC.DCCStages.mir_callconv as mircallconv
+import DerkCC.DCCStages.mir_emit as miremit
+import DerkCC.DCCStages.ir_callgraph as ircallgraph
+from tests.test_ir_cfg import gen_ir_impl
+
+# NOTE calls each of test_13.c's chains in a loop, feeding its result back in as `a`, so every call waits on the one before it.
+CHAIN_DRIVER = r"""
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+
+int sumChain(int a, int b, int c, int d);
+int productChain(int a, int b, int c, int d);
+
+static double now_ns(void) {
+    struct timespec t;
+    clock_gettime(CLOCK_MONOTONIC, &t);
+    return t.tv_sec * 1e9 + t.tv_nsec;
+}
+
+int main(int argc, char **argv) {
+    long n = atol(argv[1]);
+    int s = 1, p = 1;
+    double t0 = now_ns();
+
+    for (long i = 0; i < n; i++) s = sumChain(s, (int)i, 3, 4);
+
+    double t1 = now_ns();
+
+    for (long i = 0; i < n; i++) p = productChain(p | 1, (int)i | 1, 5, 7);
+
+    double t2 = now_ns();
+    printf("%f %f %d %d\n", (t1 - t0) / n, (t2 - t1) / n, s, p);
+    return 0;
+}
+"""
+
+CHAIN_ITERATIONS = 10_000_000
+
+def select_steps(steps: ir.StepList, func_info) -> mir.MFunction:
+    return mirselect.InstructionSelector().select_function(ircfg.build_cfg(steps), func_info)
+
+def run_asm(asm_lines: list[str]) -> int:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        asm_path = os.path.join(temp_dir, 'out.s')
+        exe_path = os.path.join(temp_dir, 'out')
+
+        with open(asm_path, 'w') as asm_file:
+            asm_file.write(''.join(asm_lines))
+
+        subprocess.run(['gcc', '-o', exe_path, asm_path], check=True)
+
+        return subprocess.run([exe_path]).returncode
+
+def time_chains(asm_lines: list[str], runs: int = 5) -> tuple[float, float, str]:
+    """
+        Links test_13.c's chains with CHAIN_DRIVER, giving the best ns per call of `sumChain` and of `productChain` over `runs` runs, plus the driver's checksums.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        asm_path = os.path.join(temp_dir, 'chains.s')
+        driver_path = os.path.join(temp_dir, 'driver.c')
+        exe_path = os.path.join(temp_dir, 'chains')
+
+        with open(asm_path, 'w') as asm_file:
+            asm_file.write(''.join(asm_lines))
+
+        with open(driver_path, 'w') as driver_file:
+            driver_file.write(CHAIN_DRIVER)
+
+        subprocess.run(['gcc', '-O2', '-o', exe_path, driver_path, asm_path], check=True)
+        results = [subprocess.run([exe_path, str(CHAIN_ITERATIONS)], capture_output=True, text=True, check=True).stdout.split() for _ in range(runs)]
+
+        return (min(float(result[0]) for result in results), min(float(result[1]) for result in results), ' '.join(results[0][2:]))
+
+class InstructionSelectTester(unittest.TestCase):
+    def test_two_address_form(self):
+        mfunc = select_steps([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('a'),
+            ir.IRLoadParam('b'),
+            ir.IRAssign('t', ir.IROp.SUBTRACT, 'a', 'b'),
+            ir.IRAssign('b', ir.IROp.SUBTRACT, 'a', 'b'),
+            ir.IRReturn('b')
+        ], [(ast.DataType.INT, 'a', True), (ast.DataType.INT, 'b', True)])
+        print(mfunc.dump())
+
+        a, b, t, temp = mir.VirtualReg(0), mir.VirtualReg(1), mir.VirtualReg(2), mir.VirtualReg(3)
+
+        # NOTE copying `a` into `b` first would lose `b`, so that difference is worked out in a new register.
+        self.assertEqual([str(instr) for instr in mfunc.get_instrs()[2:]], [
+            f'movl {a}, {t}', f'subl {b}, {t}',
+            f'movl {a}, {temp}', f'subl {b}, {temp}', f'movl {temp}, {b}',
+            f'movl {b}, %eax', 'ret'
+        ])
+
+    def test_char_promotion(self):
+        mfunc = select_steps([
+            ir.IRLabel('f'),
+            ir.IRLoadParam('c'),
+            ir.IRAssign('d', ir.IROp.ADD, 'c', 1),
+            ir.IRAssign('e', ir.IROp.COMPARE_LT, 3, 'c'),
+            ir.IRReturn('d')
+        ], [(ast.DataType.CHAR, 'c', True), (ast.DataType.CHAR, 'd', False)])
+        texts = [str(instr) for instr in mfunc.get_instrs()]
+        print(mfunc.dump())
+
+        self.assertEqual(texts[0], 'movb %dil, %v0b')
+        self.assertIn('movsbl %v0b, %v2l', texts)
+        self.assertIn('movb %v2b, %v1b', texts)
+
+        # NOTE a constant can't be `cmp`'s 2nd operand, so `3 < c` is tested as `c > 3`.
+        self.assertIn('setg %v5b', texts)
+        self.assertEqual(texts[-2:], ['movsbl %v1b, %eax', 'ret'])
+
+    def test_args_copied_at_push(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_17.c')
+        ir_result = irpasses.optimize_program(ir_result, funcs, '-O1')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[0]
+        pushes = [step.arg for block in cfg.blocks for step in block.steps if step.get_ir_type() == ir.IRType.ARGV_PUSH]
+
+        # NOTE compaction reuses the 1st arg's address for the 2nd, which is written before the call.
+        self.assertEqual(len(pushes), 2)
+        self.assertEqual(pushes[0], pushes[1])
+
+        texts = [str(instr) for instr in mirselect.InstructionSelector().select_function(cfg, funcs['loop']).get_instrs()]
+        call_i = texts.index('call loop')
+        print('\n'.join(texts))
+
+        self.assertEqual([text.split()[-1] for text in texts[call_i - 3:call_i - 1]], ['%edi', '%esi'])
+        self.assertNotEqual(texts[call_i - 3].split()[1], texts[call_i - 2].split()[1])
+
+    def test_operand_roles(self):
+        eax, edx = mir.PhysReg('%rax', 4), mir.PhysReg('%rdx', 4)
+        vreg = mir.VirtualReg(0)
+        divide = mir.MInstr(mir.MOp.IDIV, [vreg], implicit_uses=(eax, edx), implicit_defs=(eax, edx))
+        add = mir.MInstr(mir.MOp.ADD, [mir.Immediate(1), vreg])
+
+        self.assertEqual(divide.get_uses(), [eax, edx, vreg])
+        self.assertEqual(divide.get_defs(), [eax, edx])
+        self.assertEqual(add.get_uses(), [vreg])
+        self.assertEqual(add.get_defs(), [vreg])
+        self.assertEqual(mir.MInstr(mir.MOp.XOR, [eax, eax]).get_uses(), [])
+        self.assertEqual(str(mir.MInstr(mir.MOp.MOVSX, [mir.Memory(0, mir.PhysReg('%rdx'), mir.PhysReg('%rax'), 4), mir.PhysReg('%rax')], 8)), 'movslq (%rdx,%rax,4), %rax')
+
+class RegisterAllocTester(unittest.TestCase):
+    def test_call_keeps_values(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_14.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[2]
+        mfunc = mirselect.InstructionSelector().select_function(cfg, funcs['guarded'])
+
+        self.assertEqual(mirregalloc.GraphColorAllocator().allocate(mfunc), 0)
+        print(mfunc.dump())
+
+        # NOTE `a * b` lives across the call to `twice`, so it needs a register the callee keeps.
+        self.assertEqual(mfunc.saved_regs, [mir.PhysReg('%rbx')])
+        self.assertTrue(all(type(operand) != mir.VirtualReg for instr in mfunc.get_instrs() for operand in instr.operands))
+
+    def test_spills_legalized(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_14.c')
+        cfg = ircfg.build_program_cfgs(ir_result, funcs)[1]
+        mfunc = mirselect.InstructionSelector().select_function(cfg, funcs['pressure'])
+        allocator = mirregalloc.GraphColorAllocator(('%rax', '%rcx'))
+
+        self.assertGreater(allocator.allocate(mfunc), 0)
+        print(mfunc.dump())
+
+        for instr in mfunc.get_instrs():
+            memory_count = len([operand for operand in instr.operands if type(operand) == mir.Memory])
+
+            self.assertLessEqual(memory_count, 1)
+            self.assertFalse(instr.op in mirregalloc.REG_DEST_MOPS and type(instr.operands[-1]) == mir.Memory)
+
+    def test_copies_coalesced(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_14.c')
+        emitter = miremit.MachineEmitter(funcs)
+        emitter.emit_all(irpasses.optimize_program(ir_result, funcs, '-O1'))
+        twice = emitter.mfuncs[0]
+
+        # NOTE `n` is colored as %rax to match the return, leaving one copy out of %edi.
+        self.assertEqual([str(instr) for instr in twice.get_instrs()], ['pushq %rbp', 'movq %rsp, %rbp', 'movl %edi, %eax', 'addl %eax, %eax', 'movq %rbp, %rsp', 'popq %rbp', 'ret'])
+        self.assertGreater(emitter.dropped_counts['twice'], 0)
+
+class CallingConvTester(unittest.TestCase):
+    def test_conventions_chosen(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_15.c')
+        call_graph = ircallgraph.get_call_graph(ircfg.build_program_cfgs(ir_result, funcs))
+
+        self.assertEqual(mircallconv.choose_conventions(call_graph), {
+            'spread': mir.FAST_CONV,
+            'step': mir.FAST_CONV,
+            'countDown': mir.FAST_SAVED_CONV,
+            'walk': mir.FAST_CONV,
+            'main': mir.SYSV_CONV
+        })
+        self.assertTrue(all(conv == mir.SYSV_CONV for conv in mircallconv.choose_conventions(call_graph, ('start',)).values()))
+
+    def test_internal_calls(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_15.c')
+        ir_result = irpasses.optimize_program(ir_result, funcs, '-O1')
+        fast_emitter = miremit.MachineEmitter(funcs)
+        sysv_emitter = miremit.MachineEmitter(funcs, [func_name for func_name in funcs if func_name != 'spread'])
+        asm_text = ''.join(fast_emitter.emit_all(ir_result))
+        sysv_emitter.emit_all(ir_result)
+
+        # NOTE `spread` takes 8 args, which only fit in registers when it's internal.
+        with self.assertRaises(RuntimeError):
+            miremit.MachineEmitter(funcs, tuple(funcs)).emit_all(ir_result)
+        walk = fast_emitter.mfuncs[3]
+        print(walk.dump())
+
+        # NOTE `step` only writes %rax, so `walk` keeps its values in caller-saved registers across the calls.
+        self.assertEqual(fast_emitter.selector.callee_clobbers['step'], ('%rax',))
+        self.assertEqual([instr.implicit_defs for instr in walk.get_instrs() if instr.op == mir.MOp.CALL], [(mir.PhysReg('%rax', 8),)])
+        self.assertEqual(walk.saved_regs, [])
+        self.assertGreater(len(sysv_emitter.mfuncs[3].saved_regs), 0)
+        self.assertLess(walk.get_instr_count(), sysv_emitter.mfuncs[3].get_instr_count())
+
+        self.assertNotIn('xorl %eax, %eax', [str(instr) for instr in walk.get_instrs()])
+        self.assertNotIn('.globl walk\n', asm_text)
+        self.assertIn('.globl main\n', asm_text)
+
+    def test_tail_call_fallback(self):
+        selector = mirselect.InstructionSelector()
+        selector.callee_convs = {'g': mir.FAST_CONV, 'h': mir.FAST_SAVED_CONV}
+        steps = [ir.IRLabel('f'), ir.IRLoadParam('a'), ir.IRPushArg('a', False, ast.DataType.INT), ir.IRTailCall('g')]
+        func_info = [(ast.DataType.INT, 'a', True)]
+
+        # NOTE `g` keeps no registers, so a System V function can't let it return to its caller.
+        sysv_ops = [instr.op for instr in selector.select_function(ircfg.build_cfg(steps), func_info).get_instrs()]
+        fast_ops = [instr.op for instr in selector.select_function(ircfg.build_cfg(steps), func_info, mir.FAST_CONV).get_instrs()]
+        steps[-1] = ir.IRTailCall('h')
+        kept_ops = [instr.op for instr in selector.select_function(ircfg.build_cfg(steps), func_info).get_instrs()]
+
+        self.assertEqual(sysv_ops[-2:], [mir.MOp.CALL, mir.MOp.RET])
+        self.assertEqual(fast_ops[-1], mir.MOp.TAIL_JMP)
+        self.assertEqual(kept_ops[-1], mir.MOp.TAIL_JMP)
+        self.assertNotIn(mir.MOp.XOR, sysv_ops)
+
+@unittest.skipUnless(shutil.which('gcc'), 'needs gcc to assemble and link')
+class MachineEmitterTester(unittest.TestCase):
+    def test_samples_run(self):
+        for file_path in ['./c_samples/test_11.c', './c_samples/test_12.c', './c_samples/test_13.c', './c_samples/test_14.c', './c_samples/test_15.c', './c_samples/test_17.c']:
+            for opt_level in ('-O0', '-O1', '-O2'):
+                ir_result, funcs = gen_ir_impl(file_path)
+                ir_result = irpasses.optimize_program(ir_result, funcs, opt_level)
+                expected = irinterp.load_program(ir_result, funcs).run('main', [])
+
+                self.assertEqual(run_asm(miremit.MachineEmitter(funcs).emit_all(ir_result)), expected & 0xFF, f'{file_path} at {opt_level}')
+
+    def test_spills_run(self):
+        ir_result, funcs = gen_ir_impl('./c_samples/test_14.c')
+        emitter = miremit.MachineEmitter(funcs)
+        emitter.allocator = mirregalloc.GraphColorAllocator(('%rax',))
+        asm_lines = emitter.emit_all(ir_result)
+
+        self.assertGreater(sum(emitter.allocator.spill_counts.values()), 0)
+        self.assertEqual(run_asm(asm_lines), -54 & 0xFF)
+
+    def build_chains(self, reassociate: bool) -> list[str]:
+        ir_result, funcs = gen_ir_impl('./c_samples/test_13.c')
+        cfgs = ircfg.build_program_cfgs(ir_result, funcs)
+
+        # NOTE main's calls would be folded or inlined away, so the passes that do so or drop the callees after are left out.
+        skipped = {'consteval', 'specialize', 'deadfuncs'} | (set() if reassociate else {'reassoc'})
+        irpasses.PassManager([opt_pass for opt_pass in irpasses.get_pipeline('-O2') if opt_pass.name not in skipped], verify=True).run(cfgs, funcs)
+        chain_names = ('sumChain', 'productChain')
+
+        return miremit.MachineEmitter(funcs, chain_names).emit_all(ircfg.flatten_cfgs([cfg for cfg in cfgs if cfg.func_name in chain_names]))
+
+    def test_chain_timing(self):
+        chain_sum_ns, chain_product_ns, chain_checksums = time_chains(self.build_chains(False))
+        tree_sum_ns, tree_product_ns, tree_checksums = time_chains(self.build_chains(True))
+
+        # NOTE the times are only reported, as they vary too much between machines to assert on.
+        print(f'sumChain: {chain_sum_ns:.2f} -> {tree_sum_ns:.2f} ns/call, productChain: {chain_product_ns:.2f} -> {tree_product_ns:.2f} ns/call')
+
+        self.assertEqual(tree_checksums, chain_checksums)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,5 +57,161 @@ class ParserTester(unittest.TestCase):
 
             self.assertTrue(ast_ok and len(ast_4) > 0)
 
+    def test_parse_7(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_07.c') as source_7:
+            parser.use_source(source_7.read())
+
+            ast_ok, ast_7 = parser.parse_all()
+
+            print(ast_7)
+
+            self.assertTrue(ast_ok and len(ast_7) > 0)
+
+    def test_parse_8(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_08.c') as source_8:
+            parser.use_source(source_8.read())
+
+            ast_ok, ast_8 = parser.parse_all()
+
+            print(ast_8)
+
+            self.assertTrue(ast_ok and len(ast_8) > 0)
+
+    def test_parse_9(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_09.c') as source_9:
+            parser.use_source(source_9.read())
+
+            ast_ok, ast_9 = parser.parse_all()
+
+            print(ast_9)
+
+            self.assertTrue(ast_ok and len(ast_9) > 0)
+
+    def test_parse_10(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_10.c') as source_10:
+            parser.use_source(source_10.read())
+
+            ast_ok, ast_10 = parser.parse_all()
+
+            print(ast_10)
+
+            self.assertTrue(ast_ok and len(ast_10) > 0)
+
+    def test_parse_11(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_11.c') as source_11:
+            parser.use_source(source_11.read())
+
+            ast_ok, ast_11 = parser.parse_all()
+
+            print(ast_11)
+
+            self.assertTrue(ast_ok and len(ast_11) > 0)
+
+    def test_parse_12(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_12.c') as source_12:
+            parser.use_source(source_12.read())
+
+            ast_ok, ast_12 = parser.parse_all()
+
+            print(ast_12)
+
+            self.assertTrue(ast_ok and len(ast_12) > 0)
+
+    def test_parse_13(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_13.c') as source_13:
+            parser.use_source(source_13.read())
+
+            ast_ok, ast_13 = parser.parse_all()
+
+            print(ast_13)
+
+            self.assertTrue(ast_ok and len(ast_13) > 0)
+
+    def test_parse_14(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_14.c') as source_14:
+            parser.use_source(source_14.read())
+
+            ast_ok, ast_14 = parser.parse_all()
+
+            print(ast_14)
+
+            self.assertTrue(ast_ok and len(ast_14) > 0)
+
+    def test_parse_15(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_15.c') as source_15:
+            parser.use_source(source_15.read())
+
+            ast_ok, ast_15 = parser.parse_all()
+
+            print(ast_15)
+
+            self.assertTrue(ast_ok and len(ast_15) > 0)
+
+    def test_parse_16(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_16.c') as source_16:
+            parser.use_source(source_16.read())
+
+            ast_ok, ast_16 = parser.parse_all()
+
+            print(ast_16)
+
+            self.assertTrue(ast_ok and len(ast_16) > 0)
+
+    def test_parse_17(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_17.c') as source_17:
+            parser.use_source(source_17.read())
+
+            ast_ok, ast_17 = parser.parse_all()
+
+            print(ast_17)
+
+            self.assertTrue(ast_ok and len(ast_17) > 0)
+
+    def test_parse_18(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_18.c') as source_18:
+            parser.use_source(source_18.read())
+
+            ast_ok, ast_18 = parser.parse_all()
+
+            print(ast_18)
+
+            self.assertTrue(ast_ok and len(ast_18) > 0)
+
+    def test_parse_19(self):
+        parser = pycc_parser.Parser()
+
+        with open('./c_samples/test_19.c') as source_19:
+            parser.use_source(source_19.read())
+
+            ast_ok, ast_19 = parser.parse_all()
+
+            print(ast_19)
+
+            self.assertTrue(ast_ok and len(ast_19) > 0)
+
 if __name__ == '__main__':
     unittest.main()
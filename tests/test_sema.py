@@ -94,6 +94,279 @@ class SemAnalyzerTester(unittest.TestCase):
 
             self.assertTrue(len(errors) == 0)
 
+    def test_good_7(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_07.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 7!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_8(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_08.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 8!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_9(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_09.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 9!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_10(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_10.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 10!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_11(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_11.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 11!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_12(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_12.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 12!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_13(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_13.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 13!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_14(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_14.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 14!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_15(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_15.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 15!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_16(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_16.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 16!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_17(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_17.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 17!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_18(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_18.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 18!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
+    def test_good_19(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_19.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for source 19!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) == 0)
+
     def test_bad_1(self):
         parser = par.Parser()
         checker = sema.SemanticChecker()
@@ -175,5 +448,26 @@ class SemAnalyzerTester(unittest.TestCase):
 
             self.assertTrue(len(errors) > 0)
 
+    def test_bad_5(self):
+        parser = par.Parser()
+        checker = sema.SemanticChecker()
+
+        with open('./c_samples/test_bad_05.c') as src:
+            parser.use_source(src.read())
+            ok, ast = parser.parse_all()
+
+            self.assertTrue(ok)
+
+            if not ok:
+                print('Parsing failed for bad source 5!')
+                return
+
+            errors = checker.check_ast(ast)
+
+            for sem_err in errors:
+                print(f'Semantic Error:\nCulprit symbol: {sem_err[0]}\nScope of {sem_err[1]}\n{sem_err[2]}\n')
+
+            self.assertTrue(len(errors) > 0)
+
 if __name__ == '__main__':
     unittest.main()